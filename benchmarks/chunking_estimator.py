@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Offline chunk and token estimator for the chunking strategies of the knowledge base data source.
+
+Reads the reference documents (the local well_architected_docs folder, or the documents synced by
+the KB synchronizer to the reference documents bucket), applies each candidate chunking strategy
+and reports chunk counts, embedded tokens and the estimated ingestion time per strategy.
+
+Tokens are approximated by splitting the text on words and punctuation, which is close to the
+embedding model tokenizer for English prose. Semantic chunking depends on embedding similarity,
+so its breakpoints are approximated from the breakpoint percentile.
+
+Usage:
+    python3 benchmarks/chunking_estimator.py
+    python3 benchmarks/chunking_estimator.py --bucket <reference-docs-bucket> --strategy fixed_size:300:20
+"""
+
+import argparse
+import configparser
+import io
+import json
+import math
+import os
+import re
+import sys
+
+DEFAULT_DOCS_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "ecs_fargate_app", "well_architected_docs"
+)
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), "..", "config.ini")
+
+# Compared with the strategy configured in config.ini
+DEFAULT_CANDIDATES = [
+    "fixed_size:300:20",
+    "hierarchical:60:1500:300",
+    "hierarchical:60:2000:800",
+    "semantic:0:95:300",
+    "none",
+]
+
+# Titan Text Embeddings V2 input limit, longer chunks are truncated when embedded
+MAX_EMBEDDING_TOKENS = 8192
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+TEXT_EXTENSIONS = (".txt", ".md", ".csv", ".json", ".html", ".htm")
+
+
+def count_tokens(text):
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def is_ingested(name):
+    """
+    Returns whether the data source ingests the file (metadata sidecar files are not documents)
+    """
+    lower_name = name.lower()
+    return not lower_name.endswith(".metadata.json") and lower_name.endswith(
+        (".pdf",) + TEXT_EXTENSIONS
+    )
+
+
+def extract_text(name, content):
+    if name.lower().endswith(".pdf"):
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            sys.exit("pypdf is required to read PDF documents: pip3 install -r benchmarks/requirements.txt")
+        reader = PdfReader(io.BytesIO(content))
+        return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+    return content.decode("utf-8", errors="ignore")
+
+
+def load_local_documents(docs_dir):
+    documents = []
+    for root, _, files in os.walk(docs_dir):
+        for file_name in sorted(files):
+            if not is_ingested(file_name):
+                continue
+            path = os.path.join(root, file_name)
+            with open(path, "rb") as f:
+                documents.append((os.path.relpath(path, docs_dir), extract_text(file_name, f.read())))
+    return documents
+
+
+def load_bucket_documents(bucket, prefix):
+    import boto3
+
+    s3 = boto3.client("s3")
+    documents = []
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            if not is_ingested(key):
+                continue
+            content = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+            documents.append((key, extract_text(key, content)))
+    return documents
+
+
+def split_with_overlap(total, size, overlap):
+    """
+    Returns the sizes of the chunks of `size` tokens covering `total` tokens,
+    each chunk repeating the last `overlap` tokens of the previous one
+    """
+    if total <= size:
+        return [total] if total else []
+    stride = max(1, size - overlap)
+    count = math.ceil((total - size) / stride) + 1
+    return [min(size, total - i * stride) for i in range(count)]
+
+
+def chunk_fixed_size(text, max_tokens, overlap_percentage):
+    overlap = max_tokens * overlap_percentage // 100
+    chunks = split_with_overlap(count_tokens(text), max_tokens, overlap)
+    return chunks, 0, 0
+
+
+def chunk_hierarchical(text, overlap_tokens, max_parent_tokens, max_child_tokens):
+    # Only the child chunks are embedded, parents are returned as retrieval context
+    children = []
+    for parent in split_with_overlap(count_tokens(text), max_parent_tokens, overlap_tokens):
+        children.extend(split_with_overlap(parent, max_child_tokens, overlap_tokens))
+    return children, 0, 0
+
+
+def chunk_semantic(text, buffer_size, breakpoint_percentile, max_tokens):
+    sentences = [count_tokens(s) for s in SENTENCE_PATTERN.split(text)]
+    sentences = [tokens for tokens in sentences if tokens]
+
+    # Each sentence is embedded with its buffer to compute the similarity with the next one
+    chunking_tokens = sum(
+        sum(sentences[max(0, i - buffer_size): i + buffer_size + 1])
+        for i in range(len(sentences))
+    )
+
+    # The least similar (100 - percentile)% of the sentence boundaries become breakpoints
+    breakpoint_every = max(1, round(100 / (100 - breakpoint_percentile)))
+
+    chunks = []
+    current = 0
+    for i, tokens in enumerate(sentences):
+        if current and (current + tokens > max_tokens or i % breakpoint_every == 0):
+            chunks.append(current)
+            current = 0
+        # Sentences longer than the limit are split
+        while tokens > max_tokens:
+            chunks.append(max_tokens)
+            tokens -= max_tokens
+        current += tokens
+    if current:
+        chunks.append(current)
+
+    return chunks, chunking_tokens, len(sentences)
+
+
+def chunk_none(text):
+    tokens = count_tokens(text)
+    return ([tokens] if tokens else []), 0, 0
+
+
+STRATEGIES = {
+    "fixed_size": (chunk_fixed_size, 2),
+    "hierarchical": (chunk_hierarchical, 3),
+    "semantic": (chunk_semantic, 3),
+    "none": (chunk_none, 0),
+}
+
+
+def parse_strategy(spec):
+    """
+    Parses a strategy spec, e.g. fixed_size:300:20 (max tokens, overlap %),
+    hierarchical:60:2000:800 (overlap tokens, max parent tokens, max child tokens),
+    semantic:0:95:300 (buffer size, breakpoint percentile, max tokens) or none
+    """
+    name, *params = spec.split(":")
+    if name not in STRATEGIES or len(params) != STRATEGIES[name][1]:
+        raise argparse.ArgumentTypeError(f"Invalid chunking strategy: {spec}")
+    return name, [int(p) for p in params]
+
+
+def configured_strategy(config_path):
+    """
+    Returns the spec of the strategy configured in config.ini (same settings as WAGenAIStack)
+    """
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    settings = config["settings"] if config.has_section("settings") else {}
+
+    def setting(name, default):
+        return settings.get(name, default)
+
+    strategy = setting("kb_chunking_strategy", "hierarchical").strip().lower()
+    if strategy == "fixed_size":
+        return f"fixed_size:{setting('kb_chunk_max_tokens', 300)}:{setting('kb_chunk_overlap_percentage', 20)}"
+    if strategy == "hierarchical":
+        return (
+            f"hierarchical:{setting('kb_chunk_overlap_tokens', 60)}:"
+            f"{setting('kb_chunk_max_parent_tokens', 2000)}:{setting('kb_chunk_max_child_tokens', 800)}"
+        )
+    if strategy == "semantic":
+        return (
+            f"semantic:{setting('kb_chunk_buffer_size', 0)}:"
+            f"{setting('kb_chunk_breakpoint_percentile', 95)}:{setting('kb_chunk_max_tokens', 300)}"
+        )
+    return "none"
+
+
+def estimate(documents, spec, embedding_rpm, embedding_tpm):
+    name, params = parse_strategy(spec)
+    chunk_fn = STRATEGIES[name][0]
+
+    chunk_sizes = []
+    chunking_tokens = 0
+    chunking_requests = 0
+    for _, text in documents:
+        sizes, extra_tokens, extra_requests = chunk_fn(text, *params)
+        chunk_sizes.extend(sizes)
+        chunking_tokens += extra_tokens
+        chunking_requests += extra_requests
+
+    embedded_tokens = sum(min(size, MAX_EMBEDDING_TOKENS) for size in chunk_sizes)
+    truncated_tokens = sum(max(0, size - MAX_EMBEDDING_TOKENS) for size in chunk_sizes)
+    # Semantic chunking embeds every sentence window once more while chunking
+    embedding_requests = len(chunk_sizes) + chunking_requests
+    total_tokens = embedded_tokens + chunking_tokens
+
+    # Ingestion is bound by the embedding model quotas
+    ingestion_minutes = max(embedding_requests / embedding_rpm, total_tokens / embedding_tpm)
+
+    return {
+        "chunks": len(chunk_sizes),
+        "avg_chunk_tokens": round(embedded_tokens / len(chunk_sizes)) if chunk_sizes else 0,
+        "embedded_tokens": embedded_tokens,
+        "chunking_tokens": chunking_tokens,
+        "truncated_tokens": truncated_tokens,
+        "embedding_requests": embedding_requests,
+        "ingestion_minutes": round(ingestion_minutes, 1),
+    }
+
+
+def print_results(document_count, source_tokens, results):
+    print(f"\nChunking estimate - {document_count} documents, {source_tokens} source tokens")
+    print(
+        f"{'strategy':<28}{'chunks':>9}{'avg tokens':>12}{'embedded':>12}"
+        f"{'chunking':>11}{'truncated':>11}{'minutes':>9}"
+    )
+    for spec, metrics in results.items():
+        print(
+            f"{spec:<28}{metrics['chunks']:>9}{metrics['avg_chunk_tokens']:>12}"
+            f"{metrics['embedded_tokens']:>12}{metrics['chunking_tokens']:>11}"
+            f"{metrics['truncated_tokens']:>11}{metrics['ingestion_minutes']:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs-dir", default=DEFAULT_DOCS_DIR, help="Local reference documents")
+    parser.add_argument("--bucket", help="Read the synced documents from this bucket instead")
+    parser.add_argument("--prefix", default="", help="Key prefix of the documents in the bucket")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="config.ini with the configured strategy")
+    parser.add_argument(
+        "--strategy",
+        action="append",
+        type=lambda spec: parse_strategy(spec) and spec,
+        help="Candidate strategy (repeatable), e.g. fixed_size:300:20, hierarchical:60:2000:800, semantic:0:95:300, none",
+    )
+    parser.add_argument(
+        "--embedding-rpm", type=float, default=2000, help="Embedding requests per minute quota"
+    )
+    parser.add_argument(
+        "--embedding-tpm", type=float, default=300_000, help="Embedding tokens per minute quota"
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.bucket:
+        documents = load_bucket_documents(args.bucket, args.prefix)
+    else:
+        documents = load_local_documents(args.docs_dir)
+    if not documents:
+        sys.exit("No documents found")
+
+    candidates = [configured_strategy(args.config)]
+    for spec in args.strategy or DEFAULT_CANDIDATES:
+        if spec not in candidates:
+            candidates.append(spec)
+
+    results = {
+        spec: estimate(documents, spec, args.embedding_rpm, args.embedding_tpm)
+        for spec in candidates
+    }
+    print_results(len(documents), sum(count_tokens(text) for _, text in documents), results)
+    print(f"\nConfigured strategy: {candidates[0]}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
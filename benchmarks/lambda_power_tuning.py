@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Local power tuning of the Python Lambdas (KB synchronizer, storage migration, stack cleanup
+and work item cleanup).
+
+Replays each handler against in-memory stand-ins, measures its CPU time, peak memory, API calls,
+bytes transferred and idle time, then models its duration and cost at several memory sizes and
+recommends the cheapest size that meets the latency target of the function.
+
+Usage:
+    python3 benchmarks/lambda_power_tuning.py
+    python3 benchmarks/lambda_power_tuning.py --memory 256 512 1024 --target migration=120
+"""
+
+import argparse
+import configparser
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from unittest import mock
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+for function_dir in [
+    "lambda_kb_synchronizer",
+    "lambda_migration",
+    "lambda_stack_cleanup",
+    "lambda_work_item_cleanup",
+]:
+    sys.path.insert(0, os.path.join(ROOT, "ecs_fargate_app", function_dir))
+
+import boto3  # noqa: E402
+import kb_synchronizer  # noqa: E402
+import migration  # noqa: E402
+import requests  # noqa: E402
+import stack_cleanup  # noqa: E402
+import work_item_cleanup  # noqa: E402
+from migration_benchmark import BUCKET, TABLE, WA_DOCS_BUCKET, generate_dataset  # noqa: E402
+from stand_ins import (  # noqa: E402
+    BedrockAgentStandIn,
+    CloudFormationStandIn,
+    DynamoDBResourceStandIn,
+    DynamoDBStandIn,
+    ECRStandIn,
+    S3StandIn,
+    WellArchitectedStandIn,
+)
+
+DEFAULT_CONFIG = os.path.join(ROOT, "config.ini")
+
+# Lambda allocates one full vCPU at 1769 MB, and a proportional share below
+FULL_VCPU_MEMORY_MB = 1769
+
+# Request and duration prices (USD, us-east-1 on-demand list prices)
+REQUEST_PRICE = 0.20 / 1_000_000
+GB_SECOND_PRICE = {"x86_64": 0.0000166667, "arm64": 0.0000133334}
+
+DEFAULT_MEMORY_SIZES = [128, 256, 512, 1024, 1769, 3008]
+
+# Default latency target of each function in seconds
+FUNCTIONS = {
+    "kb_synchronizer": 120,
+    "migration": 600,
+    "stack_cleanup": 60,
+    "work_item_cleanup": 30,
+}
+
+
+class Context:
+    """Lambda context stand-in, the handlers only ask for the remaining time"""
+
+    def __init__(self, timeout_ms=15 * 60 * 1000):
+        self.timeout_ms = timeout_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.timeout_ms
+
+
+class Replay:
+    """
+    Records what the handler does besides computing: API calls, bytes exchanged with the services
+    and time spent sleeping (rate limiting and polling), which the replay skips
+    """
+
+    def __init__(self, clients, resources=None):
+        self.clients = clients
+        self.resources = resources or {}
+        self.downloads = 0
+        self.downloaded_bytes = 0
+        self.idle_seconds = 0.0
+
+    def client(self, service_name, *args, **kwargs):
+        return self.clients[service_name]
+
+    def resource(self, service_name, *args, **kwargs):
+        return self.resources[service_name]
+
+    def sleep(self, seconds):
+        self.idle_seconds += seconds
+
+    @property
+    def api_calls(self):
+        stand_ins = list(self.clients.values()) + list(self.resources.values())
+        return sum(sum(s.calls.values()) for s in stand_ins) + self.downloads
+
+    @property
+    def bytes_transferred(self):
+        stand_ins = list(self.clients.values()) + list(self.resources.values())
+        return sum(s.bytes_transferred for s in stand_ins) + self.downloaded_bytes
+
+
+def lens_prefixes():
+    """Bucket prefixes of the synchronized lenses, one KB data source each"""
+    with open(kb_synchronizer.LENSES_FILE) as lenses_file:
+        lenses = json.load(lenses_file)
+    return sorted(
+        {
+            lens["lensArn"].split("/")[-1]
+            for lens in [lenses["wellarchitectedLens"], *lenses["additionalLenses"]]
+        }
+    )
+
+
+def kb_synchronizer_scenario(args):
+    """Every lens is synchronized, PDFs are --pdf-mb each"""
+    replay = Replay(
+        {
+            "s3": S3StandIn(store_bodies=False),
+            "wellarchitected": WellArchitectedStandIn(),
+            "bedrock-agent": BedrockAgentStandIn(),
+        },
+        {"dynamodb": DynamoDBResourceStandIn()},
+    )
+    pdf_size = int(args.pdf_mb * 1024 * 1024)
+
+    class Response:
+        def __init__(self):
+            self.content = b"%PDF-1.7\n" + bytes(pdf_size)
+
+        def raise_for_status(self):
+            pass
+
+    def get(url, *a, **kwargs):
+        replay.downloads += 1
+        replay.downloaded_bytes += pdf_size
+        return Response()
+
+    patches = [mock.patch.object(requests, "get", get)]
+    environment = {
+        "WA_DOCS_BUCKET_NAME": "wafr-reference-docs-bucket",
+        "WORKLOAD_ID": "benchmark-workload",
+        "LENS_METADATA_TABLE": "LensMetadataTable",
+        "KNOWLEDGE_BASE_ID": "KB123456",
+        "DATA_SOURCE_IDS": json.dumps(
+            {prefix: f"DS{i:06d}" for i, prefix in enumerate(lens_prefixes())}
+        ),
+    }
+    return kb_synchronizer.handler, {}, replay, environment, patches, 1
+
+
+def migration_scenario(args):
+    """Old-format table and bucket of --migration-items work items"""
+    dynamodb, s3 = DynamoDBStandIn(), S3StandIn()
+    generate_dataset(dynamodb, s3, args.migration_items, args.objects_per_item)
+    replay = Replay({"dynamodb": dynamodb, "s3": s3})
+    environment = {
+        "ANALYSIS_METADATA_TABLE": TABLE,
+        "ANALYSIS_STORAGE_BUCKET": BUCKET,
+        "WA_DOCS_BUCKET_NAME": WA_DOCS_BUCKET,
+    }
+    return migration.handler, {"mode": "migrate"}, replay, environment, [], 1
+
+
+def stack_cleanup_scenario(args):
+    """
+    Deployment stack with a nested stack, --cleanup-buckets buckets holding --cleanup-objects objects
+    in total and two repositories of 500 images
+    """
+    cloudformation, s3, ecr = CloudFormationStandIn(), S3StandIn(), ECRStandIn()
+
+    buckets = [f"deployment-bucket-{i}" for i in range(args.cleanup_buckets)]
+    for i in range(args.cleanup_objects):
+        bucket = buckets[i % len(buckets)]
+        s3.add_object(bucket, f"assets/{i:08d}.json", 20_000)
+    for repository in ["deployment-frontend", "deployment-backend"]:
+        ecr.add_images(repository, 500)
+
+    cloudformation.add_stack(
+        "deployment-stack",
+        [("AWS::S3::Bucket", bucket) for bucket in buckets[1:]]
+        + [("AWS::ECR::Repository", "deployment-frontend")]
+        + [("AWS::CloudFormation::Stack", "deployment-stack-nested")]
+        + [("AWS::IAM::Role", f"role-{i}") for i in range(200)],
+    )
+    cloudformation.add_stack(
+        "deployment-stack-nested",
+        [("AWS::S3::Bucket", buckets[0]), ("AWS::ECR::Repository", "deployment-backend")],
+    )
+
+    replay = Replay({"cloudformation": cloudformation, "s3": s3, "ecr": ecr})
+    event = {"detail-type": "CloudFormation Stack Status Change", "detail": {"stack-name": "deployment-stack"}}
+    environment = {"ALLOWED_STACK_NAMES": "deployment-stack"}
+    return stack_cleanup.handler, event, replay, environment, [], stack_cleanup.DRAIN_CONCURRENCY
+
+
+def work_item_cleanup_scenario(args):
+    """Stream batch of --expired-items work items removed by the TTL, --objects-per-item objects each"""
+    s3 = S3StandIn()
+    records = []
+    for i in range(args.expired_items):
+        user_id, file_id = f"user-{i % 50:03d}", f"file-{i:08d}"
+        for j in range(args.objects_per_item):
+            s3.add_object(BUCKET, f"{user_id}/{file_id}/object-{j}.json", 50_000)
+        records.append(
+            {
+                "eventName": "REMOVE",
+                "userIdentity": {"type": "Service", "principalId": "dynamodb.amazonaws.com"},
+                "dynamodb": {"Keys": {"userId": {"S": user_id}, "fileId": {"S": file_id}}},
+            }
+        )
+
+    replay = Replay({"s3": s3})
+    environment = {"ANALYSIS_STORAGE_BUCKET": BUCKET}
+    return work_item_cleanup.handler, {"Records": records}, replay, environment, [], 1
+
+
+SCENARIOS = {
+    "kb_synchronizer": kb_synchronizer_scenario,
+    "migration": migration_scenario,
+    "stack_cleanup": stack_cleanup_scenario,
+    "work_item_cleanup": work_item_cleanup_scenario,
+}
+
+
+def replay_handler(function, args, trace_memory):
+    """
+    Runs the handler once on a fresh scenario. Returns the CPU time and what the replay recorded,
+    or the peak memory of the handler when trace_memory is set (tracing distorts the CPU time).
+    """
+    handler, event, replay, environment, patches, api_concurrency = SCENARIOS[function](args)
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(os.environ, environment))
+        stack.enter_context(mock.patch.object(boto3, "client", replay.client))
+        stack.enter_context(mock.patch.object(boto3, "resource", replay.resource))
+        stack.enter_context(mock.patch.object(time, "sleep", replay.sleep))
+        for patch in patches:
+            stack.enter_context(patch)
+        # The handlers print or log every object and lens, which would dominate the measurements
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+
+        if trace_memory:
+            tracemalloc.start()
+            baseline_memory = tracemalloc.get_traced_memory()[0]
+            handler(event, Context())
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # What is still held at the end is stored in the stand-ins, not by the handler
+            return {"peak_memory_mb": (peak_memory - max(current_memory, baseline_memory)) / (1024 * 1024)}
+
+        start = time.process_time()
+        response = handler(event, Context())
+        cpu_seconds = time.process_time() - start
+
+    if response.get("statusCode") != 200:
+        raise RuntimeError(f"{function} replay failed: {response}")
+
+    return {
+        "cpu_seconds": cpu_seconds,
+        "api_calls": replay.api_calls,
+        "api_concurrency": api_concurrency,
+        "transferred_mb": replay.bytes_transferred / (1024 * 1024),
+        "idle_seconds": replay.idle_seconds,
+    }
+
+
+def measure(function, args):
+    """
+    Replays the handler --repeat times and keeps the median CPU time, then once more to trace memory
+    """
+    runs = [replay_handler(function, args, trace_memory=False) for _ in range(args.repeat)]
+    measurement = dict(runs[-1])
+    measurement["cpu_seconds"] = statistics.median(run["cpu_seconds"] for run in runs)
+    measurement.update(replay_handler(function, args, trace_memory=True))
+    return measurement
+
+
+def model(measurement, memory_mb, architecture, args):
+    """
+    Estimates the duration and cost of an invocation at the given memory size.
+    CPU time scales with the vCPU share (the handlers are single-threaded or I/O-bound, so nothing
+    is gained above one vCPU), transfers with the network bandwidth, which also grows with memory
+    up to a cap, while API round trips and sleeps take the same time at every size.
+    """
+    cpu_seconds = (
+        measurement["cpu_seconds"] * args.cpu_factor * max(1.0, FULL_VCPU_MEMORY_MB / memory_mb)
+    )
+    bandwidth = min(args.bandwidth_cap, args.bandwidth_per_gb * memory_mb / 1024)
+    transfer_seconds = measurement["transferred_mb"] / bandwidth
+    api_seconds = (
+        measurement["api_calls"] * args.api_latency_ms / 1000 / measurement["api_concurrency"]
+    )
+    duration = cpu_seconds + transfer_seconds + api_seconds + measurement["idle_seconds"]
+
+    billed_ms = math.ceil(duration * 1000)
+    cost = billed_ms / 1000 * memory_mb / 1024 * GB_SECOND_PRICE[architecture] + REQUEST_PRICE
+    required_mb = measurement["peak_memory_mb"] * args.memory_overhead + args.runtime_mb
+
+    return {
+        "memory_mb": memory_mb,
+        "duration_seconds": round(duration, 3),
+        "cost_usd": cost,
+        "out_of_memory": required_mb > memory_mb,
+    }
+
+
+def recommend(estimates, target_seconds):
+    """
+    Returns the cheapest estimate meeting the target. When none does, returns the cheapest one
+    within 5% of the fastest, since more memory does not speed up API-bound functions.
+    """
+    candidates = [estimate for estimate in estimates if not estimate["out_of_memory"]]
+    if not candidates:
+        return None
+    meeting = [e for e in candidates if e["duration_seconds"] <= target_seconds]
+    if not meeting:
+        fastest = min(e["duration_seconds"] for e in candidates)
+        meeting = [e for e in candidates if e["duration_seconds"] <= fastest * 1.05]
+    return min(meeting, key=lambda e: (e["cost_usd"], e["memory_mb"]))
+
+
+def configured_settings(config_path):
+    """
+    Returns the configured memory size and architecture of each function (same settings as WAGenAIStack)
+    """
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    settings = config["settings"] if config.has_section("settings") else {}
+    defaults = {
+        "kb_synchronizer": 1024,
+        "migration": 1024,
+        "stack_cleanup": 256,
+        "work_item_cleanup": 256,
+    }
+
+    configured = {}
+    for function, default_memory in defaults.items():
+        architecture = (
+            settings.get(f"{function}_architecture", "").strip()
+            or settings.get("architecture", "x86_64").strip()
+        ).lower()
+        if architecture == "auto":
+            architecture = platform.machine().lower()
+        architecture = {"amd64": "x86_64", "aarch64": "arm64"}.get(architecture, architecture)
+        configured[function] = {
+            "memory_mb": int(settings.get(f"{function}_memory", default_memory)),
+            "architecture": architecture,
+        }
+    return configured
+
+
+def parse_target(spec):
+    function, _, seconds = spec.partition("=")
+    if function not in FUNCTIONS or not seconds:
+        raise argparse.ArgumentTypeError(
+            f"Invalid target {spec}, expected <function>=<seconds> with function in {', '.join(FUNCTIONS)}"
+        )
+    return function, float(seconds)
+
+
+def print_results(function, result):
+    measurement = result["measurement"]
+    print(
+        f"\n{function} ({result['architecture']}, configured {result['configured_memory_mb']} MB, "
+        f"target {result['target_seconds']}s)"
+    )
+    print(
+        f"  measured: {measurement['cpu_seconds']:.3f}s CPU, {measurement['peak_memory_mb']:.1f} MB peak, "
+        f"{measurement['api_calls']} API calls, {measurement['transferred_mb']:.1f} MB transferred, "
+        f"{measurement['idle_seconds']:.0f}s idle"
+    )
+    print(f"  {'memory (MB)':>12}{'duration (s)':>14}{'$ / 1000 calls':>16}")
+    for estimate in result["estimates"]:
+        if estimate["out_of_memory"]:
+            note = "out of memory"
+        else:
+            note = "meets target" if estimate["duration_seconds"] <= result["target_seconds"] else ""
+            if result["recommended_memory_mb"] == estimate["memory_mb"]:
+                note += " <- recommended"
+        print(
+            f"  {estimate['memory_mb']:>12}{estimate['duration_seconds']:>14.2f}"
+            f"{estimate['cost_usd'] * 1000:>16.4f}  {note}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--function",
+        action="append",
+        choices=list(FUNCTIONS),
+        help="Function to tune (repeatable, default: all)",
+    )
+    parser.add_argument(
+        "--memory", type=int, nargs="+", default=DEFAULT_MEMORY_SIZES, help="Memory sizes in MB"
+    )
+    parser.add_argument(
+        "--target",
+        type=parse_target,
+        action="append",
+        default=[],
+        help="Latency target as <function>=<seconds> (repeatable)",
+    )
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="config.ini with the configured sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Replays per function, the median is kept")
+    parser.add_argument("--pdf-mb", type=float, default=3.0, help="Size of each lens PDF")
+    parser.add_argument("--migration-items", type=int, default=2000, help="Work items to migrate")
+    parser.add_argument("--objects-per-item", type=int, default=8, help="S3 objects per work item")
+    parser.add_argument("--cleanup-buckets", type=int, default=4, help="Buckets of the deleted stack")
+    parser.add_argument(
+        "--cleanup-objects", type=int, default=20_000, help="Objects in the buckets of the deleted stack"
+    )
+    parser.add_argument(
+        "--expired-items", type=int, default=100, help="Expired work items per stream batch"
+    )
+    parser.add_argument(
+        "--api-latency-ms", type=float, default=20.0, help="Round trip of an API call"
+    )
+    parser.add_argument(
+        "--bandwidth-per-gb", type=float, default=50.0, help="Network bandwidth (MB/s) per GB of memory"
+    )
+    parser.add_argument(
+        "--bandwidth-cap", type=float, default=150.0, help="Maximum network bandwidth (MB/s)"
+    )
+    parser.add_argument(
+        "--cpu-factor",
+        type=float,
+        default=1.0,
+        help="Speed of this machine relative to a Lambda vCPU (e.g. 1.5 when Lambda is 50%% slower)",
+    )
+    parser.add_argument(
+        "--runtime-mb", type=float, default=90.0, help="Memory used by the runtime and boto3"
+    )
+    parser.add_argument(
+        "--memory-overhead",
+        type=float,
+        default=1.5,
+        help="Multiplier on the traced peak, which misses allocator and C extension overhead",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    targets = dict(FUNCTIONS)
+    targets.update(args.target)
+    configured = configured_settings(args.config)
+
+    results = {}
+    for function in args.function or list(FUNCTIONS):
+        measurement = measure(function, args)
+        architecture = configured[function]["architecture"]
+        estimates = [model(measurement, memory, architecture, args) for memory in sorted(args.memory)]
+        recommended = recommend(estimates, targets[function])
+
+        results[function] = {
+            "architecture": architecture,
+            "configured_memory_mb": configured[function]["memory_mb"],
+            "target_seconds": targets[function],
+            "measurement": {
+                key: round(value, 3) if isinstance(value, float) else value
+                for key, value in measurement.items()
+            },
+            "estimates": estimates,
+            "recommended_memory_mb": recommended["memory_mb"] if recommended else None,
+        }
+        print_results(function, results[function])
+
+    print("\nRecommended settings:")
+    for function, result in results.items():
+        if result["recommended_memory_mb"] is None:
+            print(f"  {function}: none of the memory sizes fits the function")
+        else:
+            print(f"  {function}_memory = {result['recommended_memory_mb']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Synthetic-scale benchmark for the storage migration Lambda (lambda_migration/migration.py).
+
+Generates an old-format (single-lens) metadata table and analysis bucket of configurable size
+in in-memory stand-ins, runs the check, update, S3-move and cleanup phases and records wall time,
+API calls and peak memory per phase. The run fails when the API calls or peak memory of a phase
+regress against the baseline. Wall time depends on the machine, it is reported but only compared
+with --time-tolerance, after normalizing it by a calibration loop timed on the same machine.
+The baseline records a hash of the stand-ins it was measured with, and has to be re-recorded
+whenever they change.
+
+Usage:
+    python3 benchmarks/migration_benchmark.py --items 100000 --objects-per-item 10
+    python3 benchmarks/migration_benchmark.py --update-baseline
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(__file__), "..", "ecs_fargate_app", "lambda_migration"),
+)
+
+import migration  # noqa: E402
+from stand_ins import DynamoDBStandIn, S3StandIn  # noqa: E402
+
+TABLE = "AnalysisMetadataTable"
+BUCKET = "analysis-storage-bucket"
+WA_DOCS_BUCKET = "wafr-reference-docs-bucket"
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(__file__), "baselines", "migration_benchmark.json"
+)
+STAND_INS = os.path.join(os.path.dirname(__file__), "stand_ins.py")
+
+# Iterations of the pure-Python loop timing the machine, wall times are compared in units of it
+CALIBRATION_ITERATIONS = 2_000_000
+
+# Object layout of a work item before multi-lens support, with typical sizes in bytes
+OLD_FORMAT_OBJECTS = [
+    ("original_content", 200_000),
+    ("metadata.json", 400),
+    ("packed_content", 150_000),
+    ("analysis/analysis_results.json", 60_000),
+    ("iac_templates/generated_template.yaml", 12_000),
+    ("supporting_documents/{doc_id}", 500_000),
+    ("supporting_documents/{doc_id}_metadata.json", 300),
+    ("chat_history.json", 8_000),
+]
+
+
+def generate_dataset(dynamodb, s3, items, objects_per_item, seed=0):
+    """
+    Fills the stand-ins with old-format work items and their S3 objects
+    """
+    rng = random.Random(seed)
+
+    for i in range(items):
+        user_id = f"{rng.getrandbits(128):032x}"
+        file_id = f"{i:08d}{rng.getrandbits(96):024x}"
+        doc_id = f"{rng.getrandbits(64):016x}"
+
+        dynamodb.put_item(
+            TableName=TABLE,
+            Item={
+                "userId": {"S": user_id},
+                "fileId": {"S": file_id},
+                "fileName": {"S": f"template-{i}.yaml"},
+                "analysisStatus": {"S": "COMPLETED"},
+                "analysisProgress": {"N": "100"},
+                "iacGenerationStatus": {"S": "NOT_STARTED"},
+                "supportingDocumentAdded": {"BOOL": True},
+                "supportingDocumentId": {"S": doc_id},
+                "workloadId": {"S": f"{rng.getrandbits(128):032x}"},
+            },
+        )
+
+        for j in range(objects_per_item):
+            suffix, size = OLD_FORMAT_OBJECTS[j % len(OLD_FORMAT_OBJECTS)]
+            if j >= len(OLD_FORMAT_OBJECTS):
+                suffix = f"extra/{j}/{suffix}"
+            s3.add_object(
+                BUCKET,
+                f"{user_id}/{file_id}/{suffix.format(doc_id=doc_id)}",
+                int(size * rng.uniform(0.5, 1.5)),
+            )
+
+    for file_name in [
+        "well_architected_best_practices.csv",
+        "well_architected_best_practices.json",
+        "wellarchitected-security-pillar.pdf",
+    ]:
+        s3.add_object(WA_DOCS_BUCKET, file_name, 1_000_000)
+
+    # Reset the counters so generating the dataset is not attributed to any phase
+    dynamodb.calls.clear()
+    s3.calls.clear()
+
+
+def run_phase(fn, clients, trace_memory):
+    """
+    Runs a migration phase and returns its wall time and API calls, or its peak memory when
+    trace_memory is set (tracing slows the run down too much to time both at once)
+    """
+    for client in clients:
+        client.calls.clear()
+
+    if trace_memory:
+        tracemalloc.start()
+        baseline_memory = tracemalloc.get_traced_memory()[0]
+        fn()
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Memory still held at the end is the stand-ins storing the converted records,
+        # what remains above it is the working set of the migration itself
+        working_set = peak_memory - max(current_memory, baseline_memory)
+        return {"peak_memory_mb": round(working_set / (1024 * 1024), 2)}
+
+    start = time.perf_counter()
+    fn()
+    wall_seconds = time.perf_counter() - start
+
+    calls = {}
+    for client in clients:
+        calls.update(client.calls)
+
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "api_calls": sum(calls.values()),
+        "api_calls_by_operation": dict(sorted(calls.items())),
+    }
+
+
+def stand_ins_hash():
+    """
+    Returns the hash of the stand-ins, whose API call counts and memory the baseline depends on
+    """
+    with open(STAND_INS, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def calibrate():
+    """
+    Returns the best of three timings of a fixed pure-Python loop, in seconds
+    """
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        data = {}
+        for i in range(CALIBRATION_ITERATIONS):
+            data[i % 1024] = i
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(items, objects_per_item, latency_ms=0.0, seed=0):
+    """
+    Runs every phase on a fresh dataset twice, once timed and once with memory tracing
+    """
+    results = run_phases(items, objects_per_item, latency_ms, seed, trace_memory=False)
+    memory = run_phases(items, objects_per_item, 0.0, seed, trace_memory=True)
+    calibration = calibrate()
+
+    for phase, metrics in memory.items():
+        results[phase].update(metrics)
+        results[phase]["relative_time"] = round(results[phase]["wall_seconds"] / calibration, 3)
+
+    return results
+
+
+def run_phases(items, objects_per_item, latency_ms, seed, trace_memory):
+    dynamodb = DynamoDBStandIn(latency_ms)
+    s3 = S3StandIn(latency_ms)
+    generate_dataset(dynamodb, s3, items, objects_per_item, seed)
+
+    clients = [dynamodb, s3]
+    results = {}
+    needed = {}
+
+    def check():
+        needed["migration"] = migration.check_migration_needed(dynamodb, TABLE)
+
+    results["check"] = run_phase(check, clients, trace_memory)
+    if not needed["migration"]:
+        raise RuntimeError("Synthetic dataset was not detected as old format")
+
+    results["update"] = run_phase(
+        lambda: migration.update_dynamodb_items(dynamodb, TABLE), clients, trace_memory
+    )
+    results["s3_move"] = run_phase(
+        lambda: migration.migrate_s3_objects(s3, BUCKET), clients, trace_memory
+    )
+    results["cleanup"] = run_phase(
+        lambda: migration.cleanup_wa_docs_bucket(s3, WA_DOCS_BUCKET), clients, trace_memory
+    )
+
+    # Sanity check: the stand-ins must end up fully in the multi-lens format
+    remaining_items = sum(
+        1 for item in dynamodb.tables[TABLE].values() if "usedLenses" not in item
+    )
+    remaining_keys = sum(
+        1 for key in s3.buckets[BUCKET] if migration.plan_key_move(key) is not None
+    )
+    if remaining_items or remaining_keys:
+        raise RuntimeError(
+            f"Migration left {remaining_items} items and {remaining_keys} keys in the old format"
+        )
+
+    return results
+
+
+def find_regressions(results, baseline, tolerances):
+    """
+    Compares each phase metric against the baseline and returns the list of regressions
+    """
+    regressions = []
+
+    for phase, metrics in results.items():
+        expected = baseline.get(phase)
+        if not expected:
+            continue
+        for metric, tolerance in tolerances.items():
+            if metric not in expected:
+                continue
+            limit = expected[metric] * (1 + tolerance)
+            # Ignore noise on very small values (e.g. a few milliseconds or kilobytes)
+            if metrics[metric] > limit and metrics[metric] - expected[metric] > 0.05:
+                regressions.append(
+                    f"{phase}.{metric}: {metrics[metric]} > {expected[metric]} (+{tolerance:.0%} allowed)"
+                )
+
+    return regressions
+
+
+def print_results(scenario, results):
+    print(f"\nMigration benchmark - {scenario}")
+    print(f"{'phase':<10}{'wall (s)':>12}{'API calls':>12}{'peak (MB)':>12}")
+    for phase, metrics in results.items():
+        print(
+            f"{phase:<10}{metrics['wall_seconds']:>12}{metrics['api_calls']:>12}{metrics['peak_memory_mb']:>12}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=10_000, help="Work items in the table")
+    parser.add_argument(
+        "--objects-per-item", type=int, default=8, help="S3 objects per work item"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Latency added to each API call"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Record this run as the baseline for its scenario",
+    )
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        help="Also fail when the calibrated wall time of a phase regresses by more than this ratio",
+    )
+    parser.add_argument("--calls-tolerance", type=float, default=0.0)
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    # The migration logs every record, which would dominate the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+
+    scenario = f"{args.items}x{args.objects_per_item}@{args.latency_ms}ms"
+    results = run_benchmark(args.items, args.objects_per_item, args.latency_ms, args.seed)
+    print_results(scenario, results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({scenario: results}, f, indent=2)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    if args.update_baseline:
+        baselines[scenario] = results
+        baselines["standInsSha256"] = stand_ins_hash()
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline for {scenario} written to {args.baseline}")
+        return 0
+
+    if scenario not in baselines:
+        print(f"\nNo baseline for {scenario}, skipping the regression check")
+        return 0
+
+    if baselines.get("standInsSha256") != stand_ins_hash():
+        print(
+            "\nThe stand-ins changed since the baseline was recorded, re-record it with --update-baseline"
+        )
+        return 1
+
+    tolerances = {
+        "api_calls": args.calls_tolerance,
+        "peak_memory_mb": args.memory_tolerance,
+    }
+    if args.time_tolerance is not None:
+        tolerances["relative_time"] = args.time_tolerance
+
+    regressions = find_regressions(results, baselines[scenario], tolerances)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
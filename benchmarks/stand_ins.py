@@ -0,0 +1,623 @@
+"""In-memory stand-ins for the AWS clients used by the Python Lambdas"""
+
+import base64
+import bisect
+import heapq
+import json
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from botocore.exceptions import ClientError
+
+# Page sizes of the real services (S3 returns up to 1000 keys, DynamoDB up to 1 MB per scan page)
+S3_PAGE_SIZE = 1000
+DYNAMODB_PAGE_BYTES = 1024 * 1024
+
+
+def client_error(code, operation):
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class StandIn:
+    """
+    Base class counting API calls and optionally adding a fixed latency to each of them,
+    to emulate the network round trip of the real service
+    """
+
+    # Paginated operations: input token, output token and page size parameter
+    PAGINATION = {}
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000
+        self.calls = Counter()
+        # Payload bytes sent and received, for the network transfer time
+        self.bytes_transferred = 0
+
+    def _call(self, operation):
+        self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_paginator(self, operation):
+        return _Paginator(getattr(self, operation), *self.PAGINATION[operation])
+
+
+class _Paginator:
+    def __init__(self, method, input_token, output_token, page_size_parameter):
+        self.method = method
+        self.input_token = input_token
+        self.output_token = output_token
+        self.page_size_parameter = page_size_parameter
+
+    def paginate(self, PaginationConfig=None, **kwargs):
+        page_size = (PaginationConfig or {}).get("PageSize")
+        if page_size and self.page_size_parameter:
+            kwargs[self.page_size_parameter] = page_size
+
+        while True:
+            page = self.method(**kwargs)
+            yield page
+            token = page.get(self.output_token)
+            if not token:
+                return
+            kwargs[self.input_token] = token
+
+
+class DynamoDBStandIn(StandIn):
+    """Low-level DynamoDB client stand-in for a single table keyed on userId/fileId"""
+
+    def __init__(self, latency_ms=0.0):
+        super().__init__(latency_ms)
+        self.tables = {}
+        self._sorted_keys = {}
+
+    def _table(self, table_name):
+        return self.tables.setdefault(table_name, {})
+
+    def _store(self, table_name, item):
+        table = self._table(table_name)
+        key = self._key(item)
+        if key not in table:
+            self._sorted_keys.pop(table_name, None)
+        table[key] = item
+
+    @staticmethod
+    def _key(key):
+        return (key["userId"]["S"], key["fileId"]["S"])
+
+    def put_item(self, TableName, Item, **kwargs):
+        self._call("put_item")
+        self._store(TableName, Item)
+        return {}
+
+    def get_item(self, TableName, Key, **kwargs):
+        self._call("get_item")
+        item = self._table(TableName).get(self._key(Key))
+        return {"Item": item} if item else {}
+
+    def scan(self, TableName, Limit=None, ExclusiveStartKey=None, **kwargs):
+        self._call("scan")
+        if TableName not in self._sorted_keys:
+            self._sorted_keys[TableName] = sorted(self._table(TableName))
+        keys = self._sorted_keys[TableName]
+        position = (
+            bisect.bisect_right(keys, self._key(ExclusiveStartKey))
+            if ExclusiveStartKey
+            else 0
+        )
+
+        items, page_bytes = [], 0
+        for key in (keys[i] for i in range(position, len(keys))):
+            item = self._table(TableName)[key]
+            page_bytes += len(json.dumps(item))
+            items.append(item)
+            if (Limit and len(items) >= Limit) or page_bytes >= DYNAMODB_PAGE_BYTES:
+                break
+
+        response = {"Items": items, "Count": len(items)}
+        if items and position + len(items) < len(keys):
+            response["LastEvaluatedKey"] = {
+                "userId": items[-1]["userId"],
+                "fileId": items[-1]["fileId"],
+            }
+        return response
+
+    def update_item(
+        self,
+        TableName,
+        Key,
+        UpdateExpression,
+        ExpressionAttributeNames=None,
+        ExpressionAttributeValues=None,
+        ConditionExpression=None,
+        **kwargs,
+    ):
+        """Supports the "SET #a = :a, ... REMOVE b" expressions used by the Lambdas"""
+        self._call("update_item")
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        item = self._table(TableName).get(self._key(Key))
+
+        if ConditionExpression == "attribute_not_exists(usedLenses)" and item:
+            if "usedLenses" in item:
+                raise client_error("ConditionalCheckFailedException", "UpdateItem")
+
+        item = dict(item or Key)
+        set_part, _, remove_part = UpdateExpression.partition(" REMOVE ")
+        for assignment in set_part.replace("SET ", "", 1).split(", "):
+            name, value = [token.strip() for token in assignment.split("=")]
+            item[names.get(name, name)] = values[value]
+        for name in filter(None, [token.strip() for token in remove_part.split(",")]):
+            item.pop(names.get(name, name), None)
+
+        self._store(TableName, item)
+        return {}
+
+
+class _SortedKeys:
+    """
+    Sorted key index of a bucket. New keys go to a small pending run merged on read and
+    deleted keys are skipped lazily, so listing a page stays cheap while objects move.
+    """
+
+    def __init__(self):
+        self.main = []
+        self.pending = []
+        self.pending_sorted = True
+        self.deleted = 0
+
+    def add(self, key):
+        self.pending.append(key)
+        self.pending_sorted = False
+
+    def remove(self):
+        self.deleted += 1
+
+    def compact(self, live):
+        self.main = sorted({key for key in self.main + self.pending if key in live})
+        self.pending, self.pending_sorted, self.deleted = [], True, 0
+
+    def iter_from(self, live, prefix="", start_after=None):
+        if len(self.pending) > max(10_000, len(self.main) // 4) or self.deleted > len(
+            self.main
+        ) // 2:
+            self.compact(live)
+        if not self.pending_sorted:
+            self.pending.sort()
+            self.pending_sorted = True
+
+        start = max(prefix, start_after or "")
+
+        def run(keys):
+            position = (
+                bisect.bisect_right(keys, start)
+                if start_after and start == start_after
+                else bisect.bisect_left(keys, start)
+            )
+            return (keys[i] for i in range(position, len(keys)))
+
+        last = None
+        for key in heapq.merge(run(self.main), run(self.pending)):
+            if not key.startswith(prefix):
+                break
+            if key != last and key in live:
+                last = key
+                yield key
+
+
+class _Body:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+    def iter_lines(self):
+        return iter(self.data.splitlines())
+
+
+class S3StandIn(StandIn):
+    """
+    S3 client stand-in. Objects generated by the benchmarks only keep their size, real bodies
+    are only stored for objects written through put_object/upload_file, unless store_bodies is off
+    (so uploads do not hold on to memory the Lambda would have released).
+    """
+
+    PAGINATION = {
+        "list_objects_v2": ("ContinuationToken", "NextContinuationToken", "MaxKeys"),
+        "list_object_versions": ("KeyMarker", "NextKeyMarker", "MaxKeys"),
+    }
+
+    def __init__(self, latency_ms=0.0, store_bodies=True):
+        super().__init__(latency_ms)
+        self.store_bodies = store_bodies
+        self.buckets = {}
+        self._indexes = {}
+        # User metadata and last modified date of the objects, by bucket and key
+        self.attributes = {}
+
+    def _bucket(self, bucket_name):
+        return self.buckets.setdefault(bucket_name, {})
+
+    def _index(self, bucket_name):
+        return self._indexes.setdefault(bucket_name, _SortedKeys())
+
+    def add_object(self, bucket_name, key, size, body=None, metadata=None):
+        bucket = self._bucket(bucket_name)
+        if key not in bucket:
+            self._index(bucket_name).add(key)
+        bucket[key] = (size, body)
+        self.attributes[(bucket_name, key)] = {
+            "Metadata": metadata or {},
+            "LastModified": datetime.now(timezone.utc),
+        }
+
+    def _attributes(self, bucket_name, key):
+        return self.attributes.get(
+            (bucket_name, key),
+            {"Metadata": {}, "LastModified": datetime.fromtimestamp(0, timezone.utc)},
+        )
+
+    def _remove_object(self, bucket_name, key):
+        if self._bucket(bucket_name).pop(key, None) is not None:
+            self._index(bucket_name).remove()
+
+    def put_object(self, Bucket, Key, Body=b"", **kwargs):
+        self._call("put_object")
+        body = Body.encode() if isinstance(Body, str) else Body
+        self.bytes_transferred += len(body)
+        self.add_object(
+            Bucket,
+            Key,
+            len(body),
+            body if self.store_bodies else None,
+            kwargs.get("Metadata"),
+        )
+        return {}
+
+    def upload_file(self, Filename, Bucket, Key, **kwargs):
+        self._call("upload_file")
+        with open(Filename, "rb") as f:
+            body = f.read()
+        self.add_object(Bucket, Key, len(body), body)
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self._call("get_object")
+        if Key not in self._bucket(Bucket):
+            raise client_error("NoSuchKey", "GetObject")
+        size, body = self._bucket(Bucket)[Key]
+        self.bytes_transferred += size
+        return {"Body": _Body(body if body is not None else b"\0" * size)}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._call("head_object")
+        if Key not in self._bucket(Bucket):
+            raise client_error("404", "HeadObject")
+        return {
+            "ContentLength": self._bucket(Bucket)[Key][0],
+            **self._attributes(Bucket, Key),
+        }
+
+    def copy_object(self, Bucket, CopySource, Key, **kwargs):
+        self._call("copy_object")
+        source = self._bucket(CopySource["Bucket"]).get(CopySource["Key"])
+        if source is None:
+            raise client_error("NoSuchKey", "CopyObject")
+        self.add_object(Bucket, Key, *source)
+        return {}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._call("delete_object")
+        self._remove_object(Bucket, Key)
+        return {}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        self._call("delete_objects")
+        for obj in Delete["Objects"]:
+            self._remove_object(Bucket, obj["Key"])
+        return {"Deleted": Delete["Objects"]}
+
+    def list_objects_v2(
+        self,
+        Bucket,
+        Prefix="",
+        StartAfter=None,
+        ContinuationToken=None,
+        MaxKeys=S3_PAGE_SIZE,
+        **kwargs,
+    ):
+        self._call("list_objects_v2")
+        if ContinuationToken:
+            StartAfter = base64.b64decode(ContinuationToken).decode()
+
+        bucket = self._bucket(Bucket)
+        keys = self._index(Bucket).iter_from(bucket, Prefix, StartAfter)
+        page = [key for _, key in zip(range(MaxKeys + 1), keys)]
+        truncated = len(page) > MaxKeys
+        page = page[:MaxKeys]
+
+        response = {
+            "Contents": [
+                {
+                    "Key": key,
+                    "Size": bucket[key][0],
+                    "LastModified": self._attributes(Bucket, key)["LastModified"],
+                }
+                for key in page
+            ],
+            "KeyCount": len(page),
+            "IsTruncated": truncated,
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = base64.b64encode(
+                page[-1].encode()
+            ).decode()
+        return response
+
+    def list_object_versions(self, Bucket, KeyMarker=None, MaxKeys=S3_PAGE_SIZE, **kwargs):
+        """Every object has a single version, buckets of the benchmarks hold no delete markers"""
+        self._call("list_object_versions")
+        if Bucket not in self.buckets:
+            raise client_error("NoSuchBucket", "ListObjectVersions")
+
+        bucket = self._bucket(Bucket)
+        keys = self._index(Bucket).iter_from(bucket, "", KeyMarker)
+        page = [key for _, key in zip(range(MaxKeys + 1), keys)]
+        truncated = len(page) > MaxKeys
+        page = page[:MaxKeys]
+
+        response = {
+            "Versions": [
+                {"Key": key, "VersionId": "1", "Size": bucket[key][0]} for key in page
+            ],
+            "IsTruncated": truncated,
+        }
+        if truncated:
+            response["NextKeyMarker"] = page[-1]
+        return response
+
+
+class DynamoDBResourceStandIn(StandIn):
+    """DynamoDB resource stand-in (boto3.resource("dynamodb")), storing the items put in each table"""
+
+    def __init__(self, latency_ms=0.0):
+        super().__init__(latency_ms)
+        self.tables = {}
+
+    def Table(self, name):
+        return _TableStandIn(self, self.tables.setdefault(name, []))
+
+
+class _TableStandIn:
+    def __init__(self, resource, items):
+        self.resource = resource
+        self.items = items
+
+    def put_item(self, Item, **kwargs):
+        self.resource._call("put_item")
+        self.resource.bytes_transferred += len(json.dumps(Item, default=str))
+        self.items.append(Item)
+        return {}
+
+
+class WellArchitectedStandIn(StandIn):
+    """
+    Well-Architected Tool client stand-in. Every lens has the same number of pillars, questions per pillar
+    and choices per question, list_answers returns 50 answers per page like the real API.
+    """
+
+    PAGE_SIZE = 50
+
+    def __init__(self, pillars=6, questions_per_pillar=10, choices_per_question=6, latency_ms=0.0):
+        super().__init__(latency_ms)
+        self.pillars = pillars
+        self.questions_per_pillar = questions_per_pillar
+        self.choices_per_question = choices_per_question
+
+    def get_lens_review(self, WorkloadId, LensAlias, **kwargs):
+        self._call("get_lens_review")
+        return {
+            "LensReview": {
+                "LensAlias": LensAlias,
+                "PillarReviewSummaries": [
+                    {"PillarId": f"pillar{p}", "PillarName": f"Pillar {p}"}
+                    for p in range(self.pillars)
+                ],
+            }
+        }
+
+    def upgrade_lens_review(self, **kwargs):
+        self._call("upgrade_lens_review")
+        return {}
+
+    def associate_lenses(self, **kwargs):
+        self._call("associate_lenses")
+        return {}
+
+    def disassociate_lenses(self, **kwargs):
+        self._call("disassociate_lenses")
+        return {}
+
+    def list_answers(self, WorkloadId, LensAlias, NextToken=None, **kwargs):
+        self._call("list_answers")
+        total = self.pillars * self.questions_per_pillar
+        start = int(NextToken or 0)
+        answers = [
+            {
+                "QuestionId": f"question{q}",
+                "PillarId": f"pillar{q // self.questions_per_pillar}",
+                "QuestionTitle": f"How do you handle concern {q} of {LensAlias}?",
+                "Choices": [
+                    {"ChoiceId": f"choice{c}", "Title": f"Best practice {q}.{c}"}
+                    for c in range(self.choices_per_question)
+                ]
+                + [{"ChoiceId": "none", "Title": "None of these"}],
+            }
+            for q in range(start, min(start + self.PAGE_SIZE, total))
+        ]
+        response = {"AnswerSummaries": answers}
+        if start + self.PAGE_SIZE < total:
+            response["NextToken"] = str(start + self.PAGE_SIZE)
+        return response
+
+
+class BedrockAgentStandIn(StandIn):
+    """Bedrock agent client stand-in, ingestion jobs complete immediately"""
+
+    def __init__(self, latency_ms=0.0):
+        super().__init__(latency_ms)
+        self.jobs = {}
+
+    def start_ingestion_job(self, knowledgeBaseId, dataSourceId, **kwargs):
+        self._call("start_ingestion_job")
+        job_id = f"job{len(self.jobs)}"
+        started_at = datetime.now(timezone.utc)
+        self.jobs[job_id] = {
+            "ingestionJobId": job_id,
+            "knowledgeBaseId": knowledgeBaseId,
+            "dataSourceId": dataSourceId,
+            "status": "COMPLETE",
+            "startedAt": started_at,
+            "updatedAt": started_at + timedelta(minutes=5),
+            "statistics": {},
+        }
+        return {"ingestionJob": {**self.jobs[job_id], "status": "STARTING"}}
+
+    def get_ingestion_job(self, ingestionJobId, **kwargs):
+        self._call("get_ingestion_job")
+        return {"ingestionJob": self.jobs[ingestionJobId]}
+
+    def list_ingestion_jobs(
+        self, knowledgeBaseId, dataSourceId, filters=None, maxResults=None, **kwargs
+    ):
+        """Jobs of the data source, newest first, filtered on their status"""
+        self._call("list_ingestion_jobs")
+        statuses = {
+            value
+            for job_filter in filters or []
+            if job_filter["attribute"] == "STATUS"
+            for value in job_filter["values"]
+        }
+        jobs = sorted(
+            (
+                job
+                for job in self.jobs.values()
+                if job["knowledgeBaseId"] == knowledgeBaseId
+                and job["dataSourceId"] == dataSourceId
+                and (not statuses or job["status"] in statuses)
+            ),
+            key=lambda job: job["startedAt"],
+            reverse=True,
+        )
+        return {"ingestionJobSummaries": jobs[:maxResults]}
+
+
+class CloudFormationStandIn(StandIn):
+    """CloudFormation client stand-in, stack deletions complete immediately"""
+
+    PAGINATION = {
+        "list_stack_resources": ("NextToken", "NextToken", None),
+        "list_stacks": ("NextToken", "NextToken", None),
+    }
+    PAGE_SIZE = 100
+
+    def __init__(self, latency_ms=0.0):
+        super().__init__(latency_ms)
+        self.stacks = {}
+
+    def add_stack(self, stack_name, resources):
+        """resources: (resource type, physical ID) pairs"""
+        self.stacks[stack_name] = [
+            {
+                "ResourceType": resource_type,
+                "PhysicalResourceId": physical_id,
+                "ResourceStatus": "CREATE_COMPLETE",
+            }
+            for resource_type, physical_id in resources
+        ]
+
+    def _paginate(self, entries, token):
+        start = int(token or 0)
+        page = entries[start : start + self.PAGE_SIZE]
+        next_token = (
+            str(start + self.PAGE_SIZE) if start + self.PAGE_SIZE < len(entries) else None
+        )
+        return page, next_token
+
+    def list_stack_resources(self, StackName, NextToken=None, **kwargs):
+        self._call("list_stack_resources")
+        if StackName not in self.stacks:
+            raise client_error("ValidationError", "ListStackResources")
+        page, next_token = self._paginate(self.stacks[StackName], NextToken)
+        response = {"StackResourceSummaries": page}
+        if next_token:
+            response["NextToken"] = next_token
+        return response
+
+    def list_stacks(self, NextToken=None, **kwargs):
+        self._call("list_stacks")
+        summaries = [
+            {"StackName": name, "StackStatus": "CREATE_COMPLETE"} for name in self.stacks
+        ]
+        page, next_token = self._paginate(summaries, NextToken)
+        response = {"StackSummaries": page}
+        if next_token:
+            response["NextToken"] = next_token
+        return response
+
+    def delete_stack(self, StackName, **kwargs):
+        self._call("delete_stack")
+        self.stacks.pop(StackName, None)
+        return {}
+
+    def describe_stacks(self, StackName, **kwargs):
+        self._call("describe_stacks")
+        if StackName not in self.stacks:
+            raise ClientError(
+                {
+                    "Error": {
+                        "Code": "ValidationError",
+                        "Message": f"Stack with id {StackName} does not exist",
+                    }
+                },
+                "DescribeStacks",
+            )
+        return {"Stacks": [{"StackName": StackName, "StackStatus": "DELETE_IN_PROGRESS"}]}
+
+
+class ECRStandIn(StandIn):
+    """ECR client stand-in holding image digests per repository"""
+
+    PAGINATION = {"list_images": ("nextToken", "nextToken", "maxResults")}
+
+    def __init__(self, latency_ms=0.0):
+        super().__init__(latency_ms)
+        self.repositories = {}
+
+    def add_images(self, repository_name, count):
+        images = self.repositories.setdefault(repository_name, [])
+        images.extend(
+            {"imageDigest": f"sha256:{len(images) + i:064x}"} for i in range(count)
+        )
+
+    def list_images(self, repositoryName, maxResults=100, nextToken=None, **kwargs):
+        self._call("list_images")
+        if repositoryName not in self.repositories:
+            raise client_error("RepositoryNotFoundException", "ListImages")
+        images = self.repositories[repositoryName]
+        start = int(nextToken or 0)
+        response = {"imageIds": images[start : start + maxResults]}
+        if start + maxResults < len(images):
+            response["nextToken"] = str(start + maxResults)
+        return response
+
+    def batch_delete_image(self, repositoryName, imageIds, **kwargs):
+        self._call("batch_delete_image")
+        deleted = {image["imageDigest"] for image in imageIds}
+        self.repositories[repositoryName] = [
+            image
+            for image in self.repositories[repositoryName]
+            if image["imageDigest"] not in deleted
+        ]
+        return {"imageIds": imageIds, "failures": []}
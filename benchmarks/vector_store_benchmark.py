@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Index size and query latency comparison of the knowledge base embedding options.
+
+Offline, each candidate (embedding model and vector dimensions) is compared on the chunks of the
+reference documents produced by the configured chunking strategy: the memory of its HNSW vector
+index and the storage of its documents in the OpenSearch Serverless collection are estimated, and
+an exact nearest neighbor search over random vectors of its dimensions is timed locally.
+
+With --knowledge-base-id, the Retrieve latency of deployed knowledge bases (e.g. one stack per
+candidate) is measured instead, with sample Well-Architected queries.
+
+Usage:
+    python3 benchmarks/vector_store_benchmark.py
+    python3 benchmarks/vector_store_benchmark.py --chunks 20000 --candidate amazon.titan-embed-text-v2:0 256
+    python3 benchmarks/vector_store_benchmark.py --knowledge-base-id <kb-id> --knowledge-base-id <other-kb-id>
+"""
+
+import argparse
+import configparser
+import json
+import math
+import operator
+import os
+import random
+import statistics
+import sys
+import time
+from array import array
+
+import chunking_estimator
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), "..", "config.ini")
+
+# Compared with the model and dimensions configured in config.ini
+DEFAULT_CANDIDATES = [
+    ("amazon.titan-embed-text-v2:0", 256),
+    ("amazon.titan-embed-text-v2:0", 512),
+    ("amazon.titan-embed-text-v2:0", 1024),
+    ("amazon.titan-embed-text-v1", 1536),
+    ("cohere.embed-english-v3", 1024),
+]
+
+# HNSW parameters of the vector index created for the knowledge base (faiss engine)
+HNSW_M = 16
+# Memory of a faiss HNSW index per vector: 1.1 * (4 * dimensions + 8 * M) bytes
+HNSW_OVERHEAD = 1.1
+# Stored per chunk besides its vector: text (about 4 bytes per token) and metadata attributes
+BYTES_PER_TOKEN = 4
+METADATA_BYTES = 400
+
+# Chunks retrieved by the backend for each question group
+NUMBER_OF_RESULTS = 10
+
+SAMPLE_QUERIES = [
+    "How do you manage encryption keys for data at rest?",
+    "How do you design your workload to withstand component failures?",
+    "How do you select the compute resources of your workload?",
+    "How do you monitor the usage and cost of your workload?",
+    "How do you control network traffic to your resources?",
+    "How do you back up data and test the recovery?",
+    "How do you scale your workload with demand?",
+    "How do you reduce the environmental impact of your data storage?",
+    "How do you implement change management?",
+    "How do you detect and investigate security events?",
+]
+
+
+def configured_candidate(config_path):
+    """
+    Returns the embedding model and dimensions configured in config.ini (same settings as WAGenAIStack)
+    """
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    return (
+        config.get("settings", "kb_embedding_model", fallback="amazon.titan-embed-text-v2:0").strip(),
+        config.getint("settings", "kb_embedding_dimensions", fallback=1024),
+    )
+
+
+def corpus_chunks(args):
+    """
+    Returns the chunk count and average chunk tokens of the reference documents, chunked
+    with the strategy configured in config.ini
+    """
+    if args.chunks:
+        return args.chunks, args.chunk_tokens
+
+    if args.bucket:
+        documents = chunking_estimator.load_bucket_documents(args.bucket, args.prefix)
+    else:
+        documents = chunking_estimator.load_local_documents(args.docs_dir)
+    if not documents:
+        sys.exit("No documents found")
+
+    strategy = chunking_estimator.configured_strategy(args.config)
+    # Ingestion quotas do not matter for the chunk counts
+    metrics = chunking_estimator.estimate(documents, strategy, 1, 1)
+    print(f"{len(documents)} documents, {metrics['chunks']} chunks with {strategy}")
+    return metrics["chunks"], metrics["avg_chunk_tokens"]
+
+
+def index_size(chunks, chunk_tokens, dimensions):
+    """
+    Returns the memory of the HNSW graph and vectors held by the search capacity, and the storage
+    of the documents (vectors, text and metadata), in MB
+    """
+    vector_memory = chunks * HNSW_OVERHEAD * (4 * dimensions + 8 * HNSW_M)
+    storage = chunks * (4 * dimensions + chunk_tokens * BYTES_PER_TOKEN + METADATA_BYTES)
+    return vector_memory / 1024**2, storage / 1024**2
+
+
+def exact_search_ms(dimensions, sample_vectors, queries, seed):
+    """
+    Times a brute-force inner product search of the top results over random vectors, in ms per query
+    """
+    rng = random.Random(seed)
+    vectors = [
+        array("f", (rng.uniform(-1, 1) for _ in range(dimensions)))
+        for _ in range(sample_vectors)
+    ]
+    durations = []
+    for _ in range(queries):
+        query = array("f", (rng.uniform(-1, 1) for _ in range(dimensions)))
+        start = time.perf_counter()
+        scores = [sum(map(operator.mul, query, vector)) for vector in vectors]
+        sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:NUMBER_OF_RESULTS]
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def compare_offline(args, candidates):
+    chunks, chunk_tokens = corpus_chunks(args)
+    # Exact search time grows linearly with the number of vectors, the sample is extrapolated to the corpus
+    sample = min(args.sample_vectors, chunks)
+
+    results = {}
+    for model, dimensions in candidates:
+        vector_memory, storage = index_size(chunks, chunk_tokens, dimensions)
+        search_ms = exact_search_ms(dimensions, sample, args.queries, args.seed)
+        results[f"{model} ({dimensions})"] = {
+            "dimensions": dimensions,
+            "vector_memory_mb": round(vector_memory, 1),
+            "storage_mb": round(storage, 1),
+            "search_ms": round(search_ms * chunks / sample, 1),
+        }
+
+    baseline = results[f"{candidates[0][0]} ({candidates[0][1]})"]["search_ms"]
+    print(f"\nVector store estimate - {chunks} chunks of {chunk_tokens} tokens on average")
+    print(
+        f"{'candidate':<40}{'vector memory MB':>18}{'storage MB':>12}"
+        f"{'exact search ms':>17}{'relative':>10}"
+    )
+    for name, metrics in results.items():
+        print(
+            f"{name:<40}{metrics['vector_memory_mb']:>18}{metrics['storage_mb']:>12}"
+            f"{metrics['search_ms']:>17}{metrics['search_ms'] / baseline:>10.2f}"
+        )
+    print(
+        "\nVector memory is per copy of the index, standby replicas (kb_vector_store_standby_replicas) "
+        "keep a second one.\nSearch times are measured in pure Python over the whole corpus: "
+        "compare them relative to each other, the HNSW index of the collection visits a fraction of the vectors."
+    )
+    return results
+
+
+def compare_deployed(args):
+    import boto3
+
+    bedrock_agent = boto3.client("bedrock-agent")
+    runtime = boto3.client("bedrock-agent-runtime")
+
+    results = {}
+    for knowledge_base_id in args.knowledge_base_id:
+        knowledge_base = bedrock_agent.get_knowledge_base(knowledgeBaseId=knowledge_base_id)["knowledgeBase"]
+        vector_config = knowledge_base["knowledgeBaseConfiguration"]["vectorKnowledgeBaseConfiguration"]
+        model = vector_config["embeddingModelArn"].split("/")[-1]
+        dimensions = (
+            vector_config.get("embeddingModelConfiguration", {})
+            .get("bedrockEmbeddingModelConfiguration", {})
+            .get("dimensions")
+        )
+
+        durations = []
+        for i in range(args.queries):
+            start = time.perf_counter()
+            runtime.retrieve(
+                knowledgeBaseId=knowledge_base_id,
+                retrievalQuery={"text": SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]},
+                retrievalConfiguration={
+                    "vectorSearchConfiguration": {"numberOfResults": NUMBER_OF_RESULTS}
+                },
+            )
+            durations.append((time.perf_counter() - start) * 1000)
+
+        durations.sort()
+        results[knowledge_base_id] = {
+            "embedding_model": model,
+            "dimensions": dimensions,
+            "p50_ms": round(statistics.median(durations), 1),
+            "p95_ms": round(durations[max(0, math.ceil(len(durations) * 0.95) - 1)], 1),
+        }
+
+    print(f"\nRetrieve latency - {args.queries} queries per knowledge base")
+    print(f"{'knowledge base':<16}{'embedding model':<34}{'dimensions':>11}{'p50 ms':>9}{'p95 ms':>9}")
+    for knowledge_base_id, metrics in results.items():
+        print(
+            f"{knowledge_base_id:<16}{metrics['embedding_model']:<34}{str(metrics['dimensions']):>11}"
+            f"{metrics['p50_ms']:>9}{metrics['p95_ms']:>9}"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs-dir", default=chunking_estimator.DEFAULT_DOCS_DIR, help="Local reference documents")
+    parser.add_argument("--bucket", help="Read the synced documents from this bucket instead")
+    parser.add_argument("--prefix", default="", help="Key prefix of the documents in the bucket")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="config.ini with the configured settings")
+    parser.add_argument("--chunks", type=int, help="Number of chunks, instead of chunking the documents")
+    parser.add_argument("--chunk-tokens", type=int, default=300, help="Average chunk tokens with --chunks")
+    parser.add_argument(
+        "--candidate",
+        action="append",
+        nargs=2,
+        metavar=("MODEL", "DIMENSIONS"),
+        help="Candidate embedding model and dimensions (repeatable), e.g. amazon.titan-embed-text-v2:0 512",
+    )
+    parser.add_argument(
+        "--sample-vectors", type=int, default=2000, help="Vectors searched locally, extrapolated to the corpus"
+    )
+    parser.add_argument("--queries", type=int, default=20, help="Queries per candidate or knowledge base")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the random vectors")
+    parser.add_argument(
+        "--knowledge-base-id",
+        action="append",
+        help="Measure the Retrieve latency of this deployed knowledge base (repeatable)",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.knowledge_base_id:
+        results = compare_deployed(args)
+    else:
+        candidates = [configured_candidate(args.config)]
+        for model, dimensions in args.candidate or DEFAULT_CANDIDATES:
+            if (model, int(dimensions)) not in candidates:
+                candidates.append((model, int(dimensions)))
+        results = compare_offline(args, candidates)
+        print(f"Configured: {candidates[0][0]} ({candidates[0][1]})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,7 @@ export AWS_ECR_IGNORE_CREDS_STORAGE=true
 
 # Print script usage
 print_usage() {
-    echo "Usage: ./deploy-wa-analyzer.sh -r region -c container_tool [-a stack_name]"
+    echo "Usage: ./deploy-wa-analyzer.sh -r region -c container_tool [-a stack_name] [-p stack_patterns]"
     echo ""
     echo "Required Options:"
     echo "  -r    AWS Region"
@@ -31,20 +31,23 @@ print_usage() {
     echo ""
     echo "Additional Options:"
     echo "  -a    Enable auto-cleanup and specify deployment stack name to clean up"
+    echo "  -p    Additional stack names or patterns (comma separated, '*' and '?' wildcards) allowed for batch cleanup"
     echo "  -h    Show this help message"
     echo ""
     echo "Example:"
     echo "  ./deploy-wa-analyzer.sh -r us-east-1 -c docker"
     echo "  ./deploy-wa-analyzer.sh -r us-east-1 -c docker -a iac-analyzer-deployment-stack-no-auth"
+    echo "  ./deploy-wa-analyzer.sh -r us-east-1 -c docker -a iac-analyzer-deployment-stack-no-auth -p 'iac-analyzer-test-*'"
 }
 
 # Parse command line arguments
-while getopts "r:c:a:h" flag; do
+while getopts "r:c:a:p:h" flag; do
     case "${flag}" in
         r) REGION=${OPTARG};;
         c) CONTAINER_TOOL=${OPTARG};;
         a) AUTO_CLEANUP=true
            DEPLOYMENT_STACK_NAME=${OPTARG};;
+        p) CLEANUP_ALLOWED_STACKS=${OPTARG};;
         h) print_usage
            exit 0;;
         *) print_usage
@@ -80,6 +83,13 @@ if [ "$AUTO_CLEANUP" = true ] && [ -z "$DEPLOYMENT_STACK_NAME" ]; then
     exit 1
 fi
 
+# Validate batch cleanup patterns are only used with auto-cleanup
+if [ -n "$CLEANUP_ALLOWED_STACKS" ] && [ "$AUTO_CLEANUP" != true ]; then
+    echo "❌ Error: The -p flag requires auto-cleanup to be enabled with -a"
+    print_usage
+    exit 1
+fi
+
 # Set AWS region for deployment
 export CDK_DEPLOY_REGION=$REGION
 
@@ -88,9 +98,11 @@ if [ "$AUTO_CLEANUP" = true ]; then
     echo "✅ Auto-cleanup of deployment stack enabled for stack: $DEPLOYMENT_STACK_NAME"
     export AUTO_CLEANUP=true
     export DEPLOYMENT_STACK_NAME="$DEPLOYMENT_STACK_NAME"
+    export CLEANUP_ALLOWED_STACKS="$CLEANUP_ALLOWED_STACKS"
 else
     export AUTO_CLEANUP=false
     export DEPLOYMENT_STACK_NAME=""
+    export CLEANUP_ALLOWED_STACKS=""
 fi
 
 # Function to check Docker daemon
@@ -344,6 +356,57 @@ cleanup() {
     fi
 }
 
+# Function to enable cross-architecture image builds
+setup_cross_build() {
+    HOST_ARCH=$(uname -m)
+    case "$HOST_ARCH" in
+        x86_64) HOST_ARCH="amd64" ;;
+        aarch64) HOST_ARCH="arm64" ;;
+    esac
+
+    # "architecture" and the per-function Lambda architecture overrides
+    TARGET_ARCHS=$(awk -F "=" '/^[a-z_]*architecture *=/ {gsub(/ /,"",$2); print $2}' config.ini)
+
+    for TARGET_ARCH in $TARGET_ARCHS; do
+        # Normalize to the container platform names
+        case "$TARGET_ARCH" in
+            x86_64|amd64) TARGET_ARCH="amd64" ;;
+            arm64|aarch64) TARGET_ARCH="arm64" ;;
+            *) continue ;;
+        esac
+
+        if [ "$TARGET_ARCH" != "$HOST_ARCH" ]; then
+            # Nothing to install when the container tool already runs $TARGET_ARCH containers
+            if $CONTAINER_TOOL run --rm --platform "linux/$TARGET_ARCH" alpine:3 true >/dev/null 2>&1; then
+                echo "✅ $TARGET_ARCH emulation already available"
+                break
+            fi
+
+            # Registering the emulators changes the kernel settings of the host (or of the container tool's VM)
+            echo "⚠️  Building $TARGET_ARCH images and Lambda bundles on this $HOST_ARCH machine requires QEMU emulation."
+            echo "   It is installed by running the tonistiigi/binfmt image as a privileged container."
+            if [ ! -t 0 ]; then
+                echo "❌ Cannot ask for confirmation without a terminal. Install the $TARGET_ARCH emulation yourself or set the architecture settings in config.ini to auto"
+                exit 1
+            fi
+            read -r -p "Install $TARGET_ARCH emulation now? [y/N] " INSTALL_EMULATION
+            if [[ ! "$INSTALL_EMULATION" =~ ^[Yy]([Ee][Ss])?$ ]]; then
+                echo "❌ Emulation not installed. Set the architecture settings in config.ini to auto to build for this machine's architecture"
+                exit 1
+            fi
+
+            echo "📦 Enabling $TARGET_ARCH emulation..."
+            if ! $CONTAINER_TOOL run --privileged --rm tonistiigi/binfmt --install "$TARGET_ARCH"; then
+                echo "❌ Failed to enable $TARGET_ARCH emulation. Set the architecture settings in config.ini to auto to build for this machine's architecture"
+                exit 1
+            fi
+            echo "✅ $TARGET_ARCH emulation enabled"
+            # Both container platforms are covered once emulation is installed
+            break
+        fi
+    done
+}
+
 # Function to deploy the stack
 deploy_stack() {
     echo "🚀 Deploying Well-Architected Analyzer stack..."
@@ -386,6 +449,7 @@ main() {
     check_prerequisites
     check_auth_config
     setup_dependencies
+    setup_cross_build
     deploy_stack
     
     echo -e "\n✅ Deployment completed successfully!"
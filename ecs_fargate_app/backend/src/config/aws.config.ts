@@ -5,6 +5,10 @@ import { BedrockRuntimeClient } from '@aws-sdk/client-bedrock-runtime';
 import { WellArchitectedClient } from '@aws-sdk/client-wellarchitected';
 import { BedrockAgentRuntimeClient } from '@aws-sdk/client-bedrock-agent-runtime';
 import { DynamoDBClient } from '@aws-sdk/client-dynamodb';
+import { LambdaClient } from '@aws-sdk/client-lambda';
+import { SQSClient } from '@aws-sdk/client-sqs';
+import { SSMClient } from '@aws-sdk/client-ssm';
+import { recordBedrockMetrics } from '../shared/utils/metrics';
 
 @Injectable()
 export class AwsConfigService {
@@ -15,7 +19,7 @@ export class AwsConfigService {
   }
 
   createBedrockClient(): BedrockRuntimeClient {
-    return new BedrockRuntimeClient(this.getAwsConfig());
+    return this.withBedrockMetrics(new BedrockRuntimeClient(this.getAwsConfig()));
   }
 
   createWAClient(): WellArchitectedClient {
@@ -23,13 +27,32 @@ export class AwsConfigService {
   }
 
   createBedrockAgentClient(): BedrockAgentRuntimeClient {
-    return new BedrockAgentRuntimeClient(this.getAwsConfig());
+    return this.withBedrockMetrics(new BedrockAgentRuntimeClient(this.getAwsConfig()));
   }
 
   createDynamoDBClient(): DynamoDBClient {
     return new DynamoDBClient(this.getAwsConfig());
   }
 
+  createLambdaClient(): LambdaClient {
+    return new LambdaClient(this.getAwsConfig());
+  }
+
+  createSQSClient(): SQSClient {
+    return new SQSClient(this.getAwsConfig());
+  }
+
+  createSSMClient(): SSMClient {
+    return new SSMClient(this.getAwsConfig());
+  }
+
+  private withBedrockMetrics<T extends { middlewareStack: any }>(client: T): T {
+    if (!this.configService.get<boolean>('metrics.enabled')) {
+      return client;
+    }
+    return recordBedrockMetrics(client, this.configService.get<string>('metrics.namespace'));
+  }
+
   private getAwsConfig() {
     return {
       region: this.configService.get<string>('aws.region'),
@@ -1,3 +1,9 @@
+// Unlike `parseInt(value, 10) || fallback`, keeps 0 when it is a meaningful value
+function parseIntOrDefault(value: string | undefined, fallback: number): number {
+  const parsed = parseInt(value, 10);
+  return Number.isNaN(parsed) ? fallback : parsed;
+}
+
 export default () => ({
   port: parseInt(process.env.PORT, 10) || 3000,
   auth: {
@@ -10,6 +16,53 @@ export default () => ({
     enabled: process.env.STORAGE_ENABLED === 'true' || true,
     bucket: process.env.ANALYSIS_STORAGE_BUCKET,
     table: process.env.ANALYSIS_METADATA_TABLE,
+    // With the lazy migration strategy, single-lens work items are converted by this Lambda when read
+    migrationFunction: process.env.MIGRATION_FUNCTION_NAME,
+    // GSI on userId and lastModified serving the work item listing
+    recencyIndex: process.env.ANALYSIS_METADATA_RECENCY_INDEX || 'UserLastModifiedIndex',
+    // Work items expire this many days after their last activity, 0 keeps them until deleted
+    retentionDays: parseInt(process.env.WORK_ITEM_RETENTION_DAYS || '0', 10),
+    listPageSize: parseInt(process.env.WORK_ITEMS_PAGE_SIZE || '50', 10),
+    // Largest archive uploaded by the browser straight to the bucket
+    maxArchiveUploadSizeMb: parseInt(process.env.MAX_ARCHIVE_UPLOAD_SIZE_MB || '2048', 10),
+  },
+  jobs: {
+    // Analyses and IaC generations are queued for the worker tier when a job table and queue are configured
+    table: process.env.JOB_TABLE,
+    queueUrl: process.env.JOB_QUEUE_URL,
+    workerMode: process.env.APP_MODE === 'worker',
+    concurrency: parseInt(process.env.WORKER_CONCURRENCY, 10) || 1,
+    // Visibility timeout of a received job message, extended while the job runs
+    leaseSeconds: parseInt(process.env.JOB_LEASE_SECONDS, 10) || 120,
+    maxAttempts: parseInt(process.env.JOB_MAX_ATTEMPTS, 10) || 2,
+  },
+  redis: {
+    // Redis-compatible cache shared by all backend tasks, relays websocket progress between tasks
+    url: process.env.REDIS_URL,
+    progressBackplane: process.env.PROGRESS_BACKPLANE !== 'false',
+    progressChannel: process.env.REDIS_PROGRESS_CHANNEL || 'analyzer-progress',
+  },
+  cache: {
+    // Catalogs, KB retrievals and model responses are cached in the Redis-compatible cache when enabled
+    enabled: process.env.CACHE_ENABLED === 'true',
+    keyPrefix: process.env.CACHE_KEY_PREFIX || 'wa-analyzer',
+    ttlSeconds: {
+      'best-practices': parseInt(process.env.CACHE_TTL_BEST_PRACTICES_SECONDS, 10) || 86400,
+      'kb-retrieval': parseInt(process.env.CACHE_TTL_KB_RETRIEVAL_SECONDS, 10) || 86400,
+      'model-response': parseInt(process.env.CACHE_TTL_MODEL_RESPONSE_SECONDS, 10) || 3600,
+    },
+  },
+  metrics: {
+    // Analysis, model and knowledge base performance metrics, written to stdout in CloudWatch embedded metric format
+    enabled: process.env.METRICS_ENABLED === 'true',
+    namespace: process.env.METRICS_NAMESPACE || 'WAIaCAnalyzer/Backend',
+  },
+  tracing: {
+    // The OpenTelemetry SDK sends spans over OTLP/HTTP to the collector sidecar, which exports them to X-Ray
+    enabled: process.env.TRACING_ENABLED === 'true',
+    endpoint: process.env.OTEL_EXPORTER_OTLP_ENDPOINT || 'http://localhost:4318',
+    serviceName: process.env.OTEL_SERVICE_NAME || 'wa-genai-backend',
+    sampleRatio: parseFloat(process.env.TRACING_SAMPLE_RATIO) || 1,
   },
   aws: {
     region: process.env.AWS_REGION || process.env.CDK_DEPLOY_REGION,
@@ -18,7 +71,21 @@ export default () => ({
     },
     bedrock: {
       knowledgeBaseId: process.env.KNOWLEDGE_BASE_ID,
+      // Data source IDs of the knowledge base keyed by lens prefix (an empty prefix for a bucket-wide data source)
+      dataSourceIds: JSON.parse(process.env.KB_DATA_SOURCE_IDS || '{}') as Record<string, string>,
+      // Blue/green ingestion: the green data sources are queried while the active color parameter is green
+      greenDataSourceIds: JSON.parse(process.env.KB_GREEN_DATA_SOURCE_IDS || '{}') as Record<string, string>,
+      activeColorParameter: process.env.KB_ACTIVE_COLOR_PARAMETER,
+      activeColorTtlSeconds: parseInt(process.env.KB_ACTIVE_COLOR_TTL_SECONDS, 10) || 30,
       modelId: process.env.MODEL_ID,
+      // Model IDs or inference profile IDs per tier, defaulting to MODEL_ID
+      models: {
+        fast: process.env.FAST_MODEL_ID,
+        iac: process.env.IAC_MODEL_ID,
+      },
+      kbModelArn: process.env.KB_MODEL_ARN,
+      // 0 never uses the fast model
+      simpleQuestionMaxBestPractices: parseIntOrDefault(process.env.SIMPLE_QUESTION_MAX_BEST_PRACTICES, 4),
     },
     ddb: {
       lensMetadataTable: process.env.LENS_METADATA_TABLE,
@@ -0,0 +1,5 @@
+import configuration from './config/configuration';
+import { startTracing } from './shared/utils/tracing';
+
+// Imported first by main.ts: the SDK patches express, http and the AWS SDK when they are loaded
+startTracing(configuration().tracing);
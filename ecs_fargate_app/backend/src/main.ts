@@ -1,9 +1,18 @@
+// Must stay the first import, the instrumented modules are patched when loaded
+import './instrumentation';
 import { NestFactory } from '@nestjs/core';
 import { ValidationPipe } from '@nestjs/common';
 import { AppModule } from './app.module';
 import * as bodyParser from 'body-parser';
 
 async function bootstrap() {
+  // Worker tasks only process queued jobs and do not serve HTTP or websocket traffic
+  if (process.env.APP_MODE === 'worker') {
+    const worker = await NestFactory.createApplicationContext(AppModule);
+    worker.enableShutdownHooks();
+    return;
+  }
+
   const app = await NestFactory.create(AppModule);
 
   // Increase payload size limit
@@ -1,7 +1,9 @@
 import {
   Controller,
+  Get,
   Post,
   Body,
+  Param,
   HttpException,
   HttpStatus,
   Logger,
@@ -9,6 +11,7 @@ import {
 } from '@nestjs/common';
 import { AnalyzerService } from './analyzer.service';
 import { StorageService } from '../storage/storage.service';
+import { JobsService } from '../jobs/jobs.service';
 import { AnalyzeRequestDto, IaCTemplateType } from '../../shared/dto/analysis.dto';
 import { ConfigService } from '@nestjs/config';
 
@@ -19,6 +22,7 @@ export class AnalyzerController {
   constructor(
     private readonly analyzerService: AnalyzerService,
     private readonly storageService: StorageService,
+    private readonly jobsService: JobsService,
     private readonly configService: ConfigService,
   ) { }
 
@@ -98,6 +102,32 @@ export class AnalyzerController {
         }
       }
 
+      // With the worker tier, queue the analysis and let the client poll the job
+      if (this.jobsService.isEnabled()) {
+        if (!userId) {
+          throw new Error('User ID is required for analysis');
+        }
+        const job = await this.jobsService.enqueueJob('analyze', userId, analyzeRequest.fileId, {
+          workloadId: analyzeRequest.workloadId,
+          selectedPillars: analyzeRequest.selectedPillars,
+          uploadMode: analyzeRequest.uploadMode,
+          supportingDocumentId: analyzeRequest.supportingDocumentId,
+          supportingDocumentDescription: analyzeRequest.supportingDocumentDescription,
+          lensAlias,
+          lensAliasArn: analyzeRequest.lensAliasArn,
+          lensName: analyzeRequest.lensName,
+          lensPillars: analyzeRequest.lensPillars,
+          outputLanguage: analyzeRequest.outputLanguage,
+        });
+        return {
+          results: [],
+          isCancelled: false,
+          fileId: analyzeRequest.fileId,
+          jobId: job.jobId,
+          status: job.status,
+        };
+      }
+
       return await this.analyzerService.analyze(
         analyzeRequest.fileId,
         analyzeRequest.workloadId,
@@ -138,6 +168,20 @@ export class AnalyzerController {
       const userId = email ? this.storageService.createUserIdHash(email) : null;
       const lensAlias = body.lensAliasArn?.split('/')?.pop() || body.lensAliasArn;
 
+      if (this.jobsService.isEnabled()) {
+        if (!userId) {
+          throw new Error('User ID is required for IaC generation');
+        }
+        const job = await this.jobsService.enqueueJob('generate-iac', userId, body.fileId, {
+          recommendations: body.recommendations,
+          templateType: body.templateType,
+          lensAlias,
+          lensName: body.lensName,
+          outputLanguage: body.outputLanguage,
+        });
+        return { content: '', isCancelled: false, jobId: job.jobId, status: job.status };
+      }
+
       const result = await this.analyzerService.generateIacDocument(
         body.fileId,
         body.recommendations,
@@ -193,15 +237,72 @@ export class AnalyzerController {
     }
   }
 
+  @Get('jobs/:jobId')
+  async getJob(
+    @Param('jobId') jobId: string,
+    @Headers('x-amzn-oidc-data') userDataHeader: string,
+  ) {
+    try {
+      const email = this.getUserEmail(userDataHeader);
+      const userId = email ? this.storageService.createUserIdHash(email) : null;
+
+      const job = this.jobsService.isEnabled() ? await this.jobsService.getJob(jobId) : null;
+      if (!job || job.userId !== userId) {
+        throw new HttpException('Job not found', HttpStatus.NOT_FOUND);
+      }
+
+      // Results are stored next to the work item once the worker is done
+      let result = null;
+      if (job.status === 'COMPLETED' || job.status === 'CANCELLED') {
+        result = await this.storageService.getJobResult(job.userId, job.fileId, job.jobId);
+      }
+
+      return {
+        jobId: job.jobId,
+        jobType: job.jobType,
+        status: job.status,
+        error: job.error || undefined,
+        result,
+      };
+    } catch (error) {
+      if (error instanceof HttpException) {
+        throw error;
+      }
+      this.logger.error('Failed to get job:', error);
+      throw new HttpException(
+        `Failed to get job: ${error.message || error}`,
+        HttpStatus.INTERNAL_SERVER_ERROR,
+      );
+    }
+  }
+
   @Post('cancel-iac-generation')
-  async cancelIaCGeneration() {
+  async cancelIaCGeneration(@Headers('x-amzn-oidc-data') userDataHeader: string) {
+    if (this.jobsService.isEnabled()) {
+      const email = this.getUserEmail(userDataHeader);
+      const userId = email ? this.storageService.createUserIdHash(email) : null;
+      if (userId) {
+        await this.jobsService.requestCancellation(userId, 'generate-iac');
+      }
+      return { message: 'Generation cancelled successfully' };
+    }
+
     this.analyzerService.cancelIaCGeneration();
     return { message: 'Generation cancelled successfully' };
   }
 
   @Post('cancel-analysis')
-  async cancelAnalysis() {
+  async cancelAnalysis(@Headers('x-amzn-oidc-data') userDataHeader: string) {
     try {
+      if (this.jobsService.isEnabled()) {
+        const email = this.getUserEmail(userDataHeader);
+        const userId = email ? this.storageService.createUserIdHash(email) : null;
+        if (userId) {
+          await this.jobsService.requestCancellation(userId, 'analyze');
+        }
+        return { message: 'Analysis cancelled' };
+      }
+
       this.analyzerService.cancelAnalysis();
       return { message: 'Analysis cancelled' };
     } catch (error) {
@@ -1,6 +1,11 @@
-import { WebSocketGateway, WebSocketServer, OnGatewayConnection, OnGatewayDisconnect } from '@nestjs/websockets';
+import { WebSocketGateway, WebSocketServer, OnGatewayConnection, OnGatewayDisconnect, OnGatewayInit } from '@nestjs/websockets';
 import { Server, Socket } from 'socket.io';
-import { Logger } from '@nestjs/common';
+import { createAdapter } from '@socket.io/redis-adapter';
+import { Emitter } from '@socket.io/redis-emitter';
+import { Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import Redis from 'ioredis';
+import { createRedisClient } from '../../shared/utils/redis-client';
 
 @WebSocketGateway({
   cors: {
@@ -10,11 +15,52 @@ import { Logger } from '@nestjs/common';
   pingInterval: 10000, // Send ping every 10 seconds
   pingTimeout: 5000,   // Wait 5 seconds for pong response
 })
-export class AnalyzerGateway implements OnGatewayConnection, OnGatewayDisconnect {
+export class AnalyzerGateway
+  implements OnGatewayInit, OnGatewayConnection, OnGatewayDisconnect, OnModuleInit, OnModuleDestroy {
   @WebSocketServer()
   server: Server;
 
   private readonly logger = new Logger(AnalyzerGateway.name);
+  private readonly progressChannel: string;
+  private readonly redisClients: Redis[] = [];
+  private emitter: Emitter | null = null;
+
+  constructor(private readonly configService: ConfigService) {
+    this.progressChannel = this.configService.get<string>('redis.progressChannel');
+  }
+
+  /**
+   * With the backplane, the Socket.IO Redis adapter relays the events emitted by any API task
+   * to the clients connected to every other API task
+   */
+  afterInit(server: Server) {
+    const redisUrl = this.getBackplaneUrl();
+    if (!redisUrl) {
+      return;
+    }
+
+    const pubClient = createRedisClient(redisUrl);
+    const subClient = pubClient.duplicate();
+    this.redisClients.push(pubClient, subClient);
+    server.adapter(createAdapter(pubClient, subClient, { key: this.progressChannel }));
+    this.logger.log(`Relaying progress events through channel ${this.progressChannel}`);
+  }
+
+  onModuleInit() {
+    // Worker tasks have no websocket server, they emit through the backplane to the API tasks' clients
+    const redisUrl = this.getBackplaneUrl();
+    if (!redisUrl || !this.configService.get<boolean>('jobs.workerMode')) {
+      return;
+    }
+
+    const client = createRedisClient(redisUrl);
+    this.redisClients.push(client);
+    this.emitter = new Emitter(client, { key: this.progressChannel });
+  }
+
+  async onModuleDestroy() {
+    await Promise.all(this.redisClients.map(client => client.quit().catch(() => undefined)));
+  }
 
   handleConnection(client: Socket) {
     this.logger.log(`Client connected: ${client.id}`);
@@ -30,13 +76,27 @@ export class AnalyzerGateway implements OnGatewayConnection, OnGatewayDisconnect
     currentPillar: string;
     currentQuestion: string;
   }) {
-    this.server.emit('analysisProgress', data);
+    this.broadcast('analysisProgress', data);
   }
 
   emitImplementationProgress(data: {
     status: string;
     progress: number;
   }) {
-    this.server.emit('implementationProgress', data);
+    this.broadcast('implementationProgress', data);
+  }
+
+  private broadcast(event: string, data: unknown) {
+    // Without a backplane, worker tasks report progress through the work item only
+    if (this.emitter) {
+      this.emitter.emit(event, data);
+      return;
+    }
+    this.server?.emit(event, data);
+  }
+
+  private getBackplaneUrl(): string | null {
+    const redisUrl = this.configService.get<string>('redis.url');
+    return redisUrl && this.configService.get<boolean>('redis.progressBackplane') ? redisUrl : null;
   }
-}
\ No newline at end of file
+}
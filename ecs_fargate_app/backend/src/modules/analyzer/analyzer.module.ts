@@ -2,14 +2,17 @@ import { Module } from '@nestjs/common';
 import { AnalyzerController } from './analyzer.controller';
 import { AnalyzerService } from './analyzer.service';
 import { AnalyzerGateway } from './analyzer.gateway';
+import { AnalyzerWorker } from './analyzer.worker';
 import { AwsConfigService } from '../../config/aws.config';
 import { StorageModule } from '../storage/storage.module';
+import { JobsModule } from '../jobs/jobs.module';
+import { CacheModule } from '../cache/cache.module';
 import { ConfigService } from '@nestjs/config';
 
 @Module({
-  imports: [StorageModule],
+  imports: [StorageModule, JobsModule, CacheModule],
   controllers: [AnalyzerController],
-  providers: [AnalyzerService, AnalyzerGateway, AwsConfigService, ConfigService],
+  providers: [AnalyzerService, AnalyzerGateway, AnalyzerWorker, AwsConfigService, ConfigService],
   exports: [AnalyzerService]
 })
-export class AnalyzerModule {}
\ No newline at end of file
+export class AnalyzerModule {}
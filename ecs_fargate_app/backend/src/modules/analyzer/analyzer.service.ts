@@ -2,21 +2,27 @@ import { Injectable, Logger } from '@nestjs/common';
 import { AwsConfigService } from '../../config/aws.config';
 import {
     ConverseCommand,
+    ConverseCommandInput,
     Message,
     SystemContentBlock
 } from '@aws-sdk/client-bedrock-runtime';
 import { RetrieveAndGenerateCommand } from '@aws-sdk/client-bedrock-agent-runtime';
 import { GetObjectCommand } from '@aws-sdk/client-s3';
+import { GetParameterCommand } from '@aws-sdk/client-ssm';
 import { paginateListAnswers, AnswerSummary } from '@aws-sdk/client-wellarchitected';
 import { ConfigService } from '@nestjs/config';
 import { AnalyzerGateway } from './analyzer.gateway';
 import { IaCTemplateType } from '../../shared/dto/analysis.dto';
-import { Subject } from 'rxjs';
+import { Observable, Subject } from 'rxjs';
 import { AnalysisResult } from '../../shared/interfaces/analysis.interface';
 import { StorageService } from '../storage/storage.service';
+import { CacheService } from '../cache/cache.service';
 import * as Prompts from '../../prompts';
 import { FileUploadMode } from '../../shared/dto/analysis.dto';
 import { LensInfo } from '../../shared/interfaces/storage.interface';
+import { Traced } from '../../shared/utils/tracing';
+import { MetricDatum, putMetrics } from '../../shared/utils/metrics';
+import { ScaleInProtected } from '../../shared/utils/task-protection';
 
 
 interface QuestionGroup {
@@ -68,29 +74,80 @@ interface ModelSectionResponse {
     sections: DocumentSection[];
 }
 
+// Model tiers: 'default' (chat, complex question groups), 'fast' (simple question groups, detail expansion), 'iac' (IaC generation)
+type ModelTier = 'default' | 'fast' | 'iac';
+
 @Injectable()
 export class AnalyzerService {
     private readonly logger = new Logger(AnalyzerService.name);
-    private cachedBestPractices: WellArchitectedBestPractice[] | null = null;
     private cancelGeneration$ = new Subject<void>();
     private cancelAnalysis$ = new Subject<void>();
     private readonly storageEnabled: boolean;
     private readonly outputLanguage: string; // Add language setting
+    // Active color of the blue/green KB data sources and when it was read
+    private activeColor = { color: 'blue', expiresAt: 0 };
 
     constructor(
         private readonly awsConfig: AwsConfigService,
         private readonly configService: ConfigService,
         private readonly analyzerGateway: AnalyzerGateway,
         private readonly storageService: StorageService,
+        private readonly cacheService: CacheService,
     ) {
         this.storageEnabled = this.configService.get<boolean>('storage.enabled', false);
         this.outputLanguage = this.configService.get<string>('language.output', 'en'); // Get language from config
     }
 
 
-    // Check if the current model is Claude 3.7 Sonnet
-    private isClaudeSonnet37(): boolean {
-        const modelId = this.configService.get<string>('aws.bedrock.modelId');
+    // Data source IDs of the KB by lens prefix. With blue/green ingestion, the active color is read from
+    // its parameter at most once per TTL, and the last known color is kept when the read fails
+    private async getDataSourceIds(): Promise<Record<string, string>> {
+        const parameterName = this.configService.get<string>('aws.bedrock.activeColorParameter');
+        if (!parameterName) {
+            return this.configService.get<Record<string, string>>('aws.bedrock.dataSourceIds');
+        }
+
+        if (Date.now() >= this.activeColor.expiresAt) {
+            const ttlSeconds = this.configService.get<number>('aws.bedrock.activeColorTtlSeconds');
+            try {
+                const response = await this.awsConfig.createSSMClient().send(
+                    new GetParameterCommand({ Name: parameterName })
+                );
+                const color = response.Parameter.Value;
+                if (color !== this.activeColor.color) {
+                    this.logger.log(`Knowledge base data sources switched to ${color}`);
+                }
+                this.activeColor = { color, expiresAt: Date.now() + ttlSeconds * 1000 };
+            } catch (error) {
+                this.logger.warn(`Failed to read ${parameterName}, keeping ${this.activeColor.color} data sources: ${error}`);
+                this.activeColor = { ...this.activeColor, expiresAt: Date.now() + ttlSeconds * 1000 };
+            }
+        }
+
+        return this.activeColor.color === 'green'
+            ? this.configService.get<Record<string, string>>('aws.bedrock.greenDataSourceIds')
+            : this.configService.get<Record<string, string>>('aws.bedrock.dataSourceIds');
+    }
+
+    // Model ID or inference profile ID used for the given tier, defaults to the main model
+    private getModelId(tier: ModelTier): string {
+        const defaultModelId = this.configService.get<string>('aws.bedrock.modelId');
+        if (tier === 'default') {
+            return defaultModelId;
+        }
+        return this.configService.get<string>(`aws.bedrock.models.${tier}`) || defaultModelId;
+    }
+
+    // Question groups with few best practices are analyzed by the fast model
+    private getAnalysisModelId(question: QuestionGroup): string {
+        const maxBestPractices = this.configService.get<number>('aws.bedrock.simpleQuestionMaxBestPractices');
+        return question.bestPractices.length <= maxBestPractices
+            ? this.getModelId('fast')
+            : this.getModelId('default');
+    }
+
+    // Check if the model is Claude 3.7 Sonnet
+    private isClaudeSonnet37(modelId: string): boolean {
         return modelId && (
             modelId.includes('anthropic.claude-3-7-sonnet') ||
             modelId.includes('us.anthropic.claude-3-7-sonnet')
@@ -98,8 +155,14 @@ export class AnalyzerService {
     }
 
     // Configure model parameters based on the model type
-    private getModelParameters() {
-        const isClaudeSonnet37 = this.isClaudeSonnet37();
+    private recordMetrics(dimensions: Record<string, string>, metrics: MetricDatum[]) {
+        if (this.configService.get<boolean>('metrics.enabled')) {
+            putMetrics(this.configService.get<string>('metrics.namespace'), dimensions, metrics);
+        }
+    }
+
+    private getModelParameters(modelId: string = this.getModelId('default')) {
+        const isClaudeSonnet37 = this.isClaudeSonnet37(modelId);
 
         if (isClaudeSonnet37) {
             return {
@@ -130,6 +193,7 @@ export class AnalyzerService {
      * @param userId The user ID for looking up relevant data
      * @returns A response message from the AI assistant
      */
+    @Traced('AnalyzerService.chat', (fileId, message, userId, lensName, lensAlias) => ({ 'app.file_id': fileId, 'app.lens_alias': lensAlias }))
     async chat(fileId: string, message: string, userId: string, lensName?: string, lensAlias?: string): Promise<string> {
         try {
             if (!fileId || !userId) {
@@ -472,6 +536,7 @@ export class AnalyzerService {
  * @param uploadMode File upload mode
  * @returns File content, type, and relevant metadata
  */
+    @Traced('AnalyzerService.getFileContent', (userId, fileId, uploadMode) => ({ 'app.upload_mode': uploadMode }))
     private async getFileContent(
         userId: string,
         fileId: string,
@@ -548,6 +613,13 @@ export class AnalyzerService {
         this.cancelAnalysis$.next();
     }
 
+    @Traced('AnalyzerService.analyze', (fileId, workloadId, selectedPillars, uploadMode, userId, supportingDocumentId, supportingDocumentDescription, lensAlias) => ({
+        'app.file_id': fileId,
+        'app.pillars': selectedPillars?.join(','),
+        'app.upload_mode': uploadMode,
+        'app.lens_alias': lensAlias || 'wellarchitected',
+    }))
+    @ScaleInProtected()
     async analyze(
         fileId: string,
         workloadId: string,
@@ -560,9 +632,11 @@ export class AnalyzerService {
         lensAliasArn?: string,
         lensName?: string,
         lensPillars?: Record<string, string>,
-        outputLanguage?: string
+        outputLanguage?: string,
+        cancel$: Observable<void> = this.cancelAnalysis$ // Per-job cancellation of the worker tier
     ): Promise<{ results: AnalysisResult[]; isCancelled: boolean; error?: string; fileId?: string }> {
         const results: AnalysisResult[] = [];
+        const analysisStart = Date.now();
         let workItem;
 
         try {
@@ -674,9 +748,9 @@ export class AnalyzerService {
 
             let processedQuestions = 0;
 
-            // Create a Promise that resolves when cancelAnalysis$ emits
+            // Create a Promise that resolves when cancel$ emits
             const cancelPromise = new Promise<boolean>((resolve) => {
-                const subscription = this.cancelAnalysis$.subscribe(() => {
+                const subscription = cancel$.subscribe(() => {
                     subscription.unsubscribe();
                     resolve(true);
                 });
@@ -686,6 +760,7 @@ export class AnalyzerService {
             for (let i = 0; i < selectedPillars.length; i++) {
                 const pillar = selectedPillars[i];
                 const questionGroups = pillarQuestionGroups[i];
+                const pillarStart = Date.now();
 
                 for (const question of questionGroups) {
                     try {
@@ -741,7 +816,8 @@ export class AnalyzerService {
                                 question.pillar,
                                 question.title,
                                 question,
-                                lensName
+                                lensName,
+                                lensAliasArn
                             );
                         } catch (error) {
                             if (workItem && results.length > 0) {
@@ -902,6 +978,11 @@ export class AnalyzerService {
                         };
                     }
                 }
+
+                this.recordMetrics({ Pillar: pillar }, [
+                    { name: 'PillarAnalysisDuration', value: (Date.now() - pillarStart) / 1000, unit: 'Seconds' },
+                    { name: 'QuestionsAnalyzed', value: questionGroups.length, unit: 'Count' },
+                ]);
             }
 
             // Update lens-specific completed status
@@ -933,6 +1014,10 @@ export class AnalyzerService {
                 lastModified: new Date().toISOString(),
             });
 
+            this.recordMetrics({ LensAlias: currentLensAlias }, [
+                { name: 'AnalysisDuration', value: (Date.now() - analysisStart) / 1000, unit: 'Seconds' },
+            ]);
+
             return { results, isCancelled: false, fileId: workItem.fileId };
         } catch (error) {
             const usedLensAlias = lensAlias || 'wellarchitected';
@@ -969,6 +1054,8 @@ export class AnalyzerService {
         this.cancelGeneration$.next();
     }
 
+    @Traced('AnalyzerService.generateIacDocument', (fileId, recommendations, templateType) => ({ 'app.file_id': fileId, 'app.template_type': templateType }))
+    @ScaleInProtected()
     async generateIacDocument(
         fileId: string,
         recommendations: any[],
@@ -976,7 +1063,8 @@ export class AnalyzerService {
         userId?: string,
         lensAlias?: string,
         lensName?: string,
-        outputLanguage?: string
+        outputLanguage?: string,
+        cancel$: Observable<void> = this.cancelGeneration$ // Per-job cancellation of the worker tier
     ): Promise<{ content: string; isCancelled: boolean; error?: string }> {
         try {
             if (!userId) {
@@ -1050,7 +1138,8 @@ export class AnalyzerService {
                         null,
                         null,
                         currentLensName,
-                        outputLanguage || this.outputLanguage
+                        outputLanguage || this.outputLanguage,
+                        cancel$
                     );
 
                     // Handle cancellation and storage updates
@@ -1277,6 +1366,7 @@ export class AnalyzerService {
         };
     }
 
+    @Traced('AnalyzerService.getMoreDetails', (selectedItems, userId, fileId) => ({ 'app.file_id': fileId, 'app.items': selectedItems?.length }))
     async getMoreDetails(
         selectedItems: any[],
         userId: string,
@@ -1376,8 +1466,8 @@ export class AnalyzerService {
 
                             // Invoke model with PDFs
                             const bedrockClient = this.awsConfig.createBedrockClient();
-                            const modelId = this.configService.get<string>('aws.bedrock.modelId');
-                            const modelParams = this.getModelParameters();
+                            const modelId = this.getModelId('fast');
+                            const modelParams = this.getModelParameters(modelId);
 
                             // Create message with user prompt
                             const messages: Message[] = [
@@ -1629,10 +1719,10 @@ export class AnalyzerService {
                             }
 
                             const bedrockClient = this.awsConfig.createBedrockClient();
-                            const modelId = this.configService.get<string>('aws.bedrock.modelId');
+                            const modelId = this.getModelId('fast');
 
                             // Get model parameters based on the model type
-                            const modelParams = this.getModelParameters();
+                            const modelParams = this.getModelParameters(modelId);
 
                             const command = new ConverseCommand({
                                 modelId,
@@ -1709,10 +1799,10 @@ export class AnalyzerService {
                             }
 
                             const bedrockClient = this.awsConfig.createBedrockClient();
-                            const modelId = this.configService.get<string>('aws.bedrock.modelId');
+                            const modelId = this.getModelId('fast');
 
                             // Get model parameters based on the model type
-                            const modelParams = this.getModelParameters();
+                            const modelParams = this.getModelParameters(modelId);
 
                             const command = new ConverseCommand({
                                 modelId,
@@ -1828,44 +1918,52 @@ export class AnalyzerService {
         };
     }
 
+    @Traced('AnalyzerService.retrieveFromKnowledgeBase', (pillar, question) => ({ 'app.pillar': pillar, 'app.question': question }))
     private async retrieveFromKnowledgeBase(
         pillar: string,
         question: string,
         questionGroup: QuestionGroup,
-        lensName?: string
+        lensName?: string,
+        lensAliasArn?: string
     ): Promise<string[]> {
         const bedrockAgent = this.awsConfig.createBedrockAgentClient();
         const knowledgeBaseId = this.configService.get<string>('aws.bedrock.knowledgeBaseId');
         const modelId = this.configService.get<string>('aws.bedrock.modelId');
 
         // Filter KB documentation per pillar if reviewing the standard Well-Architected Framework
-        let filter;
-        if (lensName === 'Well-Architected Framework') {
-            filter = {
-                andAll: [
-                    {
-                        equals: {
-                            key: "lens_name",
-                            value: lensName
-                        }
-                    },
-                    {
-                        equals: {
-                            key: "pillar",
-                            value: pillar
-                        }
-                    }
-                ]
-            };
-        } else {
-            filter = {
+        const conditions: any[] = [
+            {
                 equals: {
                     key: "lens_name",
                     value: lensName
                 }
-            };
+            }
+        ];
+        if (lensName === 'Well-Architected Framework') {
+            conditions.push({
+                equals: {
+                    key: "pillar",
+                    value: pillar
+                }
+            });
         }
 
+        // Documents of a lens are in the data source of its bucket prefix (the lens alias),
+        // so the search only considers the chunks of that data source (or of the bucket-wide one)
+        const lensPrefix = lensAliasArn?.split('/').pop() || 'wellarchitected';
+        const dataSourceIds = await this.getDataSourceIds();
+        const dataSourceId = dataSourceIds[lensPrefix] ?? dataSourceIds[''];
+        if (dataSourceId) {
+            conditions.push({
+                equals: {
+                    key: "x-amz-bedrock-kb-data-source-id",
+                    value: dataSourceId
+                }
+            });
+        }
+
+        const filter = conditions.length > 1 ? { andAll: conditions } : conditions[0];
+
         const command = new RetrieveAndGenerateCommand({
             input: {
                 text: Prompts.buildKnowledgeBaseInputPrompt(question, pillar, questionGroup, lensName),
@@ -1874,7 +1972,8 @@ export class AnalyzerService {
                 type: "KNOWLEDGE_BASE",
                 knowledgeBaseConfiguration: {
                     knowledgeBaseId: knowledgeBaseId,
-                    modelArn: modelId,
+                    // Inference profiles must be passed as ARNs
+                    modelArn: this.configService.get<string>('aws.bedrock.kbModelArn') || modelId,
                     retrievalConfiguration: {
                         vectorSearchConfiguration: {
                             numberOfResults: 10,
@@ -1896,12 +1995,20 @@ export class AnalyzerService {
             }
         });
 
-        const response = await bedrockAgent.send(command);
+        // Identical retrievals (same question, lens and pillar) are served from the cache
+        return this.cacheService.getOrLoad('kb-retrieval', command.input, async () => {
+            const response = await bedrockAgent.send(command);
 
-        // Return as an array with one element to match the expected return type
-        return response.output?.text ? [response.output.text] : [];
+            // Return as an array with one element to match the expected return type
+            return response.output?.text ? [response.output.text] : [];
+        });
     }
 
+    @Traced('AnalyzerService.analyzeQuestion', (fileContent, question: QuestionGroup) => ({
+        'app.pillar': question.pillar,
+        'app.question': question.title,
+        'app.best_practices': question.bestPractices?.length,
+    }))
     private async analyzeQuestion(
         fileContent: string | any,
         question: QuestionGroup,
@@ -1963,6 +2070,7 @@ export class AnalyzerService {
                 throw new Error('Invalid image content format');
             }
 
+            const modelId = this.getAnalysisModelId(question);
             const response = isImage
                 ? await this.invokeBedrockModelWithImage(
                     prompt,
@@ -1970,14 +2078,16 @@ export class AnalyzerService {
                     fileContent,
                     supportingDocContent,
                     supportingDocType,
-                    supportingDocName
+                    supportingDocName,
+                    modelId
                 )
                 : await this.invokeBedrockModel(
                     prompt,
                     systemPrompt,
                     supportingDocContent,
                     supportingDocType,
-                    supportingDocName
+                    supportingDocName,
+                    modelId
                 );
 
             return {
@@ -2056,13 +2166,11 @@ export class AnalyzerService {
         imageContent: string,
         supportingDocContent?: string,
         supportingDocType?: string,
-        supportingDocName?: string
+        supportingDocName?: string,
+        modelId: string = this.getModelId('default')
     ): Promise<ModelResponse> {
-        const bedrockClient = this.awsConfig.createBedrockClient();
-        const modelId = this.configService.get<string>('aws.bedrock.modelId');
-
         // Get model parameters based on the model type
-        const modelParams = this.getModelParameters();
+        const modelParams = this.getModelParameters(modelId);
 
         try {
             // Extract base64 data and media type from data URL
@@ -2136,24 +2244,33 @@ export class AnalyzerService {
                 }
             ];
 
-            const command = new ConverseCommand({
+            return await this.converseJson<ModelResponse>({
                 modelId,
                 ...modelParams,
                 messages,
                 system
             });
+        } catch (error) {
+            this.logger.error('Error invoking Bedrock model:', error);
+            throw new Error(`Failed to analyze diagram with AI model. Error invoking Bedrock model: ${error}`);
+        }
+    }
 
-            const response = await bedrockClient.send(command);
+    /**
+     * Sends a Converse request and parses the JSON answer of the model.
+     * Identical requests are served from the cache, responses that can't be parsed are not cached.
+     */
+    private async converseJson<T>(input: ConverseCommandInput): Promise<T> {
+        return this.cacheService.getOrLoad<T>('model-response', input, async () => {
+            const bedrockClient = this.awsConfig.createBedrockClient();
+            const response = await bedrockClient.send(new ConverseCommand(input));
 
-            // Extract text from the response
+            // Extract text from response
             const responseText = response.output.message.content.find(c => c.text)?.text || '';
 
             const cleanedAnalysisJsonString = this.cleanJsonString(responseText);
             return JSON.parse(cleanedAnalysisJsonString);
-        } catch (error) {
-            this.logger.error('Error invoking Bedrock model:', error);
-            throw new Error(`Failed to analyze diagram with AI model. Error invoking Bedrock model: ${error}`);
-        }
+        });
     }
 
     private async invokeBedrockModel(
@@ -2161,13 +2278,11 @@ export class AnalyzerService {
         systemPrompt: string,
         supportingDocContent?: string,
         supportingDocType?: string,
-        supportingDocName?: string
+        supportingDocName?: string,
+        modelId: string = this.getModelId('default')
     ): Promise<ModelResponse> {
-        const bedrockClient = this.awsConfig.createBedrockClient();
-        const modelId = this.configService.get<string>('aws.bedrock.modelId');
-
         // Get model parameters based on the model type
-        const modelParams = this.getModelParameters();
+        const modelParams = this.getModelParameters(modelId);
 
         // Prepare base message
         const messages: Message[] = [
@@ -2218,7 +2333,7 @@ export class AnalyzerService {
         }
 
         try {
-            const command = new ConverseCommand({
+            return await this.converseJson<ModelResponse>({
                 modelId,
                 ...modelParams,
                 messages,
@@ -2228,16 +2343,6 @@ export class AnalyzerService {
                     }
                 ]
             });
-
-            const response = await bedrockClient.send(command);
-
-            // Extract text from response
-            const responseText = response.output.message.content.find(c => c.text)?.text || '';
-
-            const cleanedAnalysisJsonString = this.cleanJsonString(responseText);
-            const parsedAnalysis = JSON.parse(cleanedAnalysisJsonString);
-
-            return parsedAnalysis;
         } catch (error) {
             this.logger.error('Error invoking Bedrock model:', error);
             throw new Error(`Failed to analyze template with AI model. Error invoking Bedrock model: ${error}`);
@@ -2256,13 +2361,14 @@ export class AnalyzerService {
         supportingDocName?: string,
         supportingDocDescription?: string,
         lensName?: string,
-        outputLanguage: string = 'en' // Add language parameter with English default
+        outputLanguage: string = 'en', // Add language parameter with English default
+        cancel$: Observable<void> = this.cancelGeneration$
     ): Promise<{ content: string; isCancelled: boolean }> {
         const bedrockClient = this.awsConfig.createBedrockClient();
-        const modelId = this.configService.get<string>('aws.bedrock.modelId');
+        const modelId = this.getModelId('iac');
 
         // Get model parameters based on the model type
-        const modelParams = this.getModelParameters();
+        const modelParams = this.getModelParameters(modelId);
 
         const systemPrompt = Prompts.buildIacGenerationSystemPrompt(templateType, modelId, lensName, outputLanguage);
         const prompt = Prompts.buildIacGenerationPrompt(
@@ -2330,9 +2436,9 @@ export class AnalyzerService {
             }
         }
 
-        // Create a Promise that resolves when cancelGeneration$ emits
+        // Create a Promise that resolves when cancel$ emits
         const cancelPromise = new Promise<void>((resolve) => {
-            const subscription = this.cancelGeneration$.subscribe(() => {
+            const subscription = cancel$.subscribe(() => {
                 subscription.unsubscribe();
                 resolve();
             });
@@ -2390,6 +2496,7 @@ export class AnalyzerService {
  * @param lensName Optional lens name
  * @returns Analysis results
  */
+    @Traced('AnalyzerService.analyzePdfFiles', (pdfFiles) => ({ 'app.pdf_files': pdfFiles?.length }))
     private async analyzePdfFiles(
         pdfFiles: Array<{ filename: string, buffer: Buffer, size: number }>,
         question: QuestionGroup,
@@ -2416,7 +2523,8 @@ export class AnalyzerService {
                 pdfFiles,
                 supportingDocContent,
                 supportingDocType,
-                supportingDocName
+                supportingDocName,
+                this.getAnalysisModelId(question)
             );
 
             return {
@@ -2447,13 +2555,11 @@ export class AnalyzerService {
         pdfFiles: Array<{ filename: string, buffer: Buffer, size: number }>,
         supportingDocContent?: string,
         supportingDocType?: string,
-        supportingDocName?: string
+        supportingDocName?: string,
+        modelId: string = this.getModelId('default')
     ): Promise<ModelResponse> {
-        const bedrockClient = this.awsConfig.createBedrockClient();
-        const modelId = this.configService.get<string>('aws.bedrock.modelId');
-
         // Get model parameters based on the model type
-        const modelParams = this.getModelParameters();
+        const modelParams = this.getModelParameters(modelId);
 
         try {
             // Build message with user prompt
@@ -2522,20 +2628,12 @@ export class AnalyzerService {
                 }
             }
 
-            const command = new ConverseCommand({
+            return await this.converseJson<ModelResponse>({
                 modelId,
                 ...modelParams,
                 messages,
                 system: [{ text: systemPrompt }]
             });
-
-            const response = await bedrockClient.send(command);
-
-            // Extract text from response
-            const responseText = response.output.message.content.find(c => c.text)?.text || '';
-
-            const cleanedAnalysisJsonString = this.cleanJsonString(responseText);
-            return JSON.parse(cleanedAnalysisJsonString);
         } catch (error) {
             this.logger.error('Error invoking Bedrock model with PDFs:', error);
             throw new Error(`Failed to analyze PDF documents with AI model. Error invoking Bedrock model: ${error}`);
@@ -2560,6 +2658,7 @@ export class AnalyzerService {
         }
     }
 
+    @Traced('AnalyzerService.loadWellArchitectedAnswers', (workloadId, lensAlias) => ({ 'app.lens_alias': lensAlias }))
     private async loadWellArchitectedAnswers(workloadId: string, lensAlias?: string): Promise<WellArchitectedAnswer> {
         const waClient = this.awsConfig.createWAClient();
 
@@ -2602,7 +2701,8 @@ export class AnalyzerService {
         }
     }
 
-    // Load best practices once
+    // Load best practices of the lens, mapped to the choices of the workload
+    @Traced('AnalyzerService.loadBestPractices')
     private async loadBestPractices(workloadId: string, lensAliasArn: string, lensPillars: Record<string, string>): Promise<WellArchitectedBestPractice[]> {
 
         const s3Client = this.awsConfig.createS3Client();
@@ -2618,20 +2718,26 @@ export class AnalyzerService {
             // Create the path to the best practices JSON file
             const bestPracticesPath = `${lensName}/best_practices_list/${lensName}_best_practices.json`;
 
-            // Fetch best practices from S3
-            const s3Response = await s3Client.send(
-                new GetObjectCommand({
-                    Bucket: waDocsBucket,
-                    Key: bestPracticesPath
-                })
-            );
+            // Fetch best practices from S3, through the cache shared by all tasks
+            const baseBestPractices = await this.cacheService.getOrLoad<WellArchitectedBestPractice[]>(
+                'best-practices',
+                { bucket: waDocsBucket, key: bestPracticesPath },
+                async () => {
+                    const s3Response = await s3Client.send(
+                        new GetObjectCommand({
+                            Bucket: waDocsBucket,
+                            Key: bestPracticesPath
+                        })
+                    );
 
-            const responseBody = await s3Response.Body?.transformToString();
-            if (!responseBody) {
-                throw new Error('No data received from S3');
-            }
+                    const responseBody = await s3Response.Body?.transformToString();
+                    if (!responseBody) {
+                        throw new Error('No data received from S3');
+                    }
 
-            const baseBestPractices: WellArchitectedBestPractice[] = JSON.parse(responseBody);
+                    return JSON.parse(responseBody);
+                }
+            );
 
             // Fetch WA Tool answers
             const waAnswers = await this.loadWellArchitectedAnswers(workloadId, lensAliasArn);
@@ -2661,7 +2767,7 @@ export class AnalyzerService {
             });
 
             // Enhance best practices with their corresponding ChoiceIds and QuestionIds
-            this.cachedBestPractices = baseBestPractices.map(bp => {
+            return baseBestPractices.map(bp => {
                 // Create the same unique key for lookup
                 const uniqueKey = `${bp.Question}|||${bp['Best Practice']}`;
 
@@ -2676,14 +2782,13 @@ export class AnalyzerService {
                     pillarId: pillarId
                 };
             });
-
-            return this.cachedBestPractices;
         } catch (error) {
             this.logger.error('Error loading best practices:', error);
             throw new Error('Failed to load Well-Architected best practices');
         }
     }
 
+    @Traced('AnalyzerService.retrieveBestPractices', (pillarId) => ({ 'app.pillar': pillarId }))
     private async retrieveBestPractices(pillarId: string, workloadId: string, lensAliasArn?: string, lensPillars?: Record<string, string>): Promise<QuestionGroup[]> {
         try {
             const allBestPractices = await this.loadBestPractices(workloadId, lensAliasArn, lensPillars);
@@ -0,0 +1,162 @@
+import {
+  Injectable,
+  Logger,
+  OnApplicationBootstrap,
+  OnApplicationShutdown,
+} from '@nestjs/common';
+import { hostname } from 'os';
+import { Subject } from 'rxjs';
+import { randomUUID } from 'crypto';
+import { AnalyzerService } from './analyzer.service';
+import { JobsService } from '../jobs/jobs.service';
+import { StorageService } from '../storage/storage.service';
+import { ClaimedJob, JobStatus } from '../../shared/interfaces/job.interface';
+import { Traced } from '../../shared/utils/tracing';
+
+// Time given to running jobs to finish when the task is stopped (ECS sends SIGKILL after 120 seconds at most)
+const SHUTDOWN_GRACE_MS = 100000;
+
+// Pause before receiving again after the queue could not be reached
+const ERROR_BACKOFF_MS = 5000;
+
+/**
+ * Processes the analyses and IaC generations queued by the API tasks.
+ * Only active when the backend runs with APP_MODE=worker.
+ */
+@Injectable()
+export class AnalyzerWorker implements OnApplicationBootstrap, OnApplicationShutdown {
+  private readonly logger = new Logger(AnalyzerWorker.name);
+  private readonly workerId = `${hostname()}-${randomUUID()}`;
+  private running = false;
+  private loops: Promise<void>[] = [];
+
+  constructor(
+    private readonly analyzerService: AnalyzerService,
+    private readonly jobsService: JobsService,
+    private readonly storageService: StorageService,
+  ) { }
+
+  onApplicationBootstrap() {
+    if (!this.jobsService.isWorkerMode()) {
+      return;
+    }
+
+    const { concurrency } = this.jobsService.getConfig();
+    this.logger.log(`Worker ${this.workerId} receiving jobs (concurrency: ${concurrency})`);
+
+    this.running = true;
+    for (let i = 0; i < concurrency; i++) {
+      this.loops.push(this.pollJobs());
+    }
+  }
+
+  async onApplicationShutdown() {
+    if (!this.running) {
+      return;
+    }
+
+    this.running = false;
+    // Jobs still running after the grace period are delivered again once their message becomes visible
+    await Promise.race([
+      Promise.all(this.loops),
+      new Promise(resolve => setTimeout(resolve, SHUTDOWN_GRACE_MS)),
+    ]);
+  }
+
+  private async pollJobs(): Promise<void> {
+    while (this.running) {
+      try {
+        // Long polling, returns as soon as a job is queued
+        const claim = await this.jobsService.claimNextJob(this.workerId);
+        if (claim) {
+          await this.processJob(claim);
+        }
+      } catch (error) {
+        this.logger.error('Error receiving jobs:', error);
+        await new Promise(resolve => setTimeout(resolve, ERROR_BACKOFF_MS));
+      }
+    }
+  }
+
+  @Traced('AnalyzerWorker.processJob', ({ job }: ClaimedJob) => ({
+    'app.job_id': job.jobId,
+    'app.job_type': job.jobType,
+    'app.job_attempt': job.attempts,
+    'app.queue_wait_ms': Date.now() - job.queuedAt,
+  }))
+  private async processJob(claim: ClaimedJob): Promise<void> {
+    const { job } = claim;
+    const { leaseSeconds } = this.jobsService.getConfig();
+    // Cancels only this job, other jobs running in the same worker task are not affected
+    const cancel$ = new Subject<void>();
+    this.logger.log(`Processing ${job.jobType} job ${job.jobId} (attempt ${job.attempts})`);
+
+    // Keep the job's message hidden from other workers while it runs and forward cancellation requests from the API tasks
+    const heartbeat = setInterval(async () => {
+      try {
+        const current = await this.jobsService.heartbeat(claim);
+        if (current?.cancelRequested) {
+          cancel$.next();
+        }
+      } catch (error) {
+        this.logger.warn(`Failed to extend the visibility of job ${job.jobId}: ${error.message}`);
+      }
+    }, (leaseSeconds * 1000) / 3);
+
+    let status: JobStatus = 'COMPLETED';
+    let errorMessage: string | undefined;
+
+    try {
+      const args = JSON.parse(job.payload);
+      let result: { isCancelled: boolean };
+
+      if (job.jobType === 'analyze') {
+        result = await this.analyzerService.analyze(
+          job.fileId,
+          args.workloadId,
+          args.selectedPillars,
+          args.uploadMode,
+          job.userId,
+          args.supportingDocumentId,
+          args.supportingDocumentDescription,
+          args.lensAlias,
+          args.lensAliasArn,
+          args.lensName,
+          args.lensPillars,
+          args.outputLanguage,
+          cancel$
+        );
+      } else {
+        result = await this.analyzerService.generateIacDocument(
+          job.fileId,
+          args.recommendations,
+          args.templateType,
+          job.userId,
+          args.lensAlias,
+          args.lensName,
+          args.outputLanguage,
+          cancel$
+        );
+      }
+
+      await this.storageService.storeJobResult(job.userId, job.fileId, job.jobId, result);
+      if (result.isCancelled) {
+        status = 'CANCELLED';
+      }
+    } catch (error) {
+      this.logger.error(`Job ${job.jobId} failed:`, error);
+      status = 'FAILED';
+      errorMessage = error.message || String(error);
+    } finally {
+      clearInterval(heartbeat);
+      cancel$.complete();
+    }
+
+    try {
+      await this.jobsService.completeJob(claim, this.workerId, status, errorMessage);
+      this.logger.log(`Job ${job.jobId} finished with status ${status}`);
+    } catch (error) {
+      this.logger.error(`Failed to record the status of job ${job.jobId}:`, error);
+    }
+  }
+}
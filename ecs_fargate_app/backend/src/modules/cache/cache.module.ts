@@ -0,0 +1,9 @@
+import { Module } from '@nestjs/common';
+import { CacheService } from './cache.service';
+import { ConfigService } from '@nestjs/config';
+
+@Module({
+  providers: [CacheService, ConfigService],
+  exports: [CacheService],
+})
+export class CacheModule {}
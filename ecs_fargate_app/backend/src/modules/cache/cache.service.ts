@@ -0,0 +1,136 @@
+import { Injectable, Logger, OnModuleDestroy } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { createHash } from 'crypto';
+import Redis from 'ioredis';
+import { createRedisClient } from '../../shared/utils/redis-client';
+import { CacheConfig, CacheNamespace } from '../../shared/interfaces/cache.interface';
+
+// Namespaces derived from the knowledge base documents, invalidated when the KB synchronizer updates the lenses
+const KNOWLEDGE_NAMESPACES: CacheNamespace[] = ['best-practices', 'kb-retrieval'];
+
+/**
+ * Caches best-practice catalogs, KB retrievals and model responses in the Redis-compatible cache
+ * shared by all backend and worker tasks. The cache is optional and fails open: when it is disabled
+ * or unreachable, values are loaded from their source.
+ *
+ * Each namespace has a generation counter that is part of its keys, so a namespace is invalidated
+ * by incrementing the counter and the previous entries expire with their TTL.
+ */
+@Injectable()
+export class CacheService implements OnModuleDestroy {
+  private readonly logger = new Logger(CacheService.name);
+  private readonly config: CacheConfig;
+  private readonly client: Redis | null = null;
+
+  constructor(private readonly configService: ConfigService) {
+    this.config = this.configService.get<CacheConfig>('cache');
+    const redisUrl = this.configService.get<string>('redis.url');
+
+    if (this.config.enabled && redisUrl) {
+      this.client = createRedisClient(redisUrl, { failFast: true });
+    }
+  }
+
+  async onModuleDestroy() {
+    await this.client?.quit();
+  }
+
+  isEnabled(): boolean {
+    return this.client !== null;
+  }
+
+  /**
+   * Returns the cached value for the given key, or loads it and caches it
+   * @param namespace Namespace of the value, defines its TTL
+   * @param key Any JSON serializable value identifying the value (binary content is hashed)
+   * @param loader Loads the value when it's not cached, failures are not cached
+   */
+  async getOrLoad<T>(namespace: CacheNamespace, key: unknown, loader: () => Promise<T>): Promise<T> {
+    if (!this.client) {
+      return loader();
+    }
+
+    let cacheKey: string | null = null;
+    try {
+      cacheKey = await this.buildKey(namespace, key);
+      const cached = await this.client.get(cacheKey);
+      if (cached !== null) {
+        return JSON.parse(cached) as T;
+      }
+    } catch (error) {
+      this.logger.warn(`Cache read failed for ${namespace}: ${error.message}`);
+    }
+
+    const value = await loader();
+
+    if (cacheKey && value !== undefined) {
+      this.client
+        .set(cacheKey, JSON.stringify(value), 'EX', this.config.ttlSeconds[namespace])
+        .catch(error => this.logger.warn(`Cache write failed for ${namespace}: ${error.message}`));
+    }
+
+    return value;
+  }
+
+  /**
+   * Invalidates all the entries of the given namespaces, in every task
+   */
+  async invalidate(...namespaces: CacheNamespace[]): Promise<void> {
+    if (!this.client) {
+      return;
+    }
+
+    try {
+      await Promise.all(namespaces.map(namespace => this.client.incr(this.generationKey(namespace))));
+      this.logger.log(`Invalidated cache namespaces: ${namespaces.join(', ')}`);
+    } catch (error) {
+      this.logger.warn(`Cache invalidation failed: ${error.message}`);
+    }
+  }
+
+  /**
+   * Invalidates the knowledge base derived namespaces when the version of the lens documents changed
+   * @param version Identifies the current lens documents (e.g. their upload dates)
+   */
+  async syncKnowledgeVersion(version: string): Promise<void> {
+    if (!this.client) {
+      return;
+    }
+
+    const versionKey = `${this.config.keyPrefix}:knowledge-version`;
+    try {
+      const current = await this.client.get(versionKey);
+      if (current === version) {
+        return;
+      }
+      await this.client.set(versionKey, version);
+      // Nothing to invalidate before the first version is recorded
+      if (current !== null) {
+        await this.invalidate(...KNOWLEDGE_NAMESPACES);
+      }
+    } catch (error) {
+      this.logger.warn(`Failed to check the knowledge version: ${error.message}`);
+    }
+  }
+
+  private async buildKey(namespace: CacheNamespace, key: unknown): Promise<string> {
+    const generation = (await this.client.get(this.generationKey(namespace))) || '0';
+    return `${this.config.keyPrefix}:${namespace}:${generation}:${this.hash(key)}`;
+  }
+
+  private generationKey(namespace: CacheNamespace): string {
+    return `${this.config.keyPrefix}:${namespace}:generation`;
+  }
+
+  private hash(key: unknown): string {
+    const serialized = JSON.stringify(key, function (name, value) {
+      // Hash binary content (images, PDFs) instead of serializing it byte by byte
+      const raw = this[name];
+      if (raw instanceof Uint8Array) {
+        return createHash('sha256').update(raw).digest('hex');
+      }
+      return value;
+    });
+    return createHash('sha256').update(serialized).digest('hex');
+  }
+}
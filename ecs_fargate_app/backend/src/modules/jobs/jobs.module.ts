@@ -0,0 +1,10 @@
+import { Module } from '@nestjs/common';
+import { JobsService } from './jobs.service';
+import { AwsConfigService } from '../../config/aws.config';
+import { ConfigService } from '@nestjs/config';
+
+@Module({
+  providers: [JobsService, AwsConfigService, ConfigService],
+  exports: [JobsService],
+})
+export class JobsModule {}
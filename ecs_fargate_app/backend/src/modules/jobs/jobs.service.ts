@@ -0,0 +1,380 @@
+import { Injectable, Logger, OnModuleInit } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { AwsConfigService } from '../../config/aws.config';
+import {
+  DynamoDBClient,
+  GetItemCommand,
+  PutItemCommand,
+  QueryCommand,
+  UpdateItemCommand,
+} from '@aws-sdk/client-dynamodb';
+import {
+  ChangeMessageVisibilityCommand,
+  DeleteMessageCommand,
+  ReceiveMessageCommand,
+  SendMessageCommand,
+  SQSClient,
+} from '@aws-sdk/client-sqs';
+import { marshall, unmarshall } from '@aws-sdk/util-dynamodb';
+import { randomUUID } from 'crypto';
+import {
+  AnalysisJob,
+  ClaimedJob,
+  JobStatus,
+  JobType,
+  JobsConfig,
+} from '../../shared/interfaces/job.interface';
+
+// Finished jobs are kept for a week before DynamoDB TTL removes them
+const JOB_RETENTION_SECONDS = 7 * 24 * 60 * 60;
+
+// Long polling wait of a worker for the next job message (the SQS maximum)
+const RECEIVE_WAIT_SECONDS = 20;
+
+/**
+ * Job queue of the worker tier. Jobs are delivered to the workers through SQS and their status
+ * is kept in DynamoDB, where the API tasks read it. A worker keeps the message of its job hidden
+ * from other workers while the job runs, so the jobs of a stopped worker are delivered again.
+ */
+@Injectable()
+export class JobsService implements OnModuleInit {
+  private readonly logger = new Logger(JobsService.name);
+  private readonly config: JobsConfig;
+  private dynamoClient: DynamoDBClient;
+  private sqsClient: SQSClient;
+
+  constructor(
+    private readonly awsConfig: AwsConfigService,
+    private readonly configService: ConfigService,
+  ) {
+    const table = this.configService.get<string>('jobs.table');
+    const queueUrl = this.configService.get<string>('jobs.queueUrl');
+    this.config = {
+      enabled: !!table && !!queueUrl,
+      table,
+      queueUrl,
+      workerMode: this.configService.get<boolean>('jobs.workerMode', false),
+      concurrency: this.configService.get<number>('jobs.concurrency', 1),
+      leaseSeconds: this.configService.get<number>('jobs.leaseSeconds', 120),
+      maxAttempts: this.configService.get<number>('jobs.maxAttempts', 2),
+    };
+  }
+
+  onModuleInit() {
+    if (!this.config.enabled) {
+      return;
+    }
+
+    this.dynamoClient = this.awsConfig.createDynamoDBClient();
+    this.sqsClient = this.awsConfig.createSQSClient();
+  }
+
+  isEnabled(): boolean {
+    return this.config.enabled;
+  }
+
+  isWorkerMode(): boolean {
+    return this.config.enabled && this.config.workerMode;
+  }
+
+  getConfig(): JobsConfig {
+    return this.config;
+  }
+
+  async enqueueJob(
+    jobType: JobType,
+    userId: string,
+    fileId: string,
+    payload: Record<string, any>,
+  ): Promise<AnalysisJob> {
+    const now = Date.now();
+    const job: AnalysisJob = {
+      jobId: randomUUID(),
+      jobType,
+      status: 'QUEUED',
+      queuedAt: now,
+      userId,
+      fileId,
+      payload: JSON.stringify(payload),
+      attempts: 0,
+      ttl: Math.floor(now / 1000) + JOB_RETENTION_SECONDS,
+    };
+
+    try {
+      await this.dynamoClient.send(
+        new PutItemCommand({
+          TableName: this.config.table,
+          Item: marshall(job, { removeUndefinedValues: true }),
+        }),
+      );
+    } catch (error) {
+      this.logger.error('Error queueing job:', error);
+      throw new Error('Failed to queue job');
+    }
+
+    try {
+      await this.sqsClient.send(
+        new SendMessageCommand({
+          QueueUrl: this.config.queueUrl,
+          MessageBody: JSON.stringify({ jobId: job.jobId }),
+        }),
+      );
+      this.logger.log(`Queued ${jobType} job ${job.jobId} for file ${fileId}`);
+      return job;
+    } catch (error) {
+      this.logger.error('Error queueing job:', error);
+      // Without its message no worker ever picks the job up
+      await this.finishJob(job.jobId, 'FAILED', 'Failed to queue job').catch(() => undefined);
+      throw new Error('Failed to queue job');
+    }
+  }
+
+  async getJob(jobId: string): Promise<AnalysisJob | null> {
+    try {
+      const result = await this.dynamoClient.send(
+        new GetItemCommand({
+          TableName: this.config.table,
+          Key: marshall({ jobId }),
+        }),
+      );
+      return result.Item ? (unmarshall(result.Item) as AnalysisJob) : null;
+    } catch (error) {
+      this.logger.error('Error getting job:', error);
+      throw new Error('Failed to get job');
+    }
+  }
+
+  /**
+   * Cancels the user's active jobs of the given type. Queued jobs are cancelled right away and skipped
+   * when their message is received, running ones are flagged and cancelled by their worker on its next heartbeat.
+   * @returns Number of jobs cancelled or flagged
+   */
+  async requestCancellation(userId: string, jobType: JobType): Promise<number> {
+    let cancelled = 0;
+
+    try {
+      const result = await this.dynamoClient.send(
+        new QueryCommand({
+          TableName: this.config.table,
+          IndexName: 'UserIndex',
+          KeyConditionExpression: 'userId = :userId',
+          FilterExpression: 'jobType = :jobType AND #status IN (:queued, :running)',
+          ExpressionAttributeNames: { '#status': 'status' },
+          ExpressionAttributeValues: marshall({
+            ':userId': userId,
+            ':jobType': jobType,
+            ':queued': 'QUEUED',
+            ':running': 'RUNNING',
+          }),
+        }),
+      );
+
+      for (const item of result.Items || []) {
+        const job = unmarshall(item) as AnalysisJob;
+        try {
+          if (job.status === 'QUEUED') {
+            await this.dynamoClient.send(
+              new UpdateItemCommand({
+                TableName: this.config.table,
+                Key: marshall({ jobId: job.jobId }),
+                UpdateExpression: 'SET #status = :cancelled, finishedAt = :now',
+                ConditionExpression: '#status = :queued',
+                ExpressionAttributeNames: { '#status': 'status' },
+                ExpressionAttributeValues: marshall({
+                  ':cancelled': 'CANCELLED',
+                  ':queued': 'QUEUED',
+                  ':now': new Date().toISOString(),
+                }),
+              }),
+            );
+          } else {
+            await this.dynamoClient.send(
+              new UpdateItemCommand({
+                TableName: this.config.table,
+                Key: marshall({ jobId: job.jobId }),
+                UpdateExpression: 'SET cancelRequested = :true',
+                ExpressionAttributeValues: marshall({ ':true': true }),
+              }),
+            );
+          }
+          cancelled++;
+        } catch (error) {
+          if (error.name !== 'ConditionalCheckFailedException') {
+            throw error;
+          }
+          // The job was claimed in the meantime, flag it for its worker instead
+          await this.dynamoClient.send(
+            new UpdateItemCommand({
+              TableName: this.config.table,
+              Key: marshall({ jobId: job.jobId }),
+              UpdateExpression: 'SET cancelRequested = :true',
+              ExpressionAttributeValues: marshall({ ':true': true }),
+            }),
+          );
+          cancelled++;
+        }
+      }
+
+      return cancelled;
+    } catch (error) {
+      this.logger.error('Error cancelling jobs:', error);
+      throw new Error('Failed to cancel jobs');
+    }
+  }
+
+  /**
+   * Receives the next job message, waiting up to RECEIVE_WAIT_SECONDS for one, and marks its job running.
+   * Messages of cancelled or finished jobs are dropped, jobs delivered more than maxAttempts times are failed.
+   * @returns The claimed job, or null if there is nothing to do
+   */
+  async claimNextJob(workerId: string): Promise<ClaimedJob | null> {
+    const result = await this.sqsClient.send(
+      new ReceiveMessageCommand({
+        QueueUrl: this.config.queueUrl,
+        MaxNumberOfMessages: 1,
+        WaitTimeSeconds: RECEIVE_WAIT_SECONDS,
+        VisibilityTimeout: this.config.leaseSeconds,
+        MessageSystemAttributeNames: ['ApproximateReceiveCount'],
+      }),
+    );
+
+    const message = result.Messages?.[0];
+    if (!message) {
+      return null;
+    }
+
+    const { jobId } = JSON.parse(message.Body);
+    const attempts = parseInt(message.Attributes?.ApproximateReceiveCount, 10) || 1;
+
+    if (attempts > this.config.maxAttempts) {
+      await this.finishJob(
+        jobId,
+        'FAILED',
+        `Job abandoned by its worker after ${attempts - 1} attempts`,
+        ['QUEUED', 'RUNNING'],
+      );
+      await this.deleteMessage(message.ReceiptHandle);
+      this.logger.warn(`Job ${jobId} failed after ${attempts - 1} attempts`);
+      return null;
+    }
+
+    try {
+      // A running job is delivered again when its previous worker stopped before finishing it
+      const claimed = await this.dynamoClient.send(
+        new UpdateItemCommand({
+          TableName: this.config.table,
+          Key: marshall({ jobId }),
+          UpdateExpression: 'SET #status = :running, workerId = :workerId, startedAt = :startedAt, attempts = :attempts',
+          ConditionExpression: '#status IN (:queued, :running) AND attribute_not_exists(cancelRequested)',
+          ExpressionAttributeNames: { '#status': 'status' },
+          ExpressionAttributeValues: marshall({
+            ':running': 'RUNNING',
+            ':queued': 'QUEUED',
+            ':workerId': workerId,
+            ':startedAt': new Date().toISOString(),
+            ':attempts': attempts,
+          }),
+          ReturnValues: 'ALL_NEW',
+        }),
+      );
+      return { job: unmarshall(claimed.Attributes) as AnalysisJob, receiptHandle: message.ReceiptHandle };
+    } catch (error) {
+      if (error.name !== 'ConditionalCheckFailedException') {
+        throw error;
+      }
+    }
+
+    // The job was cancelled, or finished by a worker whose deletion of the message failed
+    await this.finishJob(jobId, 'CANCELLED', undefined, ['RUNNING']);
+    await this.deleteMessage(message.ReceiptHandle);
+    return null;
+  }
+
+  /**
+   * Keeps the message of a running job hidden from other workers for another leaseSeconds
+   * @returns The job, including a pending cancellation request
+   */
+  async heartbeat(claim: ClaimedJob): Promise<AnalysisJob | null> {
+    try {
+      await this.sqsClient.send(
+        new ChangeMessageVisibilityCommand({
+          QueueUrl: this.config.queueUrl,
+          ReceiptHandle: claim.receiptHandle,
+          VisibilityTimeout: this.config.leaseSeconds,
+        }),
+      );
+      return await this.getJob(claim.job.jobId);
+    } catch (error) {
+      this.logger.error(`Error extending the visibility of job ${claim.job.jobId}:`, error);
+      throw new Error('Failed to extend job visibility');
+    }
+  }
+
+  async completeJob(
+    claim: ClaimedJob,
+    workerId: string,
+    status: JobStatus,
+    error?: string,
+  ): Promise<void> {
+    try {
+      await this.dynamoClient.send(
+        new UpdateItemCommand({
+          TableName: this.config.table,
+          Key: marshall({ jobId: claim.job.jobId }),
+          UpdateExpression: 'SET #status = :status, finishedAt = :now, #error = :error',
+          ConditionExpression: 'workerId = :workerId',
+          ExpressionAttributeNames: { '#status': 'status', '#error': 'error' },
+          ExpressionAttributeValues: marshall({
+            ':status': status,
+            ':now': new Date().toISOString(),
+            ':error': error || '',
+            ':workerId': workerId,
+          }),
+        }),
+      );
+      await this.deleteMessage(claim.receiptHandle);
+    } catch (error) {
+      this.logger.error(`Error completing job ${claim.job.jobId}:`, error);
+      throw new Error('Failed to complete job');
+    }
+  }
+
+  private async finishJob(
+    jobId: string,
+    status: JobStatus,
+    error?: string,
+    fromStatuses: JobStatus[] = ['QUEUED'],
+  ): Promise<void> {
+    const expected = Object.fromEntries(fromStatuses.map((value, i) => [`:from${i}`, value]));
+    try {
+      await this.dynamoClient.send(
+        new UpdateItemCommand({
+          TableName: this.config.table,
+          Key: marshall({ jobId }),
+          UpdateExpression: 'SET #status = :status, finishedAt = :now, #error = :error',
+          ConditionExpression: `#status IN (${Object.keys(expected).join(', ')})`,
+          ExpressionAttributeNames: { '#status': 'status', '#error': 'error' },
+          ExpressionAttributeValues: marshall({
+            ':status': status,
+            ':now': new Date().toISOString(),
+            ':error': error || '',
+            ...expected,
+          }),
+        }),
+      );
+    } catch (error) {
+      if (error.name !== 'ConditionalCheckFailedException') {
+        throw error;
+      }
+    }
+  }
+
+  private async deleteMessage(receiptHandle: string): Promise<void> {
+    await this.sqsClient.send(
+      new DeleteMessageCommand({
+        QueueUrl: this.config.queueUrl,
+        ReceiptHandle: receiptHandle,
+      }),
+    );
+  }
+}
@@ -4,6 +4,7 @@ import {
     Post,
     Delete,
     Param,
+    Query,
     Headers,
     HttpException,
     HttpStatus,
@@ -18,7 +19,7 @@ import { StorageService } from './storage.service';
 import { ConfigService } from '@nestjs/config';
 import { FileInterceptor, FilesInterceptor } from '@nestjs/platform-express';
 import { createHash } from 'crypto';
-import { WorkItem } from '../../shared/interfaces/storage.interface';
+import { WorkItem, CompletedArchivePart } from '../../shared/interfaces/storage.interface';
 import { FileUploadMode } from '../../shared/dto/analysis.dto';
 
 @Controller('storage')
@@ -294,8 +295,127 @@ export class StorageController {
         }
     }
 
+    // Starts a direct upload of a zip archive, the browser sends its parts to S3 with the returned URLs
+    @Post('work-items/archive-uploads')
+    async createArchiveUpload(
+        @Body('fileName') fileName: string,
+        @Body('fileSize') fileSize: number,
+        @Headers('x-amzn-oidc-data') userDataHeader: string,
+    ) {
+        try {
+            const email = this.getUserEmail(userDataHeader);
+            if (!email) {
+                throw new HttpException('User not authenticated', HttpStatus.UNAUTHORIZED);
+            }
+
+            if (typeof fileName !== 'string' || !fileName.toLowerCase().endsWith('.zip')) {
+                throw new HttpException('fileName must be the name of a .zip file', HttpStatus.BAD_REQUEST);
+            }
+
+            const maxSizeMb = this.configService.get<number>('storage.maxArchiveUploadSizeMb');
+            if (!Number.isInteger(fileSize) || fileSize <= 0) {
+                throw new HttpException('fileSize must be a positive number of bytes', HttpStatus.BAD_REQUEST);
+            }
+            if (fileSize > maxSizeMb * 1024 * 1024) {
+                throw new HttpException(
+                    `Archive exceeds the maximum upload size of ${maxSizeMb} MB`,
+                    HttpStatus.PAYLOAD_TOO_LARGE,
+                );
+            }
+
+            const userId = this.getUserId(email);
+
+            return await this.storageService.createArchiveUpload(userId, fileName, fileSize);
+        } catch (error) {
+            if (error instanceof HttpException) {
+                throw error;
+            }
+            throw new HttpException(
+                error.message || 'Failed to create archive upload',
+                HttpStatus.INTERNAL_SERVER_ERROR,
+            );
+        }
+    }
+
+    // Completes a direct upload and processes the archive from S3
+    @Post('work-items/archive-uploads/:fileId/complete')
+    async completeArchiveUpload(
+        @Param('fileId') fileId: string,
+        @Body('fileName') fileName: string,
+        @Body('uploadId') uploadId: string,
+        @Body('parts') parts: CompletedArchivePart[],
+        @Headers('x-amzn-oidc-data') userDataHeader: string,
+    ) {
+        try {
+            const email = this.getUserEmail(userDataHeader);
+            if (!email) {
+                throw new HttpException('User not authenticated', HttpStatus.UNAUTHORIZED);
+            }
+
+            const validParts = Array.isArray(parts) && parts.length > 0 && parts.every(part =>
+                Number.isInteger(part?.partNumber) && part.partNumber >= 1 && part.partNumber <= 10000 &&
+                typeof part.etag === 'string'
+            );
+            if (typeof fileName !== 'string' || typeof uploadId !== 'string' || !validParts) {
+                throw new HttpException('fileName, uploadId and parts are required', HttpStatus.BAD_REQUEST);
+            }
+
+            const userId = this.getUserId(email);
+
+            return await this.storageService.completeArchiveUpload(userId, fileId, fileName, uploadId, parts);
+        } catch (error) {
+            if (error instanceof HttpException) {
+                throw error;
+            }
+            const status = error.name === 'NoSuchUpload' || error.name === 'InvalidPart'
+                ? HttpStatus.BAD_REQUEST
+                : error.message === 'Archive exceeds the maximum upload size'
+                    ? HttpStatus.PAYLOAD_TOO_LARGE
+                    : HttpStatus.INTERNAL_SERVER_ERROR;
+            throw new HttpException(
+                error.message || 'Failed to complete archive upload',
+                status,
+            );
+        }
+    }
+
+    @Post('work-items/archive-uploads/:fileId/abort')
+    async abortArchiveUpload(
+        @Param('fileId') fileId: string,
+        @Body('uploadId') uploadId: string,
+        @Headers('x-amzn-oidc-data') userDataHeader: string,
+    ) {
+        try {
+            const email = this.getUserEmail(userDataHeader);
+            if (!email) {
+                throw new HttpException('User not authenticated', HttpStatus.UNAUTHORIZED);
+            }
+
+            if (typeof uploadId !== 'string') {
+                throw new HttpException('uploadId is required', HttpStatus.BAD_REQUEST);
+            }
+
+            const userId = this.getUserId(email);
+
+            await this.storageService.abortArchiveUpload(userId, fileId, uploadId);
+            return { message: 'Archive upload aborted' };
+        } catch (error) {
+            if (error instanceof HttpException) {
+                throw error;
+            }
+            throw new HttpException(
+                error.message || 'Failed to abort archive upload',
+                HttpStatus.INTERNAL_SERVER_ERROR,
+            );
+        }
+    }
+
     @Get('work-items')
-    async listWorkItems(@Headers('x-amzn-oidc-data') userDataHeader: string) {
+    async listWorkItems(
+        @Headers('x-amzn-oidc-data') userDataHeader: string,
+        @Query('limit') limit?: string,
+        @Query('nextToken') nextToken?: string,
+    ) {
         try {
             const email = this.getUserEmail(userDataHeader);
 
@@ -303,13 +423,21 @@ export class StorageController {
                 throw new HttpException('User not authenticated', HttpStatus.UNAUTHORIZED);
             }
 
+            const pageSize = limit !== undefined ? parseInt(limit, 10) : undefined;
+            if (pageSize !== undefined && !(pageSize >= 1 && pageSize <= 100)) {
+                throw new HttpException('limit must be between 1 and 100', HttpStatus.BAD_REQUEST);
+            }
+
             const userId = this.getUserId(email);
 
-            return await this.storageService.listWorkItems(userId);
+            return await this.storageService.listWorkItems(userId, pageSize, nextToken);
         } catch (error) {
+            if (error instanceof HttpException) {
+                throw error;
+            }
             throw new HttpException(
                 error.message || 'Failed to list work items',
-                HttpStatus.INTERNAL_SERVER_ERROR,
+                error.message === 'Invalid page token' ? HttpStatus.BAD_REQUEST : HttpStatus.INTERNAL_SERVER_ERROR,
             );
         }
     }
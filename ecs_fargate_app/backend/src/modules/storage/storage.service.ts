@@ -3,9 +3,16 @@ import { ConfigService } from '@nestjs/config';
 import { AwsConfigService } from '../../config/aws.config';
 import {
   GetObjectCommand,
+  HeadObjectCommand,
+  CreateMultipartUploadCommand,
+  CompleteMultipartUploadCommand,
+  AbortMultipartUploadCommand,
+  DeleteObjectCommand,
   DeleteObjectsCommand,
   ListObjectsV2Command,
+  UploadPartCommand,
 } from '@aws-sdk/client-s3';
+import { getSignedUrl } from '@aws-sdk/s3-request-presigner';
 import { Upload } from "@aws-sdk/lib-storage";
 import {
   PutItemCommand,
@@ -15,23 +22,52 @@ import {
   UpdateItemCommand,
 } from '@aws-sdk/client-dynamodb';
 import { marshall, unmarshall } from '@aws-sdk/util-dynamodb';
+import { InvokeCommand, LambdaClient } from '@aws-sdk/client-lambda';
 import { createHash } from 'crypto';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { Readable } from 'stream';
+import { pipeline } from 'stream/promises';
+import { Traced } from '../../shared/utils/tracing';
 import * as AdmZip from 'adm-zip';
 import {
   WorkItem,
+  WorkItemPage,
   WorkItemUpdate,
   S3Locations,
   StorageConfig,
-  LensInfo
+  LensInfo,
+  ArchiveUpload,
+  CompletedArchivePart,
 } from '../../shared/interfaces/storage.interface';
 import { FileUploadMode } from '../../shared/dto/analysis.dto';
 import { ProjectPacker } from '../../shared/utils/project-packer';
 
+// Artifact type of the stored objects, matched by the lifecycle rules of the storage bucket
+const RESULT_TAGGING = 'artifact=result';
+const INTERMEDIATE_TAGGING = 'artifact=intermediate';
+
+// Archives uploaded by the browser in parts: S3 accepts up to 10000 parts of at least 5 MiB (but the last one)
+const ARCHIVE_MIN_PART_SIZE = 8 * 1024 * 1024;
+const ARCHIVE_MAX_PARTS = 10000;
+const ARCHIVE_UPLOAD_URL_EXPIRES_IN = 60 * 60;
+// Packable entries of an archive extract to at most this multiple of the maximum upload size
+const ARCHIVE_MAX_EXTRACTED_RATIO = 4;
+
+// Legacy work items found by listings are converted in the background, a few at a time
+const LEGACY_REPAIR_CONCURRENCY = 2;
+const LEGACY_REPAIR_QUEUE_SIZE = 100;
+
 @Injectable()
 export class StorageService {
   private readonly logger = new Logger(StorageService.name);
   private readonly config: StorageConfig;
   private readonly projectPacker: ProjectPacker;
+  // Read-repair of single-lens work items: conversions in flight by work item, and listed items waiting for one
+  private readonly repairsInFlight = new Map<string, Promise<void>>();
+  private readonly repairQueue = new Map<string, { userId: string; fileId: string }>();
+  private lambdaClient?: LambdaClient;
 
   constructor(
     private readonly awsConfig: AwsConfigService,
@@ -41,6 +77,11 @@ export class StorageService {
       enabled: true,
       bucket: this.configService.get<string>('storage.bucket'),
       table: this.configService.get<string>('storage.table'),
+      migrationFunction: this.configService.get<string>('storage.migrationFunction'),
+      recencyIndex: this.configService.get<string>('storage.recencyIndex'),
+      retentionDays: this.configService.get<number>('storage.retentionDays'),
+      listPageSize: this.configService.get<number>('storage.listPageSize'),
+      maxArchiveUploadSize: this.configService.get<number>('storage.maxArchiveUploadSizeMb') * 1024 * 1024,
     };
     this.projectPacker = new ProjectPacker();
   }
@@ -55,6 +96,34 @@ export class StorageService {
     return createHash('sha256').update(input).digest('hex');
   }
 
+  /**
+   * TTL of a work item whose last activity is now, undefined when work items are kept until deleted
+   */
+  private getExpiresAt(): number | undefined {
+    if (!this.config.retentionDays) {
+      return undefined;
+    }
+    return Math.floor(Date.now() / 1000) + this.config.retentionDays * 24 * 60 * 60;
+  }
+
+  private encodePageToken(lastEvaluatedKey: Record<string, any>): string {
+    return Buffer.from(JSON.stringify(unmarshall(lastEvaluatedKey))).toString('base64url');
+  }
+
+  private decodePageToken(userId: string, token: string): Record<string, any> {
+    let key: Record<string, any>;
+    try {
+      key = JSON.parse(Buffer.from(token, 'base64url').toString('utf8'));
+    } catch {
+      key = null;
+    }
+    // Tokens only continue the listing of the user they were issued to
+    if (!key || key.userId !== userId || typeof key.fileId !== 'string' || typeof key.lastModified !== 'string') {
+      throw new Error('Invalid page token');
+    }
+    return marshall({ userId, fileId: key.fileId, lastModified: key.lastModified });
+  }
+
   private getS3Locations(userId: string, fileId: string): S3Locations {
     const prefix = `${userId}/${fileId}`;
     return {
@@ -79,6 +148,10 @@ export class StorageService {
 
       getSupportingDocumentMetadataPath: (lensAlias: string, documentId: string): string => {
         return `${prefix}/supporting_documents/${lensAlias}/${documentId}_metadata.json`;
+      },
+
+      getJobResultPath: (jobId: string): string => {
+        return `${prefix}/jobs/${jobId}.json`;
       }
     };
   }
@@ -105,6 +178,7 @@ export class StorageService {
           params: {
             Bucket: this.config.bucket,
             Key: s3Locations.chatHistory,
+            Tagging: RESULT_TAGGING,
             Body: JSON.stringify(messages),
             ContentType: 'application/json',
           },
@@ -271,6 +345,7 @@ export class StorageService {
         params: {
           Bucket: this.config.bucket,
           Key: s3Locations.getSupportingDocumentPath(lensAlias, supportingDocIdHash),
+          Tagging: RESULT_TAGGING,
           Body: fileBuffer,
           ContentType: fileType,
         },
@@ -379,6 +454,7 @@ export class StorageService {
   }
 
   // Method to get supporting document
+  @Traced('StorageService.getSupportingDocument')
   async getSupportingDocument(
     userId: string,
     mainFileId: string,
@@ -440,6 +516,7 @@ export class StorageService {
    * @param buffer File buffer
    * @returns Object containing file ID and token info
    */
+  @Traced('StorageService.handleZipFile')
   async handleZipFile(
     userId: string,
     filename: string,
@@ -502,6 +579,7 @@ export class StorageService {
    * @param files Array of files with filename, buffer, and mimetype
    * @returns Object containing file ID and token info
    */
+  @Traced('StorageService.handleMultipleFiles')
   async handleMultipleFiles(
     userId: string,
     files: Array<{ filename: string; buffer: Buffer; mimetype: string }>
@@ -570,6 +648,227 @@ export class StorageService {
     }
   }
 
+  /**
+   * Starts a multipart upload of a zip archive to the original content location of a new work item,
+   * and presigns the upload of each part so the browser sends them straight to S3
+   * @param userId User ID
+   * @param fileName Archive file name
+   * @param fileSize Archive size in bytes
+   * @returns Upload ID, part size and presigned part URLs
+   */
+  @Traced('StorageService.createArchiveUpload')
+  async createArchiveUpload(
+    userId: string,
+    fileName: string,
+    fileSize: number
+  ): Promise<ArchiveUpload> {
+    if (!this.config.enabled) {
+      throw new Error('Storage is not enabled');
+    }
+
+    const s3Client = this.awsConfig.createS3Client();
+    const fileId = this.createFileIdHash(fileName + Date.now().toString());
+    const s3Locations = this.getS3Locations(userId, fileId);
+
+    // Parts of whole MiBs, large enough to stay within the part count limit
+    const partSize = Math.max(
+      ARCHIVE_MIN_PART_SIZE,
+      Math.ceil(fileSize / ARCHIVE_MAX_PARTS / (1024 * 1024)) * 1024 * 1024
+    );
+    const partCount = Math.ceil(fileSize / partSize);
+
+    try {
+      const upload = await s3Client.send(
+        new CreateMultipartUploadCommand({
+          Bucket: this.config.bucket,
+          Key: s3Locations.originalContent,
+          ContentType: 'application/zip',
+          Tagging: RESULT_TAGGING,
+        }),
+      );
+
+      const parts = await Promise.all(
+        Array.from({ length: partCount }, async (_, i) => ({
+          partNumber: i + 1,
+          url: await getSignedUrl(
+            s3Client,
+            new UploadPartCommand({
+              Bucket: this.config.bucket,
+              Key: s3Locations.originalContent,
+              PartNumber: i + 1,
+              UploadId: upload.UploadId,
+            }),
+            { expiresIn: ARCHIVE_UPLOAD_URL_EXPIRES_IN },
+          ),
+        }))
+      );
+
+      return {
+        fileId,
+        uploadId: upload.UploadId,
+        partSize,
+        parts,
+        expiresAt: new Date(Date.now() + ARCHIVE_UPLOAD_URL_EXPIRES_IN * 1000).toISOString(),
+      };
+    } catch (error) {
+      this.logger.error('Error creating archive upload:', error);
+      throw new Error('Failed to create archive upload');
+    }
+  }
+
+  /**
+   * Completes the multipart upload of an archive, then streams it from S3 to a temporary file
+   * to pack it and create its work item
+   * @param userId User ID
+   * @param fileId File ID returned when the upload was created
+   * @param fileName Archive file name
+   * @param uploadId Multipart upload ID
+   * @param parts Part numbers and ETags returned by S3
+   * @returns Object containing file ID and token info
+   */
+  @Traced('StorageService.completeArchiveUpload')
+  async completeArchiveUpload(
+    userId: string,
+    fileId: string,
+    fileName: string,
+    uploadId: string,
+    parts: CompletedArchivePart[]
+  ): Promise<{ fileId: string; tokenCount?: number; exceedsTokenLimit?: boolean }> {
+    if (!this.config.enabled) {
+      throw new Error('Storage is not enabled');
+    }
+
+    const s3Client = this.awsConfig.createS3Client();
+    const s3Locations = this.getS3Locations(userId, fileId);
+
+    await s3Client.send(
+      new CompleteMultipartUploadCommand({
+        Bucket: this.config.bucket,
+        Key: s3Locations.originalContent,
+        UploadId: uploadId,
+        MultipartUpload: {
+          Parts: [...parts]
+            .sort((a, b) => a.partNumber - b.partNumber)
+            .map(part => ({ PartNumber: part.partNumber, ETag: part.etag })),
+        },
+      }),
+    );
+
+    // Presigned part URLs do not limit the size of each part, check the assembled archive
+    const head = await s3Client.send(
+      new HeadObjectCommand({
+        Bucket: this.config.bucket,
+        Key: s3Locations.originalContent,
+      }),
+    );
+    if (head.ContentLength > this.config.maxArchiveUploadSize) {
+      await s3Client.send(
+        new DeleteObjectCommand({
+          Bucket: this.config.bucket,
+          Key: s3Locations.originalContent,
+        }),
+      );
+      throw new Error('Archive exceeds the maximum upload size');
+    }
+
+    const tempDir = await fs.promises.mkdtemp(path.join(os.tmpdir(), 'archive-'));
+    let workItemStored = false;
+
+    try {
+      const zipPath = path.join(tempDir, 'archive.zip');
+      const result = await s3Client.send(
+        new GetObjectCommand({
+          Bucket: this.config.bucket,
+          Key: s3Locations.originalContent,
+        }),
+      );
+      await pipeline(result.Body as Readable, fs.createWriteStream(zipPath));
+
+      const packedProject = await this.projectPacker.processZipFileFromPath(
+        zipPath,
+        fileName,
+        this.config.maxArchiveUploadSize * ARCHIVE_MAX_EXTRACTED_RATIO,
+      );
+      const timestamp = new Date().toISOString();
+
+      const workItem: WorkItem = {
+        userId,
+        fileId,
+        fileName,
+        fileType: 'application/zip',
+        uploadDate: timestamp,
+        s3Prefix: `${userId}/${fileId}`,
+        lastModified: timestamp,
+        uploadMode: FileUploadMode.ZIP_FILE,
+        tokenCount: packedProject.tokenCount,
+        exceedsTokenLimit: packedProject.exceedsTokenLimit,
+      };
+
+      // Store work item in DynamoDB
+      await this.storeWorkItemInDynamoDB(workItem);
+      workItemStored = true;
+
+      // Store packed content in S3
+      await this.storePackedContent(
+        userId,
+        fileId,
+        packedProject.packedContent
+      );
+
+      return {
+        fileId,
+        tokenCount: packedProject.tokenCount,
+        exceedsTokenLimit: packedProject.exceedsTokenLimit,
+      };
+    } catch (error) {
+      this.logger.error('Error processing uploaded archive:', error);
+      // Without a work item, nothing would ever reference or delete the uploaded archive
+      if (!workItemStored) {
+        await s3Client.send(
+          new DeleteObjectCommand({
+            Bucket: this.config.bucket,
+            Key: s3Locations.originalContent,
+          }),
+        ).catch(deleteError => this.logger.error('Error deleting uploaded archive:', deleteError));
+      }
+      throw new Error(`Failed to process zip file: ${error.message}`);
+    } finally {
+      await fs.promises.rm(tempDir, { recursive: true, force: true });
+    }
+  }
+
+  /**
+   * Aborts the multipart upload of an archive, discarding the parts already uploaded
+   * @param userId User ID
+   * @param fileId File ID returned when the upload was created
+   * @param uploadId Multipart upload ID
+   */
+  @Traced('StorageService.abortArchiveUpload')
+  async abortArchiveUpload(userId: string, fileId: string, uploadId: string): Promise<void> {
+    if (!this.config.enabled) {
+      throw new Error('Storage is not enabled');
+    }
+
+    const s3Client = this.awsConfig.createS3Client();
+    const s3Locations = this.getS3Locations(userId, fileId);
+
+    try {
+      await s3Client.send(
+        new AbortMultipartUploadCommand({
+          Bucket: this.config.bucket,
+          Key: s3Locations.originalContent,
+          UploadId: uploadId,
+        }),
+      );
+    } catch (error) {
+      // Already completed or aborted, the bucket lifecycle cleans up any leftover parts
+      if (error.name !== 'NoSuchUpload') {
+        this.logger.error('Error aborting archive upload:', error);
+        throw new Error('Failed to abort archive upload');
+      }
+    }
+  }
+
   /**
    * Stores work item in DynamoDB
    * @param workItem Work item to store
@@ -581,7 +880,7 @@ export class StorageService {
       await dynamoClient.send(
         new PutItemCommand({
           TableName: this.config.table,
-          Item: marshall(workItem, { removeUndefinedValues: true }),
+          Item: marshall({ ...workItem, expiresAt: this.getExpiresAt() }, { removeUndefinedValues: true }),
         }),
       );
     } catch (error) {
@@ -596,6 +895,7 @@ export class StorageService {
    * @param fileId File ID
    * @param content Packed content as string
    */
+  @Traced('StorageService.storePackedContent')
   async storePackedContent(
     userId: string,
     fileId: string,
@@ -614,6 +914,7 @@ export class StorageService {
         params: {
           Bucket: this.config.bucket,
           Key: s3Locations.packedContent,
+          Tagging: INTERMEDIATE_TAGGING,
           Body: content,
           ContentType: 'text/plain'
         },
@@ -632,6 +933,7 @@ export class StorageService {
    * @param fileId File ID
    * @returns Packed content as string
    */
+  @Traced('StorageService.getPackedContent')
   async getPackedContent(
     userId: string,
     fileId: string
@@ -653,11 +955,66 @@ export class StorageService {
 
       return await result.Body.transformToString();
     } catch (error) {
+      // Packed content expires with the other intermediate artifacts, the original upload is kept
+      if (error.name === 'NoSuchKey') {
+        try {
+          return await this.rebuildPackedContent(userId, fileId);
+        } catch (rebuildError) {
+          this.logger.error('Error rebuilding packed content:', rebuildError);
+        }
+      }
       this.logger.error('Error getting packed content:', error);
       throw new Error('Failed to get packed content');
     }
   }
 
+  /**
+   * Packs the original upload of a zip or multiple files work item again and stores the result
+   * @param userId User ID
+   * @param fileId File ID
+   * @returns Packed content as string
+   */
+  private async rebuildPackedContent(userId: string, fileId: string): Promise<string> {
+    const workItem = await this.getWorkItem(userId, fileId);
+    const s3Locations = this.getS3Locations(userId, fileId);
+
+    const result = await this.awsConfig.createS3Client().send(
+      new GetObjectCommand({
+        Bucket: this.config.bucket,
+        Key: s3Locations.originalContent,
+      }),
+    );
+
+    let packedProject;
+    if (workItem.uploadMode === FileUploadMode.MULTIPLE_FILES) {
+      // The original content of multiple files uploads is a zip of the uploaded files, small enough to buffer
+      const buffer = Buffer.from(await result.Body.transformToByteArray());
+      const files = new AdmZip(buffer).getEntries()
+        .filter(entry => !entry.isDirectory)
+        .map(entry => ({ filename: entry.entryName, buffer: entry.getData(), type: '' }));
+      packedProject = await this.projectPacker.processMultipleFiles(files);
+    } else {
+      // Archives can be as large as the upload limit, extract them from disk as on upload
+      const tempDir = await fs.promises.mkdtemp(path.join(os.tmpdir(), 'archive-'));
+      try {
+        const zipPath = path.join(tempDir, 'archive.zip');
+        await pipeline(result.Body as Readable, fs.createWriteStream(zipPath));
+        packedProject = await this.projectPacker.processZipFileFromPath(
+          zipPath,
+          workItem.fileName,
+          this.config.maxArchiveUploadSize * ARCHIVE_MAX_EXTRACTED_RATIO,
+        );
+      } finally {
+        await fs.promises.rm(tempDir, { recursive: true, force: true });
+      }
+    }
+
+    await this.storePackedContent(userId, fileId, packedProject.packedContent);
+    this.logger.log(`Rebuilt expired packed content of ${fileId}`);
+
+    return packedProject.packedContent;
+  }
+
   async createWorkItem(
     userId: string,
     fileName: string,
@@ -691,7 +1048,7 @@ export class StorageService {
       await dynamoClient.send(
         new PutItemCommand({
           TableName: this.config.table,
-          Item: marshall(workItem, { removeUndefinedValues: true }),
+          Item: marshall({ ...workItem, expiresAt: this.getExpiresAt() }, { removeUndefinedValues: true }),
         }),
       );
 
@@ -701,6 +1058,7 @@ export class StorageService {
         params: {
           Bucket: this.config.bucket,
           Key: s3Locations.originalContent,
+          Tagging: RESULT_TAGGING,
           Body: fileBuffer,
           ContentType: fileType,
         },
@@ -754,6 +1112,14 @@ export class StorageService {
         }
       });
 
+      // Any activity pushes back the expiry of the work item
+      const expiresAt = updates.lastModified !== undefined ? this.getExpiresAt() : undefined;
+      if (expiresAt !== undefined) {
+        updateExpressions.push('#expiresAt = :expiresAt');
+        expressionAttributeNames['#expiresAt'] = 'expiresAt';
+        expressionAttributeValues[':expiresAt'] = expiresAt;
+      }
+
       // Handle usedLenses specially
       if (updates.usedLenses !== undefined) {
         updateExpressions.push(`#usedLenses = :usedLenses`);
@@ -837,32 +1203,137 @@ export class StorageService {
         throw new Error('Work item not found');
       }
 
-      return unmarshall(result.Item) as WorkItem;
+      const item = unmarshall(result.Item);
+
+      if (this.config.migrationFunction && this.isLegacyWorkItem(item)) {
+        await this.repairLegacyWorkItem(userId, fileId);
+        const repaired = await dynamoClient.send(
+          new GetItemCommand({
+            TableName: this.config.table,
+            Key: marshall({
+              userId,
+              fileId,
+            }),
+          }),
+        );
+        return unmarshall(repaired.Item) as WorkItem;
+      }
+
+      return item as WorkItem;
     } catch (error) {
       this.logger.error('Error getting work item:', error);
       throw new Error('Failed to get work item');
     }
   }
 
-  async listWorkItems(userId: string): Promise<WorkItem[]> {
+  // Work items stored in the single-lens format used before multi-lens support
+  private isLegacyWorkItem(item: Record<string, any>): boolean {
+    return item.usedLenses === undefined;
+  }
+
+  /**
+   * Converts a single-lens work item and its S3 objects to the multi-lens format with the repair mode
+   * of the migration Lambda, which also sweeps the records nobody reads. Concurrent calls for the same
+   * work item share one conversion.
+   * @param userId User ID
+   * @param fileId File ID
+   */
+  private repairLegacyWorkItem(userId: string, fileId: string): Promise<void> {
+    const id = `${userId}/${fileId}`;
+    let repair = this.repairsInFlight.get(id);
+
+    if (!repair) {
+      this.lambdaClient ??= this.awsConfig.createLambdaClient();
+      repair = this.lambdaClient
+        .send(
+          new InvokeCommand({
+            FunctionName: this.config.migrationFunction,
+            Payload: Buffer.from(JSON.stringify({ mode: 'repair', userId, fileId })),
+          }),
+        )
+        .then((response) => {
+          const result = response.Payload ? JSON.parse(Buffer.from(response.Payload).toString('utf8')) : {};
+          if (response.FunctionError || result.statusCode !== 200) {
+            throw new Error(`Repair of work item ${fileId} failed: ${response.FunctionError || result.body}`);
+          }
+          this.logger.log(`Converted legacy work item ${fileId} to the multi-lens format: ${result.body}`);
+        })
+        .finally(() => this.repairsInFlight.delete(id));
+      this.repairsInFlight.set(id, repair);
+    }
+
+    return repair;
+  }
+
+  /**
+   * Queues the conversion of a listed legacy work item. The queue is bounded and drained a few conversions
+   * at a time, items dropped when it is full are queued again by a later listing.
+   */
+  private queueLegacyRepair(userId: string, fileId: string): void {
+    const id = `${userId}/${fileId}`;
+    if (this.repairsInFlight.has(id) || this.repairQueue.has(id) || this.repairQueue.size >= LEGACY_REPAIR_QUEUE_SIZE) {
+      return;
+    }
+    this.repairQueue.set(id, { userId, fileId });
+    this.drainRepairQueue();
+  }
+
+  private drainRepairQueue(): void {
+    while (this.repairsInFlight.size < LEGACY_REPAIR_CONCURRENCY && this.repairQueue.size > 0) {
+      const [id, { userId, fileId }] = this.repairQueue.entries().next().value;
+      this.repairQueue.delete(id);
+      this.repairLegacyWorkItem(userId, fileId)
+        .catch((error) => this.logger.error(`Error converting legacy work item ${fileId}:`, error))
+        .finally(() => this.drainRepairQueue());
+    }
+  }
+
+  /**
+   * Lists the work items of a user, most recently updated first, one page at a time.
+   * Items come from the recency index, which only projects the attributes shown in the side navigation.
+   * @param userId User ID
+   * @param limit Maximum number of items, capped to 100
+   * @param nextToken Token returned with the previous page
+   */
+  @Traced('StorageService.listWorkItems')
+  async listWorkItems(userId: string, limit?: number, nextToken?: string): Promise<WorkItemPage> {
     if (!this.config.enabled) {
       throw new Error('Storage is not enabled');
     }
 
+    const exclusiveStartKey = nextToken ? this.decodePageToken(userId, nextToken) : undefined;
     const dynamoClient = this.awsConfig.createDynamoDBClient();
 
     try {
       const result = await dynamoClient.send(
         new QueryCommand({
           TableName: this.config.table,
+          IndexName: this.config.recencyIndex,
           KeyConditionExpression: 'userId = :userId',
           ExpressionAttributeValues: marshall({
             ':userId': userId,
           }),
+          ScanIndexForward: false,
+          Limit: Math.min(Math.max(limit || this.config.listPageSize || 50, 1), 100),
+          ExclusiveStartKey: exclusiveStartKey,
         }),
       );
 
-      return (result.Items || []).map((item) => unmarshall(item) as WorkItem);
+      const items = (result.Items || []).map((raw) => {
+        const item = unmarshall(raw);
+
+        // Listed as stored until converted, opening the work item converts it right away
+        if (this.config.migrationFunction && this.isLegacyWorkItem(item)) {
+          this.queueLegacyRepair(userId, item.fileId);
+        }
+
+        return item as WorkItem;
+      });
+
+      return {
+        items,
+        nextToken: result.LastEvaluatedKey ? this.encodePageToken(result.LastEvaluatedKey) : undefined,
+      };
     } catch (error) {
       this.logger.error('Error listing work items:', error);
       throw new Error('Failed to list work items');
@@ -913,6 +1384,7 @@ export class StorageService {
     }
   }
 
+  @Traced('StorageService.storeAnalysisResults')
   async storeAnalysisResults(
     userId: string,
     fileId: string,
@@ -932,6 +1404,7 @@ export class StorageService {
         params: {
           Bucket: this.config.bucket,
           Key: s3Locations.getAnalysisResultsPath(lensAlias),
+          Tagging: RESULT_TAGGING,
           Body: JSON.stringify(results),
           ContentType: 'application/json',
         },
@@ -968,6 +1441,62 @@ export class StorageService {
     }
   }
 
+  async storeJobResult(
+    userId: string,
+    fileId: string,
+    jobId: string,
+    result: any
+  ): Promise<void> {
+    if (!this.config.enabled) {
+      throw new Error('Storage is not enabled');
+    }
+
+    const s3Client = this.awsConfig.createS3Client();
+    const s3Locations = this.getS3Locations(userId, fileId);
+
+    try {
+      const upload = new Upload({
+        client: s3Client,
+        params: {
+          Bucket: this.config.bucket,
+          Key: s3Locations.getJobResultPath(jobId),
+          Tagging: INTERMEDIATE_TAGGING,
+          Body: JSON.stringify(result),
+          ContentType: 'application/json',
+        },
+      });
+
+      await upload.done();
+    } catch (error) {
+      this.logger.error('Error storing job result:', error);
+      throw new Error('Failed to store job result');
+    }
+  }
+
+  async getJobResult(userId: string, fileId: string, jobId: string): Promise<any> {
+    if (!this.config.enabled) {
+      throw new Error('Storage is not enabled');
+    }
+
+    const s3Client = this.awsConfig.createS3Client();
+    const s3Locations = this.getS3Locations(userId, fileId);
+
+    try {
+      const result = await s3Client.send(
+        new GetObjectCommand({
+          Bucket: this.config.bucket,
+          Key: s3Locations.getJobResultPath(jobId),
+        }),
+      );
+
+      const content = await result.Body.transformToString();
+      return JSON.parse(content);
+    } catch (error) {
+      this.logger.error('Error getting job result:', error);
+      throw new Error('Failed to get job result');
+    }
+  }
+
   async storeIaCDocument(
     userId: string,
     fileId: string,
@@ -989,6 +1518,7 @@ export class StorageService {
         params: {
           Bucket: this.config.bucket,
           Key: s3Locations.getIaCDocumentPath(lensAlias, extension),
+          Tagging: RESULT_TAGGING,
           Body: content,
         },
       });
@@ -1091,6 +1621,7 @@ export class StorageService {
           params: {
             Bucket: this.config.bucket,
             Key: s3Locations.originalContent,
+            Tagging: RESULT_TAGGING,
             Body: buffer,
             ContentType: fileType,
           },
@@ -1104,6 +1635,7 @@ export class StorageService {
           params: {
             Bucket: this.config.bucket,
             Key: s3Locations.originalContent,
+            Tagging: RESULT_TAGGING,
             Body: content,
             ContentType: fileType,
           },
@@ -1123,6 +1655,7 @@ export class StorageService {
  * @param files Array of files with filename, buffer, and mimetype
  * @returns Object containing file ID
  */
+  @Traced('StorageService.handlePdfFiles')
   async handlePdfFiles(
     userId: string,
     files: Array<{ filename: string; buffer: Buffer; mimetype: string }>
@@ -1184,6 +1717,7 @@ export class StorageService {
         params: {
           Bucket: this.config.bucket,
           Key: s3Locations.originalContent,
+          Tagging: RESULT_TAGGING,
           Body: zipBuffer,
           ContentType: 'application/zip',
         },
@@ -1198,6 +1732,7 @@ export class StorageService {
     }
   }
 
+  @Traced('StorageService.getOriginalContent')
   async getOriginalContent(
     userId: string,
     fileId: string,
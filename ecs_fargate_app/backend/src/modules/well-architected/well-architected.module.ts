@@ -2,8 +2,10 @@ import { Module } from '@nestjs/common';
 import { WellArchitectedService } from './well-architected.service';
 import { WellArchitectedController } from './well-architected.controller';
 import { AwsConfigService } from '../../config/aws.config';
+import { CacheModule } from '../cache/cache.module';
 
 @Module({
+  imports: [CacheModule],
   providers: [WellArchitectedService, AwsConfigService],
   controllers: [WellArchitectedController],
   exports: [WellArchitectedService],
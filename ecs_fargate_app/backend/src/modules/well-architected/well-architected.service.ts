@@ -15,6 +15,8 @@ import { randomBytes, randomUUID } from 'crypto';
 import { ConfigService } from '@nestjs/config';
 import { DynamoDBClient, ScanCommand } from '@aws-sdk/client-dynamodb';
 import { unmarshall } from '@aws-sdk/util-dynamodb';
+import { CacheService } from '../cache/cache.service';
+import { Traced } from '../../shared/utils/tracing';
 
 interface ChoiceUpdate {
   Status: 'SELECTED' | 'NOT_APPLICABLE' | 'UNSELECTED';
@@ -32,11 +34,13 @@ export class WellArchitectedService {
   constructor(
     private readonly awsConfig: AwsConfigService,
     private readonly configService: ConfigService,
+    private readonly cacheService: CacheService,
   ) {
     this.dynamoClient = this.awsConfig.createDynamoDBClient();
     this.lensMetadataTable = this.configService.get<string>('aws.ddb.lensMetadataTable');
   }
 
+  @Traced('WellArchitectedService.getLensMetadata')
   async getLensMetadata() {
     try {
       const command = new ScanCommand({
@@ -50,7 +54,7 @@ export class WellArchitectedService {
       }
 
       // Convert DynamoDB items to plain JavaScript objects
-      return response.Items.map(item => {
+      const lenses = response.Items.map(item => {
         const unmarshalledItem = unmarshall(item);
 
         // Convert lensPillars from a record with nested properties to a simple key-value map
@@ -68,6 +72,15 @@ export class WellArchitectedService {
 
         return unmarshalledItem;
       });
+
+      // The KB synchronizer rewrites the lens metadata with the documents, drop the cached catalogs and retrievals when they change
+      const knowledgeVersion = lenses
+        .map(lens => `${lens.lensAlias}@${lens.uploadDate}`)
+        .sort()
+        .join(',');
+      await this.cacheService.syncKnowledgeVersion(knowledgeVersion);
+
+      return lenses;
     } catch (error) {
       this.logger.error('Error retrieving lens metadata from DynamoDB:', error);
       throw new Error(`Failed to retrieve lens metadata: ${error.message}`);
@@ -89,6 +102,7 @@ export class WellArchitectedService {
     }
   }
 
+  @Traced('WellArchitectedService.listAnswers')
   async listAnswers(workloadId: string, pillarId: string, lensAlias?: string) {
     const waClient = this.awsConfig.createWAClient();
 
@@ -188,6 +202,7 @@ export class WellArchitectedService {
     }
   }
 
+  @Traced('WellArchitectedService.getRiskSummary')
   async getRiskSummary(workloadId: string, lensAliasArn?: string) {
     try {
       // Use the provided lens alias or default to wellarchitected
@@ -0,0 +1,7 @@
+export type CacheNamespace = 'best-practices' | 'kb-retrieval' | 'model-response';
+
+export interface CacheConfig {
+  enabled: boolean;
+  keyPrefix: string;
+  ttlSeconds: Record<CacheNamespace, number>;
+}
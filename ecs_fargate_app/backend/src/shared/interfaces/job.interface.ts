@@ -0,0 +1,35 @@
+export type JobType = 'analyze' | 'generate-iac';
+
+export type JobStatus = 'QUEUED' | 'RUNNING' | 'COMPLETED' | 'FAILED' | 'CANCELLED';
+
+export interface AnalysisJob {
+  jobId: string;           // Partition key
+  jobType: JobType;
+  status: JobStatus;
+  queuedAt: number;        // UserIndex sort key (epoch ms)
+  userId: string;          // UserIndex partition key
+  fileId: string;
+  payload: string;         // JSON encoded arguments of the job
+  attempts: number;        // Deliveries of the job's queue message
+  workerId?: string;
+  cancelRequested?: boolean;
+  startedAt?: string;
+  finishedAt?: string;
+  error?: string;
+  ttl: number;             // Epoch seconds, jobs are removed by DynamoDB TTL
+}
+
+export interface ClaimedJob {
+  job: AnalysisJob;
+  receiptHandle: string;   // Of the job's queue message, used to extend its visibility and delete it
+}
+
+export interface JobsConfig {
+  enabled: boolean;
+  table?: string;
+  queueUrl?: string;
+  workerMode: boolean;
+  concurrency: number;
+  leaseSeconds: number;
+  maxAttempts: number;
+}
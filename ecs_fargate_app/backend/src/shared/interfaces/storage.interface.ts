@@ -24,6 +24,7 @@ export interface WorkItem {
   uploadDate: string;      // ISO timestamp
   s3Prefix: string;        // Base S3 path for this work item
   lastModified: string;    // Last activity timestamp
+  expiresAt?: number;      // TTL (epoch seconds), refreshed on activity when a retention is set
   uploadMode?: FileUploadMode;
   hasChatHistory?: boolean;
   workloadId?: string;     // Legacy field
@@ -104,10 +105,39 @@ export interface S3Locations {
   getSupportingDocumentPath(lensAlias: string, documentId: string): string;
   // Function to get supporting document metadata path for a specific lens
   getSupportingDocumentMetadataPath(lensAlias: string, documentId: string): string;
+  // Function to get the result path of a job processed by the worker tier
+  getJobResultPath(jobId: string): string;
 }
 
 export interface StorageConfig {
   enabled: boolean;
   bucket?: string;
   table?: string;
-}
\ No newline at end of file
+  migrationFunction?: string;     // Migration Lambda converting single-lens work items on read
+  recencyIndex?: string;
+  retentionDays?: number;
+  listPageSize?: number;
+  maxArchiveUploadSize?: number;   // Bytes
+}
+
+export interface WorkItemPage {
+  items: WorkItem[];
+  nextToken?: string;      // Opaque token of the next page, absent on the last page
+}
+export interface ArchiveUploadPart {
+  partNumber: number;
+  url: string;             // Presigned UploadPart URL
+}
+
+export interface ArchiveUpload {
+  fileId: string;
+  uploadId: string;
+  partSize: number;        // Bytes, every part but the last has this size
+  parts: ArchiveUploadPart[];
+  expiresAt: string;       // Expiration of the presigned URLs
+}
+
+export interface CompletedArchivePart {
+  partNumber: number;
+  etag: string;
+}
@@ -0,0 +1,87 @@
+/**
+ * Writes metrics in CloudWatch embedded metric format (EMF). The awslogs driver ships stdout to CloudWatch Logs,
+ * where the metrics are extracted without any PutMetricData call.
+ */
+
+export type MetricUnit = 'Milliseconds' | 'Seconds' | 'Count' | 'Count/Second';
+
+export interface MetricDatum {
+  name: string;
+  value: number;
+  unit: MetricUnit;
+}
+
+export function putMetrics(namespace: string, dimensions: Record<string, string>, metrics: MetricDatum[]) {
+  const values: Record<string, number> = {};
+  for (const metric of metrics) {
+    if (Number.isFinite(metric.value)) {
+      values[metric.name] = metric.value;
+    }
+  }
+  if (Object.keys(values).length === 0) {
+    return;
+  }
+
+  process.stdout.write(
+    JSON.stringify({
+      _aws: {
+        Timestamp: Date.now(),
+        CloudWatchMetrics: [
+          {
+            Namespace: namespace,
+            Dimensions: [Object.keys(dimensions)],
+            Metrics: metrics
+              .filter(metric => metric.name in values)
+              .map(metric => ({ Name: metric.name, Unit: metric.unit })),
+          },
+        ],
+      },
+      ...dimensions,
+      ...values,
+    }) + '\n',
+  );
+}
+
+/**
+ * Records the latency, token throughput and throttling of the model and knowledge base calls sent by a Bedrock client.
+ * Throttles are counted once the SDK retries are exhausted, AWS/Bedrock InvocationThrottles counts every attempt.
+ */
+export function recordBedrockMetrics<T extends { middlewareStack: any }>(client: T, namespace: string): T {
+  client.middlewareStack.add(
+    (next: (args: any) => Promise<any>, context: any) => async (args: any) => {
+      const operation = String(context.commandName || '').replace(/Command$/, '');
+      const start = Date.now();
+
+      try {
+        const result = await next(args);
+        const elapsedMs = Date.now() - start;
+
+        if (operation === 'Converse') {
+          const output = result.output;
+          const latencyMs = output?.metrics?.latencyMs || elapsedMs;
+          const outputTokens = output?.usage?.outputTokens;
+          putMetrics(namespace, { ModelId: args.input.modelId }, [
+            { name: 'ModelLatency', value: latencyMs, unit: 'Milliseconds' },
+            { name: 'InputTokens', value: output?.usage?.inputTokens, unit: 'Count' },
+            { name: 'OutputTokens', value: outputTokens, unit: 'Count' },
+            { name: 'OutputTokensPerSecond', value: outputTokens / (latencyMs / 1000), unit: 'Count/Second' },
+          ]);
+        } else if (operation === 'RetrieveAndGenerate' || operation === 'Retrieve') {
+          putMetrics(namespace, { Operation: operation }, [
+            { name: 'KbRetrievalLatency', value: elapsedMs, unit: 'Milliseconds' },
+          ]);
+        }
+        return result;
+      } catch (error) {
+        if (error.name === 'ThrottlingException' || error.$metadata?.httpStatusCode === 429) {
+          putMetrics(namespace, { Operation: operation }, [
+            { name: 'BedrockThrottles', value: 1, unit: 'Count' },
+          ]);
+        }
+        throw error;
+      }
+    },
+    { step: 'initialize', name: 'bedrockMetricsMiddleware' },
+  );
+  return client;
+}
@@ -5,6 +5,7 @@ import * as AdmZip from 'adm-zip';
 import { execSync } from 'child_process';
 import { ProjectFile, PackedProject } from '../interfaces/project-file.interface';
 import { Logger } from '@nestjs/common';
+import { extractZipFile } from './zip-stream';
 
 /**
  * Class that provides functionality to pack a project from a zip file or multiple files
@@ -259,6 +260,54 @@ Below is the content of each file in the project:
         }
     }
 
+    /**
+     * Process a zip file on disk and create a packed project, extracting only the entries that can be packed
+     * @param zipPath Path of the zip file
+     * @param originalFilename Original zip filename
+     * @param maxExtractedSize Largest total size in bytes of the extracted entries
+     * @returns PackedProject object
+     */
+    public async processZipFileFromPath(
+        zipPath: string,
+        originalFilename: string,
+        maxExtractedSize?: number
+    ): Promise<PackedProject> {
+        const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'project-'));
+
+        try {
+            // Excluded entries are extracted empty, so they still show in the directory tree
+            await extractZipFile(zipPath, tempDir, entryName => this.isPackable(entryName), maxExtractedSize);
+
+            // Generate directory tree
+            const directoryStructure = this.generateDirectoryTree(tempDir);
+
+            // Read all files
+            const files = await this.readFilesFromDirectory(tempDir);
+
+            // Create packed project
+            return this.createPackedProject(files, directoryStructure, `Zip file: ${originalFilename}`);
+        } catch (error) {
+            this.logger.error(`Error processing zip file: ${error}`);
+            throw new Error(`Failed to process zip file: ${error.message}`);
+        } finally {
+            // Clean up temp directory
+            fs.rm(tempDir, { recursive: true, force: true }, (err) => {
+                if (err) {
+                    this.logger.error(`Error deleting temp directory: ${err}`);
+                }
+            });
+        }
+    }
+
+    /**
+     * Whether a file passes the exclusion rules applied by readFilesFromDirectory
+     * @param filePath File path
+     */
+    private isPackable(filePath: string): boolean {
+        return !this.excludePatterns.some(pattern => filePath.includes(pattern)) &&
+            !this.excludeExtensions.includes(path.extname(filePath).toLowerCase());
+    }
+
     /**
      * Process multiple files and create a packed project
      * @param files Array of {filename, buffer} objects
@@ -0,0 +1,23 @@
+import { Logger } from '@nestjs/common';
+import Redis from 'ioredis';
+
+/**
+ * Creates an ioredis client for the Redis-compatible cache (ElastiCache for Valkey/Redis, or the local
+ * redis container). rediss:// URLs connect over TLS. With failFast, commands are rejected while the client
+ * is disconnected instead of being queued, for callers that treat the cache as optional.
+ */
+
+const MAX_RECONNECT_DELAY_MS = 30000;
+
+const logger = new Logger('RedisClient');
+
+export function createRedisClient(url: string, options: { failFast?: boolean } = {}): Redis {
+  const client = new Redis(url, {
+    enableOfflineQueue: !options.failFast,
+    maxRetriesPerRequest: options.failFast ? 0 : null,
+    retryStrategy: attempt => Math.min(attempt * 1000, MAX_RECONNECT_DELAY_MS),
+  });
+  // Without a listener, connection errors would be raised as unhandled 'error' events
+  client.on('error', error => logger.warn(`Redis connection error: ${error.message}`));
+  return client;
+}
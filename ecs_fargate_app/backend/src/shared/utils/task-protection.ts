@@ -0,0 +1,92 @@
+import * as http from 'http';
+import { Logger } from '@nestjs/common';
+
+/**
+ * ECS task scale-in protection: while an analysis or IaC generation runs, the task asks the ECS agent
+ * not to stop it when its service scales in. Protection is renewed while work is in progress and
+ * removed when the last piece of work completes. Outside of ECS (no ECS_AGENT_URI) nothing is done.
+ */
+
+const logger = new Logger('TaskProtection');
+
+// Protection lapses after this long if the task cannot renew or remove it
+const PROTECTION_MINUTES = 60;
+const RENEW_INTERVAL_MS = 30 * 60 * 1000;
+
+let activeWork = 0;
+let renewTimer: NodeJS.Timeout | undefined;
+// Updates are sent one at a time, so a removal never overtakes the protection requested after it
+let updates = Promise.resolve();
+
+function setProtection(enabled: boolean): Promise<void> {
+  const agentUri = process.env.ECS_AGENT_URI;
+  if (!agentUri) {
+    return Promise.resolve();
+  }
+
+  const body = JSON.stringify(
+    enabled ? { ProtectionEnabled: true, ExpiresInMinutes: PROTECTION_MINUTES } : { ProtectionEnabled: false },
+  );
+
+  return new Promise<void>((resolve) => {
+    const request = http.request(
+      `${agentUri}/task-protection/v1/state`,
+      { method: 'PUT', headers: { 'content-type': 'application/json', 'content-length': Buffer.byteLength(body) } },
+      (response) => {
+        response.resume();
+        if (response.statusCode !== 200) {
+          logger.warn(`Task protection update returned status ${response.statusCode}`);
+        }
+        resolve();
+      },
+    );
+    // Failing to protect the task must not fail the work itself
+    request.on('error', (error) => {
+      logger.warn(`Task protection update failed: ${error.message}`);
+      resolve();
+    });
+    request.end(body);
+  });
+}
+
+function queueUpdate(enabled: boolean): Promise<void> {
+  updates = updates.then(() => setProtection(enabled));
+  return updates;
+}
+
+async function acquire(): Promise<void> {
+  activeWork++;
+  if (activeWork === 1) {
+    renewTimer = setInterval(() => queueUpdate(true), RENEW_INTERVAL_MS);
+    renewTimer.unref();
+    await queueUpdate(true);
+  }
+}
+
+async function release(): Promise<void> {
+  activeWork--;
+  if (activeWork === 0) {
+    clearInterval(renewTimer);
+    renewTimer = undefined;
+    await queueUpdate(false);
+  }
+}
+
+/**
+ * Protects the task from scale-in while the decorated async method runs
+ */
+export function ScaleInProtected(): MethodDecorator {
+  return (target: object, propertyKey: string | symbol, descriptor: PropertyDescriptor) => {
+    const method = descriptor.value;
+
+    descriptor.value = async function (...args: any[]) {
+      await acquire();
+      try {
+        return await method.apply(this, args);
+      } finally {
+        await release();
+      }
+    };
+    return descriptor;
+  };
+}
@@ -0,0 +1,95 @@
+import { Attributes, Span, SpanStatusCode, trace } from '@opentelemetry/api';
+import { NodeSDK, tracing } from '@opentelemetry/sdk-node';
+import { OTLPTraceExporter } from '@opentelemetry/exporter-trace-otlp-http';
+import { AWSXRayIdGenerator } from '@opentelemetry/id-generator-aws-xray';
+import { AWSXRayPropagator } from '@opentelemetry/propagator-aws-xray';
+import { AwsInstrumentation } from '@opentelemetry/instrumentation-aws-sdk';
+import { HttpInstrumentation } from '@opentelemetry/instrumentation-http';
+import { ExpressInstrumentation } from '@opentelemetry/instrumentation-express';
+
+/**
+ * OpenTelemetry tracing exporting spans over OTLP/HTTP to the collector sidecar, which forwards them to X-Ray.
+ * Trace IDs follow the X-Ray format and the X-Amzn-Trace-Id header is propagated, so API requests continue
+ * the trace started by the load balancer. Incoming requests and AWS SDK calls are traced by the instrumentations.
+ */
+
+export type SpanAttributes = Attributes;
+
+export interface TracingConfig {
+  enabled: boolean;
+  endpoint: string;
+  serviceName: string;
+  sampleRatio: number;
+}
+
+const tracer = trace.getTracer('wa-genai-backend');
+
+/**
+ * Starts the OpenTelemetry SDK. Must run before express and the AWS SDK are loaded, so they can be instrumented.
+ */
+export function startTracing(config: TracingConfig) {
+  if (!config.enabled) {
+    return;
+  }
+
+  const sdk = new NodeSDK({
+    serviceName: config.serviceName,
+    traceExporter: new OTLPTraceExporter({ url: `${config.endpoint.replace(/\/$/, '')}/v1/traces` }),
+    idGenerator: new AWSXRayIdGenerator(),
+    textMapPropagator: new AWSXRayPropagator(),
+    // Requests sampled upstream by the load balancer stay sampled
+    sampler: new tracing.ParentBasedSampler({ root: new tracing.TraceIdRatioBasedSampler(config.sampleRatio) }),
+    instrumentations: [
+      // Outgoing requests made outside of a trace, e.g. to the ECS agent, do not start traces
+      new HttpInstrumentation({ requireParentforOutgoingSpans: true }),
+      new ExpressInstrumentation(),
+      // Background polling and metrics calls do not start traces
+      new AwsInstrumentation({ suppressInternalInstrumentation: true, requireParentSpan: true }),
+    ],
+  });
+  sdk.start();
+  process.once('beforeExit', () => sdk.shutdown());
+}
+
+function endSpan<T>(span: Span, result: T): T {
+  if (result instanceof Promise) {
+    return result.then(
+      value => {
+        span.end();
+        return value;
+      },
+      error => failSpan(span, error),
+    ) as unknown as T;
+  }
+  span.end();
+  return result;
+}
+
+function failSpan(span: Span, error: any): never {
+  span.recordException(error);
+  span.setStatus({ code: SpanStatusCode.ERROR, message: error?.message || String(error) });
+  span.end();
+  throw error;
+}
+
+/**
+ * Traces each call of the decorated method in a span named after the class and method,
+ * with optional attributes computed from the call arguments
+ */
+export function Traced(name?: string, attributes?: (...args: any[]) => SpanAttributes): MethodDecorator {
+  return (target: object, propertyKey: string | symbol, descriptor: PropertyDescriptor) => {
+    const method = descriptor.value;
+    const spanName = name || `${target.constructor.name}.${String(propertyKey)}`;
+
+    descriptor.value = function (...args: any[]) {
+      return tracer.startActiveSpan(spanName, { attributes: attributes?.(...args) }, span => {
+        try {
+          return endSpan(span, method.apply(this, args));
+        } catch (error) {
+          return failSpan(span, error);
+        }
+      });
+    };
+    return descriptor;
+  };
+}
@@ -0,0 +1,228 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { Transform } from 'stream';
+import { pipeline } from 'stream/promises';
+import { createInflateRaw } from 'zlib';
+import { Logger } from '@nestjs/common';
+
+/**
+ * Extracts a zip file from disk one entry at a time: the central directory is read from the end of the file,
+ * then each entry is streamed (and inflated) from its offset to its destination. Memory use does not depend
+ * on the size of the archive or of its entries. Supports stored and deflated entries, and zip64 archives.
+ * Extraction stops when an entry inflates to more than the size declared in the central directory, or when
+ * the extracted entries exceed the size limit of the caller, so small archives cannot fill the disk.
+ */
+
+const logger = new Logger('ZipStream');
+
+const EOCD_SIGNATURE = 0x06054b50;
+const ZIP64_EOCD_LOCATOR_SIGNATURE = 0x07064b50;
+const ZIP64_EOCD_SIGNATURE = 0x06064b50;
+const CENTRAL_HEADER_SIGNATURE = 0x02014b50;
+const LOCAL_HEADER_SIGNATURE = 0x04034b50;
+const ZIP64_EXTRA_FIELD_ID = 0x0001;
+
+// End of central directory record (22 bytes) followed by a comment of up to 65535 bytes
+const MAX_EOCD_SEARCH = 22 + 0xffff;
+
+const METHOD_STORED = 0;
+const METHOD_DEFLATED = 8;
+
+interface ZipEntry {
+  name: string;
+  method: number;
+  encrypted: boolean;
+  compressedSize: number;
+  uncompressedSize: number;
+  localHeaderOffset: number;
+}
+
+async function readAt(file: fs.promises.FileHandle, position: number, length: number): Promise<Buffer> {
+  const buffer = Buffer.alloc(length);
+  const { bytesRead } = await file.read(buffer, 0, length, position);
+  return buffer.subarray(0, bytesRead);
+}
+
+async function readCentralDirectory(file: fs.promises.FileHandle, fileSize: number): Promise<ZipEntry[]> {
+  const tailLength = Math.min(fileSize, MAX_EOCD_SEARCH);
+  const tail = await readAt(file, fileSize - tailLength, tailLength);
+
+  let eocd = -1;
+  for (let i = tail.length - 22; i >= 0; i--) {
+    if (tail.readUInt32LE(i) === EOCD_SIGNATURE) {
+      eocd = i;
+      break;
+    }
+  }
+  if (eocd < 0) {
+    throw new Error('Invalid zip file: end of central directory not found');
+  }
+
+  let entryCount = tail.readUInt16LE(eocd + 10);
+  let directorySize = tail.readUInt32LE(eocd + 12);
+  let directoryOffset = tail.readUInt32LE(eocd + 16);
+
+  // Archives over 4 GB or with more than 65535 entries keep the real values in the zip64 record
+  const locator = eocd - 20;
+  if (locator >= 0 && tail.readUInt32LE(locator) === ZIP64_EOCD_LOCATOR_SIGNATURE) {
+    const record = await readAt(file, Number(tail.readBigUInt64LE(locator + 8)), 56);
+    if (record.length < 56 || record.readUInt32LE(0) !== ZIP64_EOCD_SIGNATURE) {
+      throw new Error('Invalid zip file: zip64 end of central directory not found');
+    }
+    entryCount = Number(record.readBigUInt64LE(32));
+    directorySize = Number(record.readBigUInt64LE(40));
+    directoryOffset = Number(record.readBigUInt64LE(48));
+  }
+
+  const directory = await readAt(file, directoryOffset, directorySize);
+  const entries: ZipEntry[] = [];
+  let offset = 0;
+
+  for (let i = 0; i < entryCount; i++) {
+    if (offset + 46 > directory.length || directory.readUInt32LE(offset) !== CENTRAL_HEADER_SIGNATURE) {
+      throw new Error('Invalid zip file: corrupted central directory');
+    }
+
+    const flags = directory.readUInt16LE(offset + 8);
+    const nameLength = directory.readUInt16LE(offset + 28);
+    const extraLength = directory.readUInt16LE(offset + 30);
+    const commentLength = directory.readUInt16LE(offset + 32);
+    const nameStart = offset + 46;
+
+    let uncompressedSize = directory.readUInt32LE(offset + 24);
+    let compressedSize = directory.readUInt32LE(offset + 20);
+    let localHeaderOffset = directory.readUInt32LE(offset + 42);
+
+    // The zip64 extra field holds the values saturated at 0xFFFFFFFF, in this order
+    let extra = nameStart + nameLength;
+    const extraEnd = extra + extraLength;
+    while (extra + 4 <= extraEnd) {
+      const id = directory.readUInt16LE(extra);
+      const size = directory.readUInt16LE(extra + 2);
+      if (id === ZIP64_EXTRA_FIELD_ID) {
+        let value = extra + 4;
+        if (uncompressedSize === 0xffffffff) {
+          uncompressedSize = Number(directory.readBigUInt64LE(value));
+          value += 8;
+        }
+        if (compressedSize === 0xffffffff) {
+          compressedSize = Number(directory.readBigUInt64LE(value));
+          value += 8;
+        }
+        if (localHeaderOffset === 0xffffffff) {
+          localHeaderOffset = Number(directory.readBigUInt64LE(value));
+        }
+      }
+      extra += 4 + size;
+    }
+
+    entries.push({
+      // Bit 11 flags UTF-8 names, older archivers use their code page
+      name: directory.toString(flags & 0x800 ? 'utf8' : 'latin1', nameStart, nameStart + nameLength),
+      method: directory.readUInt16LE(offset + 10),
+      encrypted: (flags & 0x1) !== 0,
+      compressedSize,
+      uncompressedSize,
+      localHeaderOffset,
+    });
+
+    offset = extraEnd + commentLength;
+  }
+
+  return entries;
+}
+
+/**
+ * Counts the bytes written for an entry, failing once they exceed its declared size or the total size limit
+ */
+function limitSize(entry: ZipEntry, extracted: { bytes: number }, maxExtractedSize: number): Transform {
+  let entryBytes = 0;
+  return new Transform({
+    transform(chunk: Buffer, _encoding, callback) {
+      entryBytes += chunk.length;
+      extracted.bytes += chunk.length;
+      if (entryBytes > entry.uncompressedSize) {
+        callback(new Error(`Invalid zip file: ${entry.name} is larger than its declared size of ${entry.uncompressedSize} bytes`));
+      } else if (extracted.bytes > maxExtractedSize) {
+        callback(new Error(`Zip file exceeds the extracted size limit of ${maxExtractedSize} bytes`));
+      } else {
+        callback(null, chunk);
+      }
+    },
+  });
+}
+
+/**
+ * Extracts the zip file to the destination directory. Entries rejected by the filter are created empty,
+ * so they still appear in the extracted tree without taking space.
+ * @param maxExtractedSize Largest total size in bytes of the extracted entries
+ */
+export async function extractZipFile(
+  zipPath: string,
+  destination: string,
+  include: (entryName: string) => boolean = () => true,
+  maxExtractedSize: number = Number.MAX_SAFE_INTEGER,
+): Promise<void> {
+  const root = path.resolve(destination);
+  const file = await fs.promises.open(zipPath, 'r');
+  const extracted = { bytes: 0 };
+
+  try {
+    const { size } = await file.stat();
+    const entries = await readCentralDirectory(file, size);
+
+    // Reject archives declaring more than the limit up front, the sizes are then enforced while inflating
+    const declaredSize = entries
+      .filter(entry => !entry.name.endsWith('/') && include(entry.name))
+      .reduce((total, entry) => total + entry.uncompressedSize, 0);
+    if (declaredSize > maxExtractedSize) {
+      throw new Error(`Zip file exceeds the extracted size limit of ${maxExtractedSize} bytes`);
+    }
+
+    for (const entry of entries) {
+      const target = path.resolve(root, entry.name);
+      // Entries with absolute paths or ".." segments would be written outside the destination
+      if (!target.startsWith(root + path.sep)) {
+        logger.warn(`Skipping zip entry outside of the archive root: ${entry.name}`);
+        continue;
+      }
+
+      if (entry.name.endsWith('/')) {
+        await fs.promises.mkdir(target, { recursive: true });
+        continue;
+      }
+      await fs.promises.mkdir(path.dirname(target), { recursive: true });
+
+      const supported = !entry.encrypted && (entry.method === METHOD_STORED || entry.method === METHOD_DEFLATED);
+      if (!supported) {
+        logger.warn(`Skipping encrypted or unsupported zip entry: ${entry.name}`);
+      }
+      if (!supported || !include(entry.name) || entry.compressedSize === 0) {
+        await fs.promises.writeFile(target, '');
+        continue;
+      }
+
+      const localHeader = await readAt(file, entry.localHeaderOffset, 30);
+      if (localHeader.length < 30 || localHeader.readUInt32LE(0) !== LOCAL_HEADER_SIGNATURE) {
+        throw new Error(`Invalid zip file: local header of ${entry.name} not found`);
+      }
+      const dataStart =
+        entry.localHeaderOffset + 30 + localHeader.readUInt16LE(26) + localHeader.readUInt16LE(28);
+
+      const data = fs.createReadStream(zipPath, {
+        start: dataStart,
+        end: dataStart + entry.compressedSize - 1,
+      });
+      const output = fs.createWriteStream(target);
+
+      const limit = limitSize(entry, extracted, maxExtractedSize);
+      if (entry.method === METHOD_DEFLATED) {
+        await pipeline(data, createInflateRaw(), limit, output);
+      } else {
+        await pipeline(data, limit, output);
+      }
+    }
+  } finally {
+    await file.close();
+  }
+}
@@ -8,6 +8,7 @@ import {
   Spinner,
   FileUpload as CloudscapeFileUpload,
   SegmentedControl,
+  ProgressBar,
   Box
 } from '@cloudscape-design/components';
 import { FileUploadMode, UploadedFiles } from '../types';
@@ -29,6 +30,8 @@ export const FileUpload: React.FC<FileUploadProps> = ({
   const [isUploading, setIsUploading] = useState(false);
   const [uploadStatus, setUploadStatus] = useState<'initial' | 'success' | 'error'>('initial');
   const [uploadMode, setUploadMode] = useState<FileUploadMode>(FileUploadMode.SINGLE_FILE);
+  // Progress of a direct archive upload, null for uploads through the backend
+  const [uploadProgress, setUploadProgress] = useState<number | null>(null);
   const { strings } = useLanguage();
 
   // Helper function to check if a file is an image based on its extension
@@ -142,8 +145,14 @@ export const FileUpload: React.FC<FileUploadProps> = ({
         formData.append('files', file);
       });
 
-      // Upload file(s) to S3 and create work item
-      const response = await storageApi.uploadFiles(formData);
+      // Upload file(s) to S3 and create work item. Archives go straight to S3, the others through the backend.
+      let response;
+      if (actualUploadMode === FileUploadMode.ZIP_FILE) {
+        setUploadProgress(0);
+        response = await storageApi.uploadArchive(files[0], setUploadProgress);
+      } else {
+        response = await storageApi.uploadFiles(formData);
+      }
 
       if (!response || !response.fileId) {
         throw new Error('Invalid server response');
@@ -223,6 +232,7 @@ export const FileUpload: React.FC<FileUploadProps> = ({
       setUploadStatus('error');
     } finally {
       setIsUploading(false);
+      setUploadProgress(null);
     }
   };
 
@@ -314,7 +324,13 @@ export const FileUpload: React.FC<FileUploadProps> = ({
             multiple={uploadMode === FileUploadMode.SINGLE_FILE || uploadMode === FileUploadMode.PDF_FILE}
             tokenLimit={uploadMode === FileUploadMode.ZIP_FILE ? 1 : undefined}
           />
-          {isUploading && (
+          {isUploading && uploadProgress !== null && (
+            <ProgressBar
+              value={uploadProgress}
+              label={uploadProgress < 100 ? strings.fileUpload.uploading : strings.fileUpload.processingArchive}
+            />
+          )}
+          {isUploading && uploadProgress === null && (
             <Spinner />
           )}
           {uploadStatus === 'success' && !isUploading && (
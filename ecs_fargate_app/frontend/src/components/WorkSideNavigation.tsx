@@ -41,6 +41,9 @@ export const WorkSideNavigation = forwardRef<WorkSideNavigationRef, WorkSideNavi
   const [loadingFileId, setLoadingFileId] = useState<string | null>(null);
   const [deletingFileId, setDeletingFileId] = useState<string | null>(null);
   const [isReloading, setIsReloading] = useState(false);
+  // Token of the next (older) page of work items, undefined once all are loaded
+  const [nextToken, setNextToken] = useState<string | undefined>(undefined);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const { authState } = useAuth();
   const [downloadingChatHistoryId, setDownloadingChatHistoryId] = useState<string | null>(null);
   const [deletingChatHistoryId, setDeletingChatHistoryId] = useState<string | null>(null);
@@ -72,8 +75,9 @@ export const WorkSideNavigation = forwardRef<WorkSideNavigationRef, WorkSideNavi
   const loadWorkItems = useCallback(async () => {
     setIsReloading(true);
     try {
-      const workItems = await storageApi.listWorkItems();
-      setSortedItems(workItems);
+      const page = await storageApi.listWorkItems();
+      setSortedItems(page.items);
+      setNextToken(page.nextToken);
       onResetActiveFile();
     } catch (err) {
       console.error('Failed to load work items:', err);
@@ -82,6 +86,23 @@ export const WorkSideNavigation = forwardRef<WorkSideNavigationRef, WorkSideNavi
     }
   }, [onResetActiveFile]);
 
+  const loadMoreWorkItems = async () => {
+    if (!nextToken || isLoadingMore) return;
+
+    setIsLoadingMore(true);
+    try {
+      const page = await storageApi.listWorkItems(nextToken);
+      // Items updated since the first page was loaded can show up again on a later page
+      const loadedIds = new Set(items.map(item => item.fileId));
+      setSortedItems([...items, ...page.items.filter(item => !loadedIds.has(item.fileId))]);
+      setNextToken(page.nextToken);
+    } catch (err) {
+      console.error('Failed to load more work items:', err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useImperativeHandle(ref, () => ({
     loadWorkItems
   }), [loadWorkItems]);
@@ -358,6 +379,24 @@ export const WorkSideNavigation = forwardRef<WorkSideNavigationRef, WorkSideNavi
         items: fileItems
       };
     }),
+    ...(nextToken ? [{
+      type: 'link' as const,
+      text: `${strings.leftPanel.loadMoreWorkItems}`,
+      href: '/load-more',
+      info: (
+        <Button
+          iconName="angle-down"
+          ariaLabel="Load older work items"
+          variant="inline-icon"
+          loading={isLoadingMore}
+          onClick={(e: any) => {
+            e.preventDefault();
+            e.stopPropagation();
+            loadMoreWorkItems();
+          }}
+        />
+      )
+    }] : []),
     { type: "divider" as const },
   ];
 
@@ -367,6 +406,11 @@ export const WorkSideNavigation = forwardRef<WorkSideNavigationRef, WorkSideNavi
     // Parse fileId from the href
     const parts = event.detail.href.split('/');
     const action = parts[1];
+
+    if (action === 'load-more') {
+      loadMoreWorkItems();
+      return;
+    }
     const fileId = parts.length > 2 ? parts[2] : null;
     
     const selectedItem = items.find(item => item.fileId === fileId);
@@ -101,6 +101,7 @@ export interface I18nStrings {
     filesUploadedSuccessfully: string;
     fileUploadedSuccessfully: string;
     errorUploadingFile: string;
+    processingArchive: string;
     uploadMode: string;
   };
   wellArchitectedAnalyzer: {
@@ -234,6 +235,7 @@ export interface I18nStrings {
     chatHistory: string;
     deleteWorkItem: string;
     reloadWorkItems: string;
+    loadMoreWorkItems: string;
     deleteWorkItemModal: {
       title: string;
       message: string;
@@ -353,6 +355,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       filesUploadedSuccessfully: "Files uploaded successfully",
       fileUploadedSuccessfully: "File uploaded successfully",
       errorUploadingFile: "Error uploading file",
+      processingArchive: "Processing project archive...",
       uploadMode: "Upload mode",
     },
     wellArchitectedAnalyzer: {
@@ -486,6 +489,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       chatHistory: "Chat history:",
       deleteWorkItem: "Delete work item:",
       reloadWorkItems: "Reload Work Items",
+      loadMoreWorkItems: "Load older work items",
       deleteWorkItemModal: {
         title: "Delete Work Item",
         message: "Are you sure you want to delete the work item? ",
@@ -602,6 +606,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       filesUploadedSuccessfully: "ファイルのアップロードが完了しました",
       fileUploadedSuccessfully: "ファイルのアップロードが完了しました",
       errorUploadingFile: "ファイルのアップロードエラー",
+      processingArchive: "プロジェクトアーカイブを処理中...",
       uploadMode: "アップロードモード",
     },
     wellArchitectedAnalyzer: {
@@ -735,6 +740,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       chatHistory: "チャット履歴：",
       deleteWorkItem: "ワークアイテムを削除：",
       reloadWorkItems: "ワークアイテムを再読み込み",
+      loadMoreWorkItems: "以前のワークアイテムを読み込む",
       deleteWorkItemModal: {
         title: "ワークアイテムを削除",
         message: "ワークアイテムを削除してもよろしいですか？",
@@ -851,6 +857,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       filesUploadedSuccessfully: "Archivos subidos exitosamente",
       fileUploadedSuccessfully: "Archivo subido exitosamente",
       errorUploadingFile: "Error al subir archivo",
+      processingArchive: "Procesando el archivo del proyecto...",
       uploadMode: "Modo de carga",
     },
     wellArchitectedAnalyzer: {
@@ -984,6 +991,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       chatHistory: "Historial de chat:",
       deleteWorkItem: "Eliminar elemento de trabajo:",
       reloadWorkItems: "Recargar Elementos de Trabajo",
+      loadMoreWorkItems: "Cargar elementos de trabajo anteriores",
       deleteWorkItemModal: {
         title: "Eliminar elemento de trabajo",
         message: "¿Está seguro de que desea eliminar el elemento de trabajo?",
@@ -1100,6 +1108,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       filesUploadedSuccessfully: "Arquivos enviados com sucesso",
       fileUploadedSuccessfully: "Arquivo enviado com sucesso",
       errorUploadingFile: "Erro ao enviar arquivo",
+      processingArchive: "Processando o arquivo do projeto...",
       uploadMode: "Modo de envio",
     },
     wellArchitectedAnalyzer: {
@@ -1233,6 +1242,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       chatHistory: "Histórico de chat:",
       deleteWorkItem: "Excluir item de trabalho:",
       reloadWorkItems: "Recarregar Itens de Trabalho",
+      loadMoreWorkItems: "Carregar itens de trabalho anteriores",
       deleteWorkItemModal: {
         title: "Excluir item de trabalho",
         message: "Tem certeza de que deseja excluir o item de trabalho?",
@@ -1349,6 +1359,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       filesUploadedSuccessfully: "Fichiers téléchargés avec succès",
       fileUploadedSuccessfully: "Fichier téléchargé avec succès",
       errorUploadingFile: "Erreur lors du téléchargement du fichier",
+      processingArchive: "Traitement de l'archive du projet...",
       uploadMode: "Mode de téléchargement",
     },
     wellArchitectedAnalyzer: {
@@ -1482,6 +1493,7 @@ export const i18nStrings: Record<Language, I18nStrings> = {
       chatHistory: "Historique du chat",
       deleteWorkItem: "Supprimer l'élément de travail",
       reloadWorkItems: "Recharger les éléments de travail",
+      loadMoreWorkItems: "Charger les éléments de travail précédents",
       deleteWorkItemModal: {
         title: "Supprimer l'élément de travail",
         message: "Êtes-vous sûr de vouloir supprimer cet élément de travail ? Toutes les données d'analyse associées seront supprimées.",
@@ -32,9 +32,71 @@ const handleError = (error: unknown) => {
       'An unexpected error occurred'
     );
   }
+  // e.g. a job that failed or timed out
+  if (error instanceof Error) {
+    return error;
+  }
   return new Error('An unexpected error occurred');
 };
 
+// Interval between status checks of jobs processed by the backend worker tier
+const JOB_POLL_INTERVAL_MS = 3000;
+// A job still queued after this long is not going to be picked up, e.g. no worker task is running
+const JOB_QUEUED_TIMEOUT_MS = 30 * 60 * 1000;
+// Longest time to wait for a job, queued and running
+const JOB_TIMEOUT_MS = 3 * 60 * 60 * 1000;
+// Consecutive failed status checks tolerated, e.g. while a backend task is replaced
+const JOB_POLL_MAX_ERRORS = 5;
+
+// Waits for a queued analysis or IaC generation job and returns its result.
+// Jobs cancelled before they ran have no result, cancelledResult is returned instead.
+const waitForJob = async <T>(jobId: string, cancelledResult: T): Promise<T> => {
+  const startedAt = Date.now();
+  let pollErrors = 0;
+
+  while (true) {
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+
+    let job;
+    try {
+      job = (await api.get(`/analyzer/jobs/${jobId}`)).data;
+      pollErrors = 0;
+    } catch (error) {
+      pollErrors++;
+      if (pollErrors >= JOB_POLL_MAX_ERRORS) {
+        throw error;
+      }
+      continue;
+    }
+
+    if (job.status === 'COMPLETED') {
+      if (!job.result) {
+        throw new Error('The job completed but its result is not available');
+      }
+      return job.result;
+    }
+    if (job.status === 'CANCELLED') {
+      return job.result || cancelledResult;
+    }
+    if (job.status === 'FAILED') {
+      throw new Error(job.error || 'Job failed');
+    }
+
+    const elapsed = Date.now() - startedAt;
+    if (job.status === 'QUEUED' && elapsed > JOB_QUEUED_TIMEOUT_MS) {
+      throw new Error(
+        `The job is still queued after ${JOB_QUEUED_TIMEOUT_MS / 60000} minutes, no worker is processing jobs. Please try again later.`
+      );
+    }
+    if (elapsed > JOB_TIMEOUT_MS) {
+      throw new Error(
+        `The job did not finish within ${JOB_TIMEOUT_MS / 3600000} hours. ` +
+        'Please check the side navigation panel later to load your results.'
+      );
+    }
+  }
+};
+
 export const analyzerApi = {
   // Fetch lens metadata
   async getLensMetadata(): Promise<LensMetadata[]> {
@@ -87,6 +149,10 @@ export const analyzerApi = {
         isTempWorkload,
         outputLanguage,
       });
+      // The backend queues the analysis when it runs with a worker tier
+      if (response.data.jobId) {
+        return await waitForJob(response.data.jobId, { results: [], isCancelled: true });
+      }
       return response.data;
     } catch (error) {
       throw handleError(error);
@@ -206,6 +272,9 @@ export const analyzerApi = {
         lensName,
         outputLanguage,
       });
+      if (response.data.jobId) {
+        return await waitForJob(response.data.jobId, { content: '', isCancelled: true });
+      }
       return response.data;
     } catch (error) {
       // Return the error response
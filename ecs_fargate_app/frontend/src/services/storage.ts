@@ -1,6 +1,10 @@
-import { WorkItem, WorkItemResponse } from '../types';
+import { ArchiveUpload, WorkItemPage, WorkItemResponse } from '../types';
 import axios from 'axios';
 
+// Archive parts uploaded in parallel, and attempts per part
+const ARCHIVE_UPLOAD_CONCURRENCY = 4;
+const ARCHIVE_PART_ATTEMPTS = 3;
+
 const api = axios.create({
   baseURL: '/api/storage',
   headers: {
@@ -76,9 +80,80 @@ export const storageApi = {
     }
   },
 
-  async listWorkItems(): Promise<WorkItem[]> {
+  // Uploads a zip archive straight to S3 in parallel parts, then lets the backend process it from S3
+  async uploadArchive(
+    file: File,
+    onProgress?: (percent: number) => void
+  ): Promise<{ fileId: string; tokenCount?: number; exceedsTokenLimit?: boolean }> {
+    let upload: ArchiveUpload | undefined;
     try {
-      const response = await api.get('/work-items');
+      upload = (await api.post<ArchiveUpload>('/work-items/archive-uploads', {
+        fileName: file.name,
+        fileSize: file.size,
+      })).data;
+      const { fileId, uploadId, partSize, parts } = upload;
+
+      const completedParts: Array<{ partNumber: number; etag: string }> = [];
+      let uploadedBytes = 0;
+      let nextPart = 0;
+
+      const uploadPart = async (part: { partNumber: number; url: string }) => {
+        const start = (part.partNumber - 1) * partSize;
+        const body = file.slice(start, start + partSize);
+
+        for (let attempt = 1; ; attempt++) {
+          try {
+            const response = await fetch(part.url, { method: 'PUT', body });
+            const etag = response.headers.get('ETag');
+            if (!response.ok || !etag) {
+              throw new Error(`Upload of part ${part.partNumber} failed with status ${response.status}`);
+            }
+            return etag;
+          } catch (error) {
+            if (attempt >= ARCHIVE_PART_ATTEMPTS) {
+              throw error;
+            }
+          }
+        }
+      };
+
+      // Each worker uploads the next part not started yet
+      const worker = async () => {
+        while (nextPart < parts.length) {
+          const part = parts[nextPart++];
+          const etag = await uploadPart(part);
+          completedParts.push({ partNumber: part.partNumber, etag });
+          uploadedBytes += Math.min(partSize, file.size - (part.partNumber - 1) * partSize);
+          onProgress?.(Math.round((uploadedBytes / file.size) * 100));
+        }
+      };
+      await Promise.all(
+        Array.from({ length: Math.min(ARCHIVE_UPLOAD_CONCURRENCY, parts.length) }, worker)
+      );
+
+      const response = await api.post(`/work-items/archive-uploads/${fileId}/complete`, {
+        fileName: file.name,
+        uploadId,
+        parts: completedParts,
+      });
+      return response.data;
+    } catch (error) {
+      if (upload) {
+        // Parts left behind are removed by the bucket lifecycle if the abort fails too
+        api.post(`/work-items/archive-uploads/${upload.fileId}/abort`, { uploadId: upload.uploadId })
+          .catch(() => undefined);
+      }
+      throw new Error(
+        error instanceof Error ? error.message : 'Failed to upload archive'
+      );
+    }
+  },
+
+  async listWorkItems(nextToken?: string): Promise<WorkItemPage> {
+    try {
+      const response = await api.get('/work-items', {
+        params: nextToken ? { nextToken } : undefined,
+      });
       return response.data;
     } catch (error) {
       throw new Error(
@@ -218,6 +218,21 @@ export interface WorkItem {
 
 export type WorkItemStatus = 'NOT_STARTED' | 'IN_PROGRESS' | 'COMPLETED' | 'FAILED' | 'PARTIAL';
 
+// One page of the work item listing, newest first. Items only carry the attributes shown in the side navigation.
+export interface WorkItemPage {
+  items: WorkItem[];
+  nextToken?: string;
+}
+
+// Direct upload of a zip archive: every part but the last is partSize bytes, each is sent to its presigned URL
+export interface ArchiveUpload {
+  fileId: string;
+  uploadId: string;
+  partSize: number;
+  parts: Array<{ partNumber: number; url: string }>;
+  expiresAt: string;
+}
+
 export interface WorkItemContent {
   data: string;
   contentType: string;
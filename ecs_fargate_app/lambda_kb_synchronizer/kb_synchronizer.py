@@ -1,4 +1,5 @@
 import csv
+import hashlib
 import json
 import os
 import time
@@ -9,6 +10,148 @@ import boto3
 import requests
 from botocore.exceptions import ClientError
 
+METRICS_NAMESPACE = "WAIaCAnalyzer/KnowledgeBase"
+# Ingestion jobs are awaited while the function has more than this time left
+INGESTION_WAIT_MARGIN_MS = 60000
+INGESTION_POLL_SECONDS = 15
+# Lenses to synchronize, also read by the CDK stack to create a data source per lens prefix
+LENSES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lenses.json")
+# Object metadata holding the SHA-256 of the uploaded content
+CONTENT_HASH_METADATA = "sha256"
+
+
+def put_metrics(dimensions, metrics):
+    """
+    Writes metrics in CloudWatch embedded metric format, extracted from the function logs by CloudWatch
+    """
+    print(
+        json.dumps(
+            {
+                "_aws": {
+                    "Timestamp": int(time.time() * 1000),
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": METRICS_NAMESPACE,
+                            "Dimensions": [list(dimensions)],
+                            "Metrics": [
+                                {"Name": name, "Unit": unit}
+                                for name, (_, unit) in metrics.items()
+                            ],
+                        }
+                    ],
+                },
+                **dimensions,
+                **{name: value for name, (value, _) in metrics.items()},
+            }
+        )
+    )
+
+
+def wait_for_ingestion_job(bedrock_agent, knowledge_base_id, data_source_id, job_id, context):
+    """
+    Waits for the ingestion job to finish and records its duration and statistics.
+    Jobs still running when the function is about to time out are left running without metrics.
+    """
+    while context.get_remaining_time_in_millis() > INGESTION_WAIT_MARGIN_MS:
+        job = bedrock_agent.get_ingestion_job(
+            knowledgeBaseId=knowledge_base_id,
+            dataSourceId=data_source_id,
+            ingestionJobId=job_id,
+        )["ingestionJob"]
+
+        if job["status"] in ("COMPLETE", "FAILED", "STOPPED"):
+            statistics = job.get("statistics", {})
+            print(f"Ingestion job {job_id} finished with status {job['status']}")
+            put_metrics(
+                {"KnowledgeBaseId": knowledge_base_id},
+                {
+                    "IngestionJobDuration": (
+                        (job["updatedAt"] - job["startedAt"]).total_seconds(),
+                        "Seconds",
+                    ),
+                    "IngestionJobFailed": (int(job["status"] != "COMPLETE"), "Count"),
+                    "DocumentsIndexed": (
+                        statistics.get("numberOfNewDocumentsIndexed", 0)
+                        + statistics.get("numberOfModifiedDocumentsIndexed", 0),
+                        "Count",
+                    ),
+                    "DocumentsFailed": (
+                        statistics.get("numberOfDocumentsFailed", 0),
+                        "Count",
+                    ),
+                },
+            )
+            return job["status"]
+
+        time.sleep(INGESTION_POLL_SECONDS)
+
+    print(f"Ingestion job {job_id} still running, not waiting for its completion")
+    return None
+
+
+def data_sources_to_ingest(bedrock_agent, bucket_name, knowledge_base_id, data_source_ids):
+    """
+    Returns the IDs of the data sources never ingested, or with objects modified since the start
+    of their last complete ingestion job. Data sources are keyed by their bucket prefix,
+    an empty prefix covering the whole bucket.
+    """
+    s3_client = boto3.client("s3")
+    paginator = s3_client.get_paginator("list_objects_v2")
+    pending = []
+
+    for prefix, data_source_id in data_source_ids.items():
+        jobs = bedrock_agent.list_ingestion_jobs(
+            knowledgeBaseId=knowledge_base_id,
+            dataSourceId=data_source_id,
+            filters=[{"attribute": "STATUS", "operator": "EQ", "values": ["COMPLETE"]}],
+            sortBy={"attribute": "STARTED_AT", "order": "DESCENDING"},
+            maxResults=1,
+        )["ingestionJobSummaries"]
+        if not jobs:
+            print(f"Data source {data_source_id} ({prefix or 'bucket'}) never ingested")
+            pending.append(data_source_id)
+            continue
+
+        last_ingestion = jobs[0]["startedAt"]
+        pages = paginator.paginate(
+            Bucket=bucket_name, Prefix=f"{prefix}/" if prefix else ""
+        )
+        if any(
+            item["LastModified"] >= last_ingestion
+            for page in pages
+            for item in page.get("Contents", [])
+        ):
+            print(f"Data source {data_source_id} ({prefix or 'bucket'}) has changed documents")
+            pending.append(data_source_id)
+
+    return pending
+
+
+def run_ingestion_jobs(bedrock_agent, knowledge_base_id, data_source_ids, context):
+    """
+    Runs the ingestion jobs of the data sources one after the other, as a knowledge base runs
+    one job at a time. Data sources left when the function is about to time out, or while
+    another job is running, are ingested by a later run.
+    """
+    for data_source_id in data_source_ids:
+        try:
+            response = bedrock_agent.start_ingestion_job(
+                knowledgeBaseId=knowledge_base_id,
+                dataSourceId=data_source_id,
+            )
+        except ClientError as e:
+            print(f"Error starting ingestion job for data source {data_source_id}: {e}")
+            if e.response["Error"]["Code"] == "ConflictException":
+                return
+            continue
+
+        job_id = response["ingestionJob"]["ingestionJobId"]
+        print(f"Started ingestion job {job_id} for data source {data_source_id}")
+        if wait_for_ingestion_job(
+            bedrock_agent, knowledge_base_id, data_source_id, job_id, context
+        ) is None:
+            return
+
 
 def download_file(url):
     response = requests.get(url)
@@ -36,10 +179,32 @@ def create_metadata_json(lens_name, lens_arn, pillar_name=None):
 
 
 def upload_to_s3(bucket_name, file_name, file_content, prefix=""):
+    """
+    Uploads the file unless the object already has the same content, so the last modified date
+    of the objects tells which data sources have changed documents to ingest
+    """
     s3_client = boto3.client("s3")
     key = f"{prefix}/{file_name}" if prefix else file_name
+    if isinstance(file_content, str):
+        file_content = file_content.encode("utf-8")
+    content_hash = hashlib.sha256(file_content).hexdigest()
+
     try:
-        s3_client.put_object(Bucket=bucket_name, Key=key, Body=file_content)
+        try:
+            existing = s3_client.head_object(Bucket=bucket_name, Key=key)
+            if existing.get("Metadata", {}).get(CONTENT_HASH_METADATA) == content_hash:
+                print(f"File {key} unchanged")
+                return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("404", "NoSuchKey", "NotFound"):
+                raise
+
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=key,
+            Body=file_content,
+            Metadata={CONTENT_HASH_METADATA: content_hash},
+        )
         print(f"File {key} uploaded successfully")
         return True
     except ClientError as e:
@@ -306,183 +471,97 @@ def process_lens(bucket_name, workload_id, lens_data, is_primary_lens=False):
         return False
 
 
+def refresh_standby_data_sources(
+    bedrock_agent, bucket_name, knowledge_base_id, parameter_name, context
+):
+    """
+    Blue/green ingestion: the backend only retrieves from the data sources of the active color,
+    named by the parameter. When they miss changed documents, the data sources of the idle color
+    are ingested instead, and the parameter is flipped once they are all up to date, so retrievals
+    never query a partially ingested index.
+    """
+    ssm_client = boto3.client("ssm")
+    colors = {
+        "blue": json.loads(os.environ["DATA_SOURCE_IDS"]),
+        "green": json.loads(os.environ["GREEN_DATA_SOURCE_IDS"]),
+    }
+    active = ssm_client.get_parameter(Name=parameter_name)["Parameter"]["Value"]
+    idle = "blue" if active == "green" else "green"
+
+    if not data_sources_to_ingest(
+        bedrock_agent, bucket_name, knowledge_base_id, colors[active]
+    ):
+        print(f"Active {active} data sources up to date, skipping ingestion")
+        return
+
+    run_ingestion_jobs(
+        bedrock_agent,
+        knowledge_base_id,
+        data_sources_to_ingest(bedrock_agent, bucket_name, knowledge_base_id, colors[idle]),
+        context,
+    )
+    # Jobs left running, not started or failed are retried by a later run before flipping
+    if data_sources_to_ingest(
+        bedrock_agent, bucket_name, knowledge_base_id, colors[idle]
+    ):
+        print(f"The {idle} data sources are not up to date yet, {active} stays active")
+        return
+
+    ssm_client.put_parameter(Name=parameter_name, Value=idle, Overwrite=True)
+    print(f"Retrievals switched from the {active} to the {idle} data sources")
+    put_metrics(
+        {"KnowledgeBaseId": knowledge_base_id},
+        {"DataSourceSwitches": (1, "Count")},
+    )
+
+
+def run_pending_ingestions(bucket_name, context):
+    """
+    Starts the ingestion jobs of the data sources with changed documents
+    """
+    knowledge_base_id = os.environ["KNOWLEDGE_BASE_ID"]
+    bedrock_agent = boto3.client("bedrock-agent")
+    try:
+        parameter_name = os.environ.get("ACTIVE_COLOR_PARAMETER")
+        if parameter_name:
+            refresh_standby_data_sources(
+                bedrock_agent, bucket_name, knowledge_base_id, parameter_name, context
+            )
+            return
+
+        pending = data_sources_to_ingest(
+            bedrock_agent,
+            bucket_name,
+            knowledge_base_id,
+            json.loads(os.environ["DATA_SOURCE_IDS"]),
+        )
+        if not pending:
+            print("No changed documents, skipping ingestion")
+            return
+        run_ingestion_jobs(bedrock_agent, knowledge_base_id, pending, context)
+    except Exception as e:
+        print(f"Error running ingestion jobs: {e}")
+
+
 def handler(event, context):
+    start_time = time.time()
     bucket_name = os.environ["WA_DOCS_BUCKET_NAME"]
     workload_id = os.environ.get("WORKLOAD_ID")
 
-    # Define primary Well-Architected lens files
-    wellarchitected_files = [
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/cost-optimization-pillar/wellarchitected-cost-optimization-pillar.pdf",
-            "pdfName": "wellarchitected-cost-optimization-pillar.pdf",
-            "lensName": "Well-Architected Framework",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/wellarchitected",
-            "lensDescription": "AWS Well-Architected helps cloud architects build secure, high-performing, resilient, and efficient infrastructure for a variety of applications and workloads.",
-            "pillarName": "Cost Optimization",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/operational-excellence-pillar/wellarchitected-operational-excellence-pillar.pdf",
-            "pdfName": "wellarchitected-operational-excellence-pillar.pdf",
-            "lensName": "Well-Architected Framework",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/wellarchitected",
-            "lensDescription": "AWS Well-Architected helps cloud architects build secure, high-performing, resilient, and efficient infrastructure for a variety of applications and workloads.",
-            "pillarName": "Operational Excellence",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/performance-efficiency-pillar/wellarchitected-performance-efficiency-pillar.pdf",
-            "pdfName": "wellarchitected-performance-efficiency-pillar.pdf",
-            "lensName": "Well-Architected Framework",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/wellarchitected",
-            "lensDescription": "AWS Well-Architected helps cloud architects build secure, high-performing, resilient, and efficient infrastructure for a variety of applications and workloads.",
-            "pillarName": "Performance Efficiency",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/reliability-pillar/wellarchitected-reliability-pillar.pdf",
-            "pdfName": "wellarchitected-reliability-pillar.pdf",
-            "lensName": "Well-Architected Framework",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/wellarchitected",
-            "lensDescription": "AWS Well-Architected helps cloud architects build secure, high-performing, resilient, and efficient infrastructure for a variety of applications and workloads.",
-            "pillarName": "Reliability",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/security-pillar/wellarchitected-security-pillar.pdf",
-            "pdfName": "wellarchitected-security-pillar.pdf",
-            "lensName": "Well-Architected Framework",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/wellarchitected",
-            "lensDescription": "AWS Well-Architected helps cloud architects build secure, high-performing, resilient, and efficient infrastructure for a variety of applications and workloads.",
-            "pillarName": "Security",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/sustainability-pillar/wellarchitected-sustainability-pillar.pdf",
-            "pdfName": "wellarchitected-sustainability-pillar.pdf",
-            "lensName": "Well-Architected Framework",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/wellarchitected",
-            "lensDescription": "AWS Well-Architected helps cloud architects build secure, high-performing, resilient, and efficient infrastructure for a variety of applications and workloads.",
-            "pillarName": "Sustainability",
-        },
-    ]
+    # Scheduled run starting the ingestion jobs left by the last synchronization
+    if (event or {}).get("ingestionOnly"):
+        run_pending_ingestions(bucket_name, context)
+        return {"statusCode": 200, "body": "Ingestion complete"}
 
-    # Define additional lenses
-    additional_lenses = [
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/serverless-applications-lens/wellarchitected-serverless-applications-lens.pdf",
-            "pdfName": "wellarchitected-serverless-applications-lens.pdf",
-            "lensName": "Serverless Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/serverless",
-            "lensDescription": "The AWS Serverless Application Lens provides a set of additional questions for you to consider for your serverless applications.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/healthcare-industry-lens/healthcare-industry-lens.pdf",
-            "pdfName": "healthcare-industry-lens.pdf",
-            "lensName": "Healthcare Industry Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/healthcare",
-            "lensDescription": "Best practices and guidance for how to design, deploy, and manage your healthcare workloads in the AWS Cloud.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/iot-lens/wellarchitected-iot-lens.pdf",
-            "pdfName": "wellarchitected-iot-lens.pdf",
-            "lensName": "IoT Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/iot",
-            "lensDescription": "Best practices for managing your Internet of Things (IoT) workloads in AWS.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/connected-mobility-lens/connected-mobility-lens.pdf",
-            "pdfName": "connected-mobility-lens.pdf",
-            "lensName": "Connected Mobility Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/connectedmobility",
-            "lensDescription": "Best practices for Connected Mobility workload",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/analytics-lens/analytics-lens.pdf",
-            "pdfName": "analytics-lens.pdf",
-            "lensName": "Data Analytics Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/dataanalytics",
-            "lensDescription": "The Data Analytics Lens contains insights that AWS has gathered from real-world case studies, and helps you learn the key design elements of well-architected analytics workloads along with recommendations for improvement. The document is intended for IT architects, developers, and team members who build and operate analytics systems.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/devops-guidance/devops-guidance.pdf",
-            "pdfName": "devops-guidance.pdf",
-            "lensName": "DevOps Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/devops",
-            "lensDescription": "The DevOps Lens for the AWS Well-Architected Framework follows the AWS DevOps Sagas as featured in the Well-Architected DevOps Guidance whitepaper. This lens provides a focused approach to integrating DevOps principles and practices into your organization and AWS workloads.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/mergers-and-acquisitions-lens/mergers-and-acquisitions-lens.pdf",
-            "pdfName": "mergers-and-acquisitions-lens.pdf",
-            "lensName": "Mergers and Acquisitions Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/mavaluecreation",
-            "lensDescription": "The Mergers and Acquisitions Lens provides a set of additional questions to consider when looking for ways to drive company growth, such as for private equity mergers and acquisitions activity.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/sap-lens/sap-lens.pdf",
-            "pdfName": "sap-lens.pdf",
-            "lensName": "SAP Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/sap",
-            "lensDescription": "The SAP Lens for the AWS Well-Architected Framework is a collection of customer-proven design principles and best practices for ensuring SAP workloads on AWS are well-architected. Use this lens as a supplement to the AWS Well-Architected Framework.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/saas-lens/wellarchitected-saas-lens.pdf",
-            "pdfName": "wellarchitected-saas-lens.pdf",
-            "lensName": "SaaS Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/softwareasaservice",
-            "lensDescription": "The AWS SaaS Lens provides a set of additional questions for you to consider for your Software-as-a-Service (SaaS) applications.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/container-build-lens/container-build-lens.pdf",
-            "pdfName": "container-build-lens.pdf",
-            "lensName": "Container Build Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/containerbuild",
-            "lensDescription": "The Container Build Lens will focus specifically on the container design and build process. Topics such as best practices for container orchestration architecture design principals and general best practices in software development are considered out of scope for this lens. These topics are addressed in other AWS publications. See the Resources sections under Pillars of the Well-Architected Framework for more information.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/financial-services-industry-lens/wellarchitected-financial-services-industry-lens.pdf",
-            "pdfName": "wellarchitected-financial-services-industry-lens.pdf",
-            "lensName": "Financial Services Industry Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/financialservices",
-            "lensDescription": "The Financial Services Industry Lens identifies best practices for security, data privacy, and resiliency that are intended to address the requirements of financial institutions based on our experience working with financial institutions worldwide. It provides guidance on guardrails for technology teams to implement and confidently use AWS to build and deploy applications. This Lens describes the process of building transparency and auditability into your AWS environment. It also offers suggestions for controls to help you expedite adoption of new services into your environment while managing the cost of your IT services.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/government-lens/government-lens.pdf",
-            "pdfName": "government-lens.pdf",
-            "lensName": "Government Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/government",
-            "lensDescription": "The Government Lens helps people understand the special context and requirements of government and how to best deliver meaningful service and policy outcomes on AWS. This lens drives architectural qualities that layer government-specific best practices for progressive enhancement as a service design assurance function. For example, government customers can use the new service outcomes chapter to guide design and operating model considerations, as an indicator of readiness for government service launches, and to inform AWS Enterprise Support event management.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/machine-learning-lens/wellarchitected-machine-learning-lens.pdf",
-            "pdfName": "wellarchitected-machine-learning-lens.pdf",
-            "lensName": "Machine Learning Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/machinelearning",
-            "lensDescription": "Best practices for managing your Machine Learning resources/workloads in AWS",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/migration-lens/migration-lens.pdf",
-            "pdfName": "migration-lens.pdf",
-            "lensName": "Migration Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/migration",
-            "lensDescription": "The Migration Lens for the Well-Architected Framework is a collection of customer-proven design principles and best practices that you can apply to your migration program across the three migration phases: Assess, Mobilize, and Migrate.",
-        },
-        {
-            "url": "https://docs.aws.amazon.com/pdfs/wellarchitected/latest/generative-ai-lens/generative-ai-lens.pdf",
-            "pdfName": "generative-ai-lens.pdf",
-            "lensName": "Generative AI Lens",
-            "lensArn": "arn:aws:wellarchitected::aws:lens/genai",
-            "lensDescription": "The Generative AI Lens provides comprehensive guidance for designing, deploying, and operating generative AI applications on AWS. It extends the Well-Architected Framework to address unique considerations when using foundation models across all pillars: operational excellence, security, reliability, performance efficiency, cost optimization, and sustainability. The lens emphasizes responsible AI practices throughout the generative AI lifecycle, helping you create secure, reliable, and cost-effective solutions with Amazon Bedrock and SageMaker AI.",
-        },
-    ]
+    with open(LENSES_FILE) as lenses_file:
+        lenses = json.load(lenses_file)
+    wellarchitected_lens = lenses["wellarchitectedLens"]
+    wellarchitected_files = lenses["wellarchitectedFiles"]
+    additional_lenses = lenses["additionalLenses"]
 
     # Process primary Well-Architected lens first
     print("Processing primary Well-Architected Framework lens")
 
-    # Process the main well-architected lens
-    wellarchitected_lens = {
-        "url": "multiple PDFs",
-        "pdfName": "multiple PDFs",
-        "lensName": "Well-Architected Framework",
-        "lensArn": "arn:aws:wellarchitected::aws:lens/wellarchitected",
-        "lensDescription": "AWS Well-Architected helps cloud architects build secure, high-performing, resilient, and efficient infrastructure.",
-    }
-
     # Process primary WA lens PDFs
     for file_data in wellarchitected_files:
         try:
@@ -518,15 +597,15 @@ def handler(event, context):
         # Process this lens
         process_lens(bucket_name, workload_id, lens, is_primary_lens=False)
 
-    # After all lenses are processed, start the ingestion job
-    bedrock_agent = boto3.client("bedrock-agent")
-    try:
-        response = bedrock_agent.start_ingestion_job(
-            knowledgeBaseId=os.environ["KNOWLEDGE_BASE_ID"],
-            dataSourceId=os.environ["DATA_SOURCE_ID"],
-        )
-        print(f"Started ingestion job: {response['ingestionJob']['ingestionJobId']}")
-    except Exception as e:
-        print(f"Error starting ingestion job: {e}")
+    put_metrics(
+        {"KnowledgeBaseId": os.environ["KNOWLEDGE_BASE_ID"]},
+        {
+            "SynchronizerDuration": (time.time() - start_time, "Seconds"),
+            "LensesSynchronized": (len(additional_lenses) + 1, "Count"),
+        },
+    )
+
+    # After all lenses are processed, ingest the data sources with changed documents
+    run_pending_ingestions(bucket_name, context)
 
     return {"statusCode": 200, "body": "Processing complete"}
@@ -1,5 +1,10 @@
+import json
 import logging
+import math
 import os
+import tempfile
+import time
+from datetime import datetime, timezone
 
 import boto3
 from botocore.exceptions import ClientError
@@ -8,13 +13,58 @@ from botocore.exceptions import ClientError
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Attributes that hold a single value in the old format and a per-lens map in the new one
+ATTRIBUTES_TO_CONVERT = [
+    "analysisStatus",
+    "analysisProgress",
+    "analysisError",
+    "analysisPartialResults",
+    "iacGenerationStatus",
+    "iacGenerationProgress",
+    "iacGenerationError",
+    "iacGeneratedFileType",
+    "iacPartialResults",
+    "supportingDocumentAdded",
+    "supportingDocumentDescription",
+    "supportingDocumentId",
+    "supportingDocumentName",
+    "supportingDocumentType",
+]
+
+# Prefix (in the analysis storage bucket by default) where planning manifests are written
+MANIFEST_PREFIX = "_migration/manifests"
+
+# S3 key (in the analysis storage bucket) holding the background sweeper cursor
+SWEEP_STATE_KEY = "_migration/sweep_state.json"
+
+# Stop sweeping when less than this much Lambda time is left, so the cursor can be saved
+SWEEP_SAFETY_MARGIN_MS = 60_000
+
+# Number of items/objects probed with read-only calls to measure per-request latency
+LATENCY_SAMPLE_SIZE = int(os.environ.get("PLAN_LATENCY_SAMPLE_SIZE", "20"))
+
+# Request prices (USD, us-east-1 on-demand list prices) used for the cost estimate
+DYNAMODB_WRITE_REQUEST_UNIT_PRICE = 1.25 / 1_000_000
+DYNAMODB_READ_REQUEST_UNIT_PRICE = 0.25 / 1_000_000
+S3_PUT_COPY_LIST_REQUEST_PRICE = 0.005 / 1_000
+S3_GET_HEAD_REQUEST_PRICE = 0.0004 / 1_000
+
 
 def handler(event, context):
     """
     The new multi-lenses support introduced on 14-April-2025 is a breaking change. This function is meant to support a seamless transition from previous single-lens (wellarchitected) storage structure to the new multi-lens structure.
     Lambda function to migrate storage structure from single-lens to multi-lens format. The Lambda will only run at cdk deployment time once and only for deployments where the old single-lens structure is detected.
+
+    Supported event fields:
+      - "mode": "migrate" (default) or "plan". Plan mode is read-only: it streams the table and the bucket,
+        writes a NDJSON manifest of every item update and key move to S3 and returns counts and estimates.
+      - "manifestKey" / "manifestBucket": when set in migrate mode, the migration replays the given manifest
+        instead of re-scanning the table and the bucket.
+      - "mode": "repair" with "userId" and "fileId" converts a single work item and its S3 keys (read-repair).
+      - "mode": "sweep" converts the cold tail incrementally, resuming from the cursor saved by the previous run.
     """
     logger.info(f"Starting migration check with event: {event}")
+    event = event or {}
 
     # Initialize clients
     dynamodb = boto3.client("dynamodb")
@@ -29,7 +79,69 @@ def handler(event, context):
         logger.error("Missing required environment variables")
         return {"statusCode": 500, "body": "Missing required environment variables"}
 
+    mode = event.get("mode", "migrate")
+
     try:
+        if mode == "plan":
+            manifest_bucket = event.get("manifestBucket", analysis_storage_bucket)
+            summary = plan_migration(
+                dynamodb,
+                s3,
+                analysis_metadata_table,
+                analysis_storage_bucket,
+                manifest_bucket,
+            )
+            return {"statusCode": 200, "body": json.dumps(summary)}
+
+        if mode == "repair":
+            if not event.get("userId") or not event.get("fileId"):
+                return {"statusCode": 400, "body": "userId and fileId are required"}
+            repaired = repair_work_item(
+                dynamodb,
+                s3,
+                analysis_metadata_table,
+                analysis_storage_bucket,
+                event["userId"],
+                event["fileId"],
+            )
+            return {"statusCode": 200, "body": json.dumps(repaired)}
+
+        if mode == "sweep":
+            state = load_sweep_state(s3, analysis_storage_bucket)
+            # The schedule keeps firing after the sweep completed, later runs have nothing left to do
+            if state["phase"] == "done":
+                logger.info("Sweep already completed, skipping")
+                return {"statusCode": 200, "body": json.dumps(state)}
+
+            state = sweep_legacy_records(
+                dynamodb, s3, analysis_metadata_table, analysis_storage_bucket, context, state
+            )
+            if state["phase"] == "done":
+                cleanup_wa_docs_bucket(s3, wa_docs_bucket)
+            return {"statusCode": 200, "body": json.dumps(state)}
+
+        if mode != "migrate":
+            return {"statusCode": 400, "body": f"Unsupported mode: {mode}"}
+
+        if event.get("manifestKey"):
+            manifest_bucket = event.get("manifestBucket", analysis_storage_bucket)
+            logger.info(
+                f"Applying migration manifest s3://{manifest_bucket}/{event['manifestKey']}"
+            )
+            counts = apply_manifest(
+                dynamodb,
+                s3,
+                analysis_metadata_table,
+                analysis_storage_bucket,
+                manifest_bucket,
+                event["manifestKey"],
+            )
+            cleanup_wa_docs_bucket(s3, wa_docs_bucket)
+            return {
+                "statusCode": 200,
+                "body": f"Migration manifest applied successfully: {json.dumps(counts)}",
+            }
+
         # Step 1: Scan the DynamoDB table and check if migration is needed
         need_migration = check_migration_needed(dynamodb, analysis_metadata_table)
 
@@ -86,286 +198,525 @@ def check_migration_needed(dynamodb, table_name):
     return True
 
 
-def update_dynamodb_items(dynamodb, table_name):
+def iter_table_items(dynamodb, table_name, latencies=None, start_key=None):
     """
-    Updates all DynamoDB items to the new multi-lens format
+    Yields every item of the DynamoDB table, one scan page at a time
     """
-    # Get all items from the table
-    items = []
-    last_evaluated_key = None
+    last_evaluated_key = start_key
 
     while True:
+        params = {"TableName": table_name}
         if last_evaluated_key:
-            response = dynamodb.scan(
-                TableName=table_name, ExclusiveStartKey=last_evaluated_key
-            )
-        else:
-            response = dynamodb.scan(TableName=table_name)
+            params["ExclusiveStartKey"] = last_evaluated_key
+
+        response = timed_call(latencies, "scan", dynamodb.scan, **params)
 
-        items.extend(response.get("Items", []))
+        yield from response.get("Items", [])
         last_evaluated_key = response.get("LastEvaluatedKey")
 
         if not last_evaluated_key:
             break
 
-    logger.info(f"Found {len(items)} items to migrate in DynamoDB")
 
-    # Update each item
-    for item in items:
-        user_id = item["userId"]
-        file_id = item["fileId"]
-
-        # Prepare the update expression
-        update_expression = "SET "
-        expression_attribute_values = {}
-        expression_attribute_names = {}
-
-        # Add usedLenses attribute
-        update_expression += "#usedLenses = :usedLenses, "
-        expression_attribute_names["#usedLenses"] = "usedLenses"
-        expression_attribute_values[":usedLenses"] = {
-            "L": [
-                {
-                    "M": {
-                        "lensAlias": {"S": "wellarchitected"},
-                        "lensName": {"S": "Well-Architected Framework"},
-                        "lensAliasArn": {
-                            "S": "arn:aws:wellarchitected::aws:lens/wellarchitected"
-                        },
-                    }
-                }
-            ]
-        }
+def iter_bucket_objects(s3, bucket_name, latencies=None, prefix=None, start_after=None):
+    """
+    Yields every object summary of the S3 bucket, one listing page at a time
+    """
+    continuation_token = None
+
+    while True:
+        params = {"Bucket": bucket_name}
+        if prefix:
+            params["Prefix"] = prefix
+        if start_after:
+            params["StartAfter"] = start_after
+        if continuation_token:
+            params["ContinuationToken"] = continuation_token
+
+        response = timed_call(latencies, "list_objects_v2", s3.list_objects_v2, **params)
 
-        # Convert single values to maps with wellarchitected key
-        attributes_to_convert = [
-            "analysisStatus",
-            "analysisProgress",
-            "analysisError",
-            "analysisPartialResults",
-            "iacGenerationStatus",
-            "iacGenerationProgress",
-            "iacGenerationError",
-            "iacGeneratedFileType",
-            "iacPartialResults",
-            "supportingDocumentAdded",
-            "supportingDocumentDescription",
-            "supportingDocumentId",
-            "supportingDocumentName",
-            "supportingDocumentType",
+        yield from response.get("Contents", [])
+
+        if not response.get("IsTruncated"):
+            break
+        continuation_token = response.get("NextContinuationToken")
+
+
+def build_item_update(item):
+    """
+    Builds the update_item parameters converting an old-format item to the multi-lens format.
+    Returns None if the item is already in the multi-lens format.
+    """
+    if "usedLenses" in item:
+        return None
+
+    set_clauses = []
+    expression_attribute_values = {}
+    expression_attribute_names = {}
+
+    # Add usedLenses attribute
+    set_clauses.append("#usedLenses = :usedLenses")
+    expression_attribute_names["#usedLenses"] = "usedLenses"
+    expression_attribute_values[":usedLenses"] = {
+        "L": [
+            {
+                "M": {
+                    "lensAlias": {"S": "wellarchitected"},
+                    "lensName": {"S": "Well-Architected Framework"},
+                    "lensAliasArn": {
+                        "S": "arn:aws:wellarchitected::aws:lens/wellarchitected"
+                    },
+                }
+            }
         ]
+    }
 
-        for attr in attributes_to_convert:
-            if attr in item:
-                update_expression += f"#{attr} = :{attr}, "
+    # Convert single values to maps with wellarchitected key
+    for attr in ATTRIBUTES_TO_CONVERT:
+        if attr not in item:
+            continue
+
+        # Different handling based on attribute type
+        for value_type in ("N", "S", "BOOL"):
+            if value_type in item[attr]:
+                set_clauses.append(f"#{attr} = :{attr}")
                 expression_attribute_names[f"#{attr}"] = attr
+                expression_attribute_values[f":{attr}"] = {
+                    "M": {"wellarchitected": {value_type: item[attr][value_type]}}
+                }
+                break
 
-                # Different handling based on attribute type
-                if "N" in item[attr]:  # Number
-                    expression_attribute_values[f":{attr}"] = {
-                        "M": {"wellarchitected": {"N": item[attr]["N"]}}
-                    }
-                elif "S" in item[attr]:  # String
-                    expression_attribute_values[f":{attr}"] = {
-                        "M": {"wellarchitected": {"S": item[attr]["S"]}}
-                    }
-                elif "BOOL" in item[attr]:  # Boolean
-                    expression_attribute_values[f":{attr}"] = {
-                        "M": {"wellarchitected": {"BOOL": item[attr]["BOOL"]}}
-                    }
+    update_expression = "SET " + ", ".join(set_clauses)
 
-        # Add workloadIds if there is a workloadId
-        if "workloadId" in item:
-            update_expression += "#workloadIds = :workloadIds, "
-            expression_attribute_names["#workloadIds"] = "workloadIds"
-            expression_attribute_values[":workloadIds"] = {
-                "M": {
-                    "wellarchitected": {
-                        "M": {
-                            "id": {"S": item["workloadId"]["S"]},
-                            "protected": {"BOOL": True},
-                        }
+    # Add workloadIds if there is a workloadId
+    if "workloadId" in item:
+        expression_attribute_names["#workloadIds"] = "workloadIds"
+        expression_attribute_values[":workloadIds"] = {
+            "M": {
+                "wellarchitected": {
+                    "M": {
+                        "id": {"S": item["workloadId"]["S"]},
+                        "protected": {"BOOL": True},
                     }
                 }
             }
+        }
+        update_expression += ", #workloadIds = :workloadIds REMOVE workloadId"
 
-            # Remove workloadId
-            update_expression += "REMOVE workloadId"
-        else:
-            # Remove trailing comma and space
-            update_expression = update_expression[:-2]
+    return {
+        "Key": {"userId": item["userId"], "fileId": item["fileId"]},
+        "UpdateExpression": update_expression,
+        "ExpressionAttributeNames": expression_attribute_names,
+        "ExpressionAttributeValues": expression_attribute_values,
+    }
 
-        try:
-            # Update the item
-            dynamodb.update_item(
-                TableName=table_name,
-                Key={"userId": user_id, "fileId": file_id},
-                UpdateExpression=update_expression,
-                ExpressionAttributeNames=expression_attribute_names,
-                ExpressionAttributeValues=expression_attribute_values,
-            )
+
+def apply_item_update(dynamodb, table_name, update):
+    """
+    Applies an update built by build_item_update. Returns True on success, None when the
+    update has a condition that no longer holds, and False on failure.
+    """
+    user_id = update["Key"]["userId"]["S"]
+    file_id = update["Key"]["fileId"]["S"]
+
+    try:
+        dynamodb.update_item(TableName=table_name, **update)
+        logger.info(f"Updated item for userId={user_id}, fileId={file_id}")
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
             logger.info(
-                f"Updated item for userId={user_id['S']}, fileId={file_id['S']}"
+                f"Skipped item for userId={user_id}, fileId={file_id}: already converted or deleted"
+            )
+            return None
+        logger.error(
+            f"Error updating item for userId={user_id}, fileId={file_id}: {str(e)}"
+        )
+        return False
+    except Exception as e:
+        logger.error(
+            f"Error updating item for userId={user_id}, fileId={file_id}: {str(e)}"
+        )
+        return False
+
+
+def update_dynamodb_items(dynamodb, table_name):
+    """
+    Updates all DynamoDB items to the new multi-lens format
+    """
+    updated = 0
+
+    for item in iter_table_items(dynamodb, table_name):
+        update = build_item_update(item)
+        if update and apply_item_update(dynamodb, table_name, update):
+            updated += 1
+
+    logger.info(f"Migrated {updated} items in DynamoDB")
+
+
+def plan_key_move(key):
+    """
+    Returns (new_key, kind) if the object key uses the old single-lens structure, None otherwise
+    """
+    parts = key.split("/")
+
+    # Only process objects with at least userId/fileId structure
+    if len(parts) < 2:
+        return None
+
+    # Check for old structure paths
+    if key.endswith("/analysis/analysis_results.json"):
+        new_key = key.replace(
+            "/analysis/analysis_results.json",
+            "/analysis/wellarchitected/analysis_results.json",
+        )
+        return new_key, "analysis results"
+
+    if (
+        "/iac_templates/generated_template." in key
+        and "/iac_templates/wellarchitected/" not in key
+    ):
+        # Extract the extension
+        if ".generated_template." in key:
+            ext = key.split(".generated_template.")[1]
+            new_key = key.replace(
+                f".generated_template.{ext}",
+                f".wellarchitected/generated_template.{ext}",
+            )
+        else:
+            ext = key.split("generated_template.")[1]
+            new_key = key.replace(
+                f"/iac_templates/generated_template.{ext}",
+                f"/iac_templates/wellarchitected/generated_template.{ext}",
             )
-        except Exception as e:
-            logger.error(
-                f"Error updating item for userId={user_id['S']}, fileId={file_id['S']}: {str(e)}"
+        return new_key, "IaC template"
+
+    if (
+        "/supporting_documents/" in key
+        and "/supporting_documents/wellarchitected/" not in key
+    ):
+        # Check if this is not a metadata file and is directly under supporting_documents/
+        if len(parts) >= 4 and parts[-2] == "supporting_documents":
+            doc_id = parts[-1]
+            new_key = key.replace(
+                f"/supporting_documents/{doc_id}",
+                f"/supporting_documents/wellarchitected/{doc_id}",
             )
+            return new_key, "supporting document"
+
+    return None
+
+
+def apply_key_move(s3, bucket_name, old_key, new_key, kind="object"):
+    """
+    Moves an object to its new key (copy then delete). Returns True on success.
+    """
+    logger.info(f"Migrating {kind}: {old_key} -> {new_key}")
+
+    try:
+        # Copy to new location
+        s3.copy_object(
+            Bucket=bucket_name,
+            CopySource={"Bucket": bucket_name, "Key": old_key},
+            Key=new_key,
+        )
+
+        # Delete old object
+        s3.delete_object(Bucket=bucket_name, Key=old_key)
+        logger.info(f"Successfully migrated {kind}: {old_key}")
+        return True
+    except Exception as e:
+        logger.error(f"Error migrating {kind} {old_key}: {str(e)}")
+        return False
 
 
 def migrate_s3_objects(s3, bucket_name):
     """
     Migrates S3 objects from the old structure to the new multi-lens structure
     """
-    # List all objects in the bucket
-    all_objects = []
-    continuation_token = None
+    moved = 0
 
-    while True:
-        if continuation_token:
-            response = s3.list_objects_v2(
-                Bucket=bucket_name, ContinuationToken=continuation_token
+    for obj in iter_bucket_objects(s3, bucket_name):
+        move = plan_key_move(obj["Key"])
+        if move and apply_key_move(s3, bucket_name, obj["Key"], *move):
+            moved += 1
+
+    logger.info(f"Migrated {moved} objects in S3 bucket {bucket_name}")
+
+
+def timed_call(latencies, name, fn, **kwargs):
+    """
+    Calls fn(**kwargs), recording its wall time in seconds under latencies[name] when latencies is set
+    """
+    start = time.perf_counter()
+    try:
+        return fn(**kwargs)
+    finally:
+        if latencies is not None:
+            latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def average(values, default=0.0):
+    return sum(values) / len(values) if values else default
+
+
+def plan_migration(dynamodb, s3, table_name, bucket_name, manifest_bucket):
+    """
+    Read-only planning run. Streams the table and the bucket, writes a NDJSON manifest with one
+    "item_update" or "key_move" record per line and returns counts, bytes to copy and estimates.
+    """
+    latencies = {}
+    item_updates = 0
+    item_write_units = 0
+    items_scanned = 0
+    key_moves = 0
+    bytes_to_copy = 0
+    objects_listed = 0
+    item_samples = []
+    key_samples = []
+
+    manifest_key = (
+        f"{MANIFEST_PREFIX}/{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.ndjson"
+    )
+
+    with tempfile.NamedTemporaryFile("w+", suffix=".ndjson", delete=False) as manifest:
+        for item in iter_table_items(dynamodb, table_name, latencies):
+            items_scanned += 1
+            update = build_item_update(item)
+            if not update:
+                continue
+
+            item_updates += 1
+            # One write request unit per started KB of the item
+            item_write_units += max(1, math.ceil(len(json.dumps(item)) / 1024))
+            if len(item_samples) < LATENCY_SAMPLE_SIZE:
+                item_samples.append(update["Key"])
+            manifest.write(json.dumps({"type": "item_update", **update}) + "\n")
+
+        for obj in iter_bucket_objects(s3, bucket_name, latencies):
+            objects_listed += 1
+            move = plan_key_move(obj["Key"])
+            if not move:
+                continue
+
+            new_key, kind = move
+            key_moves += 1
+            bytes_to_copy += obj.get("Size", 0)
+            if len(key_samples) < LATENCY_SAMPLE_SIZE:
+                key_samples.append(obj["Key"])
+            manifest.write(
+                json.dumps(
+                    {
+                        "type": "key_move",
+                        "sourceKey": obj["Key"],
+                        "destinationKey": new_key,
+                        "kind": kind,
+                        "size": obj.get("Size", 0),
+                    }
+                )
+                + "\n"
             )
+
+        manifest_path = manifest.name
+
+    # Probe the per-request round trip on the records to migrate with read-only calls
+    for key in item_samples:
+        timed_call(
+            latencies, "get_item", dynamodb.get_item, TableName=table_name, Key=key
+        )
+    for key in key_samples:
+        timed_call(latencies, "head_object", s3.head_object, Bucket=bucket_name, Key=key)
+
+    try:
+        s3.upload_file(manifest_path, manifest_bucket, manifest_key)
+    finally:
+        os.remove(manifest_path)
+
+    item_round_trip = average(latencies.get("get_item", []))
+    object_round_trip = average(latencies.get("head_object", []))
+
+    # The migration runs sequentially: one update_item per item, one copy_object and one delete_object per key
+    estimated_seconds = item_updates * item_round_trip + key_moves * 2 * object_round_trip
+    estimated_cost = (
+        item_write_units * DYNAMODB_WRITE_REQUEST_UNIT_PRICE
+        + item_updates * DYNAMODB_READ_REQUEST_UNIT_PRICE
+        + key_moves * S3_PUT_COPY_LIST_REQUEST_PRICE
+        + len(latencies.get("list_objects_v2", [])) * S3_PUT_COPY_LIST_REQUEST_PRICE
+    )
+
+    summary = {
+        "manifest": f"s3://{manifest_bucket}/{manifest_key}",
+        "manifestBucket": manifest_bucket,
+        "manifestKey": manifest_key,
+        "itemsScanned": items_scanned,
+        "itemUpdates": item_updates,
+        "objectsListed": objects_listed,
+        "keyMoves": key_moves,
+        "bytesToCopy": bytes_to_copy,
+        "measuredLatencyMs": {
+            name: round(average(values) * 1000, 2) for name, values in latencies.items()
+        },
+        "estimatedSeconds": round(estimated_seconds, 1),
+        "estimatedRequestCostUsd": round(estimated_cost, 6),
+    }
+
+    s3.put_object(
+        Bucket=manifest_bucket,
+        Key=manifest_key.replace(".ndjson", ".summary.json"),
+        Body=json.dumps(summary, indent=2),
+        ContentType="application/json",
+    )
+
+    logger.info(f"Migration plan: {json.dumps(summary)}")
+    return summary
+
+
+def iter_manifest(s3, manifest_bucket, manifest_key):
+    """
+    Yields the records of a NDJSON manifest written by plan_migration, streaming it from S3
+    """
+    body = s3.get_object(Bucket=manifest_bucket, Key=manifest_key)["Body"]
+
+    for line in body.iter_lines():
+        if line.strip():
+            yield json.loads(line)
+
+
+def apply_manifest(dynamodb, s3, table_name, bucket_name, manifest_bucket, manifest_key):
+    """
+    Executes every record of a planning manifest. Returns the number of applied, skipped and failed records.
+    """
+    counts = {"itemUpdates": 0, "keyMoves": 0, "skipped": 0, "failed": 0}
+
+    for record in iter_manifest(s3, manifest_bucket, manifest_key):
+        record_type = record.pop("type", None)
+
+        if record_type == "item_update":
+            # Values were computed at planning time: skip items deleted or converted since then
+            # rather than overwriting newer values or recreating deleted items
+            record["ConditionExpression"] = (
+                "attribute_exists(fileId) AND attribute_not_exists(usedLenses)"
+            )
+            succeeded = apply_item_update(dynamodb, table_name, record)
+            if succeeded is None:
+                counts["skipped"] += 1
+                continue
+            counts["itemUpdates"] += int(succeeded)
+        elif record_type == "key_move":
+            succeeded = apply_key_move(
+                s3,
+                bucket_name,
+                record["sourceKey"],
+                record["destinationKey"],
+                record.get("kind", "object"),
+            )
+            counts["keyMoves"] += int(succeeded)
         else:
-            response = s3.list_objects_v2(Bucket=bucket_name)
+            logger.error(f"Unknown manifest record type: {record_type}")
+            succeeded = False
 
-        if "Contents" in response:
-            all_objects.extend(response.get("Contents", []))
+        if not succeeded:
+            counts["failed"] += 1
+
+    logger.info(f"Applied migration manifest: {json.dumps(counts)}")
+    return counts
 
-        if not response.get("IsTruncated"):
-            break
-        continuation_token = response.get("NextContinuationToken")
 
-    logger.info(f"Found {len(all_objects)} objects in S3 bucket {bucket_name}")
-
-    # Group objects by userId/fileId
-    grouped_objects = {}
-    for obj in all_objects:
-        key = obj["Key"]
-        parts = key.split("/")
-
-        # Only process objects with at least userId/fileId structure
-        if len(parts) >= 2:
-            user_id = parts[0]
-            file_id = parts[1]
-            group_key = f"{user_id}/{file_id}"
-
-            if group_key not in grouped_objects:
-                grouped_objects[group_key] = []
-
-            grouped_objects[group_key].append(obj)
-
-    # Process each group
-    for prefix, objects in grouped_objects.items():
-        # Find objects that need to be migrated
-        analysis_results = None
-        iac_templates = None
-        supporting_docs = []
-
-        for obj in objects:
-            key = obj["Key"]
-
-            # Check for old structure paths
-            if key.endswith("/analysis/analysis_results.json"):
-                analysis_results = obj
-            elif (
-                "/iac_templates/generated_template." in key
-                and "/iac_templates/wellarchitected/" not in key
-            ):
-                iac_templates = obj
-            elif (
-                "/supporting_documents/" in key
-                and "/supporting_documents/wellarchitected/" not in key
-            ):
-                # Check if this is not a metadata file and is directly under supporting_documents/
-                parts = key.split("/")
-                if len(parts) >= 4 and parts[-2] == "supporting_documents":
-                    supporting_docs.append(obj)
-
-        # Migrate analysis results
-        if analysis_results:
-            old_key = analysis_results["Key"]
-            new_key = old_key.replace(
-                "/analysis/analysis_results.json",
-                "/analysis/wellarchitected/analysis_results.json",
+def repair_work_item(dynamodb, s3, table_name, bucket_name, user_id, file_id):
+    """
+    Converts a single work item and the S3 objects under its prefix to the multi-lens format.
+    Safe to call on records that are already converted.
+    """
+    repaired = {"itemUpdated": False, "keysMoved": 0}
+
+    response = dynamodb.get_item(
+        TableName=table_name,
+        Key={"userId": {"S": user_id}, "fileId": {"S": file_id}},
+    )
+    item = response.get("Item")
+
+    if item:
+        update = build_item_update(item)
+        if update:
+            # Only convert records still in the old format, in case a concurrent reader got there first
+            update["ConditionExpression"] = "attribute_not_exists(usedLenses)"
+            repaired["itemUpdated"] = bool(
+                apply_item_update(dynamodb, table_name, update)
             )
-            logger.info(f"Migrating analysis results: {old_key} -> {new_key}")
-
-            try:
-                # Copy to new location
-                s3.copy_object(
-                    Bucket=bucket_name,
-                    CopySource={"Bucket": bucket_name, "Key": old_key},
-                    Key=new_key,
-                )
 
-                # Delete old object
-                s3.delete_object(Bucket=bucket_name, Key=old_key)
-                logger.info(f"Successfully migrated analysis results: {old_key}")
-            except Exception as e:
-                logger.error(f"Error migrating analysis results {old_key}: {str(e)}")
-
-        # Migrate IaC templates
-        if iac_templates:
-            old_key = iac_templates["Key"]
-            # Extract the extension
-            if ".generated_template." in old_key:
-                ext = old_key.split(".generated_template.")[1]
-                new_key = old_key.replace(
-                    f".generated_template.{ext}",
-                    f".wellarchitected/generated_template.{ext}",
-                )
-            else:
-                ext = old_key.split("generated_template.")[1]
-                new_key = old_key.replace(
-                    f"/iac_templates/generated_template.{ext}",
-                    f"/iac_templates/wellarchitected/generated_template.{ext}",
-                )
+    for obj in iter_bucket_objects(s3, bucket_name, prefix=f"{user_id}/{file_id}/"):
+        move = plan_key_move(obj["Key"])
+        if move and apply_key_move(s3, bucket_name, obj["Key"], *move):
+            repaired["keysMoved"] += 1
 
-            logger.info(f"Migrating IaC template: {old_key} -> {new_key}")
+    return repaired
 
-            try:
-                # Copy to new location
-                s3.copy_object(
-                    Bucket=bucket_name,
-                    CopySource={"Bucket": bucket_name, "Key": old_key},
-                    Key=new_key,
-                )
 
-                # Delete old object
-                s3.delete_object(Bucket=bucket_name, Key=old_key)
-                logger.info(f"Successfully migrated IaC template: {old_key}")
-            except Exception as e:
-                logger.error(f"Error migrating IaC template {old_key}: {str(e)}")
-
-        # Migrate supporting documents
-        for doc in supporting_docs:
-            old_key = doc["Key"]
-            # Extract doc ID from the path
-            parts = old_key.split("/")
-            if len(parts) >= 4:
-                doc_id = parts[-1]
-                new_key = old_key.replace(
-                    f"/supporting_documents/{doc_id}",
-                    f"/supporting_documents/wellarchitected/{doc_id}",
-                )
-                logger.info(f"Migrating supporting document: {old_key} -> {new_key}")
-
-                try:
-                    # Copy to new location
-                    s3.copy_object(
-                        Bucket=bucket_name,
-                        CopySource={"Bucket": bucket_name, "Key": old_key},
-                        Key=new_key,
-                    )
-
-                    # Delete old object
-                    s3.delete_object(Bucket=bucket_name, Key=old_key)
-                    logger.info(f"Successfully migrated supporting document: {old_key}")
-                except Exception as e:
-                    logger.error(
-                        f"Error migrating supporting document {old_key}: {str(e)}"
-                    )
+def load_sweep_state(s3, bucket_name):
+    try:
+        response = s3.get_object(Bucket=bucket_name, Key=SWEEP_STATE_KEY)
+        return json.loads(response["Body"].read())
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return {"phase": "table", "cursor": None, "itemUpdates": 0, "keyMoves": 0}
+        raise
+
+
+def save_sweep_state(s3, bucket_name, state):
+    s3.put_object(
+        Bucket=bucket_name,
+        Key=SWEEP_STATE_KEY,
+        Body=json.dumps(state),
+        ContentType="application/json",
+    )
+
+
+def sweep_legacy_records(dynamodb, s3, table_name, bucket_name, context=None, state=None):
+    """
+    Background sweeper for lazy migrations. Converts the records nobody has read yet, first
+    the table then the bucket, and saves its cursor to S3 before the Lambda runs out of time
+    so the next scheduled run picks up where this one stopped.
+    """
+    state = state or load_sweep_state(s3, bucket_name)
+
+    def out_of_time():
+        return (
+            context is not None
+            and context.get_remaining_time_in_millis() < SWEEP_SAFETY_MARGIN_MS
+        )
+
+    if state["phase"] == "table":
+        # Any table key is a valid ExclusiveStartKey, so resume right after the last item processed
+        for item in iter_table_items(dynamodb, table_name, start_key=state["cursor"]):
+            update = build_item_update(item)
+            if update:
+                update["ConditionExpression"] = "attribute_not_exists(usedLenses)"
+                if apply_item_update(dynamodb, table_name, update):
+                    state["itemUpdates"] += 1
+            state["cursor"] = {"userId": item["userId"], "fileId": item["fileId"]}
+            if out_of_time():
+                save_sweep_state(s3, bucket_name, state)
+                logger.info(f"Sweep paused in table phase: {json.dumps(state)}")
+                return state
+
+        state["phase"], state["cursor"] = "bucket", None
+
+    if state["phase"] == "bucket":
+        for obj in iter_bucket_objects(s3, bucket_name, start_after=state["cursor"]):
+            move = plan_key_move(obj["Key"])
+            if move and apply_key_move(s3, bucket_name, obj["Key"], *move):
+                state["keyMoves"] += 1
+            state["cursor"] = obj["Key"]
+            if out_of_time():
+                save_sweep_state(s3, bucket_name, state)
+                logger.info(f"Sweep paused in bucket phase: {json.dumps(state)}")
+                return state
+
+        state["phase"], state["cursor"] = "done", None
+
+    save_sweep_state(s3, bucket_name, state)
+    logger.info(f"Sweep state: {json.dumps(state)}")
+    return state
 
 
 def cleanup_wa_docs_bucket(s3, bucket_name):
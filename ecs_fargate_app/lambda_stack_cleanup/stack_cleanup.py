@@ -1,20 +1,82 @@
+import fnmatch
+import json
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Number of buckets/repositories drained in parallel
+DRAIN_CONCURRENCY = int(os.environ.get("DRAIN_CONCURRENCY", "8"))
+
+# Number of stacks torn down in parallel in batch mode
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "5"))
+
+# Batch requests and the summary event published once they are done
+BATCH_REQUEST_SOURCE = "iac.analyzer.deployment"
+BATCH_REQUEST_DETAIL_TYPE = "Stack Cleanup Batch Request"
+SUMMARY_EVENT_SOURCE = "iac.analyzer.cleanup"
+SUMMARY_EVENT_DETAIL_TYPE = "Stack Cleanup Summary"
+
+# Stack statuses considered when expanding batch patterns
+DELETABLE_STACK_STATUSES = [
+    "CREATE_COMPLETE",
+    "CREATE_FAILED",
+    "ROLLBACK_COMPLETE",
+    "ROLLBACK_FAILED",
+    "UPDATE_COMPLETE",
+    "UPDATE_ROLLBACK_COMPLETE",
+    "UPDATE_ROLLBACK_FAILED",
+    "DELETE_FAILED",
+    "IMPORT_COMPLETE",
+    "IMPORT_ROLLBACK_COMPLETE",
+]
+
+# Batch sizes accepted by DeleteObjects and BatchDeleteImage
+S3_DELETE_BATCH_SIZE = 1000
+ECR_DELETE_BATCH_SIZE = 100
+
+# Backoff used while polling the stack deletion
+POLL_INITIAL_DELAY_SECONDS = 5
+POLL_MAX_DELAY_SECONDS = 60
+
+# Stop polling when less than this much Lambda time is left
+POLL_SAFETY_MARGIN_MS = 30_000
+
+# Batch mode does not start draining another stack when less than this much Lambda time is left
+DRAIN_SAFETY_MARGIN_MS = 5 * 60_000
+
+# Batch runs continued by a new batch request before publishing the summary with the stacks still in progress
+MAX_BATCH_CONTINUATIONS = 8
+
+# Connection pool sized for the drain workers, and adaptive retries for throttled API calls
+BOTO_CONFIG = Config(
+    max_pool_connections=DRAIN_CONCURRENCY * BATCH_CONCURRENCY,
+    retries={"max_attempts": 10, "mode": "adaptive"},
+)
+
 
 def handler(event, context):
     """
-    Lambda function to handle deployment stack deletion events from EventBridge
+    Lambda function to handle deployment stack deletion events from EventBridge.
+    Buckets and ECR repositories owned by the stack are emptied in parallel before the deletion,
+    so CloudFormation does not wait on them, then the deletion is tracked until it completes.
+    Batch requests tear down many allowed stacks at once and emit a single summary event.
     """
     logger.info(f"Received event: {event}")
 
+    if event.get("detail-type") == BATCH_REQUEST_DETAIL_TYPE:
+        return handle_batch(event.get("detail", {}), context)
+
+    start = time.monotonic()
+
     # Extract details from the event
     try:
         detail = event.get("detail", {})
@@ -24,29 +86,49 @@ def handler(event, context):
             logger.error("No stack name provided in the event")
             return {"statusCode": 400, "body": "No stack name provided in the event"}
 
-        # Get allowed stack name from environment variable
-        allowed_stack_names = os.environ.get("DEPLOYMENT_STACK_NAME", "")
+        # Get allowed stack names and patterns from environment variables
+        allowed_stack_names = get_allowed_stack_names()
 
         logger.info(f"Allowed stack names: {allowed_stack_names}")
 
         # Validate stack name against allowed names
-        if stack_name not in allowed_stack_names:
+        if not is_stack_allowed(stack_name, allowed_stack_names):
             logger.error(f"Stack name {stack_name} is not allowed for deletion")
             return {
                 "statusCode": 400,
                 "body": f"Stack name {stack_name} is not allowed for deletion. Allowed: {allowed_stack_names}",
             }
 
-        # Initialize CloudFormation client
-        cfn_client = boto3.client("cloudformation")
+        # Initialize clients
+        cfn_client = boto3.client("cloudformation", config=BOTO_CONFIG)
+        s3_client = boto3.client("s3", config=BOTO_CONFIG)
+        ecr_client = boto3.client("ecr", config=BOTO_CONFIG)
+
+        drain_seconds = start_stack_deletion(
+            cfn_client, s3_client, ecr_client, stack_name
+        )
+
+        status = wait_for_stacks_deletion(cfn_client, [stack_name], context)[stack_name]
+        teardown_seconds = time.monotonic() - start
+        logger.info(
+            f"Stack {stack_name} teardown status {status} after {teardown_seconds:.1f}s"
+        )
+
+        if status == "DELETE_FAILED":
+            return {
+                "statusCode": 500,
+                "body": f"Deletion of stack {stack_name} failed after {teardown_seconds:.1f}s",
+            }
 
-        # Delete the stack
-        logger.info(f"Deleting stack: {stack_name}")
-        cfn_client.delete_stack(StackName=stack_name)
+        if status != "DELETE_COMPLETE":
+            return {
+                "statusCode": 202,
+                "body": f"Deletion of stack {stack_name} still in progress ({status}) after {teardown_seconds:.1f}s",
+            }
 
         return {
             "statusCode": 200,
-            "body": f"Successfully initiated deletion of stack {stack_name}",
+            "body": f"Successfully deleted stack {stack_name} in {teardown_seconds:.1f}s (drain: {drain_seconds:.1f}s)",
         }
 
     except ClientError as e:
@@ -55,3 +137,393 @@ def handler(event, context):
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return {"statusCode": 500, "body": f"Unexpected error: {str(e)}"}
+
+
+def handle_batch(detail, context):
+    """
+    Tears down every allowed stack listed in "stack-names" or matching "stack-patterns",
+    at most BATCH_CONCURRENCY at a time, and publishes one summary event with the outcome of each stack.
+    When the Lambda runs out of time, the stacks not started yet and the deletions still in progress are
+    handed over to a new batch request carrying the results so far in its "continuation".
+    """
+    continuation = detail.get("continuation", {})
+    started_at = continuation.get("startedAt", time.time())
+    results = continuation.get("results", {})
+
+    def out_of_time(margin_ms):
+        return context is not None and context.get_remaining_time_in_millis() < margin_ms
+
+    try:
+        allowed_stack_names = get_allowed_stack_names()
+        logger.info(f"Allowed stack names: {allowed_stack_names}")
+
+        cfn_client = boto3.client("cloudformation", config=BOTO_CONFIG)
+        s3_client = boto3.client("s3", config=BOTO_CONFIG)
+        ecr_client = boto3.client("ecr", config=BOTO_CONFIG)
+        events_client = boto3.client("events")
+
+        stack_names, rejected = resolve_batch_stacks(
+            cfn_client,
+            detail.get("stack-names", []),
+            detail.get("stack-patterns", []),
+            allowed_stack_names,
+        )
+        for stack_name in rejected:
+            logger.error(f"Stack name {stack_name} is not allowed for deletion")
+            results[stack_name] = {"status": "REJECTED"}
+
+        # Deletions started by a previous run, only polled
+        deleting = [
+            stack_name
+            for stack_name in continuation.get("tracking", [])
+            if is_stack_allowed(stack_name, allowed_stack_names)
+        ]
+
+        if not stack_names and not rejected and not deleting:
+            logger.error("No stacks matched the batch request")
+            return {"statusCode": 400, "body": "No stacks matched the batch request"}
+
+        logger.info(f"Deleting {len(stack_names)} stacks: {stack_names}")
+
+        def start_if_time_left(stack_name):
+            if out_of_time(DRAIN_SAFETY_MARGIN_MS):
+                return None
+            return start_stack_deletion(cfn_client, s3_client, ecr_client, stack_name)
+
+        # Drain and delete the stacks in parallel, bounded to stay within the CloudFormation API limits
+        not_started = []
+        with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(start_if_time_left, stack_name): stack_name
+                for stack_name in stack_names
+            }
+            for future in as_completed(futures):
+                stack_name = futures[future]
+                try:
+                    drain_seconds = future.result()
+                    if drain_seconds is None:
+                        not_started.append(stack_name)
+                        continue
+                    results[stack_name] = {"drainSeconds": round(drain_seconds, 1)}
+                    deleting.append(stack_name)
+                except Exception as e:
+                    logger.error(f"Error deleting stack {stack_name}: {str(e)}")
+                    results[stack_name] = {"status": "ERROR", "error": str(e)}
+
+        # Track all deletions to completion with a shared polling loop
+        statuses = wait_for_stacks_deletion(cfn_client, deleting, context)
+        for stack_name, status in statuses.items():
+            results.setdefault(stack_name, {})["status"] = status
+
+        in_progress = [
+            stack_name
+            for stack_name, status in statuses.items()
+            if status not in ("DELETE_COMPLETE", "DELETE_FAILED")
+        ]
+        round_number = continuation.get("round", 0) + 1
+        if (in_progress or not_started) and round_number <= MAX_BATCH_CONTINUATIONS:
+            logger.info(
+                f"Continuing batch cleanup in a new run: {len(not_started)} stacks not started, "
+                f"{len(in_progress)} deletions in progress"
+            )
+            events_client.put_events(
+                Entries=[
+                    {
+                        "Source": BATCH_REQUEST_SOURCE,
+                        "DetailType": BATCH_REQUEST_DETAIL_TYPE,
+                        "Detail": json.dumps(
+                            {
+                                "stack-names": not_started,
+                                "continuation": {
+                                    "tracking": in_progress,
+                                    "results": results,
+                                    "startedAt": started_at,
+                                    "round": round_number,
+                                },
+                            }
+                        ),
+                    }
+                ]
+            )
+            return {
+                "statusCode": 202,
+                "body": json.dumps({"notStarted": not_started, "inProgress": in_progress}),
+            }
+
+        for stack_name in not_started:
+            results[stack_name] = {"status": "NOT_STARTED"}
+
+        teardown_seconds = round(time.time() - started_at, 1)
+        summary = summarize_batch(results, teardown_seconds)
+        logger.info(f"Batch cleanup summary: {summary}")
+
+        events_client.put_events(
+            Entries=[
+                {
+                    "Source": SUMMARY_EVENT_SOURCE,
+                    "DetailType": SUMMARY_EVENT_DETAIL_TYPE,
+                    "Detail": json.dumps(summary),
+                }
+            ]
+        )
+
+        if summary["failed"]:
+            return {"statusCode": 500, "body": json.dumps(summary)}
+        if summary["inProgress"]:
+            return {"statusCode": 202, "body": json.dumps(summary)}
+        return {"statusCode": 200, "body": json.dumps(summary)}
+
+    except ClientError as e:
+        logger.error(f"Error deleting stacks: {str(e)}")
+        return {"statusCode": 500, "body": f"Error deleting stacks: {str(e)}"}
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return {"statusCode": 500, "body": f"Unexpected error: {str(e)}"}
+
+
+def get_allowed_stack_names():
+    """
+    Returns the allowed stack names and patterns (comma separated in ALLOWED_STACK_NAMES,
+    falling back to the deployment stack name)
+    """
+    allowed = os.environ.get("ALLOWED_STACK_NAMES") or os.environ.get(
+        "DEPLOYMENT_STACK_NAME", ""
+    )
+    return [name.strip() for name in allowed.split(",") if name.strip()]
+
+
+def is_stack_allowed(stack_name, allowed_stack_names):
+    """
+    Checks the stack name against the allow-list. Entries are exact names or patterns using "*" and "?",
+    the same wildcards the IAM policy of the Lambda uses for the stack ARNs.
+    """
+    return any(
+        fnmatch.fnmatchcase(stack_name, allowed) for allowed in allowed_stack_names
+    )
+
+
+def resolve_batch_stacks(cfn_client, stack_names, stack_patterns, allowed_stack_names):
+    """
+    Expands the requested names and patterns to existing stacks.
+    Returns the allowed stack names and the explicitly requested names that are not allowed.
+    """
+    selected = [name for name in stack_names if is_stack_allowed(name, allowed_stack_names)]
+    rejected = [name for name in stack_names if name not in selected]
+
+    if stack_patterns:
+        paginator = cfn_client.get_paginator("list_stacks")
+        for page in paginator.paginate(StackStatusFilter=DELETABLE_STACK_STATUSES):
+            for stack in page["StackSummaries"]:
+                name = stack["StackName"]
+                if (
+                    name not in selected
+                    and any(fnmatch.fnmatchcase(name, p) for p in stack_patterns)
+                    and is_stack_allowed(name, allowed_stack_names)
+                ):
+                    selected.append(name)
+
+    return selected, rejected
+
+
+def summarize_batch(results, teardown_seconds):
+    """
+    Builds the detail of the summary event from the per-stack results
+    """
+    statuses = [result["status"] for result in results.values()]
+    return {
+        "stacks": results,
+        "total": len(results),
+        "deleted": statuses.count("DELETE_COMPLETE"),
+        "failed": sum(
+            1
+            for status in statuses
+            if status in ("DELETE_FAILED", "ERROR", "REJECTED", "NOT_STARTED")
+        ),
+        "inProgress": statuses.count("DELETE_IN_PROGRESS"),
+        "teardownSeconds": teardown_seconds,
+    }
+
+
+def start_stack_deletion(cfn_client, s3_client, ecr_client, stack_name):
+    """
+    Drains the stack's buckets and repositories, then requests the stack deletion.
+    Returns the time spent draining in seconds.
+    """
+    start = time.monotonic()
+
+    # Empty the stack's buckets and repositories before CloudFormation gets to them
+    buckets, repositories = discover_drainable_resources(cfn_client, stack_name)
+    drained = drain_resources(s3_client, ecr_client, buckets, repositories)
+    drain_seconds = time.monotonic() - start
+    logger.info(
+        f"Drained {len(buckets)} buckets and {len(repositories)} repositories of {stack_name} in {drain_seconds:.1f}s: {drained}"
+    )
+
+    # Delete the stack
+    logger.info(f"Deleting stack: {stack_name}")
+    cfn_client.delete_stack(StackName=stack_name)
+
+    return drain_seconds
+
+
+def discover_drainable_resources(cfn_client, stack_name):
+    """
+    Returns the physical names of the S3 buckets and ECR repositories of the stack, including nested stacks
+    """
+    buckets, repositories = [], []
+    paginator = cfn_client.get_paginator("list_stack_resources")
+
+    for page in paginator.paginate(StackName=stack_name):
+        for resource in page["StackResourceSummaries"]:
+            physical_id = resource.get("PhysicalResourceId")
+            if not physical_id or resource["ResourceStatus"] == "DELETE_COMPLETE":
+                continue
+
+            if resource["ResourceType"] == "AWS::S3::Bucket":
+                buckets.append(physical_id)
+            elif resource["ResourceType"] == "AWS::ECR::Repository":
+                repositories.append(physical_id)
+            elif resource["ResourceType"] == "AWS::CloudFormation::Stack":
+                nested_buckets, nested_repositories = discover_drainable_resources(
+                    cfn_client, physical_id
+                )
+                buckets.extend(nested_buckets)
+                repositories.extend(nested_repositories)
+
+    return buckets, repositories
+
+
+def drain_resources(s3_client, ecr_client, buckets, repositories):
+    """
+    Empties all buckets and repositories concurrently. Returns the number of deleted entries per resource.
+    """
+    drained = {}
+
+    with ThreadPoolExecutor(max_workers=DRAIN_CONCURRENCY) as executor:
+        futures = {
+            executor.submit(drain_bucket, s3_client, bucket): f"s3://{bucket}"
+            for bucket in buckets
+        }
+        futures.update(
+            {
+                executor.submit(drain_repository, ecr_client, repository): f"ecr://{repository}"
+                for repository in repositories
+            }
+        )
+
+        for future in as_completed(futures):
+            resource = futures[future]
+            try:
+                drained[resource] = future.result()
+            except Exception as e:
+                # CloudFormation still empties (or fails on) whatever is left
+                logger.error(f"Error draining {resource}: {str(e)}")
+                drained[resource] = None
+
+    return drained
+
+
+def drain_bucket(s3_client, bucket_name):
+    """
+    Deletes every object version and delete marker of the bucket, 1000 keys per request
+    """
+    deleted = 0
+    paginator = s3_client.get_paginator("list_object_versions")
+
+    try:
+        for page in paginator.paginate(
+            Bucket=bucket_name,
+            PaginationConfig={"PageSize": S3_DELETE_BATCH_SIZE},
+        ):
+            objects = [
+                {"Key": entry["Key"], "VersionId": entry["VersionId"]}
+                for entry in page.get("Versions", []) + page.get("DeleteMarkers", [])
+            ]
+
+            for i in range(0, len(objects), S3_DELETE_BATCH_SIZE):
+                batch = objects[i : i + S3_DELETE_BATCH_SIZE]
+                response = s3_client.delete_objects(
+                    Bucket=bucket_name, Delete={"Objects": batch, "Quiet": True}
+                )
+                errors = response.get("Errors", [])
+                if errors:
+                    logger.error(
+                        f"Failed to delete {len(errors)} objects from {bucket_name}: {errors[0]}"
+                    )
+                deleted += len(batch) - len(errors)
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchBucket":
+            return deleted
+        raise
+
+    return deleted
+
+
+def drain_repository(ecr_client, repository_name):
+    """
+    Deletes every image of the ECR repository, 100 images per request
+    """
+    deleted = 0
+    paginator = ecr_client.get_paginator("list_images")
+
+    try:
+        for page in paginator.paginate(
+            repositoryName=repository_name,
+            PaginationConfig={"PageSize": ECR_DELETE_BATCH_SIZE},
+        ):
+            image_ids = page.get("imageIds", [])
+            if not image_ids:
+                continue
+
+            response = ecr_client.batch_delete_image(
+                repositoryName=repository_name, imageIds=image_ids
+            )
+            failures = response.get("failures", [])
+            if failures:
+                logger.error(
+                    f"Failed to delete {len(failures)} images from {repository_name}: {failures[0]}"
+                )
+            deleted += len(response.get("imageIds", []))
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "RepositoryNotFoundException":
+            return deleted
+        raise
+
+    return deleted
+
+
+def wait_for_stacks_deletion(cfn_client, stack_names, context=None):
+    """
+    Polls the stacks with exponential backoff until each deletion completes, fails, or the Lambda runs out of time.
+    Returns the last known status of each stack.
+    """
+    delay = POLL_INITIAL_DELAY_SECONDS
+    statuses = {stack_name: "DELETE_IN_PROGRESS" for stack_name in stack_names}
+    pending = list(stack_names)
+
+    while pending:
+        for stack_name in list(pending):
+            try:
+                stacks = cfn_client.describe_stacks(StackName=stack_name)["Stacks"]
+                statuses[stack_name] = stacks[0]["StackStatus"]
+            except ClientError as e:
+                # The stack (by name) no longer exists once it is fully deleted
+                if "does not exist" not in str(e):
+                    raise
+                statuses[stack_name] = "DELETE_COMPLETE"
+
+            if statuses[stack_name] in ("DELETE_COMPLETE", "DELETE_FAILED"):
+                pending.remove(stack_name)
+
+        if not pending:
+            break
+
+        if context is not None:
+            remaining_ms = context.get_remaining_time_in_millis()
+            if remaining_ms - delay * 1000 < POLL_SAFETY_MARGIN_MS:
+                break
+
+        time.sleep(delay)
+        delay = min(delay * 2, POLL_MAX_DELAY_SECONDS)
+
+    return statuses
@@ -0,0 +1,79 @@
+import logging
+import os
+
+import boto3
+from botocore.config import Config
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Batch size accepted by DeleteObjects
+S3_DELETE_BATCH_SIZE = 1000
+
+# Adaptive retries for throttled API calls
+BOTO_CONFIG = Config(retries={"max_attempts": 10, "mode": "adaptive"})
+
+# Principal of the deletions made by the DynamoDB time to live
+TTL_PRINCIPAL = "dynamodb.amazonaws.com"
+
+
+def handler(event, context):
+    """
+    Lambda function deleting the S3 objects of the work items expired by the DynamoDB time to live.
+    Receives the keys of the removed items from the table stream. Errors are raised so the batch is retried,
+    deleting the objects of a work item twice is harmless.
+    """
+    bucket_name = os.environ["ANALYSIS_STORAGE_BUCKET"]
+    s3_client = boto3.client("s3", config=BOTO_CONFIG)
+
+    work_items = 0
+    deleted = 0
+    for record in event.get("Records", []):
+        # The event source mapping only forwards TTL removals, user deletions already remove the objects
+        if record.get("eventName") != "REMOVE":
+            continue
+        if record.get("userIdentity", {}).get("principalId") != TTL_PRINCIPAL:
+            continue
+
+        keys = record["dynamodb"]["Keys"]
+        prefix = f"{keys['userId']['S']}/{keys['fileId']['S']}/"
+        count = delete_prefix(s3_client, bucket_name, prefix)
+        logger.info(f"Deleted {count} objects of expired work item {prefix}")
+
+        work_items += 1
+        deleted += count
+
+    return {
+        "statusCode": 200,
+        "body": f"Deleted {deleted} objects of {work_items} expired work items",
+    }
+
+
+def delete_prefix(s3_client, bucket_name, prefix):
+    """
+    Deletes every object under the prefix, 1000 keys per request. Returns the number of deleted objects.
+    """
+    deleted = 0
+    paginator = s3_client.get_paginator("list_objects_v2")
+
+    for page in paginator.paginate(
+        Bucket=bucket_name,
+        Prefix=prefix,
+        PaginationConfig={"PageSize": S3_DELETE_BATCH_SIZE},
+    ):
+        objects = [{"Key": entry["Key"]} for entry in page.get("Contents", [])]
+        if not objects:
+            continue
+
+        response = s3_client.delete_objects(
+            Bucket=bucket_name, Delete={"Objects": objects, "Quiet": True}
+        )
+        errors = response.get("Errors", [])
+        if errors:
+            raise RuntimeError(
+                f"Failed to delete {len(errors)} objects under {prefix}: {errors[0]}"
+            )
+        deleted += len(objects)
+
+    return deleted
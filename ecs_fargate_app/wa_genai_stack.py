@@ -1,34 +1,143 @@
 """CDK stack for hosting react app in ECS and Fargate"""
 
 import configparser
+import json
 import os
 import platform
+import re
+import shutil
+import subprocess
+import sys
 import time
 import uuid
 
 import aws_cdk as cdk
 import aws_cdk.aws_servicediscovery as servicediscovery
+import jsii
 from aws_cdk import Duration, RemovalPolicy, Stack
+from aws_cdk import aws_applicationautoscaling as appscaling
 from aws_cdk import aws_certificatemanager as aws_certificatemanager
+from aws_cdk import aws_cloudfront as cloudfront
+from aws_cdk import aws_cloudfront_origins as origins
+from aws_cdk import aws_cloudwatch as cloudwatch
+from aws_cdk import aws_cloudwatch_actions as cw_actions
 from aws_cdk import aws_cognito as aws_cognito
 from aws_cdk import aws_dynamodb as dynamodb
 from aws_cdk import aws_ec2 as ec2
 from aws_cdk import aws_ecs as ecs
 from aws_cdk import aws_ecs_patterns as ecs_patterns
+from aws_cdk import aws_elasticache as elasticache
 from aws_cdk import aws_elasticloadbalancingv2 as elbv2
 from aws_cdk import aws_elasticloadbalancingv2_actions as actions
 from aws_cdk import aws_events as events
 from aws_cdk import aws_events_targets as targets
 from aws_cdk import aws_iam as iam
 from aws_cdk import aws_lambda as lambda_
+from aws_cdk import aws_lambda_event_sources as lambda_event_sources
 from aws_cdk import aws_s3 as s3
 from aws_cdk import aws_s3_deployment as s3deploy
 from aws_cdk import aws_secretsmanager as aws_secretsmanager
+from aws_cdk import aws_sns as sns
+from aws_cdk import aws_sns_subscriptions as subscriptions
+from aws_cdk import aws_sqs as sqs
+from aws_cdk import aws_ssm as ssm
 from aws_cdk import custom_resources as cr
 from aws_cdk.aws_ecr_assets import DockerImageAsset, Platform
-from cdklabs.generative_ai_cdk_constructs import bedrock
+from cdklabs.generative_ai_cdk_constructs import bedrock, opensearchserverless
 from constructs import Construct
 
+# Python runtime of the Lambdas, the local bundling installs wheels built for it
+LAMBDA_PYTHON_VERSION = "3.12"
+
+# Embedding models of the knowledge base: input token limit, and BedrockFoundationModel per vector dimension
+KB_EMBEDDING_MODELS = {
+    "amazon.titan-embed-text-v2:0": (
+        8192,
+        {
+            256: "TITAN_EMBED_TEXT_V2_256",
+            512: "TITAN_EMBED_TEXT_V2_512",
+            1024: "TITAN_EMBED_TEXT_V2_1024",
+        },
+    ),
+    "amazon.titan-embed-text-v1": (8192, {1536: "TITAN_EMBED_TEXT_V1"}),
+    "cohere.embed-english-v3": (512, {1024: "COHERE_EMBED_ENGLISH_V3"}),
+    "cohere.embed-multilingual-v3": (512, {1024: "COHERE_EMBED_MULTILINGUAL_V3"}),
+}
+
+# Header carrying the CloudFront origin secret, the load balancer rejects requests without it
+CLOUDFRONT_ORIGIN_HEADER = "X-Origin-Verify"
+
+# Lenses synchronized into the knowledge base, shared with the KB synchronizer Lambda
+KB_LENSES_FILE = os.path.join(
+    os.path.dirname(__file__), "lambda_kb_synchronizer", "lenses.json"
+)
+
+
+@jsii.implements(cdk.ILocalBundling)
+class LocalPythonBundling:
+    """
+    Bundles a Python Lambda without Docker: pip installs the wheels of the target platform
+    into the asset, then the sources are copied next to them. Returns False (falling back to
+    the bundling container) when a requirement has no wheel for the platform or pip fails.
+    Only the packages and the sources are written to the output directory, nothing else.
+    """
+
+    def __init__(self, source_dir: str, pip_platform: str, cache_dir: str):
+        self.source_dir = source_dir
+        self.pip_platform = pip_platform
+        self.cache_dir = cache_dir
+
+    def try_bundle(self, output_dir: str, options: cdk.BundlingOptions) -> bool:
+        try:
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "pip",
+                    "install",
+                    "--quiet",
+                    "--requirement",
+                    os.path.join(self.source_dir, "requirements.txt"),
+                    "--target",
+                    output_dir,
+                    "--platform",
+                    self.pip_platform,
+                    "--implementation",
+                    "cp",
+                    "--python-version",
+                    LAMBDA_PYTHON_VERSION,
+                    "--only-binary=:all:",
+                    # Bytecode of the local interpreter is not used by the Lambda runtime
+                    "--no-compile",
+                    "--cache-dir",
+                    self.cache_dir,
+                ],
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(
+                f"Local bundling of {self.source_dir} failed ({e}), bundling in a container",
+                file=sys.stderr,
+            )
+            # The bundling container expects an empty output directory
+            for entry in os.scandir(output_dir):
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+            return False
+
+        # Console scripts of the installed packages, never run in the Lambda
+        shutil.rmtree(os.path.join(output_dir, "bin"), ignore_errors=True)
+
+        shutil.copytree(
+            self.source_dir,
+            output_dir,
+            dirs_exist_ok=True,
+            ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+        )
+        return True
+
 
 class WAGenAIStack(Stack):
 
@@ -74,6 +183,1307 @@ class WAGenAIStack(Stack):
 
         return auth_config
 
+    def parse_compute_config(self, config: configparser.ConfigParser):
+        compute_config = {
+            "backendCpu": config.getint("settings", "backend_cpu", fallback=1024),
+            "backendMemory": config.getint(
+                "settings", "backend_memory", fallback=2048
+            ),
+            "backendEphemeralStorage": config.getint(
+                "settings", "backend_ephemeral_storage", fallback=20
+            ),
+            "backendMinTasks": config.getint(
+                "settings", "backend_min_tasks", fallback=1
+            ),
+            "backendMaxTasks": config.getint(
+                "settings", "backend_max_tasks", fallback=1
+            ),
+            "frontendMinTasks": config.getint(
+                "settings", "frontend_min_tasks", fallback=1
+            ),
+            "frontendMaxTasks": config.getint(
+                "settings", "frontend_max_tasks", fallback=4
+            ),
+            "targetCpuUtilization": config.getint(
+                "settings", "scaling_target_cpu_utilization", fallback=60
+            ),
+            "targetMemoryUtilization": config.getint(
+                "settings", "scaling_target_memory_utilization", fallback=70
+            ),
+            "targetRequestsPerTask": config.getint(
+                "settings", "scaling_target_requests_per_task", fallback=500
+            ),
+            "workerTier": config.getboolean("settings", "worker_tier", fallback=False),
+            "workerMinTasks": config.getint("settings", "worker_min_tasks", fallback=1),
+            "workerMaxTasks": config.getint("settings", "worker_max_tasks", fallback=4),
+            "workerConcurrency": config.getint(
+                "settings", "worker_concurrency", fallback=1
+            ),
+        }
+
+        # Supported Fargate memory (MiB) for each CPU value: (min, max, step)
+        fargate_memory = {
+            256: (512, 2048, 512),
+            512: (1024, 4096, 1024),
+            1024: (2048, 8192, 1024),
+            2048: (4096, 16384, 1024),
+            4096: (8192, 30720, 1024),
+            8192: (16384, 61440, 4096),
+            16384: (32768, 122880, 8192),
+        }
+
+        cpu = compute_config["backendCpu"]
+        memory = compute_config["backendMemory"]
+        if cpu not in fargate_memory:
+            raise ValueError(
+                f"backend_cpu must be one of {', '.join(map(str, fargate_memory))}"
+            )
+
+        min_memory, max_memory, step = fargate_memory[cpu]
+        if (
+            memory < min_memory
+            or memory > max_memory
+            or memory % step
+            or (cpu == 256 and memory == 1536)
+        ):
+            raise ValueError(
+                f"backend_memory must be between {min_memory} and {max_memory} in increments of {step} when backend_cpu is {cpu}"
+            )
+
+        # 20 GiB is the Fargate default, larger values must be between 21 and 200 GiB
+        if not 20 <= compute_config["backendEphemeralStorage"] <= 200:
+            raise ValueError("backend_ephemeral_storage must be between 20 and 200")
+
+        for service in ("backend", "frontend"):
+            min_tasks = compute_config[f"{service}MinTasks"]
+            max_tasks = compute_config[f"{service}MaxTasks"]
+            if min_tasks < 1 or max_tasks < min_tasks:
+                raise ValueError(
+                    f"{service}_min_tasks must be at least 1 and not greater than {service}_max_tasks"
+                )
+
+        # The worker tier can scale in to zero tasks when no job is queued or running
+        if (
+            compute_config["workerMinTasks"] < 0
+            or compute_config["workerMaxTasks"] < max(1, compute_config["workerMinTasks"])
+        ):
+            raise ValueError(
+                "worker_min_tasks must be at least 0, and worker_max_tasks at least 1 and not lower than worker_min_tasks"
+            )
+
+        if compute_config["workerConcurrency"] < 1:
+            raise ValueError("worker_concurrency must be at least 1")
+
+        for setting in ("targetCpuUtilization", "targetMemoryUtilization"):
+            if not 10 <= compute_config[setting] <= 90:
+                raise ValueError(
+                    "scaling_target_cpu_utilization and scaling_target_memory_utilization must be between 10 and 90"
+                )
+
+        return compute_config
+
+    def get_architecture(
+        self, config: configparser.ConfigParser, setting: str = "architecture"
+    ):
+        """
+        Return the settings of the target CPU architecture of the container images, Fargate tasks and Lambdas.
+        Settings other than "architecture" fall back to it when empty.
+        """
+        platform_mapping = {
+            "x86_64": {
+                "fargate_architecture": ecs.CpuArchitecture.X86_64,
+                "build_architecture": Platform.LINUX_AMD64,
+                "build_architecture_argument": "amd64",
+                "lambda_architecture": lambda_.Architecture.X86_64,
+                "bundling_platform": "linux/amd64",
+                "pip_platform": "manylinux2014_x86_64",
+            },
+            "arm64": {
+                "fargate_architecture": ecs.CpuArchitecture.ARM64,
+                "build_architecture": Platform.LINUX_ARM64,
+                "build_architecture_argument": "arm64",
+                "lambda_architecture": lambda_.Architecture.ARM_64,
+                "bundling_platform": "linux/arm64",
+                "pip_platform": "manylinux2014_aarch64",
+            },
+        }
+        aliases = {"amd64": "x86_64", "aarch64": "arm64"}
+
+        target = (
+            config.get("settings", setting, fallback="").strip().lower()
+            or config.get("settings", "architecture", fallback="auto").strip().lower()
+        )
+        if target == "auto":
+            # Same architecture as the machine that runs CDK
+            target = platform.machine().lower()
+        target = aliases.get(target, target)
+
+        if target not in platform_mapping:
+            raise ValueError(f"{setting} must be one of x86_64, arm64, auto")
+
+        return platform_mapping[target]
+
+    def parse_build_config(self, config: configparser.ConfigParser):
+        """
+        Return how the Lambda assets are bundled: locally when possible, and the directory
+        of the wheel cache kept between deployments (relative paths are from the project root)
+        """
+        cache_dir = config.get(
+            "settings", "asset_cache_dir", fallback=".cdk-cache"
+        ).strip()
+        if not cache_dir:
+            raise ValueError("asset_cache_dir must not be empty")
+
+        return {
+            "localBundling": config.getboolean(
+                "settings", "local_bundling", fallback=True
+            ),
+            "cacheDir": os.path.abspath(
+                os.path.join(os.path.dirname(__file__), "..", cache_dir)
+            ),
+        }
+
+    def python_lambda_code(
+        self, directory: str, function_config: dict, build_config: dict
+    ):
+        """
+        Return the code of a Python Lambda with its requirements installed for the function architecture.
+        The asset hash covers the sources and the bundling options only, so unchanged functions reuse
+        the bundle already staged in cdk.out instead of being bundled again. Wheels are cached
+        in the asset cache directory, both by the local bundling and by the bundling container.
+        """
+        architecture = function_config["architecture"]
+        pip_cache_dir = os.path.join(build_config["cacheDir"], "pip")
+        os.makedirs(pip_cache_dir, exist_ok=True)
+
+        return lambda_.Code.from_asset(
+            directory,
+            asset_hash_type=cdk.AssetHashType.SOURCE,
+            exclude=["__pycache__", "*.pyc"],
+            bundling=cdk.BundlingOptions(
+                image=lambda_.Runtime.PYTHON_3_12.bundling_image,
+                # Install dependencies built for the architecture of the function
+                platform=architecture["bundling_platform"],
+                local=(
+                    LocalPythonBundling(
+                        directory, architecture["pip_platform"], pip_cache_dir
+                    )
+                    if build_config["localBundling"]
+                    else None
+                ),
+                volumes=[
+                    cdk.DockerVolume(
+                        host_path=pip_cache_dir, container_path="/tmp/pip-cache"
+                    )
+                ],
+                command=[
+                    "bash",
+                    "-c",
+                    "pip install --no-compile --cache-dir /tmp/pip-cache -r requirements.txt -t /asset-output"
+                    " && rm -rf /asset-output/bin && cp -au . /asset-output",
+                ],
+            ),
+        )
+
+    def parse_lambda_config(self, config: configparser.ConfigParser):
+        """
+        Return the memory size, ephemeral storage, architecture and reserved concurrency of each Python Lambda.
+        Memory also sets the CPU share and network bandwidth of a function (1 vCPU at 1769 MB).
+        """
+        # Default memory sizes match config.ini
+        functions = {
+            "kbSynchronizer": ("kb_synchronizer", 256),
+            "migration": ("migration", 256),
+            "stackCleanup": ("stack_cleanup", 256),
+            "workItemCleanup": ("work_item_cleanup", 128),
+        }
+
+        lambda_config = {}
+        for function, (prefix, default_memory) in functions.items():
+            reserved_concurrency = config.get(
+                "settings", f"{prefix}_reserved_concurrency", fallback=""
+            ).strip()
+            function_config = {
+                "memorySize": config.getint(
+                    "settings", f"{prefix}_memory", fallback=default_memory
+                ),
+                "ephemeralStorageSize": config.getint(
+                    "settings", f"{prefix}_ephemeral_storage", fallback=512
+                ),
+                "reservedConcurrency": (
+                    int(reserved_concurrency) if reserved_concurrency else None
+                ),
+                "architecture": self.get_architecture(config, f"{prefix}_architecture"),
+            }
+
+            if not 128 <= function_config["memorySize"] <= 10240:
+                raise ValueError(f"{prefix}_memory must be between 128 and 10240 MB")
+            if not 512 <= function_config["ephemeralStorageSize"] <= 10240:
+                raise ValueError(
+                    f"{prefix}_ephemeral_storage must be between 512 and 10240 MB"
+                )
+            if (
+                function_config["reservedConcurrency"] is not None
+                and function_config["reservedConcurrency"] < 1
+            ):
+                raise ValueError(
+                    f"{prefix}_reserved_concurrency must be at least 1, or empty for no reservation"
+                )
+
+            lambda_config[function] = function_config
+
+        return lambda_config
+
+    def parse_model_config(self, config: configparser.ConfigParser):
+        model_id = config["settings"]["model_id"].strip()
+        model_config = {
+            "default": model_id,
+            "fast": config.get("settings", "fast_model_id", fallback="").strip()
+            or model_id,
+            "iac": config.get("settings", "iac_model_id", fallback="").strip()
+            or model_id,
+            "simpleQuestionMaxBestPractices": config.getint(
+                "settings", "simple_question_max_best_practices", fallback=4
+            ),
+        }
+
+        for tier in ("default", "fast", "iac"):
+            # A model ID, an inference profile ID, or the ARN of either
+            if not re.fullmatch(
+                r"(arn:aws[a-z-]*:bedrock:[a-z0-9-]*:[0-9]*:(foundation-model|inference-profile)/)?"
+                r"[a-z0-9-]+(\.[a-z0-9-]+)+(:[a-z0-9-]+)*",
+                model_config[tier],
+            ):
+                raise ValueError(
+                    f"Invalid {tier} model ID '{model_config[tier]}', expected a Bedrock model ID or inference profile ID, or its ARN"
+                )
+
+        if model_config["simpleQuestionMaxBestPractices"] < 0:
+            raise ValueError("simple_question_max_best_practices must be at least 0")
+
+        return model_config
+
+    def get_model_arns(self, model_id: str):
+        """
+        Return the ARN to invoke the model with, and the ARNs to grant access to.
+        The model can be given by ID or by ARN, IDs are resolved in the partition and region of the stack.
+        """
+        partition = Stack.of(self).partition
+        arn = re.fullmatch(r"arn:([a-z-]+):bedrock:[^:]*:[^:]*:[a-z-]+/(.+)", model_id)
+        if arn:
+            partition, model_id = arn.groups()
+
+        # Cross-region inference profile IDs are prefixed with their geography (e.g. us., eu., apac., global.)
+        if re.match(r"(us|us-gov|eu|apac|jp|au|ca|global)\.", model_id):
+            profile_arn = (
+                arn.group(0)
+                if arn
+                else f"arn:{partition}:bedrock:{self.region}:{self.account}:inference-profile/{model_id}"
+            )
+            foundation_model_id = model_id.split(".", 1)[1]
+            # The profile routes requests to the model in any region of its geography
+            return profile_arn, [
+                profile_arn,
+                f"arn:{partition}:bedrock:*::foundation-model/{foundation_model_id}",
+            ]
+
+        model_arn = (
+            arn.group(0)
+            if arn
+            else f"arn:{partition}:bedrock:{self.region}::foundation-model/{model_id}"
+        )
+        return model_arn, [model_arn]
+
+    def parse_chunking_config(self, config: configparser.ConfigParser):
+        chunking_config = {
+            "strategy": config.get(
+                "settings", "kb_chunking_strategy", fallback="hierarchical"
+            )
+            .strip()
+            .lower(),
+            "maxTokens": config.getint("settings", "kb_chunk_max_tokens", fallback=300),
+            "overlapPercentage": config.getint(
+                "settings", "kb_chunk_overlap_percentage", fallback=20
+            ),
+            "overlapTokens": config.getint(
+                "settings", "kb_chunk_overlap_tokens", fallback=60
+            ),
+            "maxParentTokens": config.getint(
+                "settings", "kb_chunk_max_parent_tokens", fallback=2000
+            ),
+            "maxChildTokens": config.getint(
+                "settings", "kb_chunk_max_child_tokens", fallback=800
+            ),
+            "bufferSize": config.getint("settings", "kb_chunk_buffer_size", fallback=0),
+            "breakpointPercentile": config.getint(
+                "settings", "kb_chunk_breakpoint_percentile", fallback=95
+            ),
+        }
+
+        strategy = chunking_config["strategy"]
+        if strategy == "fixed_size":
+            if chunking_config["maxTokens"] < 1:
+                raise ValueError("kb_chunk_max_tokens must be at least 1")
+            if not 1 <= chunking_config["overlapPercentage"] <= 99:
+                raise ValueError("kb_chunk_overlap_percentage must be between 1 and 99")
+        elif strategy == "hierarchical":
+            if chunking_config["overlapTokens"] < 1:
+                raise ValueError("kb_chunk_overlap_tokens must be at least 1")
+            if not (
+                1
+                <= chunking_config["maxChildTokens"]
+                < chunking_config["maxParentTokens"]
+                <= 8192
+            ):
+                raise ValueError(
+                    "kb_chunk_max_child_tokens must be lower than kb_chunk_max_parent_tokens, which must be at most 8192"
+                )
+        elif strategy == "semantic":
+            if chunking_config["maxTokens"] < 1:
+                raise ValueError("kb_chunk_max_tokens must be at least 1")
+            if not 0 <= chunking_config["bufferSize"] <= 1:
+                raise ValueError("kb_chunk_buffer_size must be 0 or 1")
+            if not 50 <= chunking_config["breakpointPercentile"] <= 99:
+                raise ValueError(
+                    "kb_chunk_breakpoint_percentile must be between 50 and 99"
+                )
+        elif strategy != "none":
+            raise ValueError(
+                "kb_chunking_strategy must be one of fixed_size, hierarchical, semantic, none"
+            )
+
+        return chunking_config
+
+    def create_chunking_strategy(self, chunking_config: dict):
+        """
+        Create the chunking strategy of the KB data source from the chunking config
+        """
+        strategy = chunking_config["strategy"]
+        if strategy == "fixed_size":
+            return bedrock.ChunkingStrategy.fixed_size(
+                max_tokens=chunking_config["maxTokens"],
+                overlap_percentage=chunking_config["overlapPercentage"],
+            )
+        if strategy == "hierarchical":
+            return bedrock.ChunkingStrategy.hierarchical(
+                overlap_tokens=chunking_config["overlapTokens"],
+                max_parent_token_size=chunking_config["maxParentTokens"],
+                max_child_token_size=chunking_config["maxChildTokens"],
+            )
+        if strategy == "semantic":
+            return bedrock.ChunkingStrategy.semantic(
+                buffer_size=chunking_config["bufferSize"],
+                breakpoint_percentile_threshold=chunking_config["breakpointPercentile"],
+                max_tokens=chunking_config["maxTokens"],
+            )
+        return bedrock.ChunkingStrategy.NONE
+
+    def parse_kb_vector_store_config(
+        self, config: configparser.ConfigParser, chunking_config: dict
+    ):
+        """
+        Return the embedding model and vector dimensions of the knowledge base, and whether its
+        OpenSearch Serverless collection has standby replicas. Chunks must fit the model input.
+        """
+        vector_store_config = {
+            "embeddingModel": config.get(
+                "settings",
+                "kb_embedding_model",
+                fallback="amazon.titan-embed-text-v2:0",
+            ).strip(),
+            "dimensions": config.getint(
+                "settings", "kb_embedding_dimensions", fallback=1024
+            ),
+            "standbyReplicas": config.getboolean(
+                "settings", "kb_vector_store_standby_replicas", fallback=True
+            ),
+        }
+
+        model = vector_store_config["embeddingModel"]
+        if model not in KB_EMBEDDING_MODELS:
+            raise ValueError(
+                f"kb_embedding_model must be one of {', '.join(KB_EMBEDDING_MODELS)}"
+            )
+        max_input_tokens, dimensions = KB_EMBEDDING_MODELS[model]
+        if vector_store_config["dimensions"] not in dimensions:
+            raise ValueError(
+                f"kb_embedding_dimensions of {model} must be one of {', '.join(map(str, dimensions))}"
+            )
+
+        # Hierarchical chunking embeds the child chunks, the other strategies their chunks
+        strategy = chunking_config["strategy"]
+        if strategy == "hierarchical":
+            chunk_tokens = chunking_config["maxChildTokens"]
+        elif strategy in ("fixed_size", "semantic"):
+            chunk_tokens = chunking_config["maxTokens"]
+        else:
+            chunk_tokens = None
+        if chunk_tokens is not None and chunk_tokens > max_input_tokens:
+            raise ValueError(
+                f"{model} embeds at most {max_input_tokens} tokens, lower the chunk size of kb_chunking_strategy {strategy}"
+            )
+
+        return vector_store_config
+
+    def create_knowledge_base(self, vector_store_config: dict):
+        """
+        Create the knowledge base with the configured embedding model. The construct creates the
+        default OpenSearch Serverless collection (with standby replicas), without standby replicas
+        the collection is created here: its indexing and search capacity run in a single AZ,
+        halving the minimum OCUs billed.
+        """
+        embeddings_model = getattr(
+            bedrock.BedrockFoundationModel,
+            KB_EMBEDDING_MODELS[vector_store_config["embeddingModel"]][1][
+                vector_store_config["dimensions"]
+            ],
+        )
+
+        vector_store = None
+        if not vector_store_config["standbyReplicas"]:
+            vector_store = opensearchserverless.VectorCollection(
+                self,
+                "KBVectorsWithoutStandby",
+                description="Vector store of the WAFR knowledge base, without standby replicas",
+                standby_replicas=opensearchserverless.VectorCollectionStandbyReplicas.DISABLED,
+            )
+
+        return bedrock.KnowledgeBase(
+            self,
+            "WAFR-KnowledgeBase",
+            embeddings_model=embeddings_model,
+            vector_store=vector_store,
+            instruction="Use this knowledge base to answer questions about AWS Well Architected Framework Review (WAFR).",
+            description="This knowledge base contains AWS Well Architected Framework Review (WAFR) reference documents",
+        )
+
+    def parse_kb_data_source_config(self, config: configparser.ConfigParser):
+        """
+        Return the bucket prefixes of the KB data sources: the prefix of each synchronized lens,
+        or a single empty prefix for one data source covering the whole reference docs bucket.
+        In blue/green mode, each prefix has a data source per color.
+        """
+        scope = config.get("settings", "kb_data_sources", fallback="bucket").strip()
+        blue_green = config.getboolean("settings", "kb_blue_green", fallback=False)
+        if scope == "bucket":
+            return {"scope": scope, "prefixes": [""], "blueGreen": blue_green}
+        if scope != "lens":
+            raise ValueError("kb_data_sources must be one of lens, bucket")
+
+        with open(KB_LENSES_FILE) as lenses_file:
+            lenses = json.load(lenses_file)
+
+        # Documents are stored under the alias of their lens, the last segment of the lens ARN
+        prefixes = [lenses["wellarchitectedLens"]["lensArn"].split("/")[-1]]
+        for lens in lenses["additionalLenses"]:
+            prefix = lens["lensArn"].split("/")[-1]
+            if prefix not in prefixes:
+                prefixes.append(prefix)
+
+        return {"scope": scope, "prefixes": prefixes, "blueGreen": blue_green}
+
+    def create_kb_data_sources(
+        self,
+        kb: bedrock.KnowledgeBase,
+        bucket: s3.Bucket,
+        data_source_config: dict,
+        chunking_config: dict,
+        color: str = "blue",
+    ):
+        """
+        Create the KB data sources of the reference docs bucket, keyed by bucket prefix.
+        The bucket-wide data source keeps the construct ID and name of the original single data source,
+        and the blue data sources keep theirs when blue/green ingestion is enabled.
+        """
+        data_sources = {}
+        for prefix in data_source_config["prefixes"]:
+            name = "-".join(
+                part for part in [prefix, color if color != "blue" else ""] if part
+            )
+            data_sources[prefix] = bedrock.S3DataSource(
+                self,
+                f"DataSource-{name}" if name else "DataSource",
+                bucket=bucket,
+                knowledge_base=kb,
+                data_source_name=(
+                    f"wafr-reference-docs-{name}" if name else "wafr-reference-docs"
+                ),
+                inclusion_prefixes=[f"{prefix}/"] if prefix else None,
+                chunking_strategy=self.create_chunking_strategy(chunking_config),
+            )
+        return data_sources
+
+    def parse_cloudfront_config(
+        self,
+        config: configparser.ConfigParser,
+        auth_config: dict,
+        compute_config: dict,
+        public_lb: bool,
+    ):
+        """
+        Return the price class and the optional custom domain of the CloudFront distribution.
+        With authentication, the ALB redirects users back to the host they requested, so CloudFront
+        must serve a custom domain name that the ALB certificate also covers.
+        """
+        price_classes = {
+            "PriceClass_100": cloudfront.PriceClass.PRICE_CLASS_100,
+            "PriceClass_200": cloudfront.PriceClass.PRICE_CLASS_200,
+            "PriceClass_All": cloudfront.PriceClass.PRICE_CLASS_ALL,
+        }
+        price_class = config.get(
+            "settings", "cloudfront_price_class", fallback="PriceClass_100"
+        ).strip()
+        if price_class not in price_classes:
+            raise ValueError(
+                f"cloudfront_price_class must be one of {', '.join(price_classes)}"
+            )
+
+        cloudfront_config = {
+            "priceClass": price_classes[price_class],
+            "domainName": config.get(
+                "settings", "cloudfront_domain_name", fallback=""
+            ).strip(),
+            "certificateArn": config.get(
+                "settings", "cloudfront_certificate_arn", fallback=""
+            ).strip(),
+            "authenticated": auth_config["enabled"],
+        }
+
+        # CloudFront reaches the ALB over the Internet
+        if not public_lb:
+            raise ValueError("cloudfront requires public_load_balancer = True")
+        # CloudFront waits at most 60 seconds for the origin, analyses and IaC generation
+        # requests only return within that time when they are queued for the worker tier
+        if not compute_config["workerTier"]:
+            raise ValueError("cloudfront requires worker_tier = True")
+        if bool(cloudfront_config["domainName"]) != bool(
+            cloudfront_config["certificateArn"]
+        ):
+            raise ValueError(
+                "cloudfront_domain_name and cloudfront_certificate_arn must be set together"
+            )
+        if auth_config["enabled"] and not cloudfront_config["domainName"]:
+            raise ValueError(
+                "cloudfront with authentication requires cloudfront_domain_name and cloudfront_certificate_arn"
+            )
+
+        return cloudfront_config
+
+    def get_cloudfront_prefix_list_id(self) -> str:
+        """
+        Return the ID of the managed prefix list of the CloudFront origin-facing servers in the stack region
+        """
+        prefix_list = cr.AwsCustomResource(
+            self,
+            "CloudFrontOriginPrefixList",
+            on_create=cr.AwsSdkCall(
+                service="ec2",
+                action="describeManagedPrefixLists",
+                parameters={
+                    "Filters": [
+                        {
+                            "Name": "prefix-list-name",
+                            "Values": ["com.amazonaws.global.cloudfront.origin-facing"],
+                        }
+                    ]
+                },
+                physical_resource_id=cr.PhysicalResourceId.of(
+                    "cloudfront-origin-facing"
+                ),
+                output_paths=["PrefixLists.0.PrefixListId"],
+            ),
+            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
+                resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
+            ),
+        )
+        return prefix_list.get_response_field("PrefixLists.0.PrefixListId")
+
+    def restrict_listener_to_cloudfront(
+        self,
+        listener: elbv2.ApplicationListener,
+        action: elbv2.ListenerAction,
+        origin_secret: aws_secretsmanager.Secret,
+    ):
+        """
+        Only run the listener action for requests carrying the CloudFront origin secret, reject the others
+        """
+        listener.add_action(
+            "CloudFrontOrigin",
+            priority=1,
+            conditions=[
+                elbv2.ListenerCondition.http_header(
+                    CLOUDFRONT_ORIGIN_HEADER,
+                    [origin_secret.secret_value.unsafe_unwrap()],
+                )
+            ],
+            action=action,
+        )
+        listener.add_action(
+            "DefaultDeny",
+            action=elbv2.ListenerAction.fixed_response(
+                403, content_type="text/plain", message_body="Forbidden"
+            ),
+        )
+
+    def create_cloudfront_distribution(
+        self,
+        load_balancer: elbv2.ApplicationLoadBalancer,
+        cloudfront_config: dict,
+        origin_secret: aws_secretsmanager.Secret,
+    ):
+        """
+        Create the CloudFront distribution in front of the ALB, caching the static assets at the edge
+        """
+        origin_headers = {
+            CLOUDFRONT_ORIGIN_HEADER: origin_secret.secret_value.unsafe_unwrap()
+        }
+
+        if cloudfront_config["authenticated"]:
+            # The HTTPS listener authenticates every request. The viewer Host header is forwarded, so the ALB
+            # redirects to the identity provider and back to the distribution domain, which its certificate covers.
+            alb_origin = origins.LoadBalancerV2Origin(
+                load_balancer,
+                protocol_policy=cloudfront.OriginProtocolPolicy.HTTPS_ONLY,
+                custom_headers=origin_headers,
+                read_timeout=Duration.seconds(60),
+                keepalive_timeout=Duration.seconds(60),
+            )
+            # Responses depend on the user session, nothing is cached at the edge
+            pass_through_behavior = cloudfront.BehaviorOptions(
+                origin=alb_origin,
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                allowed_methods=cloudfront.AllowedMethods.ALLOW_ALL,
+                cache_policy=cloudfront.CachePolicy.CACHING_DISABLED,
+                origin_request_policy=cloudfront.OriginRequestPolicy.ALL_VIEWER,
+            )
+            static_assets_behavior = pass_through_behavior
+        else:
+            alb_origin = origins.LoadBalancerV2Origin(
+                load_balancer,
+                protocol_policy=cloudfront.OriginProtocolPolicy.HTTP_ONLY,
+                custom_headers=origin_headers,
+                # Highest values allowed without a quota increase
+                read_timeout=Duration.seconds(60),
+                keepalive_timeout=Duration.seconds(60),
+            )
+
+            # API and websocket requests reach the ALB unchanged and are never cached
+            pass_through_behavior = cloudfront.BehaviorOptions(
+                origin=alb_origin,
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                allowed_methods=cloudfront.AllowedMethods.ALLOW_ALL,
+                cache_policy=cloudfront.CachePolicy.CACHING_DISABLED,
+                origin_request_policy=cloudfront.OriginRequestPolicy.ALL_VIEWER_EXCEPT_HOST_HEADER,
+            )
+
+            # Vite build assets have content hashes in their names, nginx serves them as immutable
+            static_assets_behavior = cloudfront.BehaviorOptions(
+                origin=alb_origin,
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                cache_policy=cloudfront.CachePolicy.CACHING_OPTIMIZED,
+                compress=True,
+            )
+
+        custom_domain = {}
+        if cloudfront_config["domainName"]:
+            custom_domain = {
+                "domain_names": [cloudfront_config["domainName"]],
+                "certificate": aws_certificatemanager.Certificate.from_certificate_arn(
+                    self,
+                    "CloudFrontCertificate",
+                    cloudfront_config["certificateArn"],
+                ),
+            }
+
+        return cloudfront.Distribution(
+            self,
+            "FrontendDistribution",
+            comment="WA IaC Analyzer",
+            # index.html and public files follow the origin Cache-Control headers
+            default_behavior=static_assets_behavior,
+            additional_behaviors={
+                "/assets/*": static_assets_behavior,
+                "/api/*": pass_through_behavior,
+                "/socket.io/*": pass_through_behavior,
+            },
+            price_class=cloudfront_config["priceClass"],
+            **custom_domain,
+        )
+
+    def parse_work_item_config(self, config: configparser.ConfigParser):
+        """
+        Return the retention of work items (days after their last activity, 0 keeps them until deleted),
+        the page size of the work item listing, the lifecycle of their objects in the storage bucket
+        and the largest archive uploaded straight to the bucket
+        """
+        work_item_config = {
+            "retentionDays": config.getint(
+                "settings", "work_item_retention_days", fallback=0
+            ),
+            "listPageSize": config.getint(
+                "settings", "work_items_page_size", fallback=50
+            ),
+            "intermediateArtifactDays": config.getint(
+                "settings", "intermediate_artifact_expiration_days", fallback=7
+            ),
+            "intelligentTiering": config.getboolean(
+                "settings", "results_intelligent_tiering", fallback=True
+            ),
+            "maxArchiveUploadSizeMb": config.getint(
+                "settings", "max_archive_upload_size_mb", fallback=2048
+            ),
+        }
+
+        if work_item_config["retentionDays"] < 0:
+            raise ValueError("work_item_retention_days must be at least 0")
+
+        if work_item_config["intermediateArtifactDays"] < 1:
+            raise ValueError("intermediate_artifact_expiration_days must be at least 1")
+
+        # 5 TiB is the largest S3 object
+        if not 1 <= work_item_config["maxArchiveUploadSizeMb"] <= 5 * 1024 * 1024:
+            raise ValueError("max_archive_upload_size_mb must be between 1 and 5242880")
+
+        # Intermediate artifacts never outlive their work item
+        if work_item_config["retentionDays"]:
+            work_item_config["intermediateArtifactDays"] = min(
+                work_item_config["intermediateArtifactDays"],
+                work_item_config["retentionDays"],
+            )
+
+        if not 1 <= work_item_config["listPageSize"] <= 100:
+            raise ValueError("work_items_page_size must be between 1 and 100")
+
+        return work_item_config
+
+    def create_work_item_cleanup_resources(
+        self,
+        work_item_cleanup_config: dict,
+        build_config: dict,
+        analysis_metadata_table: dynamodb.Table,
+        analysis_storage_bucket: s3.Bucket,
+    ):
+        """
+        Create the Lambda deleting the S3 objects of the work items expired by the DynamoDB time to live,
+        triggered by the table stream
+        """
+        work_item_cleanup_lambda = lambda_.Function(
+            self,
+            "WorkItemCleanupLambda",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            architecture=work_item_cleanup_config["architecture"]["lambda_architecture"],
+            handler="work_item_cleanup.handler",
+            code=self.python_lambda_code(
+                "ecs_fargate_app/lambda_work_item_cleanup",
+                work_item_cleanup_config,
+                build_config,
+            ),
+            environment={
+                "ANALYSIS_STORAGE_BUCKET": analysis_storage_bucket.bucket_name,
+            },
+            timeout=Duration.minutes(5),
+            memory_size=work_item_cleanup_config["memorySize"],
+            ephemeral_storage_size=cdk.Size.mebibytes(
+                work_item_cleanup_config["ephemeralStorageSize"]
+            ),
+            reserved_concurrent_executions=work_item_cleanup_config[
+                "reservedConcurrency"
+            ],
+        )
+
+        analysis_storage_bucket.grant_read(work_item_cleanup_lambda)
+        analysis_storage_bucket.grant_delete(work_item_cleanup_lambda)
+
+        # Only the removals made by the time to live, deletions by the user already remove the objects
+        work_item_cleanup_lambda.add_event_source(
+            lambda_event_sources.DynamoEventSource(
+                analysis_metadata_table,
+                starting_position=lambda_.StartingPosition.TRIM_HORIZON,
+                batch_size=100,
+                max_batching_window=Duration.minutes(1),
+                bisect_batch_on_error=True,
+                retry_attempts=5,
+                filters=[
+                    lambda_.FilterCriteria.filter(
+                        {
+                            "eventName": lambda_.FilterRule.is_equal("REMOVE"),
+                            "userIdentity": {
+                                "type": lambda_.FilterRule.is_equal("Service"),
+                                "principalId": lambda_.FilterRule.is_equal(
+                                    "dynamodb.amazonaws.com"
+                                ),
+                            },
+                        }
+                    )
+                ],
+            )
+        )
+
+        return work_item_cleanup_lambda
+
+    def parse_cache_config(self, config: configparser.ConfigParser):
+        cache_config = {
+            "websocketBackplane": config.getboolean(
+                "settings", "websocket_backplane", fallback=False
+            ),
+            "responseCache": config.getboolean(
+                "settings", "response_cache", fallback=False
+            ),
+            "nodeType": config.get(
+                "settings", "cache_node_type", fallback="cache.t4g.micro"
+            ).strip(),
+            "replicas": config.getint("settings", "cache_replicas", fallback=0),
+        }
+
+        if not cache_config["nodeType"].startswith("cache."):
+            raise ValueError(
+                "cache_node_type must be an ElastiCache node type, e.g. cache.t4g.micro"
+            )
+
+        if not 0 <= cache_config["replicas"] <= 5:
+            raise ValueError("cache_replicas must be between 0 and 5")
+
+        return cache_config
+
+    def parse_monitoring_config(self, config: configparser.ConfigParser):
+        monitoring_config = {
+            "enabled": config.getboolean("settings", "monitoring", fallback=False),
+            "alarmEmail": config.get("settings", "alarm_email", fallback="").strip(),
+            "responseTimeSeconds": config.getfloat(
+                "settings", "alarm_response_time_seconds", fallback=10
+            ),
+            "modelLatencySeconds": config.getfloat(
+                "settings", "alarm_model_latency_seconds", fallback=60
+            ),
+            "kbRetrievalLatencySeconds": config.getfloat(
+                "settings", "alarm_kb_retrieval_latency_seconds", fallback=30
+            ),
+        }
+
+        if monitoring_config["alarmEmail"] and not re.fullmatch(
+            r"[^@\s]+@[^@\s]+\.[^@\s]+", monitoring_config["alarmEmail"]
+        ):
+            raise ValueError("alarm_email must be an email address")
+
+        for setting in (
+            "responseTimeSeconds",
+            "modelLatencySeconds",
+            "kbRetrievalLatencySeconds",
+        ):
+            if monitoring_config[setting] <= 0:
+                raise ValueError("alarm thresholds must be greater than 0")
+
+        return monitoring_config
+
+    def create_monitoring(
+        self,
+        monitoring_config: dict,
+        load_balancer: elbv2.ApplicationLoadBalancer,
+        services: dict,
+        functions: dict,
+        knowledge_base_id: str,
+        model_ids: list,
+    ):
+        """
+        Create the performance dashboard and the latency, throttling and saturation alarms, fed by the metrics
+        the backend and the KB synchronizer write in embedded metric format and by the AWS service metrics
+        """
+        period = Duration.minutes(5)
+
+        def backend_metric(metric_name, dimensions, statistic="Average"):
+            return cloudwatch.Metric(
+                namespace="WAIaCAnalyzer/Backend",
+                metric_name=metric_name,
+                dimensions_map=dimensions,
+                statistic=statistic,
+                period=period,
+            )
+
+        def kb_metric(metric_name, statistic="Maximum"):
+            return cloudwatch.Metric(
+                namespace="WAIaCAnalyzer/KnowledgeBase",
+                metric_name=metric_name,
+                dimensions_map={"KnowledgeBaseId": knowledge_base_id},
+                statistic=statistic,
+                period=Duration.hours(1),
+            )
+
+        def search(dimension, metric_name, statistic, label=None):
+            # One line per value of the dimension (pillar, lens), whichever values the backend reported
+            return cloudwatch.MathExpression(
+                expression=(
+                    f"SEARCH('{{WAIaCAnalyzer/Backend,{dimension}}} "
+                    f"MetricName=\"{metric_name}\"', '{statistic}', 300)"
+                ),
+                using_metrics={},
+                label=label,
+                period=period,
+            )
+
+        def throttles(model_id):
+            return cloudwatch.Metric(
+                namespace="AWS/Bedrock",
+                metric_name="InvocationThrottles",
+                dimensions_map={"ModelId": model_id},
+                statistic="Sum",
+                period=period,
+            )
+
+        kb_retrieval_latency = backend_metric(
+            "KbRetrievalLatency", {"Operation": "RetrieveAndGenerate"}, "p90"
+        )
+        total_throttles = cloudwatch.MathExpression(
+            expression="+".join(f"m{i}" for i in range(len(model_ids))),
+            using_metrics={f"m{i}": throttles(model_id) for i, model_id in enumerate(model_ids)},
+            label="Bedrock invocation throttles",
+            period=period,
+        )
+
+        dashboard = cloudwatch.Dashboard(
+            self,
+            "PerformanceDashboard",
+            dashboard_name=f"{Stack.of(self).stack_name}-Performance",
+        )
+        dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="Analysis duration per pillar (s)",
+                left=[search("Pillar", "PillarAnalysisDuration", "Average")],
+                width=12,
+            ),
+            cloudwatch.GraphWidget(
+                title="Analysis duration per lens (s, p90)",
+                left=[search("LensAlias", "AnalysisDuration", "p90")],
+                width=12,
+            ),
+        )
+        dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="Model latency (ms, p90)",
+                left=[
+                    backend_metric("ModelLatency", {"ModelId": model_id}, "p90")
+                    for model_id in model_ids
+                ],
+                width=8,
+            ),
+            cloudwatch.GraphWidget(
+                title="Model output tokens per second",
+                left=[
+                    backend_metric("OutputTokensPerSecond", {"ModelId": model_id})
+                    for model_id in model_ids
+                ],
+                width=8,
+            ),
+            cloudwatch.GraphWidget(
+                title="Bedrock throttles",
+                left=[throttles(model_id) for model_id in model_ids],
+                right=[
+                    search(
+                        "Operation", "BedrockThrottles", "Sum", "Failed after retries"
+                    )
+                ],
+                width=8,
+            ),
+        )
+        dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="KB retrieval latency (ms)",
+                left=[
+                    backend_metric(
+                        "KbRetrievalLatency", {"Operation": "RetrieveAndGenerate"}, "p50"
+                    ),
+                    kb_retrieval_latency,
+                ],
+                width=8,
+            ),
+            cloudwatch.GraphWidget(
+                title="KB synchronizer and ingestion job duration (s)",
+                left=[
+                    kb_metric("SynchronizerDuration"),
+                    kb_metric("IngestionJobDuration"),
+                ],
+                right=[kb_metric("DocumentsFailed")],
+                width=8,
+            ),
+            cloudwatch.GraphWidget(
+                title="Lambda duration (ms, max) and errors",
+                left=[
+                    function.metric_duration(statistic="Maximum", label=name)
+                    for name, function in functions.items()
+                ],
+                right=[
+                    function.metric_errors(label=f"{name} errors")
+                    for name, function in functions.items()
+                ],
+                width=8,
+            ),
+        )
+        dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="ALB target response time (s)",
+                left=[
+                    load_balancer.metrics.target_response_time(statistic=statistic)
+                    for statistic in ("p50", "p90", "p99")
+                ],
+                right=[
+                    load_balancer.metrics.http_code_target(
+                        elbv2.HttpCodeTarget.TARGET_5XX_COUNT
+                    )
+                ],
+                width=8,
+            ),
+            cloudwatch.GraphWidget(
+                title="ECS CPU utilization (%)",
+                left=[
+                    service.metric_cpu_utilization(label=name)
+                    for name, service in services.items()
+                ],
+                width=8,
+            ),
+            cloudwatch.GraphWidget(
+                title="ECS memory utilization (%)",
+                left=[
+                    service.metric_memory_utilization(label=name)
+                    for name, service in services.items()
+                ],
+                width=8,
+            ),
+        )
+
+        alarms = [
+            cloudwatch.Alarm(
+                self,
+                "TargetResponseTimeAlarm",
+                alarm_description="p90 ALB target response time is above the threshold",
+                metric=load_balancer.metrics.target_response_time(
+                    statistic="p90", period=period
+                ),
+                threshold=monitoring_config["responseTimeSeconds"],
+                evaluation_periods=3,
+                datapoints_to_alarm=2,
+            ),
+            cloudwatch.Alarm(
+                self,
+                "ModelLatencyAlarm",
+                alarm_description="p90 latency of the default model is above the threshold",
+                metric=backend_metric("ModelLatency", {"ModelId": model_ids[0]}, "p90"),
+                threshold=monitoring_config["modelLatencySeconds"] * 1000,
+                evaluation_periods=3,
+                datapoints_to_alarm=2,
+            ),
+            cloudwatch.Alarm(
+                self,
+                "BedrockThrottlesAlarm",
+                alarm_description="Bedrock throttles model invocations, request a quota increase or use cross-region inference profiles",
+                metric=total_throttles,
+                threshold=10,
+                evaluation_periods=3,
+                datapoints_to_alarm=2,
+            ),
+            cloudwatch.Alarm(
+                self,
+                "KbRetrievalLatencyAlarm",
+                alarm_description="p90 knowledge base retrieval latency is above the threshold",
+                metric=kb_retrieval_latency,
+                threshold=monitoring_config["kbRetrievalLatencySeconds"] * 1000,
+                evaluation_periods=3,
+                datapoints_to_alarm=2,
+            ),
+            cloudwatch.Alarm(
+                self,
+                "IngestionJobFailedAlarm",
+                alarm_description="A knowledge base ingestion job failed",
+                metric=kb_metric("IngestionJobFailed"),
+                threshold=1,
+                comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+                evaluation_periods=1,
+            ),
+        ]
+        for name, function in functions.items():
+            alarms.append(
+                cloudwatch.Alarm(
+                    self,
+                    f"{name}ErrorsAlarm",
+                    alarm_description=f"The {name} function failed",
+                    metric=function.metric_errors(period=Duration.hours(1)),
+                    threshold=1,
+                    comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+                    evaluation_periods=1,
+                )
+            )
+        for name, service in services.items():
+            alarms.append(
+                cloudwatch.Alarm(
+                    self,
+                    f"{name}CpuAlarm",
+                    alarm_description=f"{name} tasks are CPU bound, check the scaling settings",
+                    metric=service.metric_cpu_utilization(period=period),
+                    threshold=85,
+                    evaluation_periods=3,
+                )
+            )
+            alarms.append(
+                cloudwatch.Alarm(
+                    self,
+                    f"{name}MemoryAlarm",
+                    alarm_description=f"{name} tasks are running out of memory, check the task size",
+                    metric=service.metric_memory_utilization(period=period),
+                    threshold=85,
+                    evaluation_periods=3,
+                )
+            )
+
+        if monitoring_config["alarmEmail"]:
+            alarm_topic = sns.Topic(self, "AlarmTopic", enforce_ssl=True)
+            alarm_topic.add_subscription(
+                subscriptions.EmailSubscription(monitoring_config["alarmEmail"])
+            )
+            for alarm in alarms:
+                alarm.add_alarm_action(cw_actions.SnsAction(alarm_topic))
+
+        return dashboard
+
+    def parse_tracing_config(self, config: configparser.ConfigParser):
+        tracing_config = {
+            "enabled": config.getboolean("settings", "tracing", fallback=False),
+            "sampleRatio": config.getfloat(
+                "settings", "tracing_sample_ratio", fallback=1.0
+            ),
+            "collectorImage": config.get(
+                "settings",
+                "otel_collector_image",
+                fallback="public.ecr.aws/aws-observability/aws-otel-collector:v0.43.3",
+            ).strip(),
+        }
+
+        if not 0 < tracing_config["sampleRatio"] <= 1:
+            raise ValueError("tracing_sample_ratio must be greater than 0 and at most 1")
+
+        return tracing_config
+
+    def add_otel_collector(
+        self,
+        task_definition: ecs.FargateTaskDefinition,
+        app_container: ecs.ContainerDefinition,
+        tracing_config: dict,
+        stream_prefix: str,
+    ):
+        """
+        Add an AWS Distro for OpenTelemetry collector sidecar receiving the spans of the app container over OTLP
+        and exporting them to X-Ray
+        """
+        collector = task_definition.add_container(
+            "OtelCollector",
+            image=ecs.ContainerImage.from_registry(tracing_config["collectorImage"]),
+            # Configuration bundled in the image: OTLP receivers on localhost:4317 (gRPC) and 4318 (HTTP), X-Ray exporter
+            command=["--config=/etc/ecs/ecs-xray.yaml"],
+            logging=ecs.LogDriver.aws_logs(stream_prefix=stream_prefix),
+            memory_reservation_mib=64,
+            # Losing the collector only loses spans, the app keeps serving requests
+            essential=False,
+        )
+        app_container.add_container_dependencies(
+            ecs.ContainerDependency(
+                container=collector, condition=ecs.ContainerDependencyCondition.START
+            )
+        )
+
+    def create_cache_cluster(self, vpc: ec2.Vpc, cache_config: dict):
+        """
+        Create the Redis-compatible cache shared by the backend and worker tasks
+        """
+        cache_security_group = ec2.SecurityGroup(
+            self,
+            "CacheSecurityGroup",
+            vpc=vpc,
+            description="Security group for the ElastiCache cluster",
+            allow_all_outbound=False,
+        )
+
+        cache_subnet_group = elasticache.CfnSubnetGroup(
+            self,
+            "CacheSubnetGroup",
+            description="Private subnets of the ElastiCache cluster",
+            subnet_ids=vpc.select_subnets(
+                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+            ).subnet_ids,
+        )
+
+        replicas = cache_config["replicas"]
+        cache_cluster = elasticache.CfnReplicationGroup(
+            self,
+            "CacheReplicationGroup",
+            replication_group_description="WA IaC Analyzer cache and websocket backplane",
+            engine="valkey",
+            cache_node_type=cache_config["nodeType"],
+            num_cache_clusters=1 + replicas,
+            automatic_failover_enabled=replicas > 0,
+            multi_az_enabled=replicas > 0,
+            cache_subnet_group_name=cache_subnet_group.ref,
+            security_group_ids=[cache_security_group.security_group_id],
+            at_rest_encryption_enabled=True,
+            transit_encryption_enabled=True,
+        )
+
+        # The backend connects over TLS (rediss://)
+        cache_url = (
+            f"rediss://{cache_cluster.attr_primary_end_point_address}:"
+            f"{cache_cluster.attr_primary_end_point_port}"
+        )
+
+        return cache_security_group, cache_url
+
+    def create_vpc_endpoints(self, vpc: ec2.Vpc, tracing: bool, job_queue: bool):
+        """
+        Create the VPC endpoints of the AWS services called by the backend and worker tasks
+        """
+        private_subnets = ec2.SubnetSelection(
+            subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+        )
+
+        # Gateway endpoints are free and only add routes to the private subnets
+        vpc.add_gateway_endpoint(
+            "S3GatewayEndpoint",
+            service=ec2.GatewayVpcEndpointAwsService.S3,
+            subnets=[private_subnets],
+        )
+        vpc.add_gateway_endpoint(
+            "DynamoDBGatewayEndpoint",
+            service=ec2.GatewayVpcEndpointAwsService.DYNAMODB,
+            subnets=[private_subnets],
+        )
+
+        endpoint_security_group = ec2.SecurityGroup(
+            self,
+            "VpcEndpointSecurityGroup",
+            vpc=vpc,
+            description="Security group for the interface VPC endpoints",
+            allow_all_outbound=False,
+        )
+
+        # Private DNS makes the SDK clients use the endpoints without any configuration change
+        interface_services = {
+            "BedrockRuntimeEndpoint": ec2.InterfaceVpcEndpointAwsService.BEDROCK_RUNTIME,
+            "BedrockAgentRuntimeEndpoint": ec2.InterfaceVpcEndpointAwsService.BEDROCK_AGENT_RUNTIME,
+            "WellArchitectedEndpoint": ec2.InterfaceVpcEndpointAwsService(
+                "wellarchitected"
+            ),
+        }
+        if tracing:
+            interface_services["XRayEndpoint"] = ec2.InterfaceVpcEndpointAwsService.XRAY
+        if job_queue:
+            interface_services["SqsEndpoint"] = ec2.InterfaceVpcEndpointAwsService.SQS
+        for endpoint_id, service in interface_services.items():
+            vpc.add_interface_endpoint(
+                endpoint_id,
+                service=service,
+                subnets=private_subnets,
+                security_groups=[endpoint_security_group],
+                private_dns_enabled=True,
+                open=False,
+            )
+
+        return endpoint_security_group
+
     def create_alb_auth_action(
         self,
         auth_config: dict,
@@ -170,7 +1580,9 @@ class WAGenAIStack(Stack):
                 next=elbv2.ListenerAction.forward([self.frontend_target_group]),
             )
 
-    def create_stack_cleanup_resources(self):
+    def create_stack_cleanup_resources(
+        self, stack_cleanup_config: dict, build_config: dict
+    ):
         """
         Create resources for automatic stack cleanup via EventBridge and Lambda
         """
@@ -183,6 +1595,19 @@ class WAGenAIStack(Stack):
                 "DEPLOYMENT_STACK_NAME environment variable must be provided"
             )
 
+        # Additional stack names or patterns the Lambda may delete in batch mode (comma separated).
+        # Only "*" and "?" wildcards are supported, so the same entries can scope the IAM policies.
+        allowed_stack_names = [deployment_stack_name]
+        for name in os.environ.get("CLEANUP_ALLOWED_STACKS", "").split(","):
+            name = name.strip()
+            if not name or name in allowed_stack_names:
+                continue
+            if not re.fullmatch(r"[A-Za-z0-9*?-]+", name):
+                raise ValueError(
+                    f"Invalid stack name or pattern in CLEANUP_ALLOWED_STACKS: {name}"
+                )
+            allowed_stack_names.append(name)
+
         # Create Lambda execution role
         lambda_role = iam.Role(
             self,
@@ -197,12 +1622,13 @@ class WAGenAIStack(Stack):
             )
         )
 
-        # Add CloudFormation permissions to delete the specific stack
+        # Add CloudFormation permissions to delete the allowed stacks
         lambda_role.add_to_policy(
             iam.PolicyStatement(
                 actions=["cloudformation:DeleteStack"],
                 resources=[
-                    f"arn:aws:cloudformation:{self.region}:{self.account}:stack/{deployment_stack_name}/*",
+                    f"arn:aws:cloudformation:{self.region}:{self.account}:stack/{name}/*"
+                    for name in allowed_stack_names
                 ],
             )
         )
@@ -213,6 +1639,8 @@ class WAGenAIStack(Stack):
                 actions=[
                     "cloudformation:DescribeStacks",
                     "cloudformation:GetTemplate",
+                    "cloudformation:ListStackResources",
+                    "cloudformation:ListStacks",
                     "ec2:DescribeInstances",
                     "ec2:DescribeInternetGateways",
                     "ec2:DescribeRouteTables",
@@ -235,10 +1663,10 @@ class WAGenAIStack(Stack):
             )
         )
 
-        # EC2, SSM, Logs write operations - With resource tag condition for specific stack
+        # EC2, SSM, Logs write operations - With resource tag condition for the allowed stacks
         tag_conditions = {
-            "StringEquals": {
-                "aws:ResourceTag/aws:cloudformation:stack-name": [deployment_stack_name]
+            "StringLike": {
+                "aws:ResourceTag/aws:cloudformation:stack-name": allowed_stack_names
             }
         }
 
@@ -267,7 +1695,7 @@ class WAGenAIStack(Stack):
             )
         )
 
-        # IAM permissions for the specific stack resources
+        # IAM permissions for the allowed stacks' resources
         lambda_role.add_to_policy(
             iam.PolicyStatement(
                 actions=[
@@ -276,7 +1704,8 @@ class WAGenAIStack(Stack):
                     "iam:DetachRolePolicy",
                 ],
                 resources=[
-                    f"arn:aws:iam::{self.account}:role/{deployment_stack_name}*"
+                    f"arn:aws:iam::{self.account}:role/{name}*"
+                    for name in allowed_stack_names
                 ],
             )
         )
@@ -288,7 +1717,48 @@ class WAGenAIStack(Stack):
                     "iam:RemoveRoleFromInstanceProfile",
                 ],
                 resources=[
-                    f"arn:aws:iam::{self.account}:instance-profile/{deployment_stack_name}*"
+                    f"arn:aws:iam::{self.account}:instance-profile/{name}*"
+                    for name in allowed_stack_names
+                ],
+            )
+        )
+
+        # Permissions to drain the stacks' buckets and repositories before deleting them.
+        # CloudFormation generated names start with the lowercased stack name.
+        generated_name_prefixes = [name.lower() for name in allowed_stack_names]
+
+        lambda_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=[
+                    "s3:DeleteObject",
+                    "s3:DeleteObjectVersion",
+                    "s3:ListBucket",
+                    "s3:ListBucketVersions",
+                ],
+                resources=[
+                    arn
+                    for prefix in generated_name_prefixes
+                    for arn in (f"arn:aws:s3:::{prefix}*", f"arn:aws:s3:::{prefix}*/*")
+                ],
+            )
+        )
+
+        lambda_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["ecr:BatchDeleteImage", "ecr:ListImages"],
+                resources=[
+                    f"arn:aws:ecr:{self.region}:{self.account}:repository/{prefix}*"
+                    for prefix in generated_name_prefixes
+                ],
+            )
+        )
+
+        # Publish the summary event of batch cleanups, and the batch requests continuing them
+        lambda_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["events:PutEvents"],
+                resources=[
+                    f"arn:aws:events:{self.region}:{self.account}:event-bus/default"
                 ],
             )
         )
@@ -298,23 +1768,28 @@ class WAGenAIStack(Stack):
             self,
             "StackCleanupLambda",
             runtime=lambda_.Runtime.PYTHON_3_12,
+            architecture=stack_cleanup_config["architecture"]["lambda_architecture"],
             handler="stack_cleanup.handler",
-            code=lambda_.Code.from_asset(
+            code=self.python_lambda_code(
                 "ecs_fargate_app/lambda_stack_cleanup",
-                bundling=cdk.BundlingOptions(
-                    image=lambda_.Runtime.PYTHON_3_12.bundling_image,
-                    command=[
-                        "bash",
-                        "-c",
-                        "pip install --no-cache -r requirements.txt -t /asset-output && cp -au . /asset-output",
-                    ],
-                ),
+                stack_cleanup_config,
+                build_config,
             ),
-            timeout=Duration.minutes(10),
+            # Maximum timeout, the Lambda waits for the stack deletion to complete
+            timeout=Duration.minutes(15),
+            memory_size=stack_cleanup_config["memorySize"],
+            ephemeral_storage_size=cdk.Size.mebibytes(
+                stack_cleanup_config["ephemeralStorageSize"]
+            ),
+            reserved_concurrent_executions=stack_cleanup_config["reservedConcurrency"],
             role=lambda_role,
             environment={
                 # Pass the deployment stack name to the Lambda
-                "DEPLOYMENT_STACK_NAME": deployment_stack_name
+                "DEPLOYMENT_STACK_NAME": deployment_stack_name,
+                "ALLOWED_STACK_NAMES": ",".join(allowed_stack_names),
+                "DRAIN_CONCURRENCY": "8",
+                # Stacks torn down in parallel in batch mode, kept low for the CloudFormation API limits
+                "BATCH_CONCURRENCY": "5",
             },
         )
 
@@ -329,8 +1804,161 @@ class WAGenAIStack(Stack):
             ),
         )
 
-        # Add Lambda as target for the rule
-        rule.add_target(targets.LambdaFunction(cleanup_lambda))
+        # Add Lambda as target for the rule
+        rule.add_target(targets.LambdaFunction(cleanup_lambda))
+
+        # Create EventBridge rule for batch cleanups, stacks are validated against the allow-list by the Lambda.
+        # Runs out of time hand the remaining stacks over to a new batch request through this rule.
+        batch_rule = events.Rule(
+            self,
+            "StackCleanupBatchRule",
+            event_pattern=events.EventPattern(
+                source=["iac.analyzer.deployment"],
+                detail_type=["Stack Cleanup Batch Request"],
+            ),
+        )
+
+        batch_rule.add_target(targets.LambdaFunction(cleanup_lambda))
+
+    def create_worker_tier(
+        self,
+        ecs_cluster: ecs.Cluster,
+        backend_image: DockerImageAsset,
+        backend_environment: dict,
+        task_role: iam.Role,
+        architecture: dict,
+        compute_config: dict,
+        job_queue: sqs.Queue,
+        tracing_config: dict,
+    ):
+        """
+        Create the worker service processing the jobs queued by the backend, scaled on the queue metrics
+        """
+        worker_task_definition = ecs.FargateTaskDefinition(
+            self,
+            "WorkerTaskDef",
+            runtime_platform=ecs.RuntimePlatform(
+                operating_system_family=ecs.OperatingSystemFamily.LINUX,
+                cpu_architecture=architecture["fargate_architecture"],
+            ),
+            task_role=task_role,
+            cpu=compute_config["backendCpu"],
+            memory_limit_mib=compute_config["backendMemory"],
+            ephemeral_storage_gib=(
+                compute_config["backendEphemeralStorage"]
+                if compute_config["backendEphemeralStorage"] > 20
+                else None
+            ),
+        )
+
+        # Same image and settings as the backend, running in worker mode
+        worker_environment = {
+            **backend_environment,
+            "APP_MODE": "worker",
+            "WORKER_CONCURRENCY": str(compute_config["workerConcurrency"]),
+        }
+        if tracing_config["enabled"]:
+            worker_environment["OTEL_SERVICE_NAME"] = "wa-genai-worker"
+
+        worker_container = worker_task_definition.add_container(
+            "WorkerContainer",
+            image=ecs.ContainerImage.from_docker_image_asset(backend_image),
+            environment=worker_environment,
+            logging=ecs.LogDriver.aws_logs(stream_prefix="worker"),
+            # Let running jobs finish when the task is stopped
+            stop_timeout=Duration.seconds(120),
+        )
+
+        if tracing_config["enabled"]:
+            self.add_otel_collector(
+                worker_task_definition, worker_container, tracing_config, "worker-otel"
+            )
+
+        # Workers only make outbound calls
+        worker_security_group = ec2.SecurityGroup(
+            self,
+            "WorkerSecurityGroup",
+            vpc=ecs_cluster.vpc,
+            description="Security group for worker service",
+        )
+
+        worker_service = ecs.FargateService(
+            self,
+            "WorkerService",
+            cluster=ecs_cluster,
+            task_definition=worker_task_definition,
+            vpc_subnets=ec2.SubnetSelection(
+                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+            ),
+            security_groups=[worker_security_group],
+            desired_count=compute_config["workerMinTasks"],
+        )
+
+        worker_scaling = worker_service.auto_scale_task_count(
+            min_capacity=compute_config["workerMinTasks"],
+            max_capacity=compute_config["workerMaxTasks"],
+        )
+
+        # Scale out with the number of jobs waiting for a worker
+        worker_scaling.scale_on_metric(
+            "WorkerQueueDepthScaling",
+            metric=job_queue.metric_approximate_number_of_messages_visible(
+                statistic="Maximum", period=Duration.minutes(1)
+            ),
+            scaling_steps=[
+                appscaling.ScalingInterval(upper=0, change=0),
+                appscaling.ScalingInterval(lower=1, change=1),
+                appscaling.ScalingInterval(
+                    lower=5 * compute_config["workerConcurrency"], change=2
+                ),
+            ],
+            adjustment_type=appscaling.AdjustmentType.CHANGE_IN_CAPACITY,
+            cooldown=Duration.minutes(1),
+        )
+
+        # Scale out faster when jobs wait too long
+        worker_scaling.scale_on_metric(
+            "WorkerOldestJobAgeScaling",
+            metric=job_queue.metric_approximate_age_of_oldest_message(
+                statistic="Maximum", period=Duration.minutes(1)
+            ),
+            scaling_steps=[
+                appscaling.ScalingInterval(upper=120, change=0),
+                appscaling.ScalingInterval(lower=120, change=1),
+                appscaling.ScalingInterval(lower=600, change=2),
+            ],
+            adjustment_type=appscaling.AdjustmentType.CHANGE_IN_CAPACITY,
+            cooldown=Duration.minutes(1),
+        )
+
+        # Only scale in once no job is queued or running, so in-flight analyses are not interrupted.
+        # Messages of running jobs are kept invisible by their workers.
+        active_jobs = cloudwatch.MathExpression(
+            expression="visible + running",
+            using_metrics={
+                "visible": job_queue.metric_approximate_number_of_messages_visible(
+                    statistic="Maximum", period=Duration.minutes(1)
+                ),
+                "running": job_queue.metric_approximate_number_of_messages_not_visible(
+                    statistic="Maximum", period=Duration.minutes(1)
+                ),
+            },
+            label="ActiveJobs",
+            period=Duration.minutes(1),
+        )
+        worker_scaling.scale_on_metric(
+            "WorkerIdleScaling",
+            metric=active_jobs,
+            scaling_steps=[
+                appscaling.ScalingInterval(upper=0, change=-1),
+                appscaling.ScalingInterval(lower=1, change=0),
+            ],
+            adjustment_type=appscaling.AdjustmentType.CHANGE_IN_CAPACITY,
+            cooldown=Duration.minutes(5),
+            evaluation_periods=10,
+        )
+
+        return worker_service
 
     def __init__(self, scope: Construct, construct_id: str, **kwarg) -> None:
         super().__init__(scope, construct_id, **kwarg)
@@ -338,8 +1966,17 @@ class WAGenAIStack(Stack):
         # Read config.ini
         config = configparser.ConfigParser()
         config.read("config.ini")
-        model_id = config["settings"]["model_id"]
+        model_config = self.parse_model_config(config)
+        model_id = model_config["default"]
         public_lb = config["settings"].getboolean("public_load_balancer", False)
+        vpc_endpoints = config["settings"].getboolean("vpc_endpoints", False)
+        service_connect = config["settings"].getboolean("service_connect", False)
+        use_cloudfront = config["settings"].getboolean("cloudfront", False)
+        migration_strategy = config.get(
+            "settings", "migration_strategy", fallback="eager"
+        ).lower()
+        if migration_strategy not in ("eager", "lazy"):
+            raise ValueError("migration_strategy must be either 'eager' or 'lazy'")
 
         # Check if auto-cleanup is enabled (from environment variable set by deploy script)
         auto_cleanup = os.environ.get("AUTO_CLEANUP", "false").lower() == "true"
@@ -348,6 +1985,46 @@ class WAGenAIStack(Stack):
         # Parse authentication config
         auth_config = self.parse_auth_config(config)
 
+        # Parse task sizing and autoscaling config
+        compute_config = self.parse_compute_config(config)
+
+        # Parse CloudFront config
+        cloudfront_config = None
+        if use_cloudfront:
+            cloudfront_config = self.parse_cloudfront_config(
+                config, auth_config, compute_config, public_lb
+            )
+            # Users sign in through the distribution, new user pool clients accept its callback URL
+            if auth_config["enabled"] and auth_config["authType"] == "new-cognito":
+                callback_url = (
+                    f"https://{cloudfront_config['domainName']}/oauth2/idpresponse"
+                )
+                if callback_url not in auth_config["cognito"]["callbackUrls"]:
+                    auth_config["cognito"]["callbackUrls"].append(callback_url)
+
+        # Parse work item retention and listing config
+        work_item_config = self.parse_work_item_config(config)
+
+        # Parse cache config
+        cache_config = self.parse_cache_config(config)
+
+        # Parse KB chunking config
+        chunking_config = self.parse_chunking_config(config)
+
+        # Parse KB data sources config
+        kb_data_source_config = self.parse_kb_data_source_config(config)
+
+        # Parse KB embedding model and vector store config
+        kb_vector_store_config = self.parse_kb_vector_store_config(
+            config, chunking_config
+        )
+
+        # Parse distributed tracing config
+        tracing_config = self.parse_tracing_config(config)
+
+        # Parse dashboard and alarms config
+        monitoring_config = self.parse_monitoring_config(config)
+
         # Create sign out URL based on auth type
         sign_out_url = ""
         if auth_config["enabled"]:
@@ -366,38 +2043,52 @@ class WAGenAIStack(Stack):
 
         random_id = str(uuid.uuid4())[:8]  # First 8 characters of a UUID
 
-        platform_mapping = {
-            "x86_64": {
-                "fargate_architecture": ecs.CpuArchitecture.X86_64,
-                "build_architecture": Platform.LINUX_AMD64,
-                "build_architecture_argument": "amd64",
-            },
-            "arm64": {
-                "fargate_architecture": ecs.CpuArchitecture.ARM64,
-                "build_architecture": Platform.LINUX_ARM64,
-                "build_architecture_argument": "arm64",
-            },
-            "aarch64": {
-                "fargate_architecture": ecs.CpuArchitecture.ARM64,
-                "build_architecture": Platform.LINUX_ARM64,
-                "build_architecture_argument": "arm64",
-            },
-        }
-        # Get architecture from platform (depending the machine that runs CDK)
-        architecture = platform_mapping[platform.machine()]
+        architecture = self.get_architecture(config)
+
+        # Sizing and architecture of the Python Lambdas
+        lambda_config = self.parse_lambda_config(config)
+        kb_synchronizer_config = lambda_config["kbSynchronizer"]
+        migration_config = lambda_config["migration"]
+        work_item_cleanup_config = lambda_config["workItemCleanup"]
+        build_config = self.parse_build_config(config)
 
         # Creates Bedrock KB using the generative_ai_cdk_constructs
-        kb = bedrock.KnowledgeBase(
-            self,
-            "WAFR-KnowledgeBase",
-            embeddings_model=bedrock.BedrockFoundationModel.TITAN_EMBED_TEXT_V2_1024,
-            instruction="Use this knowledge base to answer questions about AWS Well Architected Framework Review (WAFR).",
-            description="This knowledge base contains AWS Well Architected Framework Review (WAFR) reference documents",
-        )
+        kb = self.create_knowledge_base(kb_vector_store_config)
 
         KB_ID = kb.knowledge_base_id
 
         # Create S3 bucket and DynamoDB table for storage layer
+        # The backend tags the objects it writes with their artifact type: "result" (uploads, supporting documents,
+        # analysis results, chat histories and templates) or "intermediate" (packed content and job results).
+        # Objects of expired work items are deleted by the work item cleanup Lambda, not by these rules.
+        storage_lifecycle_rules = [
+            s3.LifecycleRule(
+                id="AbortIncompleteMultipartUploads",
+                abort_incomplete_multipart_upload_after=Duration.days(1),
+            ),
+            # The backend rebuilds the packed content from the original upload when it has expired
+            s3.LifecycleRule(
+                id="ExpireIntermediateArtifacts",
+                tag_filters={"artifact": "intermediate"},
+                expiration=Duration.days(work_item_config["intermediateArtifactDays"]),
+            ),
+        ]
+        if work_item_config["intelligentTiering"]:
+            # Objects under 128 KB are not monitored by Intelligent-Tiering, transitioning them would only add request charges
+            storage_lifecycle_rules.append(
+                s3.LifecycleRule(
+                    id="IntelligentTieringForResults",
+                    tag_filters={"artifact": "result"},
+                    object_size_greater_than=128 * 1024,
+                    transitions=[
+                        s3.Transition(
+                            storage_class=s3.StorageClass.INTELLIGENT_TIERING,
+                            transition_after=Duration.days(0),
+                        )
+                    ],
+                )
+            )
+
         # Create S3 bucket for storing analysis results
         analysis_storage_bucket = s3.Bucket(
             self,
@@ -410,8 +2101,11 @@ class WAGenAIStack(Stack):
                     allowed_methods=[s3.HttpMethods.GET, s3.HttpMethods.PUT],
                     allowed_origins=["*"],
                     allowed_headers=["*"],
+                    # Archive parts uploaded by the browser are completed with their ETags
+                    exposed_headers=["ETag"],
                 )
             ],
+            lifecycle_rules=storage_lifecycle_rules,
         )
 
         # Create DynamoDB table for metadata
@@ -427,8 +2121,79 @@ class WAGenAIStack(Stack):
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy=RemovalPolicy.DESTROY,
             point_in_time_recovery=True,
+            # Set from the last activity when work_item_retention_days is set
+            time_to_live_attribute="expiresAt",
+            # Keys of the expired work items, for the cleanup of their objects
+            stream=(
+                dynamodb.StreamViewType.KEYS_ONLY
+                if work_item_config["retentionDays"]
+                else None
+            ),
+        )
+
+        # Most recently updated work items first per user, for the paginated work item listing.
+        # Only the attributes shown in the side navigation are projected, the item itself is loaded when opened.
+        analysis_metadata_table.add_global_secondary_index(
+            index_name="UserLastModifiedIndex",
+            partition_key=dynamodb.Attribute(
+                name="userId", type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name="lastModified", type=dynamodb.AttributeType.STRING
+            ),
+            projection_type=dynamodb.ProjectionType.INCLUDE,
+            non_key_attributes=[
+                "fileName",
+                "fileType",
+                "uploadDate",
+                "uploadMode",
+                "hasChatHistory",
+                "usedLenses",
+                "analysisStatus",
+                "analysisPartialResults",
+                "workloadIds",
+                "workloadId",
+            ],
         )
 
+        # Create the job queue of the worker tier, with the job status records in DynamoDB
+        job_table = None
+        job_queue = None
+        if compute_config["workerTier"]:
+            # Workers extend the visibility of a job's message while it runs,
+            # the message of a stopped worker's job is delivered again after this timeout
+            job_queue = sqs.Queue(
+                self,
+                "AnalysisJobQueue",
+                visibility_timeout=Duration.seconds(120),
+                retention_period=Duration.days(4),
+                encryption=sqs.QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                removal_policy=RemovalPolicy.DESTROY,
+            )
+
+            job_table = dynamodb.Table(
+                self,
+                "AnalysisJobTable",
+                partition_key=dynamodb.Attribute(
+                    name="jobId", type=dynamodb.AttributeType.STRING
+                ),
+                billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+                removal_policy=RemovalPolicy.DESTROY,
+                time_to_live_attribute="ttl",
+            )
+
+            # Jobs per user, for cancellations
+            job_table.add_global_secondary_index(
+                index_name="UserIndex",
+                partition_key=dynamodb.Attribute(
+                    name="userId", type=dynamodb.AttributeType.STRING
+                ),
+                sort_key=dynamodb.Attribute(
+                    name="queuedAt", type=dynamodb.AttributeType.NUMBER
+                ),
+            )
+
         # Create DynamoDB table for lens metadata
         lens_metadata_table = dynamodb.Table(
             self,
@@ -461,37 +2226,42 @@ class WAGenAIStack(Stack):
 
         WA_DOCS_BUCKET_NAME = wafrReferenceDocsBucket.bucket_name
 
-        # Adds the created S3 bucket [docBucket] as a Data Source for Bedrock KB
-        kbDataSource = bedrock.S3DataSource(
-            self,
-            "DataSource",
-            bucket=wafrReferenceDocsBucket,
-            knowledge_base=kb,
-            data_source_name="wafr-reference-docs",
-            chunking_strategy=bedrock.ChunkingStrategy.hierarchical(
-                overlap_tokens=60, max_parent_token_size=2000, max_child_token_size=800
-            ),
+        # Adds the created S3 bucket [docBucket] as the Data Sources of the Bedrock KB, one per lens prefix
+        # (or one for the whole bucket), so a changed lens only re-ingests its own documents.
+        # The synchronizer starts the ingestion jobs, including the first one of each data source.
+        kb_data_sources = self.create_kb_data_sources(
+            kb, wafrReferenceDocsBucket, kb_data_source_config, chunking_config
+        )
+        kb_data_source_ids = self.to_json_string(
+            {
+                prefix: data_source.data_source_id
+                for prefix, data_source in kb_data_sources.items()
+            }
         )
 
-        # Data Ingestion Params
-        dataSourceIngestionParams = {
-            "dataSourceId": kbDataSource.data_source_id,
-            "knowledgeBaseId": KB_ID,
-        }
-
-        # Define a custom resource to make an AwsSdk startIngestionJob call
-        ingestion_job_cr = cr.AwsCustomResource(
-            self,
-            "IngestionCustomResource",
-            on_create=cr.AwsSdkCall(
-                service="bedrock-agent",
-                action="startIngestionJob",
-                parameters=dataSourceIngestionParams,
-                physical_resource_id=cr.PhysicalResourceId.of("Parameter.ARN"),
-            ),
-            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
-                resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
-            ),
+        # Blue/green ingestion: a second data source per prefix, ingested while the backend retrieves
+        # from the other color, named by the active color parameter flipped by the synchronizer
+        kb_green_data_sources = {}
+        kb_active_color_parameter = None
+        if kb_data_source_config["blueGreen"]:
+            kb_green_data_sources = self.create_kb_data_sources(
+                kb,
+                wafrReferenceDocsBucket,
+                kb_data_source_config,
+                chunking_config,
+                color="green",
+            )
+            kb_active_color_parameter = ssm.StringParameter(
+                self,
+                "KbActiveColorParameter",
+                description="Color of the knowledge base data sources queried by the backend (blue or green)",
+                string_value="blue",
+            )
+        kb_green_data_source_ids = self.to_json_string(
+            {
+                prefix: data_source.data_source_id
+                for prefix, data_source in kb_green_data_sources.items()
+            }
         )
 
         # Params for the test Well-Architected Workload
@@ -543,32 +2313,45 @@ class WAGenAIStack(Stack):
             self,
             "KbLambdaSynchronizer",
             runtime=lambda_.Runtime.PYTHON_3_12,
+            architecture=kb_synchronizer_config["architecture"]["lambda_architecture"],
             handler="kb_synchronizer.handler",
-            code=lambda_.Code.from_asset(
+            code=self.python_lambda_code(
                 "ecs_fargate_app/lambda_kb_synchronizer",
-                bundling=cdk.BundlingOptions(
-                    image=lambda_.Runtime.PYTHON_3_12.bundling_image,
-                    command=[
-                        "bash",
-                        "-c",
-                        "pip install --no-cache -r requirements.txt -t /asset-output && cp -au . /asset-output",
-                    ],
-                ),
+                kb_synchronizer_config,
+                build_config,
             ),
             environment={
                 "KNOWLEDGE_BASE_ID": KB_ID,
-                "DATA_SOURCE_ID": kbDataSource.data_source_id,
+                # Data source IDs keyed by bucket prefix, an empty prefix covers the whole bucket
+                "DATA_SOURCE_IDS": kb_data_source_ids,
                 "WA_DOCS_BUCKET_NAME": wafrReferenceDocsBucket.bucket_name,
                 "WORKLOAD_ID": workload_cr.get_response_field("WorkloadId"),
                 "LENS_METADATA_TABLE": lens_metadata_table.table_name,
+                **(
+                    {
+                        "GREEN_DATA_SOURCE_IDS": kb_green_data_source_ids,
+                        "ACTIVE_COLOR_PARAMETER": kb_active_color_parameter.parameter_name,
+                    }
+                    if kb_active_color_parameter
+                    else {}
+                ),
             },
             timeout=Duration.minutes(15),
+            memory_size=kb_synchronizer_config["memorySize"],
+            ephemeral_storage_size=cdk.Size.mebibytes(
+                kb_synchronizer_config["ephemeralStorageSize"]
+            ),
+            reserved_concurrent_executions=kb_synchronizer_config["reservedConcurrency"],
         )
 
         # Grant permissions to the KB synchronizer Lambda
         kb_lambda_synchronizer.add_to_role_policy(
             iam.PolicyStatement(
-                actions=["bedrock:StartIngestionJob"],
+                actions=[
+                    "bedrock:StartIngestionJob",
+                    "bedrock:GetIngestionJob",
+                    "bedrock:ListIngestionJobs",
+                ],
                 resources=[
                     f"arn:aws:bedrock:{self.region}:{self.account}:knowledge-base/{KB_ID}"
                 ],
@@ -587,11 +2370,16 @@ class WAGenAIStack(Stack):
             )
         )
 
+        # Grant Lambda access to the active color of the blue/green data sources
+        if kb_active_color_parameter:
+            kb_active_color_parameter.grant_read(kb_lambda_synchronizer)
+            kb_active_color_parameter.grant_write(kb_lambda_synchronizer)
+
         # Grant Lambda access to the lens metadata table
         lens_metadata_table.grant_read_write_data(kb_lambda_synchronizer)
 
-        # Grant Lambda access to the WA docs bucket
-        wafrReferenceDocsBucket.grant_put(kb_lambda_synchronizer)
+        # Grant Lambda access to the WA docs bucket, documents are read back to skip unchanged ones
+        wafrReferenceDocsBucket.grant_read_write(kb_lambda_synchronizer)
 
         # Create EventBridge rule to trigger KbLambdaSynchronizer weekly on Mondays
         events.Rule(
@@ -603,11 +2391,39 @@ class WAGenAIStack(Stack):
             targets=[targets.LambdaFunction(kb_lambda_synchronizer)],
         )
 
+        # Ingestion jobs run one at a time, those not started before the synchronizer timed out
+        # are started by this hourly rule, without synchronizing the lenses again
+        events.Rule(
+            self,
+            "PendingIngestionRule",
+            schedule=events.Schedule.rate(Duration.hours(1)),
+            targets=[
+                targets.LambdaFunction(
+                    kb_lambda_synchronizer,
+                    event=events.RuleTargetInput.from_object({"ingestionOnly": True}),
+                )
+            ],
+        )
+
         frontend_image = DockerImageAsset(
             self,
             "FrontendImage",
             directory="ecs_fargate_app",
             file="finch/frontend.Dockerfile",
+            # Only the files used by the Dockerfile are part of the asset hash, so changes elsewhere
+            # (or local node_modules) do not trigger a rebuild and push of an unchanged image
+            exclude=[
+                "*",
+                "!frontend",
+                "frontend/node_modules",
+                "frontend/dist",
+                # The finch directory itself must be re-included before the files in it
+                "!finch",
+                "finch/*",
+                "!finch/frontend.Dockerfile",
+                "!finch/nginx.conf",
+            ],
+            ignore_mode=cdk.IgnoreMode.DOCKER,
             platform=architecture["build_architecture"],
             build_args={
                 "BUILDKIT_INLINE_CACHE": "1",
@@ -620,6 +2436,16 @@ class WAGenAIStack(Stack):
             "BackendImage",
             directory="ecs_fargate_app",
             file="finch/backend.Dockerfile",
+            exclude=[
+                "*",
+                "!backend",
+                "backend/node_modules",
+                "backend/dist",
+                "!finch",
+                "finch/*",
+                "!finch/backend.Dockerfile",
+            ],
+            ignore_mode=cdk.IgnoreMode.DOCKER,
             platform=architecture["build_architecture"],
             build_args={
                 "BUILDKIT_INLINE_CACHE": "1",
@@ -696,8 +2522,15 @@ class WAGenAIStack(Stack):
                 },
             )
         )
+        # Allow invoking the models (or inference profiles) of every tier
+        model_resources = []
+        for tier_model_id in {model_config[tier] for tier in ("default", "fast", "iac")}:
+            model_resources.extend(self.get_model_arns(tier_model_id)[1])
         app_execute_role.add_to_policy(
-            iam.PolicyStatement(actions=["bedrock:InvokeModel"], resources=["*"])
+            iam.PolicyStatement(
+                actions=["bedrock:InvokeModel", "bedrock:InvokeModelWithResponseStream"],
+                resources=sorted(set(model_resources)),
+            )
         )
         app_execute_role.add_to_policy(
             iam.PolicyStatement(
@@ -717,8 +2550,11 @@ class WAGenAIStack(Stack):
             iam.PolicyStatement(
                 actions=[
                     "s3:PutObject",
+                    "s3:PutObjectTagging",
                     "s3:GetObject",
+                    "s3:GetObjectTagging",
                     "s3:DeleteObject",
+                    "s3:AbortMultipartUpload",
                     "s3:ListBucket",
                 ],
                 resources=[
@@ -759,6 +2595,36 @@ class WAGenAIStack(Stack):
             )
         )
 
+        if job_table:
+            app_execute_role.add_to_policy(
+                iam.PolicyStatement(
+                    actions=[
+                        "dynamodb:PutItem",
+                        "dynamodb:GetItem",
+                        "dynamodb:Query",
+                        "dynamodb:UpdateItem",
+                    ],
+                    resources=[
+                        job_table.table_arn,
+                        f"{job_table.table_arn}/index/*",
+                    ],
+                )
+            )
+            job_queue.grant_send_messages(app_execute_role)
+            job_queue.grant_consume_messages(app_execute_role)
+
+        # Backend and worker tasks protect themselves from scale-in while an analysis or IaC generation runs
+        app_execute_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["ecs:GetTaskProtection", "ecs:UpdateTaskProtection"],
+                resources=["*"],
+            )
+        )
+
+        # Backend and worker read the active color of the blue/green KB data sources
+        if kb_active_color_parameter:
+            kb_active_color_parameter.grant_read(app_execute_role)
+
         # Create VPC to host the ECS cluster
         vpc = ec2.Vpc(
             self,
@@ -780,7 +2646,13 @@ class WAGenAIStack(Stack):
         public_subnets = vpc.select_subnets(subnet_type=ec2.SubnetType.PUBLIC)
 
         # Create ECS Cluster
-        ecs_cluster = ecs.Cluster(self, "AppCluster", vpc=vpc, container_insights=True)
+        # Enhanced Container Insights adds task and container level CPU, memory, network and storage metrics
+        ecs_cluster = ecs.Cluster(
+            self,
+            "AppCluster",
+            vpc=vpc,
+            container_insights_v2=ecs.ContainerInsights.ENHANCED,
+        )
 
         # Add ECS Service Discovery namespace
         namespace = servicediscovery.PrivateDnsNamespace(
@@ -802,6 +2674,51 @@ class WAGenAIStack(Stack):
             description="Security group for backend service",
         )
 
+        # Create VPC endpoints so AWS service calls don't go through the NAT gateway
+        endpoint_security_group = None
+        if vpc_endpoints:
+            endpoint_security_group = self.create_vpc_endpoints(
+                vpc, tracing_config["enabled"], compute_config["workerTier"]
+            )
+            endpoint_security_group.add_ingress_rule(
+                peer=backend_security_group,
+                connection=ec2.Port.tcp(443),
+                description="Allow backend to access the VPC endpoints",
+            )
+
+        # Create the cache relaying websocket progress and caching responses between tasks
+        cache_security_group = None
+        cache_url = None
+        if cache_config["websocketBackplane"] or cache_config["responseCache"]:
+            cache_security_group, cache_url = self.create_cache_cluster(
+                vpc, cache_config
+            )
+            cache_security_group.add_ingress_rule(
+                peer=backend_security_group,
+                connection=ec2.Port.tcp(6379),
+                description="Allow backend to access the cache",
+            )
+
+        frontend_environment = {
+            # Use service discovery DNS name
+            "VITE_API_URL": f"http://backend.internal:3000",
+            # With Service Connect, nginx sends requests to the local proxy instead of resolving backend tasks
+            "NGINX_BACKEND_SERVER_PARAMS": "" if service_connect else "resolve",
+        }
+
+        # With CloudFront, the ALB only accepts requests from the CloudFront origin-facing servers
+        # that carry this secret, so the distribution cannot be bypassed
+        cloudfront_origin_secret = None
+        if use_cloudfront:
+            cloudfront_origin_secret = aws_secretsmanager.Secret(
+                self,
+                "CloudFrontOriginSecret",
+                description="Header value sent by CloudFront to the WA IaC Analyzer load balancer",
+                generate_secret_string=aws_secretsmanager.SecretStringGenerator(
+                    exclude_punctuation=True, password_length=32
+                ),
+            )
+
         # Create frontend service with ALB
         if auth_config["enabled"]:
             # Create HTTPS listener with authentication
@@ -820,12 +2737,10 @@ class WAGenAIStack(Stack):
                 task_image_options=ecs_patterns.ApplicationLoadBalancedTaskImageOptions(
                     image=ecs.ContainerImage.from_docker_image_asset(frontend_image),
                     container_port=8080,
-                    environment={
-                        # Use service discovery DNS name
-                        "VITE_API_URL": f"http://backend.internal:3000"
-                    },
+                    environment=frontend_environment,
                 ),
                 public_load_balancer=public_lb,
+                open_listener=not use_cloudfront,
                 security_groups=[frontend_security_group],
                 certificate=certificate,
                 redirect_http=True,
@@ -908,8 +2823,13 @@ class WAGenAIStack(Stack):
                 domain,
             )
 
-            # Remove any existing actions and add the auth action as the only action
-            https_listener.add_action("DefaultAuth", action=auth_action)
+            if use_cloudfront:
+                self.restrict_listener_to_cloudfront(
+                    https_listener, auth_action, cloudfront_origin_secret
+                )
+            else:
+                # Remove any existing actions and add the auth action as the only action
+                https_listener.add_action("DefaultAuth", action=auth_action)
         else:
             # HTTP-only ALB creation
             frontend_service = ecs_patterns.ApplicationLoadBalancedFargateService(
@@ -923,17 +2843,22 @@ class WAGenAIStack(Stack):
                 task_image_options=ecs_patterns.ApplicationLoadBalancedTaskImageOptions(
                     image=ecs.ContainerImage.from_docker_image_asset(frontend_image),
                     container_port=8080,
-                    environment={
-                        # Use service discovery DNS name
-                        "VITE_API_URL": f"http://backend.internal:3000"
-                    },
+                    environment=frontend_environment,
                 ),
                 public_load_balancer=public_lb,
+                open_listener=not use_cloudfront,
                 security_groups=[frontend_security_group],
             )
             # Store reference to frontend target group
             self.frontend_target_group = frontend_service.target_group
 
+            if use_cloudfront:
+                self.restrict_listener_to_cloudfront(
+                    frontend_service.listener,
+                    elbv2.ListenerAction.forward([self.frontend_target_group]),
+                    cloudfront_origin_secret,
+                )
+
         # Set ALB idle timeout to 60 minutes
         frontend_service.load_balancer.set_attribute(
             "idle_timeout.timeout_seconds", "3600"
@@ -957,6 +2882,23 @@ class WAGenAIStack(Stack):
 
         # Get the ALB DNS name after frontend service is created
         alb_dns = frontend_service.load_balancer.load_balancer_dns_name
+        frontend_url = f"http://{alb_dns}"
+
+        # Create the CloudFront distribution serving the application from the edge
+        distribution = None
+        if use_cloudfront:
+            distribution = self.create_cloudfront_distribution(
+                frontend_service.load_balancer,
+                cloudfront_config,
+                cloudfront_origin_secret,
+            )
+            frontend_url = f"https://{cloudfront_config['domainName'] or distribution.distribution_domain_name}"
+
+            frontend_service.load_balancer.connections.allow_from(
+                ec2.Peer.prefix_list(self.get_cloudfront_prefix_list_id()),
+                ec2.Port.tcp(443 if auth_config["enabled"] else 80),
+                "Allow CloudFront origin-facing servers to access the ALB",
+            )
 
         # Configure health check for ALB
         frontend_service.target_group.configure_health_check(path="/healthz")
@@ -970,36 +2912,145 @@ class WAGenAIStack(Stack):
                 cpu_architecture=architecture["fargate_architecture"],
             ),
             task_role=app_execute_role,
+            cpu=compute_config["backendCpu"],
+            memory_limit_mib=compute_config["backendMemory"],
+            # Extra space for unpacking and packing uploaded IaC archives
+            ephemeral_storage_gib=(
+                compute_config["backendEphemeralStorage"]
+                if compute_config["backendEphemeralStorage"] > 20
+                else None
+            ),
         )
 
-        backend_container = backend_task_definition.add_container(
-            "BackendContainer",
-            image=ecs.ContainerImage.from_docker_image_asset(backend_image),
+        # Migration Lambda function for transitioning from single-lens to multi-lens storage structure
+        # The new multi-lenses support introduced on 14-April-2025 is a breaking change. This function is meant to support a seamless transition from previous single-lens (wellarchitected) storage structure to the new multi-lens structure.
+        # The Lambda will only run at cdk deployment time once and only for deployments where the old single-lens structure is detected.
+        migration_lambda = lambda_.Function(
+            self,
+            "MigrationLambda",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            architecture=migration_config["architecture"]["lambda_architecture"],
+            handler="migration.handler",
+            code=self.python_lambda_code(
+                "ecs_fargate_app/lambda_migration", migration_config, build_config
+            ),
             environment={
-                "WA_DOCS_S3_BUCKET": WA_DOCS_BUCKET_NAME,
-                "KNOWLEDGE_BASE_ID": KB_ID,
-                "MODEL_ID": model_id,
-                "AWS_REGION": Stack.of(self).region,
-                "FRONTEND_URL": f"http://{alb_dns}",
-                "AUTH_ENABLED": str(auth_config["enabled"]).lower(),
-                "AUTH_SIGN_OUT_URL": sign_out_url,
+                "ANALYSIS_METADATA_TABLE": analysis_metadata_table.table_name,
+                "ANALYSIS_STORAGE_BUCKET": analysis_storage_bucket.bucket_name,
+                "WA_DOCS_BUCKET_NAME": wafrReferenceDocsBucket.bucket_name,
             },
-            logging=ecs.LogDriver.aws_logs(stream_prefix="backend"),
+            timeout=Duration.minutes(15),
+            memory_size=migration_config["memorySize"],
+            ephemeral_storage_size=cdk.Size.mebibytes(
+                migration_config["ephemeralStorageSize"]
+            ),
+            reserved_concurrent_executions=migration_config["reservedConcurrency"],
         )
 
-        backend_container.add_port_mappings(ecs.PortMapping(container_port=3000))
+        # Grant DynamoDB permissions to migration Lambda
+        analysis_metadata_table.grant_read_write_data(migration_lambda)
+
+        # Grant S3 permissions for both buckets to migration Lambda
+        analysis_storage_bucket.grant_read_write(migration_lambda)
+        wafrReferenceDocsBucket.grant_read_write(migration_lambda)
 
-        # Environment variables for the backend service when auth is enabled
-        backend_container.add_environment("STORAGE_ENABLED", "true")
+        # With the lazy strategy, the backend converts the work items it reads with the repair mode of the Lambda
+        if migration_strategy == "lazy":
+            migration_lambda.grant_invoke(app_execute_role)
+
+        backend_environment = {
+            "WA_DOCS_S3_BUCKET": WA_DOCS_BUCKET_NAME,
+            "KNOWLEDGE_BASE_ID": KB_ID,
+            # Retrievals are scoped to the data source of the analyzed lens
+            "KB_DATA_SOURCE_IDS": kb_data_source_ids,
+            # With blue/green ingestion, the green data sources are queried while the parameter says so
+            "KB_GREEN_DATA_SOURCE_IDS": kb_green_data_source_ids,
+            "KB_ACTIVE_COLOR_PARAMETER": (
+                kb_active_color_parameter.parameter_name
+                if kb_active_color_parameter
+                else ""
+            ),
+            "MODEL_ID": model_id,
+            # Cheaper model for simple question groups and detail expansion, larger one for IaC generation
+            "FAST_MODEL_ID": model_config["fast"],
+            "IAC_MODEL_ID": model_config["iac"],
+            "SIMPLE_QUESTION_MAX_BEST_PRACTICES": str(
+                model_config["simpleQuestionMaxBestPractices"]
+            ),
+            "KB_MODEL_ARN": self.get_model_arns(model_id)[0],
+            "AWS_REGION": Stack.of(self).region,
+            "FRONTEND_URL": frontend_url,
+            "AUTH_ENABLED": str(auth_config["enabled"]).lower(),
+            "AUTH_SIGN_OUT_URL": sign_out_url,
+            # Environment variables for the backend service when auth is enabled
+            "STORAGE_ENABLED": "true",
+            "ANALYSIS_STORAGE_BUCKET": analysis_storage_bucket.bucket_name,
+            "ANALYSIS_METADATA_TABLE": analysis_metadata_table.table_name,
+            "LENS_METADATA_TABLE": lens_metadata_table.table_name,
+            "ANALYSIS_METADATA_RECENCY_INDEX": "UserLastModifiedIndex",
+            "WORK_ITEM_RETENTION_DAYS": str(work_item_config["retentionDays"]),
+            "WORK_ITEMS_PAGE_SIZE": str(work_item_config["listPageSize"]),
+            "MAX_ARCHIVE_UPLOAD_SIZE_MB": str(
+                work_item_config["maxArchiveUploadSizeMb"]
+            ),
+        }
 
-        backend_container.add_environment(
-            "ANALYSIS_STORAGE_BUCKET", analysis_storage_bucket.bucket_name
-        )
-        backend_container.add_environment(
-            "ANALYSIS_METADATA_TABLE", analysis_metadata_table.table_name
+        # With lazy migrations, single-lens work items are converted when the backend first reads them
+        if migration_strategy == "lazy":
+            backend_environment["MIGRATION_FUNCTION_NAME"] = migration_lambda.function_name
+
+        # With the worker tier, the backend queues analyses and IaC generations instead of running them
+        if job_table:
+            backend_environment["JOB_TABLE"] = job_table.table_name
+            backend_environment["JOB_QUEUE_URL"] = job_queue.queue_url
+
+        if cache_url:
+            backend_environment["REDIS_URL"] = cache_url
+            # Progress events are published to the cache and relayed by every backend task to its clients
+            backend_environment["PROGRESS_BACKPLANE"] = str(
+                cache_config["websocketBackplane"]
+            ).lower()
+            backend_environment["CACHE_ENABLED"] = str(
+                cache_config["responseCache"]
+            ).lower()
+
+        if monitoring_config["enabled"]:
+            # Analysis, model and KB retrieval metrics for the performance dashboard and alarms
+            backend_environment["METRICS_ENABLED"] = "true"
+
+        if tracing_config["enabled"]:
+            # Spans of the requests, analysis phases and AWS SDK calls are sent to the collector sidecar
+            backend_environment["TRACING_ENABLED"] = "true"
+            backend_environment["TRACING_SAMPLE_RATIO"] = str(
+                tracing_config["sampleRatio"]
+            )
+            backend_environment["OTEL_EXPORTER_OTLP_ENDPOINT"] = "http://localhost:4318"
+            backend_environment["OTEL_SERVICE_NAME"] = "wa-genai-backend"
+            app_execute_role.add_managed_policy(
+                iam.ManagedPolicy.from_aws_managed_policy_name(
+                    "AWSXRayDaemonWriteAccess"
+                )
+            )
+
+        backend_container = backend_task_definition.add_container(
+            "BackendContainer",
+            image=ecs.ContainerImage.from_docker_image_asset(backend_image),
+            environment=backend_environment,
+            logging=ecs.LogDriver.aws_logs(stream_prefix="backend"),
         )
-        backend_container.add_environment(
-            "LENS_METADATA_TABLE", lens_metadata_table.table_name
+
+        if tracing_config["enabled"]:
+            self.add_otel_collector(
+                backend_task_definition,
+                backend_container,
+                tracing_config,
+                "backend-otel",
+            )
+
+        backend_container.add_port_mappings(
+            ecs.PortMapping(
+                container_port=3000, name="backend", app_protocol=ecs.AppProtocol.http
+            )
         )
 
         # Create the backend service
@@ -1012,10 +3063,101 @@ class WAGenAIStack(Stack):
                 subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
             ),
             security_groups=[backend_security_group],
+            desired_count=compute_config["backendMinTasks"],
+        )
+
+        if service_connect:
+            # Route frontend to backend traffic through the Service Connect proxies, which pool connections,
+            # retry failed requests, eject unhealthy tasks and publish per-service request metrics
+            backend_service.enable_service_connect(
+                namespace=namespace.namespace_arn,
+                services=[
+                    ecs.ServiceConnectService(
+                        port_mapping_name="backend",
+                        discovery_name="backend",
+                        dns_name="backend.internal",
+                        port=3000,
+                        # Analyses and websocket connections last longer than the proxy defaults
+                        idle_timeout=Duration.hours(1),
+                        per_request_timeout=Duration.hours(1),
+                    )
+                ],
+                log_driver=ecs.LogDriver.aws_logs(stream_prefix="backend-proxy"),
+            )
+            frontend_service.service.enable_service_connect(
+                namespace=namespace.namespace_arn,
+                log_driver=ecs.LogDriver.aws_logs(stream_prefix="frontend-proxy"),
+            )
+        else:
+            # Add service discovery
+            backend_service.enable_cloud_map(
+                cloud_map_namespace=namespace, name="backend"
+            )
+
+        # Scale the backend on CPU and memory, scaling in more slowly than out so in-flight analyses can finish
+        backend_scaling = backend_service.auto_scale_task_count(
+            min_capacity=compute_config["backendMinTasks"],
+            max_capacity=compute_config["backendMaxTasks"],
+        )
+        backend_scaling.scale_on_cpu_utilization(
+            "BackendCpuScaling",
+            target_utilization_percent=compute_config["targetCpuUtilization"],
+            scale_out_cooldown=Duration.minutes(1),
+            scale_in_cooldown=Duration.minutes(10),
         )
+        backend_scaling.scale_on_memory_utilization(
+            "BackendMemoryScaling",
+            target_utilization_percent=compute_config["targetMemoryUtilization"],
+            scale_out_cooldown=Duration.minutes(1),
+            scale_in_cooldown=Duration.minutes(10),
+        )
+
+        worker_service = None
+        if job_table:
+            worker_service = self.create_worker_tier(
+                ecs_cluster,
+                backend_image,
+                backend_environment,
+                app_execute_role,
+                architecture,
+                compute_config,
+                job_queue,
+                tracing_config,
+            )
+
+            # Workers publish the progress of the jobs they run
+            if cache_security_group:
+                cache_security_group.connections.allow_from(
+                    worker_service,
+                    ec2.Port.tcp(6379),
+                    "Allow workers to access the cache",
+                )
+
+            if endpoint_security_group:
+                endpoint_security_group.connections.allow_from(
+                    worker_service,
+                    ec2.Port.tcp(443),
+                    "Allow workers to access the VPC endpoints",
+                )
 
-        # Add service discovery
-        backend_service.enable_cloud_map(cloud_map_namespace=namespace, name="backend")
+        # Scale the frontend, the only service behind the ALB, on requests per target and CPU
+        frontend_scaling = frontend_service.service.auto_scale_task_count(
+            min_capacity=compute_config["frontendMinTasks"],
+            max_capacity=compute_config["frontendMaxTasks"],
+        )
+        frontend_scaling.scale_on_request_count(
+            "FrontendRequestScaling",
+            requests_per_target=compute_config["targetRequestsPerTask"],
+            target_group=frontend_service.target_group,
+            scale_out_cooldown=Duration.minutes(1),
+            scale_in_cooldown=Duration.minutes(5),
+        )
+        frontend_scaling.scale_on_cpu_utilization(
+            "FrontendCpuScaling",
+            target_utilization_percent=compute_config["targetCpuUtilization"],
+            scale_out_cooldown=Duration.minutes(1),
+            scale_in_cooldown=Duration.minutes(5),
+        )
 
         deployment_timestamp = int(time.time())
 
@@ -1056,39 +3198,9 @@ class WAGenAIStack(Stack):
             ),
         )
 
-        # Migration Lambda function for transitioning from single-lens to multi-lens storage structure
-        # The new multi-lenses support introduced on 14-April-2025 is a breaking change. This function is meant to support a seamless transition from previous single-lens (wellarchitected) storage structure to the new multi-lens structure.
-        # The Lambda will only run at cdk deployment time once and only for deployments where the old single-lens structure is detected.
-        migration_lambda = lambda_.Function(
-            self,
-            "MigrationLambda",
-            runtime=lambda_.Runtime.PYTHON_3_12,
-            handler="migration.handler",
-            code=lambda_.Code.from_asset(
-                "ecs_fargate_app/lambda_migration",
-                bundling=cdk.BundlingOptions(
-                    image=lambda_.Runtime.PYTHON_3_12.bundling_image,
-                    command=[
-                        "bash",
-                        "-c",
-                        "pip install --no-cache -r requirements.txt -t /asset-output && cp -au . /asset-output",
-                    ],
-                ),
-            ),
-            environment={
-                "ANALYSIS_METADATA_TABLE": analysis_metadata_table.table_name,
-                "ANALYSIS_STORAGE_BUCKET": analysis_storage_bucket.bucket_name,
-                "WA_DOCS_BUCKET_NAME": wafrReferenceDocsBucket.bucket_name,
-            },
-            timeout=Duration.minutes(15),
-        )
-
-        # Grant DynamoDB permissions to migration Lambda
-        analysis_metadata_table.grant_read_write_data(migration_lambda)
-
-        # Grant S3 permissions for both buckets to migration Lambda
-        analysis_storage_bucket.grant_read_write(migration_lambda)
-        wafrReferenceDocsBucket.grant_read_write(migration_lambda)
+        # Eager migrations rewrite everything at deploy time. Lazy ones only start the background sweeper,
+        # the backend converting the records it reads in the meantime.
+        migration_event = {"mode": "migrate" if migration_strategy == "eager" else "sweep"}
 
         # Create a custom resource to trigger migration Lambda after KB synchronization
         migration_trigger_cr = cr.AwsCustomResource(
@@ -1100,6 +3212,7 @@ class WAGenAIStack(Stack):
                 parameters={
                     "FunctionName": migration_lambda.function_name,
                     "InvocationType": "Event",
+                    "Payload": json.dumps(migration_event),
                 },
                 physical_resource_id=cr.PhysicalResourceId.of("MigrationLambdaTrigger"),
             ),
@@ -1110,9 +3223,66 @@ class WAGenAIStack(Stack):
 
         migration_lambda.grant_invoke(migration_trigger_cr)
 
+        if migration_strategy == "lazy":
+            # Background sweeper finishing the cold tail; each run resumes from the cursor saved by the previous one
+            events.Rule(
+                self,
+                "MigrationSweepRule",
+                schedule=events.Schedule.rate(Duration.hours(1)),
+                targets=[
+                    targets.LambdaFunction(
+                        migration_lambda,
+                        event=events.RuleTargetInput.from_object({"mode": "sweep"}),
+                    )
+                ],
+            )
+
+        work_item_cleanup_lambda = None
+        if work_item_config["retentionDays"]:
+            work_item_cleanup_lambda = self.create_work_item_cleanup_resources(
+                work_item_cleanup_config,
+                build_config,
+                analysis_metadata_table,
+                analysis_storage_bucket,
+            )
+
+        if monitoring_config["enabled"]:
+            monitored_services = {
+                "Frontend": frontend_service.service,
+                "Backend": backend_service,
+            }
+            if worker_service:
+                monitored_services["Worker"] = worker_service
+
+            dashboard = self.create_monitoring(
+                monitoring_config,
+                frontend_service.load_balancer,
+                monitored_services,
+                {
+                    "KbSynchronizer": kb_lambda_synchronizer,
+                    "Migration": migration_lambda,
+                    **(
+                        {"WorkItemCleanup": work_item_cleanup_lambda}
+                        if work_item_cleanup_lambda
+                        else {}
+                    ),
+                },
+                KB_ID,
+                list(dict.fromkeys(model_config[tier] for tier in ("default", "fast", "iac"))),
+            )
+
+            cdk.CfnOutput(
+                self,
+                "PerformanceDashboardURL",
+                value=f"https://{self.region}.console.aws.amazon.com/cloudwatch/home?region={self.region}#dashboards/dashboard/{dashboard.dashboard_name}",
+                description="CloudWatch dashboard of the analysis, model, knowledge base and service performance",
+            )
+
         # Conditionally create stack cleanup resources if auto_cleanup is enabled
         if auto_cleanup:
-            self.create_stack_cleanup_resources()
+            self.create_stack_cleanup_resources(
+                lambda_config["stackCleanup"], build_config
+            )
 
         # Output the frontend ALB DNS name
         cdk.CfnOutput(
@@ -1122,6 +3292,14 @@ class WAGenAIStack(Stack):
             description="Frontend application URL",
         )
 
+        if distribution:
+            cdk.CfnOutput(
+                self,
+                "CloudFrontURL",
+                value=frontend_url,
+                description="Frontend application URL through CloudFront",
+            )
+
         # Output the ID of the Bedrock knowledge base
         cdk.CfnOutput(
             self,
@@ -1130,6 +3308,27 @@ class WAGenAIStack(Stack):
             description="ID of the Bedrock knowledge base",
         )
 
+        # Output the data source IDs of the knowledge base by lens prefix
+        cdk.CfnOutput(
+            self,
+            "KnowledgeBaseDataSourceIDs",
+            value=kb_data_source_ids,
+            description="IDs of the Bedrock knowledge base data sources by lens prefix",
+        )
+        if kb_active_color_parameter:
+            cdk.CfnOutput(
+                self,
+                "KnowledgeBaseGreenDataSourceIDs",
+                value=kb_green_data_source_ids,
+                description="IDs of the green Bedrock knowledge base data sources by lens prefix",
+            )
+            cdk.CfnOutput(
+                self,
+                "KnowledgeBaseActiveColorParameter",
+                value=kb_active_color_parameter.parameter_name,
+                description="SSM parameter with the color of the data sources queried by the backend",
+            )
+
         # Output S3 bucket (Source of Bedrock knowledge base) with well-architected documents.
         cdk.CfnOutput(
             self,
@@ -1199,16 +3398,17 @@ class WAGenAIStack(Stack):
         )
 
         # Node dependencies
-        kbDataSource.node.add_dependency(wafrReferenceDocsBucket)
-        ingestion_job_cr.node.add_dependency(kb)
         kb_lambda_synchronizer.node.add_dependency(kb)
-        kb_lambda_synchronizer.node.add_dependency(kbDataSource)
+        for data_source in [*kb_data_sources.values(), *kb_green_data_sources.values()]:
+            data_source.node.add_dependency(wafrReferenceDocsBucket)
+            kb_lambda_synchronizer.node.add_dependency(data_source)
         kb_lambda_synchronizer.node.add_dependency(wafrReferenceDocsBucket)
         kb_lambda_synchronizer.node.add_dependency(workload_cr)
 
         kb_lambda_trigger_cr.node.add_dependency(kb_lambda_synchronizer)
         kb_lambda_trigger_cr.node.add_dependency(kb)
-        kb_lambda_trigger_cr.node.add_dependency(kbDataSource)
+        for data_source in [*kb_data_sources.values(), *kb_green_data_sources.values()]:
+            kb_lambda_trigger_cr.node.add_dependency(data_source)
         kb_lambda_trigger_cr.node.add_dependency(wafrReferenceDocsBucket)
         kb_lambda_trigger_cr.node.add_dependency(workload_cr)
 
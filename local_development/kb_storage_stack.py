@@ -1,5 +1,7 @@
 """CDK stack for deploying only Knowledge Base and Storage resources"""
 
+import json
+import os
 import time
 import uuid
 
@@ -13,9 +15,29 @@ from aws_cdk import aws_lambda as lambda_
 from aws_cdk import aws_s3 as s3
 from aws_cdk import aws_s3_deployment as s3deploy
 from aws_cdk import custom_resources as cr
-from cdklabs.generative_ai_cdk_constructs import bedrock
+from cdklabs.generative_ai_cdk_constructs import bedrock, opensearchserverless
 from constructs import Construct
 
+# BedrockFoundationModel of the supported embedding models per vector dimension
+# (Cohere models embed at most 512 tokens, less than the 800-token child chunks of this stack)
+KB_EMBEDDING_MODELS = {
+    "amazon.titan-embed-text-v2:0": {
+        256: "TITAN_EMBED_TEXT_V2_256",
+        512: "TITAN_EMBED_TEXT_V2_512",
+        1024: "TITAN_EMBED_TEXT_V2_1024",
+    },
+    "amazon.titan-embed-text-v1": {1536: "TITAN_EMBED_TEXT_V1"},
+}
+
+# Lenses synchronized into the knowledge base, shared with the KB synchronizer Lambda
+KB_LENSES_FILE = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "ecs_fargate_app",
+    "lambda_kb_synchronizer",
+    "lenses.json",
+)
+
 
 class KBStorageStack(Stack):
     """CDK Stack for deploying only Knowledge Base and Storage resources"""
@@ -28,11 +50,44 @@ class KBStorageStack(Stack):
         if deploy_storage is None:  # Default to true if not specified
             deploy_storage = True
 
+        # Embedding model and vector dimensions, same settings as config.ini of the main stack
+        kb_embedding_model = (
+            self.node.try_get_context("kb_embedding_model")
+            or "amazon.titan-embed-text-v2:0"
+        )
+        kb_embedding_dimensions = int(
+            self.node.try_get_context("kb_embedding_dimensions") or 1024
+        )
+        if kb_embedding_model not in KB_EMBEDDING_MODELS:
+            raise ValueError(
+                f"kb_embedding_model must be one of {', '.join(KB_EMBEDDING_MODELS)}"
+            )
+        if kb_embedding_dimensions not in KB_EMBEDDING_MODELS[kb_embedding_model]:
+            raise ValueError(
+                f"kb_embedding_dimensions of {kb_embedding_model} must be one of "
+                f"{', '.join(map(str, KB_EMBEDDING_MODELS[kb_embedding_model]))}"
+            )
+
+        # Without standby replicas the OpenSearch Serverless collection runs in a single AZ,
+        # halving its minimum capacity, which is enough for development
+        kb_vector_store = None
+        if str(self.node.try_get_context("kb_vector_store_standby_replicas")).lower() == "false":
+            kb_vector_store = opensearchserverless.VectorCollection(
+                self,
+                "KBVectorsWithoutStandby",
+                description="Vector store of the WAFR knowledge base, without standby replicas",
+                standby_replicas=opensearchserverless.VectorCollectionStandbyReplicas.DISABLED,
+            )
+
         # Creates Bedrock KB using the generative_ai_cdk_constructs
         kb = bedrock.KnowledgeBase(
             self,
             "WAFR-KnowledgeBase",
-            embeddings_model=bedrock.BedrockFoundationModel.TITAN_EMBED_TEXT_V2_1024,
+            embeddings_model=getattr(
+                bedrock.BedrockFoundationModel,
+                KB_EMBEDDING_MODELS[kb_embedding_model][kb_embedding_dimensions],
+            ),
+            vector_store=kb_vector_store,
             instruction="Use this knowledge base to answer questions about AWS Well Architected Framework Review (WAFR).",
             description="This knowledge base contains AWS Well Architected Framework Review (WAFR) reference documents",
         )
@@ -73,37 +128,44 @@ class KBStorageStack(Stack):
 
         WA_DOCS_BUCKET_NAME = wafrReferenceDocsBucket.bucket_name
 
-        # Adds the created S3 bucket [wafrReferenceDocsBucket] as a Data Source for Bedrock KB
-        kbDataSource = bedrock.S3DataSource(
-            self,
-            "DataSource",
-            bucket=wafrReferenceDocsBucket,
-            knowledge_base=kb,
-            data_source_name="wafr-reference-docs",
-            chunking_strategy=bedrock.ChunkingStrategy.hierarchical(
-                overlap_tokens=60, max_parent_token_size=2000, max_child_token_size=800
-            ),
-        )
-
-        # Data Ingestion Params
-        dataSourceIngestionParams = {
-            "dataSourceId": kbDataSource.data_source_id,
-            "knowledgeBaseId": KB_ID,
+        # Adds the created S3 bucket [wafrReferenceDocsBucket] as the Data Sources of the Bedrock KB,
+        # one for the whole bucket (kb_data_sources=bucket, default) or one per lens prefix (kb_data_sources=lens).
+        # The synchronizer starts the ingestion jobs, including the first one of each data source.
+        kb_data_source_scope = self.node.try_get_context("kb_data_sources") or "bucket"
+        if kb_data_source_scope == "lens":
+            with open(KB_LENSES_FILE) as lenses_file:
+                lenses = json.load(lenses_file)
+            kb_prefixes = []
+            for lens in [lenses["wellarchitectedLens"], *lenses["additionalLenses"]]:
+                prefix = lens["lensArn"].split("/")[-1]
+                if prefix not in kb_prefixes:
+                    kb_prefixes.append(prefix)
+        elif kb_data_source_scope == "bucket":
+            kb_prefixes = [""]
+        else:
+            raise ValueError("kb_data_sources must be one of lens, bucket")
+
+        kb_data_sources = {
+            prefix: bedrock.S3DataSource(
+                self,
+                f"DataSource-{prefix}" if prefix else "DataSource",
+                bucket=wafrReferenceDocsBucket,
+                knowledge_base=kb,
+                data_source_name=(
+                    f"wafr-reference-docs-{prefix}" if prefix else "wafr-reference-docs"
+                ),
+                inclusion_prefixes=[f"{prefix}/"] if prefix else None,
+                chunking_strategy=bedrock.ChunkingStrategy.hierarchical(
+                    overlap_tokens=60, max_parent_token_size=2000, max_child_token_size=800
+                ),
+            )
+            for prefix in kb_prefixes
         }
-
-        # Define a custom resource to make an AwsSdk startIngestionJob call
-        ingestion_job_cr = cr.AwsCustomResource(
-            self,
-            "IngestionCustomResource",
-            on_create=cr.AwsSdkCall(
-                service="bedrock-agent",
-                action="startIngestionJob",
-                parameters=dataSourceIngestionParams,
-                physical_resource_id=cr.PhysicalResourceId.of("Parameter.ARN"),
-            ),
-            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
-                resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
-            ),
+        kb_data_source_ids = self.to_json_string(
+            {
+                prefix: data_source.data_source_id
+                for prefix, data_source in kb_data_sources.items()
+            }
         )
 
         # Params for the test Well-Architected Workload
@@ -169,7 +231,8 @@ class KBStorageStack(Stack):
             ),
             environment={
                 "KNOWLEDGE_BASE_ID": KB_ID,
-                "DATA_SOURCE_ID": kbDataSource.data_source_id,
+                # Data source IDs keyed by bucket prefix, an empty prefix covers the whole bucket
+                "DATA_SOURCE_IDS": kb_data_source_ids,
                 "WA_DOCS_BUCKET_NAME": wafrReferenceDocsBucket.bucket_name,
                 "WORKLOAD_ID": workload_cr.get_response_field("WorkloadId"),
                 "LENS_METADATA_TABLE": lens_metadata_table.table_name,
@@ -180,7 +243,11 @@ class KBStorageStack(Stack):
         # Grant permissions to the KB synchronizer Lambda
         kb_lambda_synchronizer.add_to_role_policy(
             iam.PolicyStatement(
-                actions=["bedrock:StartIngestionJob"],
+                actions=[
+                    "bedrock:StartIngestionJob",
+                    "bedrock:GetIngestionJob",
+                    "bedrock:ListIngestionJobs",
+                ],
                 resources=[
                     f"arn:aws:bedrock:{self.region}:{self.account}:knowledge-base/{KB_ID}"
                 ],
@@ -202,8 +269,8 @@ class KBStorageStack(Stack):
         # Grant Lambda access to the lens metadata table
         lens_metadata_table.grant_read_write_data(kb_lambda_synchronizer)
 
-        # Grant Lambda access to the WA docs bucket
-        wafrReferenceDocsBucket.grant_put(kb_lambda_synchronizer)
+        # Grant Lambda access to the WA docs bucket, documents are read back to skip unchanged ones
+        wafrReferenceDocsBucket.grant_read_write(kb_lambda_synchronizer)
 
         # Create EventBridge rule to trigger KbLambdaSynchronizer weekly on Mondays
         events.Rule(
@@ -215,6 +282,20 @@ class KBStorageStack(Stack):
             targets=[targets.LambdaFunction(kb_lambda_synchronizer)],
         )
 
+        # Ingestion jobs run one at a time, those not started before the synchronizer timed out
+        # are started by this hourly rule, without synchronizing the lenses again
+        events.Rule(
+            self,
+            "PendingIngestionRule",
+            schedule=events.Schedule.rate(Duration.hours(1)),
+            targets=[
+                targets.LambdaFunction(
+                    kb_lambda_synchronizer,
+                    event=events.RuleTargetInput.from_object({"ingestionOnly": True}),
+                )
+            ],
+        )
+
         deployment_timestamp = int(time.time())
 
         # Custom resource to trigger the KB Lambda synchronizer during deployment
@@ -271,8 +352,21 @@ class KBStorageStack(Stack):
                         allowed_methods=[s3.HttpMethods.GET, s3.HttpMethods.PUT],
                         allowed_origins=["*"],
                         allowed_headers=["*"],
+                        exposed_headers=["ETag"],
                     )
                 ],
+                # Same cleanup of incomplete uploads and intermediate artifacts as WAGenAIStack
+                lifecycle_rules=[
+                    s3.LifecycleRule(
+                        id="AbortIncompleteMultipartUploads",
+                        abort_incomplete_multipart_upload_after=Duration.days(1),
+                    ),
+                    s3.LifecycleRule(
+                        id="ExpireIntermediateArtifacts",
+                        tag_filters={"artifact": "intermediate"},
+                        expiration=Duration.days(7),
+                    ),
+                ],
             )
 
             # Create DynamoDB table for metadata
@@ -288,6 +382,31 @@ class KBStorageStack(Stack):
                 billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
                 removal_policy=RemovalPolicy.DESTROY,
                 point_in_time_recovery=True,
+                time_to_live_attribute="expiresAt",
+            )
+
+            # Same recency index as WAGenAIStack, used by the work item listing
+            analysis_metadata_table.add_global_secondary_index(
+                index_name="UserLastModifiedIndex",
+                partition_key=dynamodb.Attribute(
+                    name="userId", type=dynamodb.AttributeType.STRING
+                ),
+                sort_key=dynamodb.Attribute(
+                    name="lastModified", type=dynamodb.AttributeType.STRING
+                ),
+                projection_type=dynamodb.ProjectionType.INCLUDE,
+                non_key_attributes=[
+                    "fileName",
+                    "fileType",
+                    "uploadDate",
+                    "uploadMode",
+                    "hasChatHistory",
+                    "usedLenses",
+                    "analysisStatus",
+                    "analysisPartialResults",
+                    "workloadIds",
+                    "workloadId",
+                ],
             )
 
         # Output the Knowledge Base ID for .env configuration
@@ -298,6 +417,14 @@ class KBStorageStack(Stack):
             description="ID of the Bedrock knowledge base",
         )
 
+        # Output the data source IDs of the knowledge base for .env configuration
+        CfnOutput(
+            self,
+            "KnowledgeBaseDataSourceIDs",
+            value=kb_data_source_ids,
+            description="IDs of the Bedrock knowledge base data sources by lens prefix",
+        )
+
         # Output the S3 bucket name for .env configuration
         CfnOutput(
             self,
@@ -331,10 +458,10 @@ class KBStorageStack(Stack):
             )
 
         # Node dependencies
-        kbDataSource.node.add_dependency(wafrReferenceDocsBucket)
-        ingestion_job_cr.node.add_dependency(kb)
         kb_lambda_synchronizer.node.add_dependency(kb)
-        kb_lambda_synchronizer.node.add_dependency(kbDataSource)
+        for data_source in kb_data_sources.values():
+            data_source.node.add_dependency(wafrReferenceDocsBucket)
+            kb_lambda_synchronizer.node.add_dependency(data_source)
         kb_lambda_synchronizer.node.add_dependency(wafrReferenceDocsBucket)
         kb_lambda_synchronizer.node.add_dependency(workload_cr)
         kb_lambda_trigger_cr.node.add_dependency(kb_lambda_synchronizer)